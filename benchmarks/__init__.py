@@ -0,0 +1,4 @@
+# Headless performance benchmarks (no Streamlit required).
+# Run any module directly, e.g. `python -m benchmarks.bench_db_connections`.
+# `python -m benchmarks.suite` runs the hot-function suite on synthetic data
+# (benchmarks.synthetic) and compares it with a stored JSON baseline.
@@ -0,0 +1,49 @@
+import os
+import statistics
+import subprocess
+import sys
+
+# ==========================================
+# COLD START: db_manager IMPORT + app.py BOOT
+# ==========================================
+# Each sample is a fresh interpreter. pandas/numpy are imported before the
+# timer starts so the number isolates what our own modules do at import
+# (schema DDL, migrations, seed injection) rather than third-party load time.
+# Usage: python -m benchmarks.bench_cold_start [repo_root] [runs]
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+SNIPPETS = {
+    "import modules.core.db_manager": (
+        "import pandas, numpy, time\n"
+        "t = time.perf_counter()\n"
+        "import modules.core.db_manager\n"
+        "print(time.perf_counter() - t)"
+    ),
+    "run app.py (bare Streamlit)": (
+        "import logging, warnings, runpy, pandas, numpy, streamlit, time\n"
+        "logging.disable(logging.CRITICAL); warnings.simplefilter('ignore')\n"
+        "t = time.perf_counter()\n"
+        "runpy.run_path('app.py')\n"
+        "print(time.perf_counter() - t)"
+    ),
+}
+
+
+def _sample(snippet, cwd):
+    out = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, cwd=cwd)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(root=REPO_ROOT, runs=7):
+    return {
+        name: statistics.median(_sample(snippet, root) for _ in range(runs)) * 1000
+        for name, snippet in SNIPPETS.items()
+    }
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else REPO_ROOT
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    for name, ms in run_benchmark(root, runs).items():
+        print(f"{name:<34}{ms:>10.1f} ms (median of {runs})")
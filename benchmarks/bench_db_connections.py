@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.core.db_pool import ConnectionPool
+
+# ==========================================
+# CONNECT OVERHEAD: LEGACY vs POOLED
+# ==========================================
+# Legacy = the old db_manager pattern: sqlite3.connect -> execute -> commit -> close
+# per call. Pooled = one tuned, long-lived connection per thread.
+
+ITERATIONS = 2000
+
+
+def _seed(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE system_config (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("CREATE TABLE ledger_lines (transaction_id TEXT, date TEXT, description TEXT, "
+                 "account_code TEXT, debit REAL, credit REAL, reference_id TEXT)")
+    conn.execute("INSERT INTO system_config VALUES ('target_2025', '15000000')")
+    conn.commit()
+    conn.close()
+
+
+def _legacy_read(db_path):
+    conn = sqlite3.connect(db_path)
+    try: return conn.execute("SELECT value FROM system_config WHERE key = ?", ("target_2025",)).fetchone()
+    finally: conn.close()
+
+
+def _legacy_write(db_path, i):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
+              (f"JRN-{i}", "2025-01-01", "bench", "1200-AR", 100.0, 0, "REF"))
+    conn.commit()
+    conn.close()
+
+
+def _pooled_read(pool):
+    with pool.connect() as conn:
+        return conn.execute("SELECT value FROM system_config WHERE key = ?", ("target_2025",)).fetchone()
+
+
+def _pooled_write(pool, i):
+    with pool.connect() as conn:
+        conn.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (f"JRN-{i}", "2025-01-01", "bench", "1200-AR", 100.0, 0, "REF"))
+
+
+def _time(fn, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t0) / n * 1e6  # µs per call
+
+
+def run_benchmark(iterations=ITERATIONS):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy.db")
+        pooled_db = os.path.join(tmp, "pooled.db")
+        _seed(legacy_db)
+        _seed(pooled_db)
+
+        pool = ConnectionPool(pooled_db)
+        results["read_legacy_us"] = _time(lambda i: _legacy_read(legacy_db), iterations)
+        results["read_pooled_us"] = _time(lambda i: _pooled_read(pool), iterations)
+        results["write_legacy_us"] = _time(lambda i: _legacy_write(legacy_db, i), iterations)
+        results["write_pooled_us"] = _time(lambda i: _pooled_write(pool, i), iterations)
+        pool.close_all()
+    return results
+
+
+if __name__ == "__main__":
+    r = run_benchmark()
+    print(f"{'op':<8}{'legacy µs/call':>18}{'pooled µs/call':>18}{'speed-up':>10}")
+    for op in ("read", "write"):
+        legacy, pooled = r[f"{op}_legacy_us"], r[f"{op}_pooled_us"]
+        print(f"{op:<8}{legacy:>18.1f}{pooled:>18.1f}{legacy / pooled:>9.1f}x")
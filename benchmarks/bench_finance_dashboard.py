@@ -0,0 +1,113 @@
+import sys
+import os
+import time
+import tempfile
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# LOGISTICS FINANCE DASHBOARD: iterrows ENGINES vs ONE VECTORISED PIPELINE
+# ==========================================
+# Seeds N dispatch-journal trips (some on unlisted routes) into a throwaway
+# fleet DB, then times the dashboard's CPK -> corridor profit -> fuel
+# variance pass end to end (journal read included) with the vectorised
+# pipeline, and the old per-row engines on a sample. Checks both produce the
+# same figures on that sample, plus the depreciation schedule.
+# Usage: python -m benchmarks.bench_finance_dashboard [trips] [legacy_sample]
+
+
+def legacy_cpk(df, CORRIDORS, DIESEL_PRICE):
+    rows = []
+    for _, row in df.iterrows():
+        route = row.get("rfq_ref", "")
+        if route not in CORRIDORS:
+            continue
+        dist, tolls = CORRIDORS[route]["dist"], CORRIDORS[route]["tolls"]
+        fuel_cost = (dist / 100) * 38.0 * DIESEL_PRICE
+        total_cost = fuel_cost + tolls
+        rows.append({"trip_id": row.get("trip_id"), "route": route, "distance_km": dist, "fuel_cost": fuel_cost,
+                     "toll_cost": tolls, "total_cost": total_cost, "cpk": total_cost / dist if dist > 0 else 0})
+    return pd.DataFrame(rows)
+
+
+def legacy_profit(gl_df, df_cpk):
+    revenue_df = gl_df[gl_df["Code"].astype(str).str.startswith("4")]
+    rows = []
+    for route in df_cpk["route"].unique():
+        cost = df_cpk[df_cpk["route"] == route]["total_cost"].sum()
+        revenue = revenue_df["Amount"].sum()
+        profit = revenue - cost
+        rows.append({"route": route, "revenue": revenue, "cost": cost, "profit": profit,
+                     "margin_pct": (profit / revenue) * 100 if revenue > 0 else 0})
+    return pd.DataFrame(rows)
+
+
+def legacy_depreciation(asset_df):
+    rows = []
+    for _, row in asset_df.iterrows():
+        cost = row.get("Purchase_Value", 0) or 0
+        life = row.get("Useful_Life_Years", 5) or 5
+        annual_dep = cost / life if life > 0 else 0
+        rows.append({"Asset": row.get("Asset_ID", row.get("Reg", "Unknown")), "Purchase_Value": cost,
+                     "Useful_Life_Years": life, "Annual_Depreciation": annual_dep, "Monthly_Depreciation": annual_dep / 12})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    os.chdir(tempfile.mkdtemp())  # db_utils binds fleet_data.db relative to the working directory
+
+    from modules.core.query_cache import clear_cache
+    from modules.logistics.constants import CORRIDORS, DIESEL_PRICE
+    from modules.logistics.db_utils import engine, init_db, load_data
+    from modules.logistics.views import finance_dashboard as fd
+
+    init_db()
+    rng = np.random.default_rng(7)
+    routes = rng.choice(np.array(list(CORRIDORS) + ["Unlisted Lane"], dtype=object), n)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO log_dispatch_journal (trip_id, rfq_ref, truck_reg, status) VALUES (?, ?, ?, 'Delivered')",
+                             [(f"TRP-{i:07d}", routes[i], f"TRK-{i % 500:03d}") for i in range(n)])
+    gl_df = pd.DataFrame({"Code": [4000, 4000, 5000, 5000, 1000], "Amount": [250_000.0, 120_000.0, -40_000.0, -9_500.0, 10.0]})
+
+    clear_cache()
+    t = time.perf_counter()
+    df_cpk = fd._compute_cpk()
+    df_profit = fd._compute_corridor_profit(gl_df, df_cpk)
+    df_var = fd._compute_fuel_variance(gl_df, df_cpk)
+    t_new = time.perf_counter() - t
+
+    journal = load_data("SELECT * FROM log_dispatch_journal").head(sample)
+    t = time.perf_counter()
+    old_cpk = legacy_cpk(journal, CORRIDORS, DIESEL_PRICE)
+    old_profit = legacy_profit(gl_df, old_cpk)
+    t_old = (time.perf_counter() - t) * n / sample
+
+    new_cpk = fd._compute_cpk(journal)
+    pd.testing.assert_frame_equal(old_cpk, new_cpk, check_dtype=False)
+    pd.testing.assert_frame_equal(old_profit, fd._compute_corridor_profit(gl_df, new_cpk), check_dtype=False, rtol=1e-9)
+
+    assets = pd.DataFrame({"Asset_ID": [f"A{i}" for i in range(sample)],
+                           "Purchase_Value": rng.uniform(0, 2e6, sample).round(-3),
+                           "Useful_Life_Years": rng.choice([0, 3, 5, 8, 10], sample)})
+    t = time.perf_counter()
+    old_dep = legacy_depreciation(assets)
+    t_dep_old = time.perf_counter() - t
+    t = time.perf_counter()
+    new_dep = fd._compute_depreciation(assets)
+    t_dep_new = time.perf_counter() - t
+    pd.testing.assert_frame_equal(old_dep, new_dep, check_dtype=False)
+
+    print(f"trips: {n:,} ({len(df_cpk):,} on listed corridors, {len(df_profit)} corridors, {len(df_var):,} variance rows)")
+    print(f"vectorised pipeline (read + CPK + profit + variance): {t_new:8.2f} s")
+    print(f"iterrows engines, extrapolated from {sample:,} trips  : {t_old:8.2f} s ({t_old / t_new:,.0f}x)")
+    print(f"depreciation, {sample:,} assets: {t_dep_old * 1000:8.1f} ms iterrows | {t_dep_new * 1000:6.1f} ms vectorised")
+    print("sample results identical: CPK, corridor profit, depreciation")
@@ -0,0 +1,187 @@
+import sys
+import os
+import time
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# FUEL FORENSICS: A YEAR OF MINUTE-LEVEL TANK DATA, 300 TANKS
+# ==========================================
+# Throwaway fleet DB with two kinds of tank, each reporting its level every
+# minute for `days` days:
+#   - trucks: 600 L tanks. Use follows a GPS drive pattern, which is also
+#     written to gps_rollup_15m. Trucks refuel at 25%; the level carries
+#     sensor noise and slosh while moving.
+#   - depot tanks: 25,000 L. Every pump issue (200-400 L at 60-100 L/min)
+#     is logged in fuel_dispensing and deliveries top the tank up.
+# Each tank gets THEFTS unlogged losses of 40-150 L: quick drains of a few
+# minutes, or one slow siphon over ~1.5 h.
+# Reported: storage size, ingest time, and full-history scan time (target
+# under a minute). Detected events are matched to the injected thefts for
+# recall, false positives and the litres estimate. A last incremental scan
+# over one new day must raise only that day's theft.
+# Usage: python -m benchmarks.bench_fuel_forensics [tanks] [days]
+
+THEFTS = 4
+T0 = int(pd.Timestamp("2025-01-01").timestamp())
+
+
+def _thefts(rng, n_min, night):
+    """[(start minute, duration, litres)]: parked-time quick drains + one slow siphon."""
+    starts = rng.choice(night[(night > 1440) & (night < n_min - 300)], THEFTS, replace=False)
+    starts.sort()
+    out = []
+    for k, s in enumerate(starts):
+        slow = k == THEFTS - 1
+        out.append((int(s), 90 if slow else int(rng.integers(3, 15)), float(rng.uniform(70, 110) if slow else rng.uniform(40, 150))))
+    return out
+
+
+def _apply(level, thefts):
+    loss = np.zeros(len(level))
+    for s, d, liters in thefts:
+        loss[s:s + d] += liters / d
+    return level - np.cumsum(loss)
+
+
+def _truck(rng, n_min):
+    n_b = n_min // 15
+    hour = (np.arange(n_b) * 15 // 60) % 24
+    driving = (hour >= 6) & (hour < 18) & (rng.random(n_b) < 0.7)
+    speed_b = np.where(driving, rng.uniform(40, 90, n_b), 0.0)
+    ign_b = driving | ((hour >= 5) & (hour < 19) & (rng.random(n_b) < 0.3))
+    speed = np.repeat(speed_b, 15)
+    ign = np.repeat(ign_b, 15)
+    eff = float(rng.uniform(32, 42))
+    use = speed / 60 * eff / 100 + np.where((speed <= 5) & ign, 3.0 / 60, 0.0)
+    cum = np.cumsum(use)
+    level = 600 - np.mod(cum, 450)                 # refuel back to full at 25%
+    night = np.flatnonzero(np.repeat(~ign_b, 15))
+    thefts = _thefts(rng, n_min, night)
+    level = _apply(level, thefts) + rng.normal(0, 1.5, n_min) + np.where(speed > 0, rng.normal(0, 3, n_min), 0)
+    return level, thefts, speed_b, ign_b, eff
+
+
+def _depot(rng, n_min, t):
+    hour = (np.arange(0, n_min, 10) // 60) % 24
+    slots = np.arange(0, n_min, 10)[(hour >= 5) & (hour < 20)]   # one nozzle: issues at least 10 min apart
+    issues = np.sort(rng.choice(slots, n_min // 1440 * 20, replace=False))
+    liters = rng.uniform(200, 400, len(issues))
+    minutes = np.ceil(liters / rng.uniform(60, 100, len(issues))).astype(int)   # pump flow 60-100 L/min
+    draw = np.zeros(n_min)
+    for m in range(minutes.max()):
+        run = m < minutes
+        np.add.at(draw, np.minimum(issues[run] + m, n_min - 1), liters[run] / minutes[run])
+    level = 25000 - np.mod(np.cumsum(draw), 17500)   # delivery tops up at 30%
+    night = np.flatnonzero((np.arange(n_min) // 60) % 24 < 4)
+    thefts = _thefts(rng, n_min, night)
+    level = _apply(level, thefts) + rng.normal(0, 3, n_min)
+    dispensing = pd.DataFrame({"ts": pd.to_datetime(t[issues], unit="s").strftime("%Y-%m-%dT%H:%M:%S"), "liters": liters})
+    return level, thefts, dispensing
+
+
+def _score(events, thefts, t):
+    """(hits, false positives, litres estimate errors) for one tank."""
+    hit, errs = set(), []
+    fp = 0
+    for ev in events.itertuples(index=False):
+        match = [k for k, (s, d, _) in enumerate(thefts) if ev.start <= t[min(s + d, len(t) - 1)] + 600 and ev.end >= t[s] - 600]
+        if match:
+            hit.add(match[0])
+            errs.append(ev.liters_lost - thefts[match[0]][2])
+        else:
+            fp += 1
+    return len(hit), fp, errs
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n_tanks = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    from benchmarks.synthetic import open_sandbox
+    open_sandbox()
+
+    from modules.logistics.db_utils import engine, init_db
+    from modules.logistics import fuel_forensics as ff
+
+    init_db()
+    rng = np.random.default_rng(24)
+    n_min = days * 1440
+    t = T0 + 60.0 * np.arange(n_min)
+    buckets = pd.to_datetime(t[::15], unit="s").strftime("%Y-%m-%dT%H:%M").to_numpy(object)
+    n_trucks = n_tanks * 2 // 3
+    truth = {}
+
+    t_ingest = 0.0
+    for k in range(n_tanks):
+        if k < n_trucks:
+            tank = f"TRK-{k:04d}"
+            level, thefts, speed_b, ign_b, eff = _truck(rng, n_min)
+            ff.register_tank(tank, "vehicle", capacity_l=600, l_per_100km=eff)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "INSERT INTO gps_rollup_15m (reg_number, bucket, pings, avg_speed, max_speed, ignition_on) VALUES (?, ?, 15, ?, ?, ?)",
+                    list(zip([tank] * len(buckets), buckets, speed_b.tolist(), speed_b.tolist(), (ign_b * 15).tolist())))
+        else:
+            tank = f"TNK-DSL-{k:03d}"
+            level, thefts, dispensing = _depot(rng, n_min, t)
+            ff.register_tank(tank, "depot", capacity_l=25000)
+            with engine.begin() as conn:
+                conn.exec_driver_sql("INSERT INTO fuel_dispensing (tank_id, ts, liters, reference) VALUES (?, ?, ?, 'PUMP')",
+                                     [(tank, ts, float(v)) for ts, v in zip(dispensing["ts"], dispensing["liters"])])
+        truth[tank] = thefts
+        s = time.perf_counter()
+        ff.ingest_fuel_levels({"tank_id": np.full(n_min, tank, dtype=object), "timestamp": t, "liters": np.round(level, 1)})
+        t_ingest += time.perf_counter() - s
+
+    readings = n_tanks * n_min
+    with engine.connect() as conn:
+        size = conn.exec_driver_sql("SELECT SUM(pgsize) FROM dbstat WHERE name IN ('fuel_series', 'sqlite_autoindex_fuel_series_1')").fetchone()[0]
+    print(f"{readings:,} readings ({n_trucks} trucks + {n_tanks - n_trucks} depot tanks, {days} days at 1 / min): "
+          f"{size / 2**20:,.0f} MiB in fuel_series ({size / readings:.2f} bytes / reading), ingested in {t_ingest:,.1f} s")
+
+    s = time.perf_counter()
+    summary = ff.scan_fuel(full=True)
+    t_scan = time.perf_counter() - s
+    print(f"full scan: {t_scan:,.1f} s ({readings / t_scan:,.0f} readings/s) -> {summary}")
+
+    hits = fps = 0
+    errs = []
+    events = ff.fuel_events(limit=10**9)
+    events = events.assign(start=ff._epoch(events["start_ts"]), end=ff._epoch(events["end_ts"]))
+    for tank, thefts in truth.items():
+        h, fp, e = _score(events[events["tank_id"] == tank], thefts, t)
+        hits, fps = hits + h, fps + fp
+        errs += e
+    injected = n_tanks * THEFTS
+    print(f"thefts detected: {hits} / {injected} ({hits / injected:.1%}) | false positives: {fps} "
+          f"({fps / (n_tanks * days) * 365:.2f} per tank-year) | litres estimate error: median {np.median(np.abs(errs)):.1f} L")
+    with engine.connect() as conn:
+        incidents = conn.exec_driver_sql("SELECT COUNT(*) FROM log_risk_incidents WHERE type = 'Fuel Theft'").fetchone()[0]
+    assert incidents == summary["incidents"] == len(events), (incidents, summary)
+    assert t_scan < 60 or (n_tanks, days) != (300, 365), f"full scan took {t_scan:.1f} s"
+    assert hits >= 0.95 * injected and fps <= 0.02 * injected, (hits, fps)
+
+    # Incremental: one more day for the first truck with a 120 L drain at 02:00 -> exactly one new incident
+    tank = "TRK-0000"
+    t_new = t[-1] + 60.0 * np.arange(1, 1441)
+    last = float(ff.load_series(tank)[1][-1])
+    level = last - np.r_[np.zeros(120), np.linspace(0, 120, 10), np.full(1310, 120.0)] + rng.normal(0, 1.5, 1440)
+    ff.ingest_fuel_levels({"tank_id": [tank] * 1440, "timestamp": t_new, "liters": np.round(level, 1)})
+    # Parked all day: the day's GPS rollup (no use) lands with the maintenance pass. Readings past
+    # the truck's last rolled-up bucket are not judged, so the day needs its buckets.
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO gps_rollup_15m (reg_number, bucket, pings, avg_speed, max_speed, ignition_on) VALUES (?, ?, 15, 0, 0, 0)",
+            [(tank, b) for b in pd.to_datetime(t_new[::15], unit="s").strftime("%Y-%m-%d %H:%M")])
+    s = time.perf_counter()
+    again = ff.scan_fuel()
+    t_inc = time.perf_counter() - s
+    assert again["incidents"] == 1, again
+    print(f"incremental scan after one new day: {t_inc:,.2f} s -> {again}")
@@ -0,0 +1,141 @@
+import sys
+import os
+import math
+import time
+import logging
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# GEOFENCE: PER-PING x PER-FENCE LOOP vs GRID INDEX + VECTORISED BATCHES
+# ==========================================
+# Throwaway fleet + cortex DBs with F fences (circles and polygons across
+# SA) and V trucks, each with an open trip and shuttling in and out of one
+# fence: 5 rounds outside, 8 inside, 7 outside, repeated. Trips are routed
+# to the truck's fence, except every 4th (names another site) and every 8th
+# (dispatched after the last ping); neither may arrive. Pings go through
+# geofence.process_pings in batches. Reports sustained pings/s with events
+# and trip writes included, the pure Python loop on a sample for reference,
+# and checks that:
+#   - the grid match agrees with a brute-force pings x fences test
+#   - every truck entered and left twice
+#   - trips routed to their site got arrival and departure times, no others
+# Usage: python -m benchmarks.bench_geofence [fences] [vehicles] [rounds] [batch]
+
+PATTERN = np.array([0] * 5 + [1] * 8 + [0] * 7)   # 1 = inside the truck's fence
+
+
+def _loop_inside(lat, lon, fences):
+    """Reference: every ping against every fence, haversine / ray cast in Python."""
+    hits = []
+    for la, lo in zip(lat, lon):
+        inside = []
+        for f in fences:
+            if f["ring"] is None:
+                p1, p2 = math.radians(la), math.radians(f["lat"])
+                a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(f["lon"] - lo) / 2) ** 2
+                if 6371000 * 2 * math.asin(math.sqrt(a)) <= f["radius"]:
+                    inside.append(f["id"])
+            else:
+                ring, c, j = f["ring"], False, len(f["ring"]) - 1
+                for i in range(len(ring)):
+                    if (ring[i][0] > la) != (ring[j][0] > la) and \
+                            lo < (ring[j][1] - ring[i][1]) * (la - ring[i][0]) / (ring[j][0] - ring[i][0]) + ring[i][1]:
+                        c = not c
+                    j = i
+                if c:
+                    inside.append(f["id"])
+        hits.append(inside)
+    return hits
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n_fences = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n_veh = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+    batch = int(sys.argv[4]) if len(sys.argv) > 4 else 5_000
+    from benchmarks.synthetic import open_sandbox
+    open_sandbox()
+
+    import modules.core.db_manager as db
+    db.init_db()
+    from modules.logistics import geofence as gf
+
+    rng = np.random.default_rng(21)
+    fences = []
+    for i in range(n_fences - len(gf.SEED_FENCES)):
+        lat, lon = rng.uniform(-33.5, -23.0), rng.uniform(18.5, 32.5)
+        if i % 3:
+            fences.append({"id": f"F{i:04d}", "name": f"Site {i}", "lat": lat, "lon": lon,
+                           "radius": float(rng.uniform(300, 3000)), "ring": None})
+            gf.add_fence(f"F{i:04d}", f"Site {i}", "client" if i % 5 else "depot", (lat, lon), fences[-1]["radius"])
+        else:
+            d = rng.uniform(0.005, 0.03)
+            ring = [[lat - d, lon - d], [lat - d, lon + d], [lat + d, lon + d * 1.5], [lat + d, lon - d]]
+            fences.append({"id": f"F{i:04d}", "name": f"Mine {i}", "lat": lat, "lon": lon, "radius": None, "ring": ring})
+            gf.add_fence(f"F{i:04d}", f"Mine {i}", "mine", polygon=ring)
+
+    # Each truck shuttles in and out of one fence (at its centre / 8 km east)
+    own = rng.integers(0, len(fences), n_veh)
+    regs = np.array([f"TRK-{v:04d}" for v in range(n_veh)], dtype=object)
+    c_lat = np.array([fences[k]["lat"] for k in own])
+    c_lon = np.array([fences[k]["lon"] for k in own])
+    decoy = np.arange(n_veh) % 4 == 0           # routed to another site
+    late = np.arange(n_veh) % 8 == 1            # dispatched after the last ping
+    with db.cortex_connection() as conn:
+        conn.executemany("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, route, status, date_dispatched, dispatched_at) "
+                         "VALUES (?, 'BENCH', ?, ?, 'In Transit', '2025-01-01', ?)",
+                         [(f"TRIP-{v:04d}", regs[v], f"Depot → {fences[(own[v] + decoy[v]) % len(fences)]['name']}",
+                           "2025-01-02 00:00:00" if late[v] else "2025-01-01 05:00:00") for v in range(n_veh)])
+
+    rows = []
+    base = np.datetime64("2025-01-01T06:00:00")
+    for r in range(rounds):
+        inside = PATTERN[r % len(PATTERN)]
+        lat = c_lat + rng.normal(0, 0.0003, n_veh)
+        lon = c_lon + rng.normal(0, 0.0003, n_veh) + (0 if inside else 0.08)
+        ts = str(base + np.timedelta64(30 * r, "s"))
+        rows.extend(zip(regs, [ts] * n_veh, lat.tolist(), lon.tolist()))
+
+    t = time.perf_counter()
+    totals = {"events": 0, "arrivals": 0, "departures": 0, "candidates": 0}
+    for s in range(0, len(rows), batch):
+        out = gf.process_pings(rows[s:s + batch])
+        for k in totals:
+            totals[k] += out[k]
+    t_vec = time.perf_counter() - t
+
+    # Brute-force cross-check of the grid match + the Python loop for reference
+    sample = rows[:2_000]
+    lat = np.array([r[2] for r in sample])
+    lon = np.array([r[3] for r in sample])
+    all_fences = fences + [{"id": f["fence_id"], "lat": f.get("center", (0, 0))[0], "lon": f.get("center", (0, 0))[1],
+                            "radius": f.get("radius_m"), "ring": f.get("polygon")} for f in gf.SEED_FENCES]
+    t = time.perf_counter()
+    expected = _loop_inside(lat, lon, all_fences)
+    t_loop = (time.perf_counter() - t) * len(rows) / len(sample)
+    ping, fence, inside = gf.match_fences(lat, lon)
+    ids = gf.fence_index()["ids"]
+    got = [[] for _ in sample]
+    for p, f in zip(ping[inside], fence[inside]):
+        got[p].append(ids[f])
+    assert [sorted(g) for g in got] == [sorted(e) for e in expected], "grid match disagrees with brute force"
+
+    cycles = rounds // len(PATTERN) + (rounds % len(PATTERN) > 5)
+    sites = int(sum(1 for v, k in enumerate(own) if not (decoy[v] or late[v])
+                    and not (fences[k]["ring"] is None and int(fences[k]["id"][1:]) % 5 == 0)))
+    assert totals["events"] == n_veh * (2 * cycles - (rounds % len(PATTERN) in range(6, 13))), totals
+    trips = db.read_cached("SELECT COUNT(arrival_time) AS arr, COUNT(departure_time) AS dep FROM trip_manifests")
+    assert trips["arr"][0] == totals["arrivals"] == sites and trips["dep"][0] == totals["departures"] == sites, (trips, totals)
+
+    print(f"{len(rows):,} pings, {n_veh} trucks, {len(ids)} fences, batches of {batch:,}")
+    print(f"grid index + vectorised batches : {t_vec:8.2f} s  ({len(rows) / t_vec:12,.0f} pings/s, "
+          f"{totals['candidates']:,} candidate pairs)")
+    print(f"per-ping x per-fence Python loop: {t_loop:8.2f} s  ({len(rows) / t_loop:12,.0f} pings/s, extrapolated)")
+    print(f"events: {totals['events']:,} | trips: {totals['arrivals']} arrivals, {totals['departures']} departures "
+          f"(site fences only) | grid match identical to brute force")
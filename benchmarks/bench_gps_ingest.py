@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import tempfile
+import logging
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# GPS INGEST: PER-PING run_query vs ingest_gps_batch
+# ==========================================
+# Runs against a throwaway fleet_data.db (db_utils uses a cwd-relative URL,
+# so we chdir into a temp dir before the first connection).
+# Usage: python -m benchmarks.bench_gps_ingest [vehicles] [rounds]
+
+
+def _pings(regs, rounds, rng):
+    n = len(regs) * rounds
+    base = np.datetime64("2025-01-01T00:00:00")
+    return {
+        "reg_number": np.tile(regs, rounds),
+        "timestamp": (base + np.repeat(np.arange(rounds), len(regs)).astype("timedelta64[s]") * 30).astype(str),
+        "latitude": -26.2 + rng.normal(0, 0.01, n),
+        "longitude": 28.0 + rng.normal(0, 0.01, n),
+        "speed": rng.uniform(0, 90, n),
+        "heading": rng.uniform(0, 360, n),
+        "ignition": np.ones(n, dtype=int),
+        "signal_quality": rng.uniform(0.8, 1.0, n),
+    }
+
+
+def _legacy_ingest(batch):
+    """The pre-batch loop: two run_query transactions per ping."""
+    for i in range(len(batch["reg_number"])):
+        ping = {k: (v[i].item() if hasattr(v[i], "item") else v[i]) for k, v in batch.items()}
+        ping["source"] = "bench"
+        run_query("""
+            INSERT INTO gps_pings
+            (reg_number, timestamp, latitude, longitude, speed, heading, ignition, signal_quality, source)
+            VALUES (:reg_number, :timestamp, :latitude, :longitude, :speed, :heading, :ignition, :signal_quality, :source)
+        """, ping)
+        run_query("""
+            UPDATE log_vehicles
+            SET last_lat = :latitude,
+                last_lon = :longitude
+            WHERE reg_number = :reg_number
+        """, ping)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    os.chdir(tempfile.mkdtemp())
+    from modules.logistics.db_utils import init_db, run_query, load_data
+    from modules.logistics.gps_engine import ingest_gps_batch
+
+    init_db()
+    regs = np.array([f"TRK-{i:04d}" for i in range(vehicles)])
+    for r in regs:
+        run_query("INSERT INTO log_vehicles (reg_number, last_lat, last_lon) VALUES (:r, -26.2, 28.0)", {"r": r})
+    rng = np.random.default_rng(7)
+
+    legacy = _pings(regs, 5, rng)
+    t = time.perf_counter()
+    _legacy_ingest(legacy)
+    n_legacy = len(legacy["reg_number"])
+    legacy_rate = n_legacy / (time.perf_counter() - t)
+
+    batch = _pings(regs, rounds, rng)
+    n_batch = len(batch["reg_number"])
+    t = time.perf_counter()
+    written = ingest_gps_batch(batch, source="bench")
+    batch_rate = written / (time.perf_counter() - t)
+
+    # Steady state: one small batch per polling round (one ping per vehicle)
+    t = time.perf_counter()
+    for i in range(20):
+        ingest_gps_batch(_pings(regs, 1, rng), source="bench")
+    round_rate = 20 * vehicles / (time.perf_counter() - t)
+
+    latest = load_data("SELECT COUNT(*) AS n FROM gps_latest").iloc[0]["n"]
+    print(f"legacy per-ping     : {legacy_rate:10,.0f} pings/s ({n_legacy} pings)")
+    print(f"ingest_gps_batch    : {batch_rate:10,.0f} pings/s ({n_batch} pings, one batch)")
+    print(f"ingest_gps_batch x20: {round_rate:10,.0f} pings/s ({vehicles} pings per batch)")
+    print(f"gps_latest rows     : {latest} (vehicles: {vehicles})")
@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import tempfile
+import logging
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# GPS HISTORY QUERY: UNINDEXED gps_pings vs DAILY PARTITIONS
+# ==========================================
+# Seeds the same pings (1 per 30 s per truck) into the legacy single table
+# and into the partitioned store, then times "one truck, one hour" reads.
+# Usage: python -m benchmarks.bench_gps_partitions [trucks] [days]
+
+LEGACY_DDL = """
+    CREATE TABLE legacy_pings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, reg_number TEXT, timestamp TEXT,
+        latitude REAL, longitude REAL, speed REAL, heading REAL,
+        ignition INTEGER, signal_quality REAL, source TEXT
+    )
+"""
+
+
+def _day_rows(regs, day, rng):
+    secs = np.arange(0, 86400, 30)
+    stamps = (np.datetime64(day) + secs.astype("timedelta64[s]")).astype(str)
+    n = len(secs) * len(regs)
+    return list(zip(
+        np.repeat(regs, len(secs)).tolist(), np.tile(stamps, len(regs)).tolist(),
+        (-26.2 + rng.normal(0, 0.01, n)).tolist(), (28.0 + rng.normal(0, 0.01, n)).tolist(),
+        rng.uniform(0, 90, n).tolist(), rng.uniform(0, 360, n).tolist(),
+        [1] * n, [1.0] * n, ["bench"] * n,
+    ))
+
+
+def _time(fn, reps=20):
+    t = time.perf_counter()
+    for _ in range(reps):
+        out = fn()
+    return (time.perf_counter() - t) / reps * 1000, out
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    trucks = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+
+    os.chdir(tempfile.mkdtemp())
+    from modules.logistics.db_utils import engine
+    from modules.logistics.telemetry_store import ensure_telemetry_tables, write_pings, rollup_day, GPS_FIELDS
+
+    ensure_telemetry_tables()
+    rng = np.random.default_rng(7)
+    regs = np.array([f"TRK-{i:03d}" for i in range(trucks)])
+    marks = ", ".join("?" * len(GPS_FIELDS))
+    total = 0
+    with engine.begin() as conn:
+        conn.exec_driver_sql(LEGACY_DDL)
+        for d in range(days):
+            rows = _day_rows(regs, np.datetime64("2025-03-01") + d, rng)
+            conn.exec_driver_sql(f"INSERT INTO legacy_pings ({', '.join(GPS_FIELDS)}) VALUES ({marks})", rows)
+            write_pings(conn, rows)
+            total += len(rows)
+
+    day = f"2025-03-0{min(days, 9)}"
+    params = ("TRK-007", f"{day}T10:00", f"{day}T11:00")
+    sql = "SELECT timestamp, latitude, longitude, speed FROM {t} WHERE reg_number = ? AND timestamp >= ? AND timestamp < ?"
+    with engine.connect() as conn:
+        t_legacy, a = _time(lambda: conn.exec_driver_sql(sql.format(t="legacy_pings"), params).fetchall(), reps=3)
+        t_part, b = _time(lambda: conn.exec_driver_sql(sql.format(t=f"gps_pings_{day.replace('-', '')}"), params).fetchall())
+        t_view, c = _time(lambda: conn.exec_driver_sql(sql.format(t="gps_telemetry"), params).fetchall(), reps=3)
+    assert a == b == c
+
+    t = time.perf_counter()
+    rollup_day(day.replace("-", ""))
+    t_roll = time.perf_counter() - t
+
+    print(f"{total:,} pings ({trucks} trucks x {days} days), one truck / one hour ({len(a)} rows):")
+    print(f"  legacy single table (no index): {t_legacy:8.2f} ms")
+    print(f"  daily partition + (reg, ts) idx: {t_part:7.2f} ms | {t_legacy / t_part:.0f}x")
+    print(f"  gps_telemetry union view:       {t_view:8.2f} ms")
+    print(f"  1m + 15m rollup of one day:     {t_roll * 1000:8.0f} ms")
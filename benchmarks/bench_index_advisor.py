@@ -0,0 +1,108 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import tempfile
+import logging
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# INDEX ADVISOR: HOT LOOKUPS WITH / WITHOUT THE STANDARD INDEX SET
+# ==========================================
+# Seeds throwaway cortex + fleet DBs, drops the standard indexes, replays the
+# hot lookups (missions by truck, ledger by account + period, deals by
+# status / rfq, interactions by company, trips by vehicle) through the
+# traced wrappers, lets the advisor propose indexes from EXPLAIN QUERY PLAN,
+# then re-times the same lookups with the declared index set in place.
+# Usage: python -m benchmarks.bench_index_advisor [rows]
+
+REPS = 50
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)  # db_utils binds fleet_data.db relative to the working directory
+
+    import modules.core.db_manager as db
+    from modules.core.index_advisor import advise, create_index
+    from modules.core.query_cache import clear_cache
+    from modules.core.query_trace import reset_trace
+    from modules.logistics.db_utils import INDEX_STATEMENTS, engine, init_db
+
+    db.DB_NAME = os.path.join(tmp, "bench_cortex.db")
+    init_db()
+    rng = random.Random(5)
+    regs = [f"TRK-{i:04d}" for i in range(400)]
+    companies = [f"Client {i}" for i in range(2000)]
+    with db.cortex_connection() as conn:
+        conn.executemany("INSERT INTO ledger_lines (transaction_id, date, description, account_code, debit, credit, reference_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(f"J{i // 2}", f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "bench", str(rng.choice(range(1000, 1400, 10))), 10.0, 0.0, "R") for i in range(rows)])
+        conn.executemany("INSERT INTO trade_deals (client_name, product, volume, value, status, probability, stage, rfq_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         [(rng.choice(companies), "Chrome", 30, 1000.0, rng.choice(["Open", "Closed", "Dispatched", "Lost"]), 0.5, "Negotiation", f"RFQ-{i}") for i in range(rows // 4)])
+        conn.executemany("INSERT INTO interaction_log (company_name, interaction_type, date, outcome, next_step) VALUES (?, 'Call', '2025-01-01', 'ok', '-')",
+                         [(rng.choice(companies),) for _ in range(rows // 4)])
+        conn.executemany("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, route, status) VALUES (?, ?, ?, 'A → B', 'DELIVERED')",
+                         [(f"T{i}", f"D{i}", rng.choice(regs)) for i in range(rows // 4)])
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO log_missions (mission_name, reg_number, status) VALUES (?, ?, ?)",
+                             [(f"M{i}", rng.choice(regs), rng.choice(["Closed", "Active", "Staged"])) for i in range(rows)])
+
+    def drop_standard_indexes():
+        with db.cortex_connection() as conn:
+            for name, _, _ in db.CORTEX_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+        with engine.begin() as conn:
+            for stmt in INDEX_STATEMENTS:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {stmt.split()[5]}")
+
+    def lookups():
+        reg = rng.choice(regs)
+        company = rng.choice(companies)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT id, status FROM log_missions WHERE reg_number = ? AND status != 'Closed'", (reg,)).fetchall()
+        with db.cortex_connection() as conn:
+            conn.execute("SELECT SUM(debit), SUM(credit) FROM ledger_lines WHERE account_code = ? AND date BETWEEN ? AND ?", ("1200", "2025-03-01", "2025-03-31")).fetchall()
+            conn.execute("SELECT * FROM trade_deals WHERE rfq_id = ?", (f"RFQ-{rng.randint(0, rows // 4)}",)).fetchall()
+            conn.execute("SELECT * FROM interaction_log WHERE company_name = ?", (company,)).fetchall()
+            conn.execute("SELECT trip_id, status FROM trip_manifests WHERE vehicle_id = ?", (reg,)).fetchall()
+
+    def timed():
+        clear_cache()
+        t = time.perf_counter()
+        for _ in range(REPS):
+            lookups()
+        return (time.perf_counter() - t) / REPS * 1000
+
+    drop_standard_indexes()
+    reset_trace()
+    t_scan = timed()
+    recs = advise(threshold_ms=0.5)
+    print(f"hot lookups, no indexes       : {t_scan:8.2f} ms per pass ({rows:,} ledger / mission rows)")
+    print(f"advisor recommendations       : {len(recs)}")
+    for rec in recs:
+        print(f"  {os.path.basename(rec['db']):16s} {rec['ddl']}")
+
+    for rec in recs:
+        create_index(rec["db"], rec["ddl"])
+    t_advised = timed()
+    print(f"after advisor indexes         : {t_advised:8.2f} ms per pass ({t_scan / t_advised:,.0f}x)")
+
+    drop_standard_indexes()
+    for rec in recs:
+        conn = sqlite3.connect(rec["db"])
+        conn.execute(f"DROP INDEX IF EXISTS {rec['ddl'].split()[5]}")
+        conn.close()
+    db._create_standard_indexes()
+    with engine.begin() as conn:
+        for stmt in INDEX_STATEMENTS:
+            conn.exec_driver_sql(stmt)
+    t_declared = timed()
+    reset_trace()
+    timed()
+    print(f"declared standard index set   : {t_declared:8.2f} ms per pass ({t_scan / t_declared:,.0f}x)")
+    print(f"remaining recommendations     : {len(advise(threshold_ms=0.5))}")
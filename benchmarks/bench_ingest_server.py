@@ -0,0 +1,103 @@
+import sys
+import os
+import json
+import time
+import asyncio
+import tempfile
+import logging
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# ==========================================
+# TELEMETRY INGESTION SERVER: THROUGHPUT, LATENCY AND BACKPRESSURE
+# ==========================================
+# Throwaway fleet DB. For each scenario, an IngestServer starts on ephemeral
+# ports in this process, and modules.logistics.tracker_sim runs in a
+# subprocess so client and server don't share an event loop. Reported per
+# scenario:
+#   - sent vs written pings and the sustained write rate
+#   - commit latency (received -> batch committed) and end-to-end latency
+#     (tracker sent_at -> committed), p50 / p95 / p99
+#   - client stall time (TCP backpressure) and dropped datagrams (UDP)
+# The last two scenarios swap in a deliberately slow writer behind a small
+# queue. Checks that:
+#   - TCP loses nothing under backpressure
+#   - UDP only sheds load (counted drops, never more written than sent)
+#   - the gps_pings partitions hold exactly what the server says it wrote
+# Usage: python -m benchmarks.bench_ingest_server [trucks] [seconds]
+
+
+async def _scenario(name, trucks, rate, seconds, proto="tcp", slow_s=0.0, connections=None, **server_kw):
+    from modules.logistics.gps_engine import ingest_gps_batch
+    from modules.logistics.ingest_server import IngestServer
+
+    def writer(pings):
+        if slow_s:
+            time.sleep(slow_s)   # stand-in for a contended disk
+        return ingest_gps_batch(pings, source="tracker")
+
+    server = IngestServer(writer=writer, **server_kw)
+    tcp_port, udp_port = await server.start("127.0.0.1", 0, 0)
+    port = udp_port if proto == "udp" else tcp_port
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "modules.logistics.tracker_sim", "--port", str(port), "--trucks", str(trucks),
+        "--rate", str(rate), "--seconds", str(seconds), *(["--udp"] if proto == "udp" else []),
+        *(["--connections", str(connections)] if connections else []),
+        stdout=asyncio.subprocess.PIPE, env=dict(os.environ, PYTHONPATH=ROOT))
+    out, _ = await proc.communicate()
+    client = json.loads(out.decode().strip().splitlines()[-1])
+    await asyncio.sleep(0.2)   # last datagrams in flight
+    t = time.perf_counter()
+    await server.stop()
+    drain = time.perf_counter() - t
+    snap = server.snapshot()
+    commit, e2e = snap.get("commit_ms", {}), snap.get("e2e_ms", {})
+    print(f"{name:<24} sent {client['sent']:>8,} ({client['rate']:>7,}/s) | written {snap['written']:>8,} "
+          f"in {snap['batches']:>4} batches | commit p50/p95/p99 {commit.get('p50', 0):6.1f}/{commit.get('p95', 0):6.1f}/"
+          f"{commit.get('p99', 0):6.1f} ms | e2e p99 {e2e.get('p99', 0):7.1f} ms | max queue {snap['max_queue']:>6,} | "
+          f"stalled {client['stalled_s']:5.2f} s | dropped {snap['dropped']:>6,} "
+          f"(+{client['sent'] - snap['written'] - snap['dropped']:,} in the kernel) | drain {drain:4.2f} s")
+    return client, snap
+
+
+async def _main(trucks, seconds):
+    results = []
+    for rate in (2_000, 10_000, 30_000):
+        results.append(await _scenario(f"tcp {rate:,}/s", trucks, rate, seconds))
+    results.append(await _scenario("udp 10,000/s", trucks, 10_000, seconds, proto="udp"))
+    # One socket, so the kernel buffers in between fill within the run and the writer sets the pace
+    slow = dict(slow_s=0.1, queue_max=2_000, batch_max=1_000)
+    tcp_bp = await _scenario("tcp backpressure", trucks, 40_000, seconds, connections=1, **slow)
+    udp_bp = await _scenario("udp backpressure", trucks, 20_000, seconds, proto="udp", **slow)
+    return results, tcp_bp, udp_bp
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    trucks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    os.chdir(tempfile.mkdtemp())  # db_utils binds fleet_data.db relative to the working directory
+
+    from modules.logistics.db_utils import engine, init_db
+    from modules.logistics.telemetry_store import TELEMETRY_VIEW
+
+    init_db()
+    results, tcp_bp, udp_bp = asyncio.run(_main(trucks, seconds))
+
+    for client, snap in results[:3] + [tcp_bp]:
+        assert snap["written"] == client["sent"] and snap["rejected"] == snap["failed"] == 0, (client, snap)
+    assert tcp_bp[0]["stalled_s"] > 0 and tcp_bp[0]["rate"] < 40_000 * 0.9, "slow writer never pushed back on the TCP client"
+    assert udp_bp[1]["dropped"] > 0, "slow writer never filled the queue for UDP"
+    for client, snap in (results[3], udp_bp):
+        assert snap["written"] + snap["dropped"] <= client["sent"], (client, snap)
+
+    written = sum(snap["written"] for _, snap in results + [tcp_bp, udp_bp])
+    with engine.connect() as conn:
+        stored = conn.exec_driver_sql(f"SELECT COUNT(*) FROM {TELEMETRY_VIEW}").fetchone()[0]
+    assert stored == written, (stored, written)
+    print(f"{stored:,} pings in the gps_pings partitions = total written | TCP lossless under backpressure | "
+          f"UDP shed {udp_bp[1]['dropped']:,} of {udp_bp[0]['sent']:,} at a full queue")
@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import logging
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import modules.core.db_manager as db
+from modules.core.query_cache import clear_cache
+from modules.finance.analytics import get_financial_split
+
+# ==========================================
+# LEDGER KPIs: PANDAS MASKS vs SQL PUSH-DOWN
+# ==========================================
+# Seeds a throwaway cortex DB with N ledger lines and times the financial
+# health KPIs and the revenue-stream split three ways: masks over the full
+# ledger in pandas, masks over the account_balances frame, and the single
+# conditional-SUM statement of ledger_kpis. Checks all three agree.
+# Usage: python -m benchmarks.bench_ledger_kpis [lines]
+
+ACCOUNTS = ["1000", "1200", "1210", "2000", "4000", "4100", "4500", "5000", "5100", "6000", "6100"]
+
+
+def _full_scan_health():
+    with db.cortex_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM ledger_lines", conn)
+    rev = df[df['account_code'].str.startswith('4')]['credit'].sum()
+    exp = df[df['account_code'].str.startswith('5')]['debit'].sum()
+    ar = df[df['account_code'].str.startswith('12')]['debit'].sum() - df[df['account_code'].str.startswith('12')]['credit'].sum()
+    return {"revenue": rev, "ar": ar, "cash": rev - exp, "expense": exp}
+
+
+def _balances_health():
+    df = db.get_account_balances()
+    rev = df[df['account_code'].str.startswith('4')]['c'].sum()
+    exp = df[df['account_code'].str.startswith('5')]['d'].sum()
+    ar = df[df['account_code'].str.startswith('12')]['d'].sum() - df[df['account_code'].str.startswith('12')]['c'].sum()
+    return {"revenue": rev, "ar": ar, "cash": rev - exp, "expense": exp}
+
+
+def _full_scan_split():
+    with db.cortex_connection() as conn:
+        df = pd.read_sql_query("SELECT account_code AS Code, credit - debit AS Amount, 0.0 AS Km FROM ledger_lines", conn)
+    return get_financial_split(df)
+
+
+def _time(fn, reps=5):
+    t = time.perf_counter()
+    for _ in range(reps):
+        clear_cache()  # time the query, not the query cache
+        out = fn()
+    return (time.perf_counter() - t) / reps * 1000, out
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    db.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db.init_db()
+
+    rng = random.Random(11)
+    rows = [(f"JRN-{i}", f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "bench", rng.choice(ACCOUNTS),
+             round(rng.random() * 1000, 2) if i % 2 == 0 else 0.0, round(rng.random() * 1000, 2) if i % 2 else 0.0, "REF")
+            for i in range(n)]
+    with db.cortex_connection() as conn:
+        conn.executemany("INSERT INTO ledger_lines (transaction_id, date, description, account_code, debit, credit, reference_id) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    print(f"{n:,} ledger lines")
+    for name, variants in [
+        ("financial health", [("full ledger + masks", _full_scan_health), ("balances + masks", _balances_health),
+                              ("SQL push-down", db.get_financial_health)]),
+        ("revenue split", [("full ledger + masks", _full_scan_split), ("SQL push-down", get_financial_split)]),
+    ]:
+        results = []
+        for label, fn in variants:
+            ms, out = _time(fn)
+            results.append(out)
+            print(f"  {name:<17} {label:<20}: {ms:9.2f} ms")
+        assert all(abs(r[k] - results[0][k]) < 1e-3 for r in results for k in results[0]), "KPI mismatch"
+    print("all variants agree")
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import tracemalloc
+import logging
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import modules.core.db_manager as db
+from modules.core.query_cache import clear_cache
+
+# ==========================================
+# LEDGER VIEWER + EXPORT: FULL LOAD / OFFSET vs KEYSET PAGES + STREAMING
+# ==========================================
+# Seeds a throwaway cortex DB with N ledger lines, then compares:
+#   - first page: whole ledger sorted into pandas (get_ledger_stream) vs one keyset page
+#   - deep page:  LIMIT / OFFSET vs keyset cursor at the same position
+#   - export:     full DataFrame to_csv vs export_ledger (CSV + Parquet), with peak
+#                 Python heap (tracemalloc) for each
+# Usage: python -m benchmarks.bench_ledger_paging [lines]
+
+
+def _peak(fn):
+    """Wall time of an untraced run, then peak Python heap (tracemalloc) of a second run."""
+    clear_cache()
+    t = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t
+    clear_cache()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, out
+
+
+def _offset_page(offset):
+    with db.cortex_connection() as conn:
+        return pd.read_sql_query(f"SELECT rowid AS line_id, {', '.join(db.LEDGER_COLUMNS)} FROM ledger_lines "
+                                 "ORDER BY date DESC, rowid DESC LIMIT ? OFFSET ?", conn, params=(db.LEDGER_PAGE_SIZE, offset))
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tmp = tempfile.mkdtemp()
+    db.DB_NAME = os.path.join(tmp, "bench.db")
+    db.init_db()
+
+    rng = random.Random(3)
+    with db.cortex_connection() as conn:
+        for start in range(0, n, 500_000):
+            conn.executemany("INSERT INTO ledger_lines (transaction_id, date, description, account_code, debit, credit, reference_id) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             [(f"JRN-{i // 2}", f"20{rng.randint(20, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                               f"bench line {i}", rng.choice(["1000", "1200", "4000", "5000"]), 100.0 if i % 2 == 0 else 0.0,
+                               100.0 if i % 2 else 0.0, "REF") for i in range(start, min(start + 500_000, n))])
+
+    t_full, mb_full, _ = _peak(lambda: db.get_ledger_stream().head(db.LEDGER_PAGE_SIZE))
+    t_page, mb_page, (page, cursor) = _peak(lambda: db.get_ledger_page())
+
+    # Walk to a deep position with keyset cursors, then time that page both ways
+    depth = n // 2
+    with db.cortex_connection() as conn:
+        row = conn.execute("SELECT date, rowid FROM ledger_lines ORDER BY date DESC, rowid DESC LIMIT 1 OFFSET ?", (depth - 1,)).fetchone()
+    deep_cursor = (row[0], row[1])
+    t = time.perf_counter()
+    by_offset = _offset_page(depth)
+    t_offset = time.perf_counter() - t
+    clear_cache()
+    t = time.perf_counter()
+    by_key, _ = db.get_ledger_page(deep_cursor)
+    t_key = time.perf_counter() - t
+    assert by_offset["line_id"].tolist() == by_key["line_id"].tolist()
+
+    csv_path, pq_path, full_path = (os.path.join(tmp, f) for f in ("stream.csv", "stream.parquet", "full.csv"))
+    t_fullx, mb_fullx, _ = _peak(lambda: db.get_ledger_stream().to_csv(full_path, index=False))
+    t_csv, mb_csv, rows_csv = _peak(lambda: db.export_ledger(csv_path))
+    t_pq, mb_pq, rows_pq = _peak(lambda: db.export_ledger(pq_path))
+    assert rows_csv == rows_pq == n
+
+    print(f"{n:,} ledger lines")
+    print(f"first page    full sort into pandas : {t_full * 1000:9.1f} ms  peak {mb_full:8.1f} MiB")
+    print(f"              keyset page           : {t_page * 1000:9.1f} ms  peak {mb_page:8.1f} MiB")
+    print(f"page @ {depth:,}  LIMIT / OFFSET    : {t_offset * 1000:9.1f} ms")
+    print(f"              keyset cursor         : {t_key * 1000:9.1f} ms")
+    print(f"export        full frame -> CSV     : {t_fullx:9.2f} s   peak {mb_fullx:8.1f} MiB")
+    print(f"              streamed CSV          : {t_csv:9.2f} s   peak {mb_csv:8.1f} MiB ({os.path.getsize(csv_path) / 2**20:,.0f} MiB file)")
+    print(f"              streamed Parquet      : {t_pq:9.2f} s   peak {mb_pq:8.1f} MiB ({os.path.getsize(pq_path) / 2**20:,.0f} MiB file)")
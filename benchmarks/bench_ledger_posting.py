@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+import logging
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.finance.ledger_store import LedgerStore, GL_COLUMNS
+
+# ==========================================
+# GL POSTING: pd.concat PER ENTRY vs LEDGER STORE
+# ==========================================
+# In-memory only (no DB) so the number isolates the session-state cost of
+# posting N two-line journals and then rendering one trial balance.
+# Usage: python -m benchmarks.bench_ledger_posting [entries]
+
+
+def _lines(i):
+    return [
+        {'Entry_ID': f"JRN-{i}", 'Date': "2025-01-01", 'Description': "Bench", 'Reference': f"REF-{i}",
+         'Code': 1200, 'Account': "Debtors", 'Debit': 100.0, 'Credit': 0.0, 'Type': "ASSET", 'Source_Module': "BENCH"},
+        {'Entry_ID': f"JRN-{i}", 'Date': "2025-01-01", 'Description': "Bench", 'Reference': f"REF-{i}",
+         'Code': 4000, 'Account': "Revenue", 'Debit': 0.0, 'Credit': 100.0, 'Type': "INCOME", 'Source_Module': "BENCH"},
+    ]
+
+
+def _trial_balance(df):
+    return df.groupby(['Code', 'Account', 'Type'])[['Debit', 'Credit']].sum().reset_index()
+
+
+def bench_concat(n):
+    t = time.perf_counter()
+    gl = pd.DataFrame(columns=GL_COLUMNS)
+    for i in range(n):
+        gl = pd.concat([gl, pd.DataFrame(_lines(i))], ignore_index=True)
+    tb = _trial_balance(gl)
+    return time.perf_counter() - t, tb
+
+
+def bench_store(n):
+    t = time.perf_counter()
+    store = LedgerStore()
+    for i in range(n):
+        store.append(_lines(i))
+    tb = _trial_balance(store.frame())
+    return time.perf_counter() - t, tb
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    t_old, tb_old = bench_concat(n)
+    t_new, tb_new = bench_store(n)
+    pd.testing.assert_frame_equal(tb_old, tb_new, check_dtype=False)
+    print(f"{n} entries | pd.concat per entry: {t_old:.2f}s | LedgerStore: {t_new:.3f}s | {t_old / t_new:.0f}x")
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.logistics.constants import HUB_COORDS, REGION_COORDS
+from modules.logistics.route_builder import build_milk_runs, locate, site_matrix, DEPOT
+
+# ==========================================
+# MILK-RUN BUILDER: SAVINGS + 2-OPT vs ONE TRUCK PER ORDER
+# ==========================================
+# Plans N synthetic drops over the hub / region map with a mixed fleet and
+# compares total km and cost against dispatching every order out-and-back
+# on its own truck (what a bundle without sequencing amounts to).
+# Usage: python -m benchmarks.bench_milk_runs [orders] [time_budget_s]
+
+PLACES = [p for p in list(HUB_COORDS) + list(REGION_COORDS) if p not in ("Cross-Border", "Depot")]
+
+
+def synthetic_run(n_orders, seed=5):
+    rng = np.random.default_rng(seed)
+    orders = pd.DataFrame({
+        "order_id": [f"DEAL-{i:05d}" for i in range(n_orders)],
+        "load_kg": rng.choice([2000, 4000, 6000, 8000, 12000], n_orders).astype(float),
+        "location": rng.choice(PLACES, n_orders),
+    })
+    n_trucks = max(4, n_orders // 3)
+    vehicles = pd.DataFrame({
+        "vehicle_id": [f"FLT-{i:04d}" for i in range(n_trucks)],
+        "capacity_kg": rng.choice([10000.0, 28000.0, 34000.0], n_trucks),
+        "cpk": rng.choice([12.5, 15.0, 18.0], n_trucks),
+    })
+    return orders, vehicles
+
+
+def out_and_back(orders, vehicles):
+    places = [DEPOT] + list(orders["location"])
+    D = site_matrix(places, [locate(p) for p in places])
+    return float(2 * D[0, 1:].sum()), float(2 * D[0, 1:].sum() * vehicles["cpk"].mean())
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [50, 200, 500]
+
+    for n in sizes:
+        orders, vehicles = synthetic_run(n)
+        t = time.perf_counter()
+        plan = build_milk_runs(orders, vehicles, time_budget_s=budget)
+        elapsed = (time.perf_counter() - t) * 1000
+        km = sum(trip["distance_km"] for trip in plan["trips"])
+        cost = sum(trip["cost"] for trip in plan["trips"])
+        routed = sum(len(trip["stops"]) for trip in plan["trips"])
+        base_km, base_cost = out_and_back(orders, vehicles)
+        print(f"{n:>5} orders: {len(plan['trips'])} trips, {routed}/{n} routed, {km:,.0f} km / R {cost:,.0f} "
+              f"in {elapsed:.0f} ms | out-and-back {base_km:,.0f} km / ~R {base_cost:,.0f} "
+              f"({(1 - km / base_km) * 100:.0f}% fewer km)")
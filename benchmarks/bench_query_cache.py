@@ -0,0 +1,77 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import logging
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# QUERY CACHE: STREAMLIT RERUN READ PATH
+# ==========================================
+# Seeds throwaway cortex + fleet DBs, then replays the reads one rerun of
+# the logistics / finance / trade screens makes. Compares every rerun
+# hitting SQLite against the table-versioned cache, with a write every
+# WRITE_EVERY reruns to show invalidation keeping results fresh.
+# Usage: python -m benchmarks.bench_query_cache [reruns]
+
+WRITE_EVERY = 10
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)  # db_utils binds fleet_data.db relative to the working directory
+
+    import modules.core.db_manager as db
+    from modules.core.query_cache import cache_stats, clear_cache
+    from modules.logistics.db_utils import init_db, load_data, run_query
+
+    db.DB_NAME = os.path.join(tmp, "bench_cortex.db")
+    init_db()
+    rng = random.Random(3)
+    with db.cortex_connection() as conn:
+        conn.executemany("INSERT INTO trade_deals (client_name, product, volume, value, status, probability, stage) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(f"Client {i % 90}", "Chrome", rng.randint(5, 34), 1000.0, "Open", 0.5, "Negotiation") for i in range(5000)])
+        conn.executemany("INSERT INTO fleet_registry (vehicle_id, type, status, max_payload_kg, cpk, driver, location, current_load, hazchem_compliant) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         [(f"V{i}", "Interlink", "Idle", 34000, 15.0, "D", "Depot", 0, 0) for i in range(300)])
+        conn.executemany("INSERT INTO ledger_lines (transaction_id, date, description, account_code, debit, credit, reference_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(f"J{i // 2}", f"2025-{rng.randint(1, 12):02d}-01", "bench", rng.choice(["1000", "1200", "4000", "5100"]), 10.0 * (i % 2), 10.0 * (1 - i % 2), "R") for i in range(50000)])
+    for i in range(300):
+        run_query("INSERT INTO log_vehicles (reg_number, type, status, driver_name) VALUES (:r, 'Interlink', 'Idle', 'D')", {"r": f"TRK-{i}"})
+        run_query("INSERT INTO ind_rfqs (rfq_id, client, origin, destination, tons, commodity, status) VALUES (:r, 'C', 'JHB', 'Durban', 30, 'Coal', 'Pending')", {"r": f"RFQ-{i}"})
+
+    def rerun():
+        load_data("SELECT * FROM log_vehicles")
+        load_data("SELECT * FROM ind_rfqs WHERE status='Pending'")
+        db.load_fleet_to_dataframe()
+        db.load_trades_to_dataframe()
+        db.get_pending_orders()
+        db.get_ledger_stream()
+        db.get_account_balances()
+
+    def replay(cached):
+        clear_cache()
+        t = time.perf_counter()
+        for i in range(reruns):
+            if not cached:
+                clear_cache()
+            if i and i % WRITE_EVERY == 0:
+                run_query("UPDATE log_vehicles SET status = :s WHERE reg_number = 'TRK-1'", {"s": f"S{i}"})
+            rerun()
+        return (time.perf_counter() - t) / reruns * 1000
+
+    t_cold = replay(cached=False)
+    before = cache_stats()
+    t_warm = replay(cached=True)
+    after = cache_stats()
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    fresh = load_data("SELECT status FROM log_vehicles WHERE reg_number = 'TRK-1'")["status"].iloc[0]
+
+    print(f"per rerun ({reruns} reruns, 7 reads, 1 write / {WRITE_EVERY} reruns)")
+    print(f"  uncached : {t_cold:7.2f} ms")
+    print(f"  cached   : {t_warm:7.2f} ms  ({t_cold / t_warm:.0f}x) | hits {hits}, misses {misses} ({hits / (hits + misses):.0%})")
+    print(f"  last write visible after invalidation: {fresh == f'S{(reruns - 1) // WRITE_EVERY * WRITE_EVERY}'}")
@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.core.query_trace import TracedConnection, export_json, reset_trace, top_queries, trace_rerun, trace_section
+
+# ==========================================
+# QUERY TRACE: INSTRUMENTATION OVERHEAD
+# ==========================================
+# Runs the same point lookups and small scans on a plain sqlite3 connection
+# and on a TracedConnection, reports the per-statement cost of tracing
+# (timing, caller lookup, histogram update) and writes the JSON export.
+# Usage: python -m benchmarks.bench_query_trace [statements]
+
+
+def workload(conn, n):
+    for i in range(n):
+        conn.execute("SELECT name, qty FROM items WHERE id = ?", (i % 5000,)).fetchone()
+        if i % 50 == 0:
+            conn.execute("SELECT COUNT(*), SUM(qty) FROM items WHERE qty > ?", (i % 90,)).fetchall()
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    path = os.path.join(tempfile.mkdtemp(), "trace.db")
+    seed = sqlite3.connect(path)
+    seed.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, qty REAL)")
+    seed.executemany("INSERT INTO items VALUES (?, ?, ?)", [(i, f"item {i}", i % 100) for i in range(5000)])
+    seed.commit()
+    seed.close()
+
+    plain = sqlite3.connect(path)
+    traced = sqlite3.connect(path, factory=TracedConnection)
+    workload(plain, 1000)
+    workload(traced, 1000)
+    reset_trace()
+
+    t = time.perf_counter()
+    workload(plain, n)
+    t_plain = (time.perf_counter() - t) / n * 1e6
+
+    t = time.perf_counter()
+    with trace_rerun("bench"), trace_section("lookups"):
+        workload(traced, n)
+    t_traced = (time.perf_counter() - t) / n * 1e6
+
+    q = top_queries(1, by="calls")[0]
+    out = os.path.join(os.path.dirname(path), "query_trace.json")
+    export_json(out)
+    print(f"plain sqlite3   : {t_plain:6.2f} us per lookup")
+    print(f"traced          : {t_traced:6.2f} us per lookup (+{t_traced - t_plain:.2f} us)")
+    print(f"recorded        : {q['calls']:,} calls, p50 <= {q['p50_ms']} ms, p95 <= {q['p95_ms']} ms, caller {next(iter(q['callers']))}")
+    print(f"JSON export     : {out} ({os.path.getsize(out):,} bytes)")
@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import modules.core.db_manager as db
+from modules.core import reference_data as ref
+
+# ==========================================
+# REFERENCE DATA: PRIVATE COPY PER SESSION vs SHARED COPY-ON-WRITE VIEWS
+# ==========================================
+# Registers a synthetic catalog of N rows next to the built-in datasets (COA,
+# corridors, SKU catalog, client registry), then opens S simulated sessions
+# that each hold every dataset, once as private deep copies (what every
+# session built for itself before) and once as views of the shared frames.
+# Reports heap growth (tracemalloc) and set-up time for both, then has one
+# session edit a column and checks the edit stays private and costs only
+# that column.
+# Usage: python -m benchmarks.bench_reference_data [catalog_rows] [sessions]
+
+
+def _catalog(n):
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        "sku_id": [f"SKU-{i:07d}" for i in range(n)],
+        "hazchem_mandatory": rng.integers(0, 2, n),
+        "unit_price": rng.uniform(10, 5000, n).round(2),
+        "description": [f"Bulk commodity grade {i % 97}" for i in range(n)],
+    })
+
+
+def _open_sessions(datasets, sessions, make):
+    tracemalloc.start()
+    t = time.perf_counter()
+    held = [{name: make(name) for name in datasets} for _ in range(sessions)]
+    elapsed = time.perf_counter() - t
+    grown = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, elapsed, grown / 2**20
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    db.DB_NAME = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db.init_db()
+    for i in range(200):
+        db.register_new_client(f"Client {i:03d}", f"REG-{i}", 50_000 * (i % 30))
+
+    ref.register_reference("bench_catalog", lambda: _catalog(n))
+    datasets = ["coa", "corridors", "sku_catalog", "client_registry", "bench_catalog"]
+    for name in datasets:
+        ref.reference_view(name)  # load the shared frames outside the measurement
+
+    copies, t_copy, mb_copy = _open_sessions(datasets, sessions, lambda name: ref._shared(name).copy(deep=True))
+    del copies
+    views, t_view, mb_view = _open_sessions(datasets, sessions, ref.reference_view)
+
+    # One session edits a column: only that column becomes private, the shared frame is untouched
+    shared = ref._shared("bench_catalog")
+    before = shared["unit_price"].sum()
+    session = views[0]["bench_catalog"]
+    session.loc[session.index[:10], "unit_price"] = 0.0
+    assert shared["unit_price"].sum() == before, "edit leaked into the shared frame"
+    assert all(v["bench_catalog"]["unit_price"].sum() == before for v in views[1:]), "edit leaked into another session"
+    private = ref._private_bytes(session, shared)
+    column = int(session["unit_price"].memory_usage(index=False))
+
+    report = ref.reference_memory_report()
+    shared_mb = sum(r["bytes"] for r in report["shared"]) / 2**20
+    print(f"{sessions} sessions x {len(datasets)} datasets ({n:,}-row catalog, {shared_mb:,.1f} MiB shared once)")
+    print(f"private deep copies : {t_copy * 1000:9.1f} ms  heap +{mb_copy:9.1f} MiB")
+    print(f"copy-on-write views : {t_view * 1000:9.1f} ms  heap +{mb_view:9.1f} MiB  ({mb_copy / max(mb_view, 1e-9):,.0f}x less)")
+    print(f"after one edit      : session private {private / 2**20:.2f} MiB (edited column {column / 2**20:.2f} MiB); shared + other sessions unchanged")
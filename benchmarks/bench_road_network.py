@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+import heapq
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# HUB ROAD NETWORK: PER-QUOTE DIJKSTRA vs PRECOMPUTED MATRIX
+# ==========================================
+# Prices N random hub-to-hub lanes, using the hub names and aliases that
+# quotes arrive with. Two ways:
+#   - on demand: a Dijkstra search over the corridor graph for every quote
+#     (what routing without the matrix costs)
+#   - road_network lookups against the cached all-pairs matrix
+# Both must agree on distance for every pair, and the matrix must never be
+# longer than a listed corridor. Also times building the matrix against
+# reading it back from the disk cache in a fresh process state.
+# Usage: python -m benchmarks.bench_road_network [quotes]
+
+
+def _graph(rn):
+    adj = {}
+    for a, b, _, meta in rn._edges():
+        for p, q in ((a, b), (b, a)):
+            adj.setdefault(p, []).append((q, meta["dist"]))
+    return adj
+
+
+def _dijkstra_km(adj, rn, origin, destination):
+    """Shortest road km from a fresh search; names resolved through the same hub index."""
+    net = rn.network()
+    i, j = rn.hub_node(origin), rn.hub_node(destination)
+    if i is None or j is None:
+        return np.nan
+    src, dst = net["nodes"][i], net["nodes"][j]
+    best = {src: 0.0}
+    heap = [(0.0, src)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if node == dst:
+            return d
+        if d > best[node]:
+            continue
+        for nxt, km in adj.get(node, ()):
+            if d + km < best.get(nxt, np.inf):
+                best[nxt] = d + km
+                heapq.heappush(heap, (d + km, nxt))
+    return np.nan
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    n_quotes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    from benchmarks.synthetic import open_sandbox
+    open_sandbox()  # the matrix cache is written to the working directory
+
+    from modules.logistics import road_network as rn
+    from modules.logistics.constants import CORRIDORS, HUB_ALIASES
+
+    t = time.perf_counter()
+    rn.network()
+    t_build = time.perf_counter() - t
+    rn.reset_network()
+    t = time.perf_counter()
+    net = rn.network()
+    t_load = time.perf_counter() - t
+    n = len(net["nodes"])
+    print(f"{n} hubs, {len(rn._edges())} corridors / links | build + cache {t_build * 1000:.1f} ms, "
+          f"read cache {t_load * 1000:.1f} ms ({os.path.getsize(rn.CACHE_PATH) / 1024:.0f} KiB)")
+
+    names = list(net["nodes"]) + list(HUB_ALIASES) + ["Durban (DBN)", "Cape Town (CPT)"]
+    rng = np.random.default_rng(25)
+    pairs = [(names[a], names[b]) for a, b in rng.integers(0, len(names), (n_quotes, 2))]
+
+    adj = _graph(rn)
+    sample = pairs[:min(n_quotes, 20_000)]
+    t = time.perf_counter()
+    slow = [_dijkstra_km(adj, rn, a, b) for a, b in sample]
+    t_dijkstra = (time.perf_counter() - t) * len(pairs) / len(sample)
+
+    t = time.perf_counter()
+    fast = [rn.corridor_leg(a, b) for a, b in pairs]
+    t_matrix = time.perf_counter() - t
+
+    got = np.array([leg["dist"] if leg else np.nan for leg in fast[:len(sample)]])
+    assert np.allclose(got, slow, equal_nan=True), "matrix and Dijkstra disagree"
+    for name, meta in CORRIDORS.items():
+        a, b = (x.strip() for x in name.split(":", 1)[-1].split("->", 1))
+        assert rn.road_km(a, b) <= meta["dist"], name
+    dist = net["dist"]
+    assert np.isfinite(dist).all() and np.allclose(dist, dist.T)
+
+    print(f"per-quote Dijkstra : {t_dijkstra:7.2f} s  ({len(pairs) / t_dijkstra:12,.0f} quotes/s, extrapolated from {len(sample):,})")
+    print(f"matrix lookups     : {t_matrix:7.2f} s  ({len(pairs) / t_matrix:12,.0f} quotes/s) | identical km "
+          f"({t_dijkstra / t_matrix:,.0f}x)")
+    print(f"  e.g. Cape Town -> Musina: {rn.corridor_leg('Cape Town', 'Musina')} via "
+          f"{[leg[2] for leg in rn.route_path('Cape Town', 'Musina')]}")
@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.logistics.constants import CORRIDORS
+from modules.logistics.services import calculate_route_economics, calculate_route_economics_batch
+
+# ==========================================
+# ROUTE ECONOMICS: SCALAR LOOP vs BATCH ENGINE
+# ==========================================
+# Prices N random (corridor, efficiency, tons, trailer) quotes with the
+# vectorised engine, times the scalar engine on a slice, and checks every
+# field of that slice for exact equality.
+# Usage: python -m benchmarks.bench_route_economics [quotes] [scalar_sample]
+
+TRAILERS = np.array([None, "Interlink", "Tautliner", "Flat Deck", "Side Tipper"], dtype=object)
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sample = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rng = np.random.default_rng(7)
+
+    routes = rng.choice(np.array(list(CORRIDORS) + ["Unlisted Lane"], dtype=object), n)
+    eff = np.round(rng.uniform(15, 60, n), 1)
+    tons = rng.integers(10, 40, n)
+    trailers = rng.choice(TRAILERS, n)
+
+    t = time.perf_counter()
+    df = calculate_route_economics_batch(routes, eff, tons, trailers)
+    t_batch = time.perf_counter() - t
+
+    # Plain Python scalars, as the UI passes them (np.float64 would switch round() to NumPy's rounding)
+    r_list, e_list, t_list = routes[:sample].tolist(), eff[:sample].tolist(), tons[:sample].tolist()
+    t = time.perf_counter()
+    scalar = [
+        calculate_route_economics(r_list[i], e_list[i], t_list[i], {"trailer_type": trailers[i]} if trailers[i] else None)
+        for i in range(sample)
+    ]
+    t_scalar = time.perf_counter() - t
+
+    head = df.head(sample)
+    mismatches = sum(
+        sum(a != b for a, b in zip(head[k].tolist(), (r[k] for r in scalar)))
+        for k in scalar[0]
+    )
+
+    per_batch = t_batch / n * 1e6
+    per_scalar = t_scalar / sample * 1e6
+    print(f"batch  : {n:,} quotes in {t_batch:.2f}s ({per_batch:.2f} us/quote)")
+    print(f"scalar : {sample:,} quotes in {t_scalar:.2f}s ({per_scalar:.2f} us/quote, ~{per_scalar * n / 1e6:.1f}s for {n:,})")
+    print(f"speedup: {per_scalar / per_batch:.0f}x | field mismatches on {sample:,} checked quotes: {mismatches}")
@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+import tempfile
+import logging
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# SCHEMA REGISTRY: DDL COST PER STREAMLIT RERUN
+# ==========================================
+# Builds throwaway cortex + fleet DBs, then times the schema work one rerun
+# of the logistics screens used to do (db_utils.init_db, the risk and
+# dispatch CREATEs, the telemetry tables, boot_system's cortex init_db)
+# against the registry fast path. Also times first boot on an empty DB and
+# a restart against a DB whose stored schema hashes already match.
+# Usage: python -m benchmarks.bench_schema_init [reruns]
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tmp = tempfile.mkdtemp()
+    os.chdir(tmp)  # db_utils binds fleet_data.db relative to the working directory
+
+    import modules.core.db_manager as db
+    import modules.core.schema_registry as registry
+    from modules.logistics.db_utils import SCHEMA_STATEMENTS, init_db, run_query
+    from modules.logistics.telemetry_store import ensure_telemetry_tables
+
+    db.DB_NAME = os.path.join(tmp, "bench_cortex.db")
+    view_ddl = [s for s in SCHEMA_STATEMENTS if "log_risk_incidents (" in s or "log_compliance_docs (" in s
+                or "log_dispatch_journal (" in s]
+
+    t = time.perf_counter()
+    init_db()
+    db.init_db()
+    t_first = (time.perf_counter() - t) * 1000
+
+    registry._verified.clear()   # what a restart sees: stored hashes match, nothing to apply
+    t = time.perf_counter()
+    init_db()
+    db.init_db()
+    t_restart = (time.perf_counter() - t) * 1000
+    applied = [r["applied_at_startup"] for r in registry.schema_report()]
+
+    def legacy_rerun():
+        for stmt in SCHEMA_STATEMENTS + view_ddl:
+            run_query(stmt)
+        ensure_telemetry_tables()
+        db._create_base_schema()
+
+    def registry_rerun():
+        for _ in range(3):       # logistics app, risk view, dispatch console
+            init_db()
+        db.init_db()             # vas_kernel.boot_system
+
+    def per_rerun(fn):
+        fn()
+        t = time.perf_counter()
+        for _ in range(reruns):
+            fn()
+        return (time.perf_counter() - t) / reruns * 1000
+
+    t_legacy = per_rerun(legacy_rerun)
+    t_registry = per_rerun(registry_rerun)
+
+    print(f"first boot (empty DBs)      : {t_first:8.2f} ms")
+    print(f"restart (hashes match)      : {t_restart:8.2f} ms  | bundles re-applied: {sum(map(len, applied))}")
+    print(f"per rerun ({reruns} reruns)")
+    print(f"  DDL every rerun           : {t_legacy:8.3f} ms")
+    print(f"  schema registry           : {t_registry:8.3f} ms  ({t_legacy / t_registry:,.0f}x)")
+    print(f"  saved per rerun           : {t_legacy - t_registry:8.3f} ms")
+    for r in registry.schema_report():
+        print(f"  {os.path.basename(r['db']):18s}: {len(r['bundles'])} bundles, {r['skipped_calls']} DDL passes skipped")
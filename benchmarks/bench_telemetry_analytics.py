@@ -0,0 +1,178 @@
+import sys
+import os
+import math
+import time
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# TELEMETRY ANALYTICS: PER-PING PYTHON LOOP vs VECTORISED ARRAYS
+# ==========================================
+# Throwaway fleet DB with one day of pings for V trucks, one fix every
+# `interval` seconds. Each shift includes:
+#   - speed wandering through overspeed
+#   - harsh braking to stops with the engine idling
+#   - a parked lunch break with the ignition off
+#   - a reporting gap
+# Compares analyse_pings against a plain per-ping loop that computes the
+# same daily figures:
+#   - time per state
+#   - distance
+#   - stops
+#   - overspeed episodes
+#   - harsh events
+# The two must agree on every vehicle. Then it times summarise_day, which
+# reads the partition, analyses it and writes telemetry_daily /
+# telemetry_overspeed. Finally it times the views' reads of the summaries
+# against analysing the raw pings on every render.
+# Usage: python -m benchmarks.bench_telemetry_analytics [vehicles] [interval_s]
+
+DAY = "20250305"
+
+
+def _shift(rng, n, interval):
+    """One truck's day: lat, lon, speed, ignition arrays of n fixes."""
+    speed = np.clip(60 + np.cumsum(rng.normal(0, 1.2, n)), 0, 105)
+    ignition = np.ones(n)
+    for s in np.flatnonzero(rng.random(n) < 0.004):
+        ramp = np.linspace(speed[s], 0, 4)           # ~12 km/h/s: a harsh stop...
+        speed[s:s + 4] = ramp[:len(speed[s:s + 4])]
+        speed[s + 4:s + 4 + rng.integers(30, 120)] = 0.0   # ...then idling
+    lunch = slice(n // 2, n // 2 + 3600 // interval)
+    speed[lunch], ignition[lunch] = 0.0, 0.0
+    heading = np.radians(rng.uniform(0, 360) + np.cumsum(rng.normal(0, 2.0, n)))
+    step_m = speed / 3.6 * interval
+    lat0, lon0 = rng.uniform(-30, -24), rng.uniform(26, 31)
+    lat = lat0 + np.cumsum(step_m * np.cos(heading)) / 111_320
+    lon = lon0 + np.cumsum(step_m * np.sin(heading)) / (111_320 * np.cos(np.radians(lat0)))
+    return lat, lon, speed, ignition
+
+
+def _loop_daily(pings, ta):
+    """Reference: one pass per vehicle in plain Python."""
+    out = {}
+    for reg, grp in pings.groupby("reg_number", sort=True):
+        t = [pd.Timestamp(x).timestamp() for x in grp["timestamp"]]
+        lat, lon = grp["latitude"].tolist(), grp["longitude"].tolist()
+        spd, ign = grp["speed"].tolist(), grp["ignition"].tolist()
+        r = {"distance_km": 0.0, "moving_min": 0.0, "idle_min": 0.0, "parked_min": 0.0, "stops": 0,
+             "overspeed_episodes": 0, "overspeed_min": 0.0, "harsh_accel": 0, "harsh_brake": 0, "max_speed": max(spd)}
+        state = ["Parked" if ig == 0 else "In Transit" if v > ta.MOVING_KMH else "Stationary" for v, ig in zip(spd, ign)]
+        seg_state, seg_dur, run, prev_harsh = state[0], 0.0, None, None
+
+        def close(run_s):
+            if run_s >= ta.OVERSPEED_MIN_S:
+                r["overspeed_episodes"] += 1
+                r["overspeed_min"] += run_s / 60
+
+        for i in range(len(t)):
+            dt = t[i + 1] - t[i] if i + 1 < len(t) else 0.0
+            live = i + 1 < len(t) and dt <= ta.GAP_S
+            if i + 1 < len(t):
+                p1, p2 = math.radians(lat[i]), math.radians(lat[i + 1])
+                a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon[i + 1] - lon[i]) / 2) ** 2
+                r["distance_km"] += 6371.0 * 2 * math.asin(math.sqrt(a))
+            credit = dt if live else 0.0
+            r[{"In Transit": "moving_min", "Stationary": "idle_min", "Parked": "parked_min"}[state[i]]] += credit / 60
+            # segments / stops
+            if i > 0 and (state[i] != seg_state or not (t[i] - t[i - 1] <= ta.GAP_S)):
+                r["stops"] += seg_state != "In Transit" and seg_dur >= ta.STOP_MIN_S
+                seg_state, seg_dur = state[i], 0.0
+            seg_dur += credit
+            # overspeed runs
+            joined = i > 0 and t[i] - t[i - 1] <= ta.GAP_S
+            fast = spd[i] > ta.OVERSPEED_KMH
+            if run is not None and not (fast and joined):
+                close(run)
+                run = None
+            if fast:
+                run = (run or 0.0) + credit
+            # harsh events, one per run
+            if i + 1 < len(t) and 0 < dt <= ta.HARSH_MAX_DT_S:
+                acc = (spd[i + 1] - spd[i]) / dt
+                kind = "harsh_accel" if acc >= ta.HARSH_KMH_S else "harsh_brake" if acc <= -ta.HARSH_KMH_S else None
+                if kind and kind != prev_harsh:
+                    r[kind] += 1
+                prev_harsh = kind
+            else:
+                prev_harsh = None
+        r["stops"] += seg_state != "In Transit" and seg_dur >= ta.STOP_MIN_S
+        if run is not None:
+            close(run)
+        out[reg] = r
+    return pd.DataFrame.from_dict(out, orient="index").sort_index()
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n_veh = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    from benchmarks.synthetic import open_sandbox
+    open_sandbox()
+
+    from modules.core.query_cache import clear_cache
+    from modules.logistics.db_utils import init_db
+    from modules.logistics.gps_engine import ingest_gps_batch
+    from modules.logistics import telemetry_analytics as ta
+
+    init_db()
+    rng = np.random.default_rng(23)
+    n = 12 * 3600 // interval
+    stamps = (np.datetime64("2025-03-05T05:00:00") + np.arange(n) * np.timedelta64(interval, "s"))
+    keep = np.ones(n, dtype=bool)
+    keep[n // 4:n // 4 + 1800 // interval] = False   # 30-min reporting gap (> GAP_S)
+    stamps = stamps[keep].astype(str)
+    total = 0
+    for v in range(n_veh):
+        lat, lon, speed, ignition = (a[keep] for a in _shift(rng, n, interval))
+        total += ingest_gps_batch({"reg_number": np.full(len(stamps), f"TRK-{v:04d}", dtype=object), "timestamp": stamps,
+                                   "latitude": lat, "longitude": lon, "speed": speed, "ignition": ignition},
+                                  source="bench", update_fleet=False, geofence=False)
+    pings = ta._read_day(DAY)
+    print(f"{total:,} pings ({n_veh} trucks, 1 fix / {interval}s, 12 h shift)")
+
+    sample = pings[pings["reg_number"].isin([f"TRK-{v:04d}" for v in range(min(n_veh, 20))])]
+    t = time.perf_counter()
+    expected = _loop_daily(sample, ta)
+    t_loop = (time.perf_counter() - t) * len(pings) / len(sample)
+    t = time.perf_counter()
+    out = ta.analyse_pings(pings)
+    t_vec = time.perf_counter() - t
+
+    got = out["daily"].set_index("reg_number").loc[expected.index, expected.columns]
+    bad = ~np.isclose(got.astype(float), expected.astype(float), rtol=1e-9, atol=1e-6)
+    assert not bad.any(), got.where(bad).dropna(how="all").join(expected, rsuffix="_loop").head()
+    daily = out["daily"]
+    assert (daily[["moving_min", "idle_min", "parked_min"]].sum(axis=1) <= 12 * 60 - 30 + 1e-6).all()
+    print(f"per-ping Python loop : {t_loop:7.2f} s  ({len(pings) / t_loop:12,.0f} pings/s, extrapolated from 20 trucks)")
+    print(f"vectorised arrays    : {t_vec:7.2f} s  ({len(pings) / t_vec:12,.0f} pings/s) | identical daily figures")
+    print(f"  fleet day: {daily['distance_km'].sum():,.0f} km, {daily['moving_min'].sum() / 60:,.0f} h moving, "
+          f"{daily['idle_min'].sum() / 60:,.0f} h idling, {daily['stops'].sum():,} stops, "
+          f"{daily['overspeed_episodes'].sum():,} overspeed episodes, {daily['harsh_brake'].sum():,} harsh brakes, "
+          f"{len(out['segments']):,} state segments")
+
+    t = time.perf_counter()
+    res = ta.summarise_day(DAY)
+    t_sum = time.perf_counter() - t
+    assert res["vehicles"] == n_veh and res["pings"] == total, res
+    print(f"summarise_day (read partition + analyse + store): {t_sum:5.2f} s -> {res}")
+
+    reps = 5
+    t = time.perf_counter()
+    for _ in range(reps):
+        ta.analyse_pings(ta._read_day(DAY))["daily"]
+    t_raw = (time.perf_counter() - t) / reps
+    t = time.perf_counter()
+    for _ in range(reps):
+        clear_cache()
+        ta.latest_activity()
+        ta.driver_behaviour()
+    t_tab = (time.perf_counter() - t) / reps
+    print(f"view render: analyse raw pings {t_raw * 1000:8.1f} ms | read telemetry_daily {t_tab * 1000:6.1f} ms "
+          f"({t_raw / t_tab:,.0f}x)")
@@ -0,0 +1,112 @@
+import sys
+import os
+import time
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# ==========================================
+# TRIP TRACKS: RAW gps_pings PARTITION vs COMPRESSED trip_tracks
+# ==========================================
+# Throwaway fleet DB with one day of pings for V trucks, one fix every
+# `interval` seconds over a 10-hour shift split by a lunch stop:
+#   - dead-reckoned road legs with gentle heading drift and speed changes
+#   - idle stops
+#   - ~4 m GPS noise
+# For several tolerances it reports:
+#   - kept points
+#   - storage (dbstat bytes of the raw partition + its index vs trip_tracks)
+#   - compression time
+#   - the worst replay error measured against every raw ping
+# Then it times replaying one trip from trip_tracks against selecting the
+# same truck's raw pings.
+# Usage: python -m benchmarks.bench_trajectory [vehicles] [interval_s]
+
+DAY = "20250304"
+
+
+def _shift(rng, n, interval):
+    """One truck's day: lat, lon, speed arrays of n fixes."""
+    speed = np.clip(np.cumsum(rng.normal(0, 1.5, n)) % 100 + rng.normal(0, 2, n), 0, 110)
+    stops = rng.random(n) < 0.01
+    for s in np.flatnonzero(stops):
+        speed[s:s + rng.integers(20, 90)] = 0.0   # yard / traffic / loading stops
+    heading = np.radians(rng.uniform(0, 360) + np.cumsum(rng.normal(0, 2.0, n) * (rng.random(n) < 0.2)))
+    step_m = speed / 3.6 * interval
+    lat0, lon0 = rng.uniform(-30, -24), rng.uniform(26, 31)
+    lat = lat0 + np.cumsum(step_m * np.cos(heading)) / 111_320
+    lon = lon0 + np.cumsum(step_m * np.sin(heading)) / (111_320 * np.cos(np.radians(lat0)))
+    noise = rng.normal(0, 4, (2, n)) / 111_320
+    return lat + noise[0], lon + noise[1] / np.cos(np.radians(lat0)), speed
+
+
+def _bytes(conn, *names):
+    marks = ", ".join("?" * len(names))
+    return conn.exec_driver_sql(f"SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN ({marks})", names).fetchone()[0]
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n_veh = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    from benchmarks.synthetic import open_sandbox
+    open_sandbox()
+
+    from modules.core.query_cache import clear_cache
+    from modules.logistics.db_utils import engine, init_db
+    from modules.logistics.gps_engine import ingest_gps_batch
+    from modules.logistics import trajectory as tj
+
+    init_db()
+    rng = np.random.default_rng(4)
+    half = 5 * 3600 // interval
+    t_am = np.datetime64("2025-03-04T06:00:00") + np.arange(half) * np.timedelta64(interval, "s")
+    t_pm = t_am + np.timedelta64(6 * 3600, "s")   # 1-hour lunch gap -> two tracks per truck
+    stamps = np.concatenate([t_am, t_pm]).astype(str)
+    total = 0
+    for v in range(n_veh):
+        lat, lon, speed = _shift(rng, len(stamps), interval)
+        total += ingest_gps_batch({"reg_number": np.full(len(stamps), f"TRK-{v:04d}", dtype=object), "timestamp": stamps,
+                                   "latitude": lat, "longitude": lon, "speed": speed},
+                                  source="bench", update_fleet=False, geofence=False)
+
+    table = f"gps_pings_{DAY}"
+    with engine.connect() as conn:
+        raw_bytes = _bytes(conn, table, f"idx_{table}_reg_ts")
+    print(f"{total:,} raw pings ({n_veh} trucks, 1 fix / {interval}s): {raw_bytes / 2**20:,.1f} MiB in {table} + index")
+
+    for tol in (10.0, 25.0, 50.0):
+        t = time.perf_counter()
+        out = tj.compress_day(DAY, tolerance_m=tol)
+        elapsed = time.perf_counter() - t
+        with engine.connect() as conn:
+            tracks_bytes = _bytes(conn, "trip_tracks", "sqlite_autoindex_trip_tracks_1",
+                                  "idx_trip_tracks_reg_start", "idx_trip_tracks_trip")
+            worst = conn.exec_driver_sql("SELECT MAX(max_error_m) FROM trip_tracks").fetchone()[0]
+        assert worst <= tol, f"replay error {worst:.2f} m over tolerance {tol} m"
+        print(f"  tolerance {tol:4.0f} m: {out['tracks']} tracks, {out['kept_points']:,} points kept "
+              f"({out['raw_points'] / out['kept_points']:5.1f}x fewer), {tracks_bytes / 2**20:6.2f} MiB "
+              f"({raw_bytes / tracks_bytes:5.1f}x smaller), worst replay error {worst:5.1f} m, compressed in {elapsed:5.2f} s")
+
+    reg = "TRK-0000"
+    track_id = tj.list_tracks(reg)["track_id"].iloc[-1]
+    clear_cache()
+    t = time.perf_counter()
+    with engine.connect() as conn:
+        raw = pd.read_sql(f"SELECT timestamp, latitude, longitude, speed FROM {table} "
+                          "WHERE reg_number = ? AND timestamp < ? ORDER BY timestamp", conn, params=(reg, "2025-03-04T11:30"))
+    t_raw = time.perf_counter() - t
+    clear_cache()
+    t = time.perf_counter()
+    replay = tj.trip_replay(track_id)
+    t_cold = time.perf_counter() - t
+    t = time.perf_counter()
+    tj.trip_replay(track_id)
+    t_warm = time.perf_counter() - t
+    print(f"replay one track as a DataFrame: raw pings {len(raw):,} rows {t_raw * 1000:6.1f} ms | "
+          f"trip_replay {len(replay):,} points {t_cold * 1000:6.1f} ms cold, {t_warm * 1000:5.1f} ms from the query cache")
@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import random
+import sqlite3
+import tempfile
+import logging
+import warnings
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import modules.core.db_manager as db
+from modules.core.query_cache import clear_cache
+
+# ==========================================
+# TRIAL BALANCE: FULL LEDGER SCAN vs account_balances
+# ==========================================
+# Seeds a throwaway cortex DB with N ledger lines (24 months x 20 accounts)
+# and times the old O(lines) readers against the materialised table.
+# Usage: python -m benchmarks.bench_trial_balance [lines]
+
+ACCOUNTS = [f"{p}{i:02d}0" for p in "12456" for i in range(4)]
+
+
+def _rows(n):
+    rng = random.Random(7)
+    return [(f"JRN-{i // 2}", f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if i % 3 else
+             f"2025-{rng.randint(1, 12):02d}-01", "bench", rng.choice(ACCOUNTS),
+             rng.random() * 1000 if i % 2 == 0 else 0.0, rng.random() * 1000 if i % 2 else 0.0, "REF")
+            for i in range(n)]
+
+
+def _insert(conn, rows):
+    t = time.perf_counter()
+    conn.executemany("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    return time.perf_counter() - t
+
+
+def _legacy_tb():
+    with db.cortex_connection() as conn:
+        return pd.read_sql_query("SELECT account_code, SUM(debit) as d, SUM(credit) as c FROM ledger_lines GROUP BY account_code", conn)
+
+
+def _legacy_health():
+    with db.cortex_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM ledger_lines", conn)
+    rev = df[df['account_code'].str.startswith('4')]['credit'].sum()
+    exp = df[df['account_code'].str.startswith('5')]['debit'].sum()
+    ar = df[df['account_code'].str.startswith('12')]['debit'].sum() - df[df['account_code'].str.startswith('12')]['credit'].sum()
+    return {"revenue": rev, "ar": ar, "cash": rev - exp, "expense": exp}
+
+
+def _time(fn, reps=5):
+    t = time.perf_counter()
+    for _ in range(reps):
+        clear_cache()  # time the query, not the query cache
+        out = fn()
+    return (time.perf_counter() - t) / reps * 1000, out
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tmp = tempfile.mkdtemp()
+    db.DB_NAME = os.path.join(tmp, "bench.db")
+
+    rows = _rows(n)
+    plain = sqlite3.connect(os.path.join(tmp, "plain.db"))
+    plain.execute("CREATE TABLE ledger_lines (transaction_id TEXT, date TEXT, description TEXT, "
+                  "account_code TEXT, debit REAL, credit REAL, reference_id TEXT)")
+    t_insert_plain = _insert(plain, rows)
+    with db.cortex_connection() as conn:
+        t_insert = _insert(conn, rows)
+
+    print(f"insert {n} lines: {t_insert_plain:.2f}s without trigger | {t_insert:.2f}s with account_balances trigger")
+    for name, old, new in [
+        ("trial balance", _legacy_tb, db.get_trial_balance_sql),
+        ("financial health", _legacy_health, db.get_financial_health),
+    ]:
+        t_old, r_old = _time(old)
+        t_new, r_new = _time(new)
+        if isinstance(r_old, pd.DataFrame):
+            pd.testing.assert_frame_equal(r_old, r_new, check_exact=False, rtol=1e-9)
+        else:
+            assert all(abs(r_old[k] - r_new[k]) < 1e-3 for k in r_old)
+        print(f"{name:<18} ledger scan: {t_old:8.2f} ms | account_balances: {t_new:6.2f} ms | {t_old / t_new:.0f}x")
+    print("consistency mismatches:", len(db.verify_account_balances()))
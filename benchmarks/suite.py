@@ -0,0 +1,196 @@
+import sys
+import os
+import json
+import time
+import sqlite3
+import logging
+import platform
+import argparse
+import datetime
+import statistics
+import warnings
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SCALES, build_dataset, open_sandbox
+
+# ==========================================
+# BENCHMARK SUITE: HOT FUNCTIONS ON SYNTHETIC DATA + JSON BASELINE
+# ==========================================
+# Seeds a throwaway sandbox at the chosen scale (benchmarks.synthetic), then
+# times the functions the dashboards lean on, headless: fleet enrichment,
+# trial balance, financial health, route economics, CPK and the prospect
+# book. The query cache is cleared before every rep so reads are measured.
+# The run is compared against the stored baseline for the same dataset on
+# best-of-reps time (as timeit does: the least noisy figure). The baseline
+# is written on first run or with --update-baseline; it is per machine, so
+# benchmarks/baselines/ is not committed. Exits 1 when a case regresses
+# past --tolerance, and refuses to run (or write a baseline) when the
+# seeded row counts differ from the requested sizes.
+# Usage: python -m benchmarks.suite [--scale small|medium|large] [--reps N] [--update-baseline]
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+REPS = 9
+TOLERANCE = 0.25
+NOISE_FLOOR_MS = 0.5     # absolute slow-down below this is never a regression
+ROUTE_QUOTES = 10_000
+
+
+def _cases():
+    """name -> zero-argument callable; imported here because db_utils binds to the sandbox cwd."""
+    import modules.core.db_manager as db
+    from modules.logistics.constants import CORRIDORS
+    from modules.logistics.db_utils import load_data
+    from modules.logistics.rules import enrich_fleet_data
+    from modules.logistics.services import calculate_route_economics
+    from modules.logistics.views.finance_dashboard import _compute_cpk
+
+    routes = list(CORRIDORS) + ["Unlisted Lane"]
+    quotes = [(routes[i % len(routes)], 20 + i % 40, 10 + i % 30) for i in range(ROUTE_QUOTES)]
+
+    def route_economics():
+        return [calculate_route_economics(r, e, t) for r, e, t in quotes]
+
+    return {
+        "enrich_fleet_data": lambda: enrich_fleet_data(load_data("SELECT * FROM log_vehicles")),
+        "get_trial_balance_sql": db.get_trial_balance_sql,
+        "get_financial_health": db.get_financial_health,
+        f"calculate_route_economics_x{ROUTE_QUOTES // 1000}k": route_economics,
+        "_compute_cpk": _compute_cpk,
+        "load_prospects_to_dataframe": db.load_prospects_to_dataframe,
+    }
+
+
+def _rows(out):
+    return len(out) if hasattr(out, "__len__") else 1
+
+
+def time_case(fn, reps):
+    """One warm-up call, then reps timed calls with a cold query cache."""
+    from modules.core.query_cache import clear_cache
+
+    clear_cache()
+    out = fn()
+    runs = []
+    for _ in range(reps):
+        clear_cache()
+        t = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t) * 1000)
+    return {
+        "median_ms": round(statistics.median(runs), 4),
+        "min_ms": round(min(runs), 4),
+        "max_ms": round(max(runs), 4),
+        "reps": reps,
+        "rows": _rows(out),
+    }
+
+
+def _environment():
+    import numpy as np
+    import pandas as pd
+    return {
+        "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+        "sqlite": sqlite3.sqlite_version, "machine": platform.machine(), "system": platform.system(),
+    }
+
+
+def compare(run, baseline, tolerance=TOLERANCE):
+    """Per case: baseline / current best-of-reps ms, ratio and status (ok, faster, REGRESSION, new)."""
+    rows = []
+    base = baseline.get("results", {})
+    for name, res in run["results"].items():
+        old = base.get(name)
+        if old is None:
+            rows.append({"case": name, "baseline_ms": None, "current_ms": res["min_ms"], "ratio": None, "status": "new"})
+            continue
+        ratio = res["min_ms"] / old["min_ms"] if old["min_ms"] else float("inf")
+        slower = res["min_ms"] - old["min_ms"] > NOISE_FLOOR_MS
+        status = "REGRESSION" if ratio > 1 + tolerance and slower else "faster" if ratio < 1 - tolerance else "ok"
+        rows.append({"case": name, "baseline_ms": old["min_ms"], "current_ms": res["min_ms"], "ratio": ratio, "status": status})
+    return rows
+
+
+def _args(argv):
+    p = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Headless benchmark suite with JSON baselines.")
+    p.add_argument("--scale", choices=sorted(SCALES), default="small")
+    p.add_argument("--vehicles", type=int, help="override N vehicles")
+    p.add_argument("--pings", type=int, help="override M GPS pings")
+    p.add_argument("--ledger-lines", type=int, help="override K ledger lines")
+    p.add_argument("--prospects", type=int, help="override P prospects")
+    p.add_argument("--reps", type=int, default=REPS)
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--only", help="comma-separated case names")
+    p.add_argument("--baseline", help="baseline JSON (default: benchmarks/baselines/<dataset>.json)")
+    p.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    p.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slow-down ratio before flagging")
+    p.add_argument("--out", help="also write this run's JSON here")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    args = _args(sys.argv[1:])
+
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        override = getattr(args, key)
+        if override is not None:
+            sizes[key] = override
+    label = args.scale if sizes == SCALES[args.scale] else "custom-" + "-".join(str(sizes[k]) for k in sorted(sizes))
+    baseline_path = os.path.abspath(args.baseline or os.path.join(BASELINE_DIR, f"{label}.json"))
+    out_path = os.path.abspath(args.out) if args.out else None
+
+    tmp = open_sandbox()
+    t = time.perf_counter()
+    counts = build_dataset(seed=args.seed, **sizes)
+    print(f"dataset {label}: " + ", ".join(f"{k} {v:,}" for k, v in counts.items())
+          + f" | seeded in {time.perf_counter() - t:.1f}s ({tmp})")
+    expected = {**sizes, "ledger_lines": sizes["ledger_lines"] // 2 * 2}   # seeded as debit / credit pairs
+    short = {k: (counts.get(k), n) for k, n in expected.items() if counts.get(k) != n}
+    if short:
+        sys.exit("dataset does not match the requested sizes (seeded, wanted): "
+                 + ", ".join(f"{k} {got} / {n}" for k, (got, n) in short.items()) + "; no baseline written")
+
+    cases = _cases()
+    if args.only:
+        wanted = {c.strip() for c in args.only.split(",")}
+        cases = {k: v for k, v in cases.items() if k in wanted}
+
+    run = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "dataset": {"label": label, "seed": args.seed, **sizes},
+        "rows": counts,
+        "environment": _environment(),
+        "results": {},
+    }
+    for name, fn in cases.items():
+        run["results"][name] = res = time_case(fn, args.reps)
+        print(f"  {name:34s}: {res['median_ms']:10.3f} ms median | {res['min_ms']:10.3f} min | {res['rows']:,} rows")
+
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as fh:
+            json.dump(run, fh, indent=2)
+
+    regressions = 0
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        if baseline.get("dataset") != run["dataset"]:
+            print(f"baseline {baseline_path} was recorded on a different dataset; not compared")
+        else:
+            print(f"vs baseline {baseline.get('generated_at')} ({baseline_path})")
+            for row in compare(run, baseline, args.tolerance):
+                regressions += row["status"] == "REGRESSION"
+                ratio = f"{row['ratio']:6.2f}x" if row["ratio"] is not None else "     -"
+                base_ms = f"{row['baseline_ms']:10.3f}" if row["baseline_ms"] is not None else "         -"
+                print(f"  {row['case']:34s}: {base_ms} -> {row['current_ms']:10.3f} ms  {ratio}  {row['status']}")
+
+    if args.update_baseline or not os.path.exists(baseline_path):
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as fh:
+            json.dump(run, fh, indent=2)
+        print(f"baseline written: {baseline_path}")
+
+    sys.exit(1 if regressions else 0)
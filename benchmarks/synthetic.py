@@ -0,0 +1,208 @@
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# ==========================================
+# SYNTHETIC DATASETS FOR THE BENCHMARK SUITE
+# ==========================================
+# Seeds throwaway fleet + cortex SQLite files at a chosen size: N vehicles
+# (with missions and dispatch-journal trips), M GPS pings, K ledger lines
+# and P prospects. Everything is written through the same wrappers the app
+# uses (db_utils engine, gps_engine.ingest_gps_batch, cortex_connection), so
+# the schema, triggers and indexes match production. Deterministic per seed.
+#
+# db_utils binds fleet_data.db relative to the working directory, so call
+# open_sandbox() before anything imports it.
+
+SCALES = {
+    "small": {"vehicles": 50, "pings": 20_000, "ledger_lines": 20_000, "prospects": 1_000},
+    "medium": {"vehicles": 500, "pings": 200_000, "ledger_lines": 200_000, "prospects": 10_000},
+    "large": {"vehicles": 2_000, "pings": 1_000_000, "ledger_lines": 1_000_000, "prospects": 50_000},
+}
+
+MISSIONS_PER_VEHICLE = 4
+TRIPS_PER_VEHICLE = 6
+PING_INTERVAL_S = 30
+INGEST_BATCH = 50_000
+EPOCH = datetime(2025, 3, 1)
+
+VEHICLE_TYPES = ["Interlink", "Tautliner", "Flat Deck", "Side Tipper", "Rigid"]
+MAKES = ["Volvo FH16", "Scania R560", "Mercedes Actros", "MAN TGX", "UD Quon"]
+STATUSES = ["Idle", "In Transit", "Loading", "Maintenance", "Offline"]
+MISSION_STATUSES = ["Closed", "Closed", "Active", "Staged"]
+DEPOTS = {"City Deep": (-26.21, 28.07), "Durban Port": (-29.87, 31.03), "Richards Bay": (-28.78, 32.04),
+          "Witbank": (-25.87, 29.23), "Cape Town": (-33.92, 18.42)}
+ACCOUNT_PAIRS = [("1200", "4000"), ("5000", "1000"), ("5100", "2000"), ("1000", "1200"), ("2000", "1000")]
+INDUSTRIES = ["Mining", "Agriculture", "Retail", "Construction", "Manufacturing", "Energy"]
+REGIONS = ["Gauteng", "KZN", "Western Cape", "Mpumalanga", "Limpopo"]
+
+
+def open_sandbox(path=None):
+    """
+    Points both databases at a fresh directory (created when path is None)
+    and makes it the working directory. Returns the directory.
+    """
+    path = path or tempfile.mkdtemp(prefix="veridian_bench_")
+    os.chdir(path)
+
+    import modules.core.db_manager as db
+    db.DB_NAME = os.path.join(path, "bench_cortex.db")
+    return path
+
+
+def _regs(n):
+    return [f"SYN-{i:05d}-GP" for i in range(n)]
+
+
+def _check(what, written, wanted):
+    """Timings on a short dataset are meaningless: fail the seed instead."""
+    if written != wanted:
+        raise RuntimeError(f"seeded {written:,} {what}, expected {wanted:,}")
+    return written
+
+
+# ------------------------------------------
+# FLEET DB
+# ------------------------------------------
+
+def seed_vehicles(n, seed=7):
+    """n vehicles in log_vehicles, plus their missions and dispatch-journal trips."""
+    from modules.logistics.constants import CORRIDORS
+    from modules.logistics.db_utils import engine, init_db
+
+    init_db()
+    rng = random.Random(seed)
+    regs = _regs(n)
+    depots = list(DEPOTS)
+    routes = list(CORRIDORS) + ["Unlisted Lane"]
+
+    vehicles = []
+    for reg in regs:
+        depot = rng.choice(depots)
+        lat, lon = DEPOTS[depot]
+        vehicles.append((reg, rng.choice(VEHICLE_TYPES), rng.choice(MAKES), round(rng.uniform(28, 45), 1),
+                         rng.choice(STATUSES), f"Driver {reg[4:9]}", depot, lat, lon))
+
+    missions = [
+        (f"Client {rng.randint(1, 400)} - Load {i}", reg, f"Driver {reg[4:9]}",
+         (EPOCH - timedelta(hours=rng.randint(1, 2000))).isoformat(sep=" ", timespec="seconds"),
+         rng.choice(MISSION_STATUSES), rng.choice(depots))
+        for reg in regs for i in range(MISSIONS_PER_VEHICLE)
+    ]
+
+    trips = []
+    for reg in regs:
+        for i in range(TRIPS_PER_VEHICLE):
+            tare = round(rng.uniform(14, 17), 2)
+            gross = round(tare + rng.uniform(20, 34), 2)
+            start = EPOCH - timedelta(hours=rng.randint(1, 2000))
+            trips.append((f"TRP-{reg[4:9]}-{i}", rng.choice(routes), reg, f"Driver {reg[4:9]}", "Delivered",
+                          tare, gross, round(gross - tare, 2), f"WB-{rng.randint(10000, 99999)}",
+                          start.isoformat(sep=" ", timespec="seconds"),
+                          (start + timedelta(hours=rng.randint(5, 30))).isoformat(sep=" ", timespec="seconds")))
+
+    with engine.begin() as conn:
+        written = conn.exec_driver_sql(
+            "INSERT OR REPLACE INTO log_vehicles (reg_number, type, make_model, fuel_rating, status, driver_name, "
+            "location, last_lat, last_lon) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", vehicles).rowcount if vehicles else 0
+        conn.exec_driver_sql(
+            "INSERT INTO log_missions (mission_name, reg_number, driver_name, start_time, status, location) "
+            "VALUES (?, ?, ?, ?, ?, ?)", missions)
+        conn.exec_driver_sql(
+            "INSERT OR REPLACE INTO log_dispatch_journal (trip_id, rfq_ref, truck_reg, driver, status, tare_weight, "
+            "gross_weight, net_weight, ticket_no, start_time, end_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", trips)
+    return {"vehicles": _check("vehicles", written, n), "missions": len(missions), "trips": len(trips)}
+
+
+def seed_gps_pings(n_vehicles, m, seed=7):
+    """
+    m pings spread round-robin over the first n_vehicles vehicles, one per
+    PING_INTERVAL_S per truck counting back from EPOCH, ingested in batches.
+    """
+    from modules.logistics.gps_engine import ingest_gps_batch
+
+    if not m:
+        return {"pings": 0}
+    if not n_vehicles:
+        raise ValueError("GPS pings need at least one vehicle")
+    rng = np.random.default_rng(seed)
+    regs = np.array(_regs(n_vehicles))
+    origins = np.array(list(DEPOTS.values()))[np.arange(n_vehicles) % len(DEPOTS)]
+
+    written = 0
+    for start in range(0, m, INGEST_BATCH):
+        idx = np.arange(start, min(start + INGEST_BATCH, m))
+        truck = idx % n_vehicles
+        step = idx // n_vehicles
+        stamps = (np.datetime64(EPOCH) - (step * PING_INTERVAL_S).astype("timedelta64[s]")).astype(str)
+        written += ingest_gps_batch({
+            "reg_number": regs[truck],
+            "timestamp": stamps,
+            "latitude": origins[truck, 0] + rng.normal(0, 0.05, len(idx)),
+            "longitude": origins[truck, 1] + rng.normal(0, 0.05, len(idx)),
+            "speed": rng.uniform(0, 95, len(idx)).round(1),
+            "heading": rng.uniform(0, 360, len(idx)).round(1),
+            "ignition": (rng.random(len(idx)) > 0.2).astype(int),
+            "signal_quality": rng.uniform(0.6, 1.0, len(idx)).round(2),
+        }, source="synthetic")
+    return {"pings": _check("GPS pings", written, m)}
+
+
+# ------------------------------------------
+# CORTEX DB
+# ------------------------------------------
+
+def seed_ledger(k, seed=7):
+    """k ledger lines as balanced debit / credit pairs over 24 months (k rounded down to even)."""
+    import modules.core.db_manager as db
+
+    db.init_db()
+    rng = random.Random(seed)
+    rows = []
+    for j in range(k // 2):
+        debit_acc, credit_acc = rng.choice(ACCOUNT_PAIRS)
+        date = f"{2024 + j % 2}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        amount = round(rng.uniform(500, 250_000), 2)
+        ref = f"SYN-{j}"
+        rows.append((f"JRN-SYN-{j}", date, "synthetic", debit_acc, amount, 0.0, ref))
+        rows.append((f"JRN-SYN-{j}", date, "synthetic", credit_acc, 0.0, amount, ref))
+    with db.cortex_connection() as conn:
+        written = conn.executemany(
+            "INSERT INTO ledger_lines (transaction_id, date, description, account_code, debit, credit, reference_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows).rowcount if rows else 0
+    return {"ledger_lines": _check("ledger lines", written, k // 2 * 2)}
+
+
+def seed_prospects(p, seed=7):
+    """p prospects across industries / regions, with a parent group for every tenth company."""
+    import modules.core.db_manager as db
+
+    db.init_db()
+    rng = random.Random(seed)
+    rows = [
+        (f"Prospect {i:06d} (Pty) Ltd", f"Group {i // 10}" if i % 10 == 0 else None, f"Contact {i}",
+         rng.choice(INDUSTRIES), rng.choice(REGIONS), rng.choice(["Lead", "Contacted", "Qualified", "Won"]),
+         round(rng.uniform(50_000, 5_000_000), 2), "synthetic", None)
+        for i in range(p)
+    ]
+    with db.cortex_connection() as conn:
+        written = conn.executemany(
+            "INSERT INTO prospects (company_name, parent_company, contact_person, industry, region, status, "
+            "estimated_value, notes, focus_period) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows).rowcount if rows else 0
+    return {"prospects": _check("prospects", written, p)}
+
+
+def build_dataset(vehicles, pings, ledger_lines, prospects, seed=7):
+    """
+    Seeds the current sandbox at the given sizes; returns the row counts
+    written. Raises RuntimeError when a table comes out short.
+    """
+    counts = {}
+    counts.update(seed_vehicles(vehicles, seed))
+    counts.update(seed_gps_pings(vehicles, pings, seed))
+    counts.update(seed_ledger(ledger_lines, seed))
+    counts.update(seed_prospects(prospects, seed))
+    return counts
@@ -1,15 +1,23 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 import os
 import time
 
+from modules.core.query_cache import cache_stats, clear_cache, invalidate
+from modules.core.schema_registry import ensure_schema, schema_report
+from modules.core.reference_data import bump_reference, reference_memory_report
+from modules.core.index_advisor import advise, create_index, index_inventory
+from modules.core.query_trace import (
+    BUCKETS_MS, SLOW_QUERY_MS, connect, export_json, rerun_history, reset_trace,
+    section_costs, slow_queries, top_queries, trace_rerun, trace_section,
+)
+
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DB_PATH = os.path.join(BASE_DIR, "veridian_cortex.db")
 
 def get_db_connection():
-    return sqlite3.connect(DB_PATH)
+    return connect(DB_PATH)  # traced: shows up in the Performance tab
 
 def get_all_tables():
     conn = get_db_connection()
@@ -32,12 +40,14 @@ def nuke_table(table_name):
     try:
         c.execute(f"DELETE FROM {table_name}")
         conn.commit()
+        invalidate(DB_PATH, table_name)  # raw connection: cached reads must be told
         st.toast(f"☢️ {table_name} PURGED.")
     except Exception as e:
         st.error(f"Error: {e}")
     finally: conn.close()
 
 # --- THE MAGISTERIAL UPGRADE ---
+@trace_rerun("Admin Core")
 def render_admin_core():
     # HEADER
     st.markdown("## 🛡️ System Administration | Sovereign Kernel")
@@ -61,13 +71,73 @@ def render_admin_core():
         # Visual Health Bar
         st.progress(100, text="System Integrity Check: PASSED")
 
+    # QUERY CACHE (process-wide, table-versioned)
+    with st.expander("⚡ Query Cache"):
+        stats = cache_stats()
+        q1, q2, q3, q4 = st.columns(4)
+        q1.metric("Hit Rate", f"{stats['hit_rate']:.0%}", f"{stats['hits']:,} hits")
+        q2.metric("Misses", f"{stats['misses']:,}")
+        q3.metric("Entries", stats["entries"], f"{stats['evictions']:,} evicted", delta_color="off")
+        q4.metric("Invalidations", f"{stats['invalidations']:,}", f"{stats['tables_tracked']} tables", delta_color="off")
+        if st.button("Flush Query Cache"):
+            clear_cache()
+            st.toast("Query cache flushed.")
+
+    with st.expander("🧱 Schema Registry"):
+        report = schema_report()
+        if report:
+            st.dataframe(pd.DataFrame([{
+                "Database": os.path.basename(r["db"]),
+                "Bundles": ", ".join(r["bundles"]),
+                "Verified": r["verified_at"] or "Pending",
+                "Verify (ms)": round(r["verify_ms"] or 0.0, 2),
+                "Applied at Startup": ", ".join(r["applied_at_startup"]) or "—",
+                "Last Apply (ms)": round(sum(v or 0.0 for v in r["apply_ms"].values()), 1),
+                "DDL Passes Skipped": r["skipped_calls"],
+            } for r in report]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No schema bundles registered yet.")
+        if st.button("Re-apply All Schemas"):
+            for r in report:
+                ensure_schema(r["db"], force=True)
+            st.toast("Schema bundles re-applied.")
+
+    # SHARED REFERENCE DATA (one copy per process, copy-on-write per session)
+    with st.expander("🗂️ Reference Data"):
+        ref = reference_memory_report()
+        if ref["shared"]:
+            st.dataframe(pd.DataFrame([{
+                "Dataset": r["dataset"],
+                "Version": r["version"],
+                "Rows": r["rows"],
+                "Shared (KB)": round(r["bytes"] / 1024, 1),
+                "Loaded": r["loaded_at"],
+                "Load (ms)": round(r["load_ms"], 2),
+            } for r in ref["shared"]]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No reference datasets loaded yet.")
+        if ref["sessions"]:
+            st.caption("Per session: memory as private copies (before) vs. memory actually private (after)")
+            st.dataframe(pd.DataFrame([{
+                "Session": s["session"][:8],
+                "Views": s["views"],
+                "As Copies (KB)": round(s["copy_bytes"] / 1024, 1),
+                "Private (KB)": round(s["private_bytes"] / 1024, 1),
+            } for s in ref["sessions"]]), use_container_width=True, hide_index=True)
+        if st.button("Reload Reference Data"):
+            for r in ref["shared"]:
+                bump_reference(r["dataset"])
+            st.toast("Reference data will reload on next read.")
+
     st.divider()
 
     # --- 2. COMMAND TABS ---
-    tab_xray, tab_config, tab_danger = st.tabs(["🔍 Database X-Ray", "⚙️ System Constants", "☢️ Nuclear Option"])
+    tab_xray, tab_config, tab_perf, tab_index, tab_danger = st.tabs(
+        ["🔍 Database X-Ray", "⚙️ System Constants", "📈 Performance", "🧭 Index Advisor", "☢️ Nuclear Option"]
+    )
 
     # A. DATABASE X-RAY (Professional View)
-    with tab_xray:
+    with tab_xray, trace_section("Database X-Ray"):
         c_sel, c_view = st.columns([1, 3])
         with c_sel:
             st.markdown("##### 📂 Registry Select")
@@ -88,7 +158,7 @@ def render_admin_core():
                 st.info("System Empty. Initialize Kernel.")
 
     # B. GLOBAL CONFIG (Grid Editor)
-    with tab_config:
+    with tab_config, trace_section("System Constants"):
         st.markdown("##### ⚙️ Global Variables")
         st.caption("These constants drive the logic of the War Room and Financial Modules.")
         
@@ -126,8 +196,106 @@ def render_admin_core():
                 time.sleep(1)
                 st.rerun()
 
-    # C. HAZARD ZONE (Red Alert Style)
-    with tab_danger:
+    # C. PERFORMANCE (query trace + per-tab render cost)
+    with tab_perf, trace_section("Performance"):
+        st.markdown("##### 📈 Query Profile")
+        st.caption("Every traced DB wrapper this process has used: cortex pool, logistics engine, admin console, ORM engines.")
+        p1, p2, p3 = st.columns([1, 1, 2])
+        top_n = p1.number_input("Top N", 5, 200, 20, 5)
+        order = p2.selectbox("Rank By", ["total_ms", "p95_ms", "max_ms", "avg_ms", "calls", "rows"])
+        with p3:
+            st.download_button("⬇️ Export JSON", export_json(), file_name="veridian_query_trace.json", mime="application/json")
+            if st.button("Reset Trace"):
+                reset_trace()
+                st.rerun()
+
+        queries = top_queries(top_n, by=order)
+        if queries:
+            st.dataframe(pd.DataFrame([{
+                "Database": os.path.basename(q["db"]),
+                "Calls": q["calls"],
+                "Avg (ms)": round(q["avg_ms"], 2),
+                "p50 (ms)": q["p50_ms"],
+                "p95 (ms)": q["p95_ms"],
+                "Max (ms)": round(q["max_ms"], 1),
+                "Total (ms)": round(q["total_ms"], 1),
+                "Rows": q["rows"],
+                "Caller": next(iter(q["callers"]), "—"),
+                "SQL": " ".join(q["sql"].split()),
+            } for q in queries]), use_container_width=True, hide_index=True)
+
+            pick = st.selectbox("Latency Histogram", range(len(queries)),
+                                format_func=lambda i: " ".join(queries[i]["sql"].split())[:120])
+            labels = [f"≤{b:g}" if b != float("inf") else f">{BUCKETS_MS[-2]:g}" for b in BUCKETS_MS]
+            st.bar_chart(pd.DataFrame({"ms": labels, "executions": queries[pick]["histogram"]}).set_index("ms"))
+            st.caption("Callers: " + ", ".join(f"`{c}` ×{n}" for c, n in queries[pick]["callers"].items()))
+        else:
+            st.info("No traced queries yet.")
+
+        st.markdown("##### 🧱 Render Cost per Tab")
+        sections = section_costs()
+        if sections:
+            st.dataframe(pd.DataFrame([{
+                "Page": r["page"], "Tab": r["section"], "Renders": r["renders"],
+                "Avg (ms)": round(r["avg_ms"], 1), "Max (ms)": round(r["max_ms"], 1),
+                "DB (ms)": round(r["db_ms"] / r["renders"], 1), "Queries / Render": round(r["queries"] / r["renders"], 1),
+            } for r in sections]), use_container_width=True, hide_index=True)
+
+        reruns = rerun_history()
+        if reruns:
+            st.markdown("##### 🔁 Recent Reruns")
+            st.dataframe(pd.DataFrame([{
+                "Page": r["page"], "Started": r["started"], "Render (ms)": round(r["render_ms"], 1),
+                "DB (ms)": round(r["db_ms"], 1), "Queries": r["queries"],
+            } for r in reversed(reruns)]), use_container_width=True, hide_index=True)
+
+    # D. INDEX ADVISOR (EXPLAIN QUERY PLAN on traced slow statements)
+    with tab_index, trace_section("Index Advisor"):
+        st.markdown("##### 🧭 Index Advisor")
+        st.caption("Slow statements captured this session are re-planned with EXPLAIN QUERY PLAN; full scans get an index proposal.")
+        threshold = st.slider("Slow Query Threshold (ms)", 0.5, 100.0, SLOW_QUERY_MS, 0.5)
+
+        slow = slow_queries(threshold)
+        if slow:
+            st.dataframe(pd.DataFrame([{
+                "Database": os.path.basename(q["db"]),
+                "Calls": q["calls"],
+                "Total (ms)": round(q["total_ms"], 1),
+                "Max (ms)": round(q["max_ms"], 1),
+                "SQL": " ".join(q["sql"].split()),
+            } for q in slow]), use_container_width=True, hide_index=True)
+        else:
+            st.info("No statements above the threshold yet. Use the app, then come back.")
+
+        recs = advise(threshold)
+        st.markdown(f"##### 💡 Recommendations ({len(recs)})")
+        for i, rec in enumerate(recs):
+            with st.container(border=True):
+                r1, r2 = st.columns([4, 1])
+                r1.code(rec["ddl"], language="sql")
+                r1.caption(f"{os.path.basename(rec['db'])} • serves {rec['statements']} statement(s), "
+                           f"{rec['calls']:,} calls, {rec['total_ms']:,.0f} ms traced")
+                if r2.button("Create", key=f"idx_create_{i}"):
+                    try:
+                        create_index(rec["db"], rec["ddl"])
+                        st.toast(f"✅ {rec['table']} ({', '.join(rec['columns'])}) indexed.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Index Error: {e}")
+                with r1.expander("Query Plan"):
+                    st.code(rec["plan"])
+                    st.code(rec["example"], language="sql")
+
+        st.markdown("##### 📇 Index Inventory")
+        dbs = sorted({r["db"] for r in schema_report()} | {DB_PATH})
+        pick = st.selectbox("Database", dbs, format_func=os.path.basename)
+        try:
+            st.dataframe(index_inventory(pick), use_container_width=True, hide_index=True)
+        except Exception as e:
+            st.error(f"Inventory Error: {e}")
+
+    # E. HAZARD ZONE (Red Alert Style)
+    with tab_danger, trace_section("Nuclear Option"):
         st.error("⚠️ **AUTHORIZED PERSONNEL ONLY**")
         st.markdown("These actions are irreversible. They perform a hard delete on the selected registry.")
         
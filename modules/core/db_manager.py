@@ -1,5 +1,3 @@
-import sqlite3
-
 import pandas as pd
 
 import os
@@ -8,10 +6,20 @@ import datetime
 
 import json
 
+import re
+
 import numpy as np
 
 import time
 
+from modules.core.db_pool import get_pool
+
+from modules.core.query_cache import cached_read
+
+from modules.core.reference_data import bump_reference, reference_view
+
+from modules.core.schema_registry import ensure_schema, is_registered, register_schema
+
 
 
 # --- CONFIGURATION ---
@@ -24,6 +32,46 @@ DB_NAME = DB_PATH
 
 
 
+CORTEX_BUNDLE = "cortex.core"
+
+
+
+def _ensure_schema():
+
+    """Verifies the cortex schema once per process per DB file, on first use (never at import)."""
+
+    if not is_registered(DB_NAME, CORTEX_BUNDLE):
+
+        register_schema(DB_NAME, CORTEX_BUNDLE, apply=_create_base_schema, version=SCHEMA_VERSION)
+
+    ensure_schema(DB_NAME)
+
+
+
+def cortex_connection():
+
+    """Pooled, per-thread connection to the cortex DB (commit on exit, rollback on error)."""
+
+    _ensure_schema()
+
+    return get_pool(DB_NAME).connect()
+
+
+
+def _read_sql(sql, params=()):
+
+    with cortex_connection() as conn: return pd.read_sql_query(sql, conn, params=params)
+
+
+
+def read_cached(sql, params=()):
+
+    """SELECT through the query cache: served from memory until a table it reads is written."""
+
+    return cached_read(DB_NAME, sql, params, lambda: _read_sql(sql, params))
+
+
+
 # ==========================================
 
 # 1. SYSTEM INITIALIZATION & MIGRATION
@@ -32,205 +80,214 @@ DB_NAME = DB_PATH
 
 
 
-def _run_migrations(conn):
+def _run_migrations():
 
     """Auto-heals the database schema to support new features without deleting data."""
 
-    c = conn.cursor()
+    with cortex_connection() as conn:
+
+        c = conn.cursor()
 
     
 
-    # MIGRATION 1: Trade Deal Columns
+        # MIGRATION 1: Trade Deal Columns
 
-    try: c.execute("ALTER TABLE trade_deals ADD COLUMN stage TEXT")
+        try: c.execute("ALTER TABLE trade_deals ADD COLUMN stage TEXT")
 
-    except: pass
+        except: pass
 
-    try: c.execute("ALTER TABLE trade_deals ADD COLUMN probability REAL")
+        try: c.execute("ALTER TABLE trade_deals ADD COLUMN probability REAL")
 
-    except: pass
+        except: pass
 
-    try: c.execute("ALTER TABLE trade_deals ADD COLUMN volume REAL")
+        try: c.execute("ALTER TABLE trade_deals ADD COLUMN volume REAL")
 
-    except: pass
+        except: pass
 
-    try: c.execute("ALTER TABLE trade_deals ADD COLUMN deal_id TEXT")
+        try: c.execute("ALTER TABLE trade_deals ADD COLUMN deal_id TEXT")
 
-    except: pass
+        except: pass
 
 
 
-    # MIGRATION 2: Fleet Registry Telemetry
+        # MIGRATION 2: Fleet Registry Telemetry
 
-    try: c.execute("ALTER TABLE fleet_registry ADD COLUMN location TEXT")
+        try: c.execute("ALTER TABLE fleet_registry ADD COLUMN location TEXT")
 
-    except: pass
+        except: pass
 
-    try: c.execute("ALTER TABLE fleet_registry ADD COLUMN current_load REAL")
+        try: c.execute("ALTER TABLE fleet_registry ADD COLUMN current_load REAL")
 
-    except: pass
+        except: pass
 
     
 
-    # MIGRATION 3: HAZCHEM COMPLIANCE (The Fix)
+        # MIGRATION 3: HAZCHEM COMPLIANCE (The Fix)
 
-    try: c.execute("ALTER TABLE fleet_registry ADD COLUMN hazchem_compliant INTEGER DEFAULT 0")
+        try: c.execute("ALTER TABLE fleet_registry ADD COLUMN hazchem_compliant INTEGER DEFAULT 0")
 
-    except: pass
+        except: pass
 
     
 
-    conn.commit()
 
 
 
-def init_db():
+def _create_base_schema():
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
     
 
-    # SYSTEM CONFIG
+        # SYSTEM CONFIG
 
-    c.execute("CREATE TABLE IF NOT EXISTS system_config (key TEXT PRIMARY KEY, value TEXT)")
+        c.execute("CREATE TABLE IF NOT EXISTS system_config (key TEXT PRIMARY KEY, value TEXT)")
 
 
 
-    # WAR ROOM
+        # WAR ROOM
 
-    c.execute('''CREATE TABLE IF NOT EXISTS prospects (
+        c.execute('''CREATE TABLE IF NOT EXISTS prospects (
 
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
+            id INTEGER PRIMARY KEY AUTOINCREMENT, 
 
-        company_name TEXT, parent_company TEXT, contact_person TEXT, 
+            company_name TEXT, parent_company TEXT, contact_person TEXT, 
 
-        industry TEXT, region TEXT, status TEXT, estimated_value REAL, 
+            industry TEXT, region TEXT, status TEXT, estimated_value REAL, 
 
-        notes TEXT, focus_period TEXT)''')
+            notes TEXT, focus_period TEXT)''')
 
         
 
-    c.execute('''CREATE TABLE IF NOT EXISTS interaction_log (
+        c.execute('''CREATE TABLE IF NOT EXISTS interaction_log (
 
-        log_id INTEGER PRIMARY KEY AUTOINCREMENT, company_name TEXT,
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT, company_name TEXT,
 
-        interaction_type TEXT, date TEXT, outcome TEXT, next_step TEXT)''')
+            interaction_type TEXT, date TEXT, outcome TEXT, next_step TEXT)''')
 
 
 
-    # TRADE & FINANCE
+        # TRADE & FINANCE
 
-    c.execute('''CREATE TABLE IF NOT EXISTS trade_deals (
+        c.execute('''CREATE TABLE IF NOT EXISTS trade_deals (
 
-        deal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deal_id INTEGER PRIMARY KEY AUTOINCREMENT,
 
-        client_name TEXT, product TEXT, volume REAL, value REAL, 
+            client_name TEXT, product TEXT, volume REAL, value REAL, 
 
-        status TEXT, probability REAL, stage TEXT,
+            status TEXT, probability REAL, stage TEXT,
 
-        rfq_id TEXT, qty REAL, created_at TEXT)''') 
+            rfq_id TEXT, qty REAL, created_at TEXT)''') 
 
     
 
-    c.execute('''CREATE TABLE IF NOT EXISTS marketplace_bids (
+        c.execute('''CREATE TABLE IF NOT EXISTS marketplace_bids (
 
-        bid_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bid_id INTEGER PRIMARY KEY AUTOINCREMENT,
 
-        sku TEXT, supplier TEXT, price_per_ton REAL, 
+            sku TEXT, supplier TEXT, price_per_ton REAL, 
 
-        available_qty REAL, valid_until TEXT, status TEXT)''')
+            available_qty REAL, valid_until TEXT, status TEXT)''')
 
 
 
-    c.execute('''CREATE TABLE IF NOT EXISTS ledger_lines (
+        c.execute('''CREATE TABLE IF NOT EXISTS ledger_lines (
 
-        transaction_id TEXT, date TEXT, description TEXT, 
+            transaction_id TEXT, date TEXT, description TEXT, 
 
-        account_code TEXT, debit REAL, credit REAL, reference_id TEXT)''')
+            account_code TEXT, debit REAL, credit REAL, reference_id TEXT)''')
 
         
 
-    c.execute('''CREATE TABLE IF NOT EXISTS billing_docs (
+        c.execute('''CREATE TABLE IF NOT EXISTS billing_docs (
 
-        doc_id TEXT PRIMARY KEY, client_name TEXT, doc_type TEXT, 
+            doc_id TEXT PRIMARY KEY, client_name TEXT, doc_type TEXT, 
 
-        date TEXT, amount REAL, status TEXT, reference_deal TEXT)''')
+            date TEXT, amount REAL, status TEXT, reference_deal TEXT)''')
 
 
 
-    # LOGISTICS KERNEL (Unified)
+        # LOGISTICS KERNEL (Unified)
 
-    # Note: We ensure all columns are present in definition for fresh installs
+        # Note: We ensure all columns are present in definition for fresh installs
 
-    c.execute('''CREATE TABLE IF NOT EXISTS fleet_registry (
+        c.execute('''CREATE TABLE IF NOT EXISTS fleet_registry (
 
-        vehicle_id TEXT PRIMARY KEY, type TEXT, status TEXT, 
+            vehicle_id TEXT PRIMARY KEY, type TEXT, status TEXT, 
 
-        max_payload_kg REAL, cpk REAL, driver TEXT,
+            max_payload_kg REAL, cpk REAL, driver TEXT,
 
-        location TEXT, current_load REAL, hazchem_compliant INTEGER)''')
+            location TEXT, current_load REAL, hazchem_compliant INTEGER)''')
 
 
 
-    c.execute('''CREATE TABLE IF NOT EXISTS driver_registry (
+        c.execute('''CREATE TABLE IF NOT EXISTS driver_registry (
 
-        driver_id TEXT PRIMARY KEY, name TEXT, license_code TEXT, 
+            driver_id TEXT PRIMARY KEY, name TEXT, license_code TEXT, 
 
-        status TEXT, current_vehicle TEXT)''')
+            status TEXT, current_vehicle TEXT)''')
 
 
 
-    c.execute('''CREATE TABLE IF NOT EXISTS compliance_checks (
+        c.execute('''CREATE TABLE IF NOT EXISTS compliance_checks (
 
-        check_id TEXT PRIMARY KEY, vehicle_id TEXT, driver_id TEXT, 
+            check_id TEXT PRIMARY KEY, vehicle_id TEXT, driver_id TEXT, 
 
-        date TEXT, check_data TEXT, status TEXT)''')
+            date TEXT, check_data TEXT, status TEXT)''')
 
 
 
-    c.execute('''CREATE TABLE IF NOT EXISTS trip_manifests (
+        c.execute('''CREATE TABLE IF NOT EXISTS trip_manifests (
 
-        trip_id TEXT PRIMARY KEY, deal_ref TEXT, vehicle_id TEXT, 
+            trip_id TEXT PRIMARY KEY, deal_ref TEXT, vehicle_id TEXT, 
 
-        route TEXT, status TEXT, date_dispatched TEXT, cost_impact REAL)''')
+            route TEXT, status TEXT, date_dispatched TEXT, cost_impact REAL)''')
 
         
 
-    c.execute('''CREATE TABLE IF NOT EXISTS trip_events (
+        c.execute('''CREATE TABLE IF NOT EXISTS trip_events (
 
-        event_id TEXT PRIMARY KEY, trip_id TEXT, event_type TEXT, 
+            event_id TEXT PRIMARY KEY, trip_id TEXT, event_type TEXT, 
 
-        weight REAL, location TEXT, timestamp TEXT, photo_hash TEXT)''')
+            weight REAL, location TEXT, timestamp TEXT, photo_hash TEXT)''')
 
 
 
-    # PORTAL
+        # PORTAL
 
-    c.execute('''CREATE TABLE IF NOT EXISTS client_registry (
+        c.execute('''CREATE TABLE IF NOT EXISTS client_registry (
 
-        client_id TEXT PRIMARY KEY, company_name TEXT, reg_number TEXT, 
+            client_id TEXT PRIMARY KEY, company_name TEXT, reg_number TEXT, 
 
-        credit_limit REAL, credit_status TEXT, joined_date TEXT)''')
+            credit_limit REAL, credit_status TEXT, joined_date TEXT)''')
 
 
 
-    conn.commit()
+        # Run Safe Migrations (versioned: each step applies once per database)
 
-    
+        run_pending_migrations()
+
+
+
+def init_db(force=False):
 
-    # Run Safe Migrations
+    """
+
+    Creates the base schema and applies pending migrations. The DDL only runs when the
 
-    _run_migrations(conn)
+    schema hash stored in the DB is stale (or force=True); otherwise this is a set lookup.
 
-    conn.close()
+    """
 
+    if force:
 
+        register_schema(DB_NAME, CORTEX_BUNDLE, apply=_create_base_schema, version=SCHEMA_VERSION)
 
-# Initialize immediately
+        return ensure_schema(DB_NAME, force=True)
 
-init_db()
+    _ensure_schema()
 
 
 
@@ -244,104 +301,82 @@ init_db()
 
 def set_annual_target(year, target):
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
-    c.execute("INSERT OR REPLACE INTO system_config VALUES (?, ?)", (f"target_{year}", str(target)))
-
-    conn.commit()
-
-    conn.close()
+        c.execute("INSERT OR REPLACE INTO system_config VALUES (?, ?)", (f"target_{year}", str(target)))
 
 
 
 def get_annual_target(year):
 
-    conn = sqlite3.connect(DB_NAME)
-
     try:
 
-        df = pd.read_sql_query("SELECT value FROM system_config WHERE key = ?", conn, params=(f"target_{year}",))
+        with cortex_connection() as conn:
+
+            df = pd.read_sql_query("SELECT value FROM system_config WHERE key = ?", conn, params=(f"target_{year}",))
 
         return float(df.iloc[0]['value']) if not df.empty else 0.0
 
     except: return 0.0
 
-    finally: conn.close()
-
 
 
 def save_strategic_target(company, parent, contact, industry, region, value, notes):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT INTO prospects (company_name, parent_company, contact_person, industry, region, status, estimated_value, notes, focus_period) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        c = conn.cursor()
 
-              (company, parent, contact, industry, region, "New", value, notes, "None"))
+        c.execute("INSERT INTO prospects (company_name, parent_company, contact_person, industry, region, status, estimated_value, notes, focus_period) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
 
-    conn.commit()
-
-    conn.close()
+                  (company, parent, contact, industry, region, "New", value, notes, "None"))
 
 
 
 def log_interaction(company, i_type, outcome, next_step):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    date = datetime.datetime.now().strftime("%Y-%m-%d")
-
-    c.execute("INSERT INTO interaction_log (company_name, interaction_type, date, outcome, next_step) VALUES (?, ?, ?, ?, ?)",
+        c = conn.cursor()
 
-              (company, i_type, date, outcome, next_step))
+        date = datetime.datetime.now().strftime("%Y-%m-%d")
 
-    conn.commit()
+        c.execute("INSERT INTO interaction_log (company_name, interaction_type, date, outcome, next_step) VALUES (?, ?, ?, ?, ?)",
 
-    conn.close()
+                  (company, i_type, date, outcome, next_step))
 
 
 
 def update_target_focus(company, period):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("UPDATE prospects SET focus_period = ? WHERE company_name = ?", (period, company))
+        c = conn.cursor()
 
-    conn.commit()
-
-    conn.close()
+        c.execute("UPDATE prospects SET focus_period = ? WHERE company_name = ?", (period, company))
 
 
 
 def load_prospects_to_dataframe():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM prospects", conn)
+        return read_cached("SELECT * FROM prospects")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def load_interaction_history(company_name):
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM interaction_log WHERE company_name = ?", conn, params=(company_name,))
+        return read_cached("SELECT * FROM interaction_log WHERE company_name = ?", (company_name,))
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 # ==========================================
@@ -354,11 +389,9 @@ def load_interaction_history(company_name):
 
 def load_fleet_to_dataframe():
 
-    conn = sqlite3.connect(DB_NAME)
-
     try: 
 
-        df = pd.read_sql_query("SELECT * FROM fleet_registry", conn)
+        df = read_cached("SELECT * FROM fleet_registry")
 
         
 
@@ -394,23 +427,17 @@ def load_fleet_to_dataframe():
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def register_vehicle_db(veh_id, v_type, payload, cpk, driver):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT OR REPLACE INTO fleet_registry (vehicle_id, type, status, max_payload_kg, cpk, driver, location, current_load, hazchem_compliant) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        c = conn.cursor()
 
-              (veh_id, v_type, "Idle", payload, cpk, driver, "Depot", 0.0, 0))
+        c.execute("INSERT OR REPLACE INTO fleet_registry (vehicle_id, type, status, max_payload_kg, cpk, driver, location, current_load, hazchem_compliant) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
 
-    conn.commit()
-
-    conn.close()
+                  (veh_id, v_type, "Idle", payload, cpk, driver, "Depot", 0.0, 0))
 
 
 
@@ -418,17 +445,13 @@ def save_fleet_vehicle(veh_id, v_type, driver, max_tons):
 
     """Persistence for TTE Models."""
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
-
-    c.execute("INSERT OR REPLACE INTO fleet_registry (vehicle_id, type, driver, max_payload_kg, cpk, status, location, current_load, hazchem_compliant) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    with cortex_connection() as conn:
 
-              (veh_id, v_type, driver, max_tons * 1000, 15.0, "Idle", "Depot", 0.0, 0))
+        c = conn.cursor()
 
-    conn.commit()
+        c.execute("INSERT OR REPLACE INTO fleet_registry (vehicle_id, type, driver, max_payload_kg, cpk, status, location, current_load, hazchem_compliant) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
 
-    conn.close()
+                  (veh_id, v_type, driver, max_tons * 1000, 15.0, "Idle", "Depot", 0.0, 0))
 
 
 
@@ -436,108 +459,99 @@ def update_fleet_state(veh_id, status, location, current_load):
 
     """Telemetry Update."""
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
-    c.execute("UPDATE fleet_registry SET status=?, location=?, current_load=? WHERE vehicle_id=?", 
+        c.execute("UPDATE fleet_registry SET status=?, location=?, current_load=? WHERE vehicle_id=?", 
 
-              (status, location, current_load, veh_id))
-
-    conn.commit()
-
-    conn.close()
+                  (status, location, current_load, veh_id))
 
 
 
 def create_trip(trip_data):
 
-    conn = sqlite3.connect(DB_NAME)
+    from modules.logistics.constants import UNKNOWN_TRIP_KM
+    from modules.logistics.road_network import lane_km
 
-    c = conn.cursor()
 
-    c.execute("SELECT cpk FROM fleet_registry WHERE vehicle_id = ?", (trip_data['vehicle_id'],))
 
-    res = c.fetchone()
+    with cortex_connection() as conn:
 
-    real_cpk = res[0] if res else 12.50
+        c = conn.cursor()
 
-    dist = 600.0
+        c.execute("SELECT cpk FROM fleet_registry WHERE vehicle_id = ?", (trip_data['vehicle_id'],))
 
-    cost = dist * real_cpk
+        res = c.fetchone()
 
-    date = datetime.datetime.now().strftime("%Y-%m-%d")
+        real_cpk = res[0] if res else 12.50
 
-    
+        dist = lane_km(trip_data['route'], default=UNKNOWN_TRIP_KM)  # road km along the route's hubs
 
-    c.execute("INSERT INTO trip_manifests VALUES (?, ?, ?, ?, ?, ?, ?)",
+        cost = dist * real_cpk
 
-              (trip_data['trip_id'], trip_data['deal_ref'], trip_data['vehicle_id'], 
+        now = datetime.datetime.now()
 
-               trip_data['route'], trip_data['status'], date, cost))
+        date, dispatched_at = now.strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d %H:%M:%S")
 
     
 
-    c.execute("UPDATE fleet_registry SET status = 'Active' WHERE vehicle_id = ?", (trip_data['vehicle_id'],))
+        c.execute("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, route, status, date_dispatched, cost_impact, dispatched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+
+                  (trip_data['trip_id'], trip_data['deal_ref'], trip_data['vehicle_id'], 
+
+                   trip_data['route'], trip_data['status'], date, cost, dispatched_at))
 
     
 
-    jrn = f"JRN-OPS-{trip_data['trip_id']}"
+        c.execute("UPDATE fleet_registry SET status = 'Active' WHERE vehicle_id = ?", (trip_data['vehicle_id'],))
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)", 
+    
 
-              (jrn, date, f"Trip: {trip_data['vehicle_id']}", "5100-LOGISTICS", cost, 0, trip_data['trip_id']))
+        jrn = f"JRN-OPS-{trip_data['trip_id']}"
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)", 
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)", 
 
-              (jrn, date, "Accrual", "2000-AP", 0, cost, trip_data['trip_id']))
+                  (jrn, date, f"Trip: {trip_data['vehicle_id']}", "5100-LOGISTICS", cost, 0, trip_data['trip_id']))
 
-    conn.commit()
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)", 
 
-    conn.close()
+                  (jrn, date, "Accrual", "2000-AP", 0, cost, trip_data['trip_id']))
 
 
 
 def load_trips_to_dataframe():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM trip_manifests", conn)
+        return read_cached("SELECT * FROM trip_manifests")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 # --- DRIVERS ---
 
 def register_driver(d_id, name, license):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
-
-    c.execute("INSERT OR REPLACE INTO driver_registry VALUES (?, ?, ?, ?, ?)",
+    with cortex_connection() as conn:
 
-              (d_id, name, license, "Off Duty", "None"))
+        c = conn.cursor()
 
-    conn.commit()
+        c.execute("INSERT OR REPLACE INTO driver_registry VALUES (?, ?, ?, ?, ?)",
 
-    conn.close()
+                  (d_id, name, license, "Off Duty", "None"))
 
 
 
 def get_active_drivers():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM driver_registry", conn)
+        return read_cached("SELECT * FROM driver_registry")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def submit_checklist(vehicle_id, driver_id, checks_json):
@@ -546,19 +560,15 @@ def submit_checklist(vehicle_id, driver_id, checks_json):
 
     date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
-    c.execute("INSERT INTO compliance_checks VALUES (?, ?, ?, ?, ?, ?)",
+        c.execute("INSERT INTO compliance_checks VALUES (?, ?, ?, ?, ?, ?)",
 
-              (c_id, vehicle_id, driver_id, date, json.dumps(checks_json), "PASSED"))
+                  (c_id, vehicle_id, driver_id, date, json.dumps(checks_json), "PASSED"))
 
-    c.execute("UPDATE driver_registry SET status='On Duty', current_vehicle=? WHERE driver_id=?", (vehicle_id, driver_id))
-
-    conn.commit()
-
-    conn.close()
+        c.execute("UPDATE driver_registry SET status='On Duty', current_vehicle=? WHERE driver_id=?", (vehicle_id, driver_id))
 
     return c_id
 
@@ -570,17 +580,13 @@ def log_trip_event(trip_id, event_type, weight, location, photo_sim):
 
     ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT INTO trip_events VALUES (?, ?, ?, ?, ?, ?, ?)",
+        c = conn.cursor()
 
-              (e_id, trip_id, event_type, weight, location, ts, "photo.jpg"))
+        c.execute("INSERT INTO trip_events VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-    conn.commit()
-
-    conn.close()
+                  (e_id, trip_id, event_type, weight, location, ts, "photo.jpg"))
 
 
 
@@ -598,29 +604,25 @@ def create_billing_doc(client, doc_type, amount, ref_deal):
 
     date = datetime.datetime.now().strftime("%Y-%m-%d")
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT INTO billing_docs VALUES (?, ?, ?, ?, ?, ?, ?)",
+        c = conn.cursor()
 
-              (doc_id, client, doc_type, date, amount, "ISSUED", ref_deal))
+        c.execute("INSERT INTO billing_docs VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-    if doc_type == "INVOICE":
+                  (doc_id, client, doc_type, date, amount, "ISSUED", ref_deal))
 
-        jrn_id = f"JRN-REV-{doc_id}"
+        if doc_type == "INVOICE":
 
-        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
-
-                  (jrn_id, date, f"Invoice: {client}", "1200-AR", amount, 0, doc_id))
+            jrn_id = f"JRN-REV-{doc_id}"
 
-        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
+            c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-                  (jrn_id, date, f"Revenue: {client}", "4000-SALES", 0, amount, doc_id))
+                      (jrn_id, date, f"Invoice: {client}", "1200-AR", amount, 0, doc_id))
 
-    conn.commit()
+            c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-    conn.close()
+                      (jrn_id, date, f"Revenue: {client}", "4000-SALES", 0, amount, doc_id))
 
     return doc_id
 
@@ -628,67 +630,61 @@ def create_billing_doc(client, doc_type, amount, ref_deal):
 
 def get_billing_docs():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM billing_docs", conn)
+        return read_cached("SELECT * FROM billing_docs")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def save_journal_entry(entry_id, date, reference, description, enriched_lines, source_module):
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
-    for line in enriched_lines:
+        for line in enriched_lines:
 
-        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
+            c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-                  (entry_id, date, description, str(line['code']), line['debit'], line['credit'], reference))
+                      (entry_id, date, description, str(line['code']), line['debit'], line['credit'], reference))
 
-    conn.commit()
 
-    conn.close()
 
+def save_journal_entries(entries):
 
+    """Bulk writer: persists every line of every entry in one transaction."""
 
-def get_ledger_stream():
+    rows = [(e['entry_id'], e['date'], e['description'], str(l['code']), l['debit'], l['credit'], e['reference'])
 
-    conn = sqlite3.connect(DB_NAME)
+            for e in entries for l in e['lines']]
 
-    try: return pd.read_sql_query("SELECT * FROM ledger_lines ORDER BY date DESC", conn)
+    with cortex_connection() as conn:
 
-    except: return pd.DataFrame()
+        conn.executemany("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
 
-    finally: conn.close()
+    return len(rows)
 
 
 
-def get_financial_health():
-
-    conn = sqlite3.connect(DB_NAME)
+def get_ledger_stream():
 
     try:
 
-        df = pd.read_sql_query("SELECT * FROM ledger_lines", conn)
+        return read_cached("SELECT * FROM ledger_lines ORDER BY date DESC")
 
-        if df.empty: return {"revenue": 0, "ar": 0, "cash": 0, "expense": 0}
+    except: return pd.DataFrame()
 
-        rev = df[df['account_code'].str.startswith('4')]['credit'].sum()
 
-        exp = df[df['account_code'].str.startswith('5')]['debit'].sum()
 
-        ar = df[df['account_code'].str.startswith('12')]['debit'].sum() - df[df['account_code'].str.startswith('12')]['credit'].sum()
+def get_financial_health():
 
-        return {"revenue": rev, "ar": ar, "cash": rev - exp, "expense": exp}
+    """Revenue, AR, cash and expense as scalars, aggregated in SQL (see ledger_kpis)."""
 
-    except: return {"revenue": 0, "ar": 0, "cash": 0, "expense": 0}
+    k = ledger_kpis(HEALTH_KPIS)
 
-    finally: conn.close()
+    return {"revenue": k["revenue"], "ar": k["ar"], "cash": k["revenue"] - k["expense"], "expense": k["expense"]}
 
 
 
@@ -698,15 +694,9 @@ def init_chart_of_accounts():
 
 
 
-def get_trial_balance_sql():
-
-    conn = sqlite3.connect(DB_NAME)
-
-    try: return pd.read_sql_query("SELECT account_code, SUM(debit) as d, SUM(credit) as c FROM ledger_lines GROUP BY account_code", conn)
-
-    except: return pd.DataFrame()
+def get_trial_balance_sql(period=None):
 
-    finally: conn.close()
+    return get_account_balances(period)
 
 
 
@@ -720,74 +710,60 @@ def get_trial_balance_sql():
 
 def save_trade_deal(client, product, volume, value, status, stage):
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
-    prob_map = {"Lead": 0.1, "Negotiation": 0.5, "Firm Offer": 0.8, "Signed": 1.0}
+        prob_map = {"Lead": 0.1, "Negotiation": 0.5, "Firm Offer": 0.8, "Signed": 1.0}
 
-    prob = prob_map.get(stage, 0.0)
+        prob = prob_map.get(stage, 0.0)
 
-    c.execute("INSERT INTO trade_deals (client_name, product, volume, value, status, probability, stage) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        c.execute("INSERT INTO trade_deals (client_name, product, volume, value, status, probability, stage) VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-              (client, product, volume, value, status, prob, stage))
-
-    conn.commit()
-
-    conn.close()
+                  (client, product, volume, value, status, prob, stage))
 
 
 
 def log_supplier_bid(sku, supplier, price, qty, valid_until):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT INTO marketplace_bids (sku, supplier, price_per_ton, available_qty, valid_until, status) VALUES (?, ?, ?, ?, ?, 'Active')",
+        c = conn.cursor()
 
-              (sku, supplier, price, qty, valid_until))
+        c.execute("INSERT INTO marketplace_bids (sku, supplier, price_per_ton, available_qty, valid_until, status) VALUES (?, ?, ?, ?, ?, 'Active')",
 
-    conn.commit()
-
-    conn.close()
+                  (sku, supplier, price, qty, valid_until))
 
 
 
 def load_trades_to_dataframe():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM trade_deals", conn)
+        return read_cached("SELECT * FROM trade_deals")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def load_bids_to_dataframe():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM marketplace_bids WHERE status='Active'", conn)
+        return read_cached("SELECT * FROM marketplace_bids WHERE status='Active'")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def load_all_bids_matrix():
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT bid_id, sku as product, supplier as supplier_name, price_per_ton as bid_amount, status FROM marketplace_bids WHERE status='Active'", conn)
+        return read_cached("SELECT bid_id, sku as product, supplier as supplier_name, price_per_ton as bid_amount, status FROM marketplace_bids WHERE status='Active'")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
-
 
 
 def load_bids_for_rfq(rfq_id):
@@ -816,41 +792,33 @@ def get_sku_details(sku_name):
 
 def execute_deal_award(rfq_id):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
+    with cortex_connection() as conn:
 
-    try: c.execute("UPDATE trade_deals SET status='Logistics', stage='Signed', probability=1.0 WHERE deal_id=?", (rfq_id,))
+        c = conn.cursor()
 
-    except: pass
+        try: c.execute("UPDATE trade_deals SET status='Logistics', stage='Signed', probability=1.0 WHERE deal_id=?", (rfq_id,))
 
-    conn.commit()
-
-    conn.close()
+        except: pass
 
 
 
 def post_finance_entry(reference, description, amount):
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
-
-    date = datetime.datetime.now().strftime("%Y-%m-%d")
+    with cortex_connection() as conn:
 
-    jrn_id = f"JRN-AUTO-{int(time.time())}"
+        c = conn.cursor()
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
+        date = datetime.datetime.now().strftime("%Y-%m-%d")
 
-              (jrn_id, date, description, "1200-AR", amount, 0, reference))
+        jrn_id = f"JRN-AUTO-{int(time.time())}"
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-              (jrn_id, date, description, "4000-SALES", 0, amount, reference))
+                  (jrn_id, date, description, "1200-AR", amount, 0, reference))
 
-    conn.commit()
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, ?, ?, ?, ?)",
 
-    conn.close()
+                  (jrn_id, date, description, "4000-SALES", 0, amount, reference))
 
 
 
@@ -862,9 +830,12 @@ def mint_industrial_asset(rfq_id, client, product):
 
 def get_logistics_rate(weight_kg, destination):
 
-    dist_map = {"Durban (DBN)": 580, "Cape Town (CPT)": 1400}
+    from modules.logistics.constants import UNKNOWN_LANE_KM
+    from modules.logistics.road_network import DEFAULT_ORIGIN, road_km
+
 
-    dist = dist_map.get(destination, 500)
+
+    dist = road_km(DEFAULT_ORIGIN, destination, default=UNKNOWN_LANE_KM)
 
     base_rate = 22.50 
 
@@ -888,503 +859,483 @@ def get_pending_orders():
 
     """Fetches orders ready for dispatch from Trade."""
 
-    conn = sqlite3.connect(DB_NAME)
+    try:
 
-    try: return pd.read_sql_query("SELECT * FROM trade_deals WHERE status IN ('Open', 'Logistics', 'Firm Offer') AND stage != 'Dispatched'", conn)
+        return read_cached("SELECT * FROM trade_deals WHERE status IN ('Open', 'Logistics', 'Firm Offer') AND stage != 'Dispatched'")
 
     except: return pd.DataFrame()
 
-    finally: conn.close()
 
 
+def _add_trade_deal_destination():
 
-def batch_dispatch_orders(order_ids, trip_id, vehicle_id):
+    """Drop location per deal (hub or region name) for milk-run routing."""
 
-    """Bundles multiple orders into a single Trip Manifest."""
+    with cortex_connection() as conn:
 
-    conn = sqlite3.connect(DB_NAME)
+        try: conn.execute("ALTER TABLE trade_deals ADD COLUMN destination TEXT")
 
-    c = conn.cursor()
-
-    date = datetime.datetime.now().strftime("%Y-%m-%d")
-
-    deal_refs = ",".join(str(x) for x in order_ids)
-
-    
+        except: pass
 
-    # Estimate cost
 
-    c.execute("SELECT cpk FROM fleet_registry WHERE vehicle_id = ?", (vehicle_id,))
 
-    res = c.fetchone()
+def _milk_run_orders(conn, order_ids):
 
-    cpk = res[0] if res else 15.00
+    """Pending deals in order_ids as [order_id, load_kg, location] (destination, else the client's prospect region)."""
 
-    est_cost = 500.0 * cpk 
+    df = get_pending_orders()
 
-    
+    if df.empty:
 
-    c.execute("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, route, status, date_dispatched, cost_impact) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        return pd.DataFrame(columns=["order_id", "load_kg", "location"])
 
-              (trip_id, deal_refs, vehicle_id, "Milk Run", "In Transit", date, est_cost))
+    ids = df["deal_id"] if "deal_id" in df.columns else pd.Series(None, index=df.index)
 
-    
+    if "rfq_id" in df.columns:
 
-    # Update Trade Status
+        ids = ids.where(ids.notna(), df["rfq_id"])
 
-    for oid in order_ids:
+    df["order_id"] = ids.astype(str)
 
-        try: c.execute("UPDATE trade_deals SET status='Dispatched', stage='Dispatched' WHERE deal_id=?", (oid,))
+    df = df[df["order_id"].isin({str(x) for x in order_ids})].copy()
 
-        except: pass
 
-        try: c.execute("UPDATE trade_deals SET status='Dispatched', stage='Dispatched' WHERE rfq_id=?", (oid,))
 
-        except: pass
+    tons = pd.Series(0.0, index=df.index)
 
-        
+    for col in ("qty", "volume"):
 
-    conn.commit()
+        if col in df.columns:
 
-    conn.close()
+            tons = pd.to_numeric(df[col], errors="coerce").where(lambda t: t > 0, tons).fillna(0.0)
 
+    df["load_kg"] = tons * 1000
 
 
-# ==========================================
 
-# 7. LEGACY SUPPORT & ALIASES
+    regions = dict(conn.execute("SELECT company_name, region FROM prospects WHERE region IS NOT NULL").fetchall())
 
-# ==========================================
+    dest = df["destination"] if "destination" in df.columns else pd.Series(None, index=df.index)
 
+    df["location"] = dest.where(dest.notna() & (dest != ""), df.get("client_name", pd.Series(None, index=df.index)).map(regions))
 
+    return df[["order_id", "load_kg", "location"]]
 
-def load_ledger_to_dataframe(): return get_ledger_stream()
 
 
+def batch_dispatch_orders(order_ids, trip_id, vehicle_id=None, time_budget_s=0.5):
 
-def load_technical_skus():
+    """
 
-    catalog = [{"sku_id": "Thermal Coal", "hazchem_mandatory": 0}, {"sku_id": "Diesel", "hazchem_mandatory": 1}]
+    Routes orders into sequenced multi-drop trips (savings + 2-opt, capacity-aware)
 
-    return pd.DataFrame(catalog)
+    and writes every Trip Manifest in one transaction.
 
+    vehicle_id pins the run to one truck; None uses every idle truck in fleet_registry.
 
+    Trips are numbered trip_id-1, trip_id-2, ... when more than one truck is needed.
 
-def register_new_client(name, reg, req_credit):
+    Returns the plan: {"trips": [...], "unrouted": {order_id: reason}, "ms": float}.
 
-    status = "APPROVED" if req_credit <= 1000000 else "PENDING"
+    """
 
-    c_id = f"CLT-{name[:3]}-{pd.Timestamp.now().strftime('%d%H')}"
+    from modules.logistics.route_builder import build_milk_runs, DEFAULT_CPK
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
 
-    c.execute("INSERT OR REPLACE INTO client_registry VALUES (?, ?, ?, ?, ?, ?)", (c_id, name, reg, req_credit if status=="APPROVED" else 0, status, "2025-01-01"))
 
-    conn.commit(); conn.close()
+    with cortex_connection() as conn:
 
-    return status, c_id
+        c = conn.cursor()
 
+        now = datetime.datetime.now()
 
+        date, dispatched_at = now.strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d %H:%M:%S")
 
-def get_client_list():
+        orders = _milk_run_orders(conn, order_ids)
 
-    conn = sqlite3.connect(DB_NAME)
 
-    try: return pd.read_sql_query("SELECT * FROM client_registry", conn)
 
-    except: return pd.DataFrame()
+        if vehicle_id:
 
-    finally: conn.close()
+            fleet = pd.read_sql_query("SELECT vehicle_id, max_payload_kg AS capacity_kg, cpk FROM fleet_registry WHERE vehicle_id = ?", conn, params=(vehicle_id,))
 
+            if fleet.empty:
 
+                fleet = pd.DataFrame([{"vehicle_id": vehicle_id, "capacity_kg": orders["load_kg"].sum(), "cpk": DEFAULT_CPK}])
 
-def submit_portal_inquiry(client_name, product, qty, route, price):
+        else:
 
-    rfq_id = f"WEB-{pd.Timestamp.now().strftime('%H%M%S')}"
+            fleet = pd.read_sql_query("SELECT vehicle_id, max_payload_kg AS capacity_kg, cpk FROM fleet_registry WHERE COALESCE(status, 'Idle') IN ('Idle', 'Available')", conn)
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
 
-    c.execute("INSERT INTO trade_deals (rfq_id, client_name, status, product, qty, value) VALUES (?, ?, ?, ?, ?, ?)", (rfq_id, client_name, "WON", product, qty, price))
 
-    create_billing_doc(client_name, "PRO-FORMA", price, rfq_id)
+        plan = build_milk_runs(orders, fleet, time_budget_s=time_budget_s)
 
-    conn.commit(); conn.close()
+        trips = plan["trips"]
 
-    return rfq_id
+        for k, trip in enumerate(trips, start=1):
 
+            trip["trip_id"] = trip_id if len(trips) == 1 else f"{trip_id}-{k}"
 
 
-def get_live_fleet_positions():
 
-    conn = sqlite3.connect(DB_NAME)
+        c.executemany("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, route, status, date_dispatched, cost_impact, dispatched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
 
-    try: df = pd.read_sql_query("SELECT * FROM fleet_registry", conn)
+                      [(t["trip_id"], ",".join(t["stops"]), t["vehicle_id"], f"{t['route']} ({t['distance_km']:,.0f} km)", "In Transit", date, t["cost"], dispatched_at) for t in trips])
 
-    except: return pd.DataFrame()
+        c.executemany("UPDATE fleet_registry SET status='Active', current_load=? WHERE vehicle_id=?",
 
-    finally: conn.close()
+                      [(t["load_kg"], t["vehicle_id"]) for t in trips])
 
-    if not df.empty:
 
-        hubs = [{"lat": -26.2041, "lon": 28.0473}, {"lat": -29.8587, "lon": 31.0218}, {"lat": -33.9249, "lon": 18.4241}]
 
-        df['lat'] = df.index.map(lambda x: hubs[x % len(hubs)]['lat'])
+        # Update Trade Status (routed orders only)
 
-        df['lon'] = df.index.map(lambda x: hubs[x % len(hubs)]['lon'])
+        routed = [(oid,) for t in trips for oid in t["stops"]]
 
-    return df
+        try: c.executemany("UPDATE trade_deals SET status='Dispatched', stage='Dispatched' WHERE deal_id=?", routed)
 
+        except: pass
 
+        try: c.executemany("UPDATE trade_deals SET status='Dispatched', stage='Dispatched' WHERE rfq_id=?", routed)
 
-def generate_sensor_data(id):
+        except: pass
 
-    return pd.DataFrame([{"Time": "10:00", "Fuel_Level": 500}])
+    return plan
 
 
 
 # ==========================================
 
-# 8. MANDLA PROTOCOL: SITE COMPLIANCE (RESTORATION)
+# 7. LEGACY SUPPORT & ALIASES
 
 # ==========================================
 
 
 
-def _patch_gap_closure_schema():
-
-    """Adds columns for Mandla's specific pain points if they are missing."""
-
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
-
-    # 1. TIME: Track site delays
-
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN arrival_time TEXT")
+def load_ledger_to_dataframe(): return get_ledger_stream()
 
-    except: pass
 
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN departure_time TEXT")
 
-    except: pass
+TECHNICAL_SKUS = [{"sku_id": "Thermal Coal", "hazchem_mandatory": 0}, {"sku_id": "Diesel", "hazchem_mandatory": 1}]
 
-    # 2. PROOF: Digital Signature Name
 
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN pod_signatory TEXT")
 
-    except: pass
+def load_technical_skus():
 
-    # 3. SAFETY: Route Quality
+    # Shared process-wide; callers get a copy-on-write view
 
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN route_safety_score INTEGER")
+    return reference_view("sku_catalog")
 
-    except: pass
 
-    conn.commit()
 
-    conn.close()
+def register_new_client(name, reg, req_credit):
 
+    status = "APPROVED" if req_credit <= 1000000 else "PENDING"
 
+    c_id = f"CLT-{name[:3]}-{pd.Timestamp.now().strftime('%d%H')}"
 
-# Run patch immediately
+    with cortex_connection() as conn:
 
-_patch_gap_closure_schema()
+        c = conn.cursor()
 
+        c.execute("INSERT OR REPLACE INTO client_registry VALUES (?, ?, ?, ?, ?, ?)", (c_id, name, reg, req_credit if status=="APPROVED" else 0, status, "2025-01-01"))
 
+    bump_reference("client_registry")
 
-def log_site_event(trip_id, event_type):
+    return status, c_id
 
-    """Logs precise timestamps for Demurrage (Waiting Time) calculations."""
 
-    conn = sqlite3.connect(DB_NAME)
 
-    c = conn.cursor()
+def get_client_list():
 
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return reference_view("client_registry")
 
-    col = "arrival_time" if event_type == "ARRIVAL" else "departure_time"
 
-    c.execute(f"UPDATE trip_manifests SET {col} = ? WHERE trip_id = ?", (timestamp, trip_id))
 
-    conn.commit()
+def submit_portal_inquiry(client_name, product, qty, route, price):
 
-    conn.close()
+    rfq_id = f"WEB-{pd.Timestamp.now().strftime('%H%M%S')}"
 
-    return timestamp
+    with cortex_connection() as conn:
 
+        c = conn.cursor()
 
+        c.execute("INSERT INTO trade_deals (rfq_id, client_name, status, product, qty, value) VALUES (?, ?, ?, ?, ?, ?)", (rfq_id, client_name, "WON", product, qty, price))
 
-def complete_pod(trip_id, signatory_name):
+        create_billing_doc(client_name, "PRO-FORMA", price, rfq_id)
 
-    """Closes the loop: No Signature = No Pay."""
+    return rfq_id
 
-    conn = sqlite3.connect(DB_NAME)
 
-    c = conn.cursor()
 
-    c.execute("UPDATE trip_manifests SET status='DELIVERED', pod_signatory=? WHERE trip_id=?", 
+def get_live_fleet_positions():
 
-              (signatory_name, trip_id))
+    try:
 
-    conn.commit()
+        df = read_cached("SELECT * FROM fleet_registry")
 
-    conn.close()
+    except: return pd.DataFrame()
 
+    if not df.empty:
 
+        hubs = [{"lat": -26.2041, "lon": 28.0473}, {"lat": -29.8587, "lon": 31.0218}, {"lat": -33.9249, "lon": 18.4241}]
 
-    # ==========================================
+        df['lat'] = df.index.map(lambda x: hubs[x % len(hubs)]['lat'])
 
-# 9. INDUSTRIAL & SOURCING LOGIC (CORE)
+        df['lon'] = df.index.map(lambda x: hubs[x % len(hubs)]['lon'])
 
-# ==========================================
+    return df
 
 
 
-def _run_industrial_migrations():
+def generate_sensor_data(id):
 
-    """Adds tables for Industrial Sourcing and Subcontractors."""
+    return pd.DataFrame([{"Time": "10:00", "Fuel_Level": 500}])
 
-    conn = sqlite3.connect(DB_NAME)
 
-    c = conn.cursor()
 
-    
+# ==========================================
 
-    # 1. Industrial Sources (Mines/Factories)
+# 8. MANDLA PROTOCOL: SITE COMPLIANCE (RESTORATION)
 
-    c.execute('''CREATE TABLE IF NOT EXISTS industrial_sources (
+# ==========================================
 
-        source_id INTEGER PRIMARY KEY AUTOINCREMENT, 
 
-        name TEXT, type TEXT, location TEXT, product TEXT, 
 
-        contract_status TEXT, capacity_per_month REAL)''')
+def _patch_gap_closure_schema():
 
+    """Adds columns for Mandla's specific pain points if they are missing."""
 
+    with cortex_connection() as conn:
 
-    # 2. Virtual Stockpiles (Inventory at Origin)
+        c = conn.cursor()
 
-    c.execute('''CREATE TABLE IF NOT EXISTS virtual_stockpiles (
+        # 1. TIME: Track site delays
 
-        stock_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        try: c.execute("ALTER TABLE trip_manifests ADD COLUMN arrival_time TEXT")
 
-        source_ref TEXT, product TEXT, tonnage_on_floor REAL, 
+        except: pass
 
-        value_per_ton REAL, last_audit TEXT)''')
+        try: c.execute("ALTER TABLE trip_manifests ADD COLUMN departure_time TEXT")
 
+        except: pass
 
+        # 2. PROOF: Digital Signature Name
 
-    # 3. Subcontractor Registry (The 'Subbie' Fleet)
+        try: c.execute("ALTER TABLE trip_manifests ADD COLUMN pod_signatory TEXT")
 
-    c.execute('''CREATE TABLE IF NOT EXISTS subcontractor_registry (
+        except: pass
 
-        sub_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        # 3. SAFETY: Route Quality
 
-        company_name TEXT, fleet_size INTEGER, rate_per_ton REAL, 
+        try: c.execute("ALTER TABLE trip_manifests ADD COLUMN route_safety_score INTEGER")
 
-        status TEXT, payment_terms TEXT)''')
+        except: pass
 
 
 
-    # 4. Add Subbie Reference to Manifests
+def log_site_event(trip_id, event_type):
 
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN subcontractor_ref TEXT")
+    """Logs precise timestamps for Demurrage (Waiting Time) calculations."""
 
-    except: pass
+    with cortex_connection() as conn:
 
+        c = conn.cursor()
 
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    conn.commit()
+        col = "arrival_time" if event_type == "ARRIVAL" else "departure_time"
 
-    conn.close()
+        c.execute(f"UPDATE trip_manifests SET {col} = ? WHERE trip_id = ?", (timestamp, trip_id))
 
+    return timestamp
 
 
-# Run industrial migration
 
-_run_industrial_migrations()
+def complete_pod(trip_id, signatory_name):
 
+    """Closes the loop: No Signature = No Pay."""
 
+    with cortex_connection() as conn:
 
-def save_industrial_source(name, type_, loc, prod, cap):
+        c = conn.cursor()
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
+        c.execute("UPDATE trip_manifests SET status='DELIVERED', pod_signatory=? WHERE trip_id=?", 
 
-    c.execute("INSERT INTO industrial_sources (name, type, location, product, contract_status, capacity_per_month) VALUES (?, ?, ?, ?, 'Active', ?)",
+                  (signatory_name, trip_id))
 
-              (name, type_, loc, prod, cap))
 
-    c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, 0, 0, ?)",
 
-              (name, prod, datetime.datetime.now().strftime("%Y-%m-%d")))
+    # ==========================================
 
-    conn.commit(); conn.close()
+# 9. INDUSTRIAL & SOURCING LOGIC (CORE)
 
+# ==========================================
 
 
-def load_industrial_data():
 
-    conn = sqlite3.connect(DB_NAME)
+def _run_industrial_migrations():
 
-    src = pd.read_sql_query("SELECT * FROM industrial_sources", conn)
+    """Adds tables for Industrial Sourcing and Subcontractors."""
 
-    stk = pd.read_sql_query("SELECT * FROM virtual_stockpiles", conn)
+    with cortex_connection() as conn:
 
-    sub = pd.read_sql_query("SELECT * FROM subcontractor_registry", conn)
+        c = conn.cursor()
 
-    conn.close()
+    
 
-    return src, stk, sub
+        # 1. Industrial Sources (Mines/Factories)
 
+        c.execute('''CREATE TABLE IF NOT EXISTS industrial_sources (
 
+            source_id INTEGER PRIMARY KEY AUTOINCREMENT, 
 
-def execute_back_to_back(deal_id, sub_name, tonnage, sub_rate, client_rate):
+            name TEXT, type TEXT, location TEXT, product TEXT, 
 
-    """Generates AR (Income) and AP (Expense) simultaneously."""
+            contract_status TEXT, capacity_per_month REAL)''')
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
 
-    trip_id = f"SUB-{int(time.time())}"
 
-    date = datetime.datetime.now().strftime("%Y-%m-%d")
+        # 2. Virtual Stockpiles (Inventory at Origin)
 
-    revenue = tonnage * client_rate
+        c.execute('''CREATE TABLE IF NOT EXISTS virtual_stockpiles (
 
-    cost = tonnage * sub_rate
+            stock_id INTEGER PRIMARY KEY AUTOINCREMENT,
 
-    
+            source_ref TEXT, product TEXT, tonnage_on_floor REAL, 
 
-    # 1. Log Trip
+            value_per_ton REAL, last_audit TEXT)''')
 
-    c.execute("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, status, subcontractor_ref) VALUES (?, ?, 'EXTERNAL', 'In Transit', ?)",
 
-              (trip_id, deal_id, sub_name))
 
-    
+        # 3. Subcontractor Registry (The 'Subbie' Fleet)
 
-    # 2. Post AR (Revenue)
+        c.execute('''CREATE TABLE IF NOT EXISTS subcontractor_registry (
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '1200-AR', ?, 0, ?)", (f"JRN-AR-{trip_id}", date, f"Client Rev: {deal_id}", revenue, deal_id))
+            sub_id INTEGER PRIMARY KEY AUTOINCREMENT,
 
-    # 3. Post AP (Cost)
+            company_name TEXT, fleet_size INTEGER, rate_per_ton REAL, 
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '5100-LOGISTICS', ?, 0, ?)", (f"JRN-AP-{trip_id}", date, f"Subbie Cost: {sub_name}", cost, deal_id))
+            status TEXT, payment_terms TEXT)''')
 
-    
 
-    conn.commit(); conn.close()
 
-    return trip_id
+        # 4. Add Subbie Reference to Manifests
 
+        try: c.execute("ALTER TABLE trip_manifests ADD COLUMN subcontractor_ref TEXT")
 
+        except: pass
 
-# ==========================================
 
-# 9. INDUSTRIAL & SOURCING LOGIC (RESTORED)
 
-# ==========================================
+def save_industrial_source(name, type_, loc, prod, cap):
 
+    with cortex_connection() as conn:
 
+        c = conn.cursor()
 
-def _run_industrial_migrations():
+        c.execute("INSERT INTO industrial_sources (name, type, location, product, contract_status, capacity_per_month) VALUES (?, ?, ?, ?, 'Active', ?)",
 
-    """Adds tables for Industrial Sourcing and Subcontractors."""
+                  (name, type_, loc, prod, cap))
 
-    conn = sqlite3.connect(DB_NAME)
+        c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, 0, 0, ?)",
 
-    c = conn.cursor()
+                  (name, prod, datetime.datetime.now().strftime("%Y-%m-%d")))
 
-    
 
-    # 1. Industrial Sources
 
-    c.execute('''CREATE TABLE IF NOT EXISTS industrial_sources (
+def load_industrial_data():
 
-        source_id INTEGER PRIMARY KEY AUTOINCREMENT, 
+    with cortex_connection() as conn:
 
-        name TEXT, type TEXT, location TEXT, product TEXT, 
+        src = pd.read_sql_query("SELECT * FROM industrial_sources", conn)
 
-        contract_status TEXT, capacity_per_month REAL)''')
+        stk = pd.read_sql_query("SELECT * FROM virtual_stockpiles", conn)
 
+        sub = pd.read_sql_query("SELECT * FROM subcontractor_registry", conn)
 
+    return src, stk, sub
 
-    # 2. Virtual Stockpiles
 
-    c.execute('''CREATE TABLE IF NOT EXISTS virtual_stockpiles (
 
-        stock_id INTEGER PRIMARY KEY AUTOINCREMENT,
+def execute_back_to_back(deal_id, sub_name, tonnage, sub_rate, client_rate):
 
-        source_ref TEXT, product TEXT, tonnage_on_floor REAL, 
+    """Generates AR (Income) and AP (Expense) simultaneously."""
 
-        value_per_ton REAL, last_audit TEXT)''')
+    with cortex_connection() as conn:
 
+        c = conn.cursor()
 
+        trip_id = f"SUB-{int(time.time())}"
 
-    # 3. Subcontractor Registry
+        date = datetime.datetime.now().strftime("%Y-%m-%d")
 
-    c.execute('''CREATE TABLE IF NOT EXISTS subcontractor_registry (
+        revenue = tonnage * client_rate
 
-        sub_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cost = tonnage * sub_rate
 
-        company_name TEXT, fleet_size INTEGER, rate_per_ton REAL, 
+    
 
-        status TEXT, payment_terms TEXT)''')
+        # 1. Log Trip
 
+        c.execute("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, status, subcontractor_ref) VALUES (?, ?, 'EXTERNAL', 'In Transit', ?)",
 
+                  (trip_id, deal_id, sub_name))
 
-    # 4. Manifest Update
+    
 
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN subcontractor_ref TEXT")
+        # 2. Post AR (Revenue)
 
-    except: pass
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '1200-AR', ?, 0, ?)", (f"JRN-AR-{trip_id}", date, f"Client Rev: {deal_id}", revenue, deal_id))
 
+        # 3. Post AP (Cost)
 
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '5100-LOGISTICS', ?, 0, ?)", (f"JRN-AP-{trip_id}", date, f"Subbie Cost: {sub_name}", cost, deal_id))
 
-    conn.commit()
+    return trip_id
 
-    conn.close()
 
 
+# ==========================================
 
-# Run immediately
+# 9. INDUSTRIAL & SOURCING LOGIC (RESTORED)
 
-_run_industrial_migrations()
+# ==========================================
 
 
 
 def save_industrial_source(name, type_, loc, prod, cap):
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT INTO industrial_sources (name, type, location, product, contract_status, capacity_per_month) VALUES (?, ?, ?, ?, 'Active', ?)",
+        c = conn.cursor()
 
-              (name, type_, loc, prod, cap))
+        c.execute("INSERT INTO industrial_sources (name, type, location, product, contract_status, capacity_per_month) VALUES (?, ?, ?, ?, 'Active', ?)",
 
-    c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, 0, 0, ?)",
+                  (name, type_, loc, prod, cap))
 
-              (name, prod, datetime.datetime.now().strftime("%Y-%m-%d")))
+        c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, 0, 0, ?)",
 
-    conn.commit(); conn.close()
+                  (name, prod, datetime.datetime.now().strftime("%Y-%m-%d")))
 
 
 
 def load_industrial_data():
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    try:
+        try:
 
-        src = pd.read_sql_query("SELECT * FROM industrial_sources", conn)
-
-        stk = pd.read_sql_query("SELECT * FROM virtual_stockpiles", conn)
+            src = pd.read_sql_query("SELECT * FROM industrial_sources", conn)
 
-        sub = pd.read_sql_query("SELECT * FROM subcontractor_registry", conn)
+            stk = pd.read_sql_query("SELECT * FROM virtual_stockpiles", conn)
 
-    except: 
+            sub = pd.read_sql_query("SELECT * FROM subcontractor_registry", conn)
 
-        src, stk, sub = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        except: 
 
-    conn.close()
+            src, stk, sub = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
     return src, stk, sub
 
@@ -1392,43 +1343,41 @@ def load_industrial_data():
 
 def save_subcontractor(name, size, rate):
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
+    with cortex_connection() as conn:
 
-    c.execute("INSERT INTO subcontractor_registry (company_name, fleet_size, rate_per_ton, status, payment_terms) VALUES (?, ?, ?, 'Vetted', '30 Days')",
+        c = conn.cursor()
 
-              (name, size, rate))
+        c.execute("INSERT INTO subcontractor_registry (company_name, fleet_size, rate_per_ton, status, payment_terms) VALUES (?, ?, ?, 'Vetted', '30 Days')",
 
-    conn.commit(); conn.close()
+                  (name, size, rate))
 
 
 
 def execute_back_to_back(deal_id, sub_name, tonnage, sub_rate, client_rate):
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
-
-    trip_id = f"SUB-{int(time.time())}"
-
-    date = datetime.datetime.now().strftime("%Y-%m-%d")
+    with cortex_connection() as conn:
 
-    revenue = tonnage * client_rate
+        c = conn.cursor()
 
-    cost = tonnage * sub_rate
+        trip_id = f"SUB-{int(time.time())}"
 
-    
+        date = datetime.datetime.now().strftime("%Y-%m-%d")
 
-    c.execute("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, status, subcontractor_ref) VALUES (?, ?, 'EXTERNAL', 'In Transit', ?)",
+        revenue = tonnage * client_rate
 
-              (trip_id, deal_id, sub_name))
+        cost = tonnage * sub_rate
 
     
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '1200-AR', ?, 0, ?)", (f"JRN-AR-{trip_id}", date, f"Client Rev: {deal_id}", revenue, deal_id))
+        c.execute("INSERT INTO trip_manifests (trip_id, deal_ref, vehicle_id, status, subcontractor_ref) VALUES (?, ?, 'EXTERNAL', 'In Transit', ?)",
 
-    c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '5100-LOGISTICS', ?, 0, ?)", (f"JRN-AP-{trip_id}", date, f"Subbie Cost: {sub_name}", cost, deal_id))
+                  (trip_id, deal_id, sub_name))
 
     
 
-    conn.commit(); conn.close()
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '1200-AR', ?, 0, ?)", (f"JRN-AR-{trip_id}", date, f"Client Rev: {deal_id}", revenue, deal_id))
+
+        c.execute("INSERT INTO ledger_lines VALUES (?, ?, ?, '5100-LOGISTICS', ?, 0, ?)", (f"JRN-AP-{trip_id}", date, f"Subbie Cost: {sub_name}", cost, deal_id))
 
     return trip_id
 
@@ -1442,99 +1391,91 @@ def execute_back_to_back(deal_id, sub_name, tonnage, sub_rate, client_rate):
 
 def inject_industrial_muscle():
 
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
+    with cortex_connection() as conn:
+
+        c = conn.cursor()
 
     
 
-    # 1. THE PRINCIPALS (Your Targets)
+        # 1. THE PRINCIPALS (Your Targets)
 
-    principals = [
+        principals = [
 
-        ("PPC Cement Hercules", "Factory", "Pretoria West", "Cement (CEM II)", 45000),
+            ("PPC Cement Hercules", "Factory", "Pretoria West", "Cement (CEM II)", 45000),
 
-        ("NPC Cimpor", "Factory", "Durban / Siyaya", "Cement (Surebuild)", 30000),
+            ("NPC Cimpor", "Factory", "Durban / Siyaya", "Cement (Surebuild)", 30000),
 
-        ("Sturrock & Robson", "Warehouse", "East Rand", "Industrial Components", 5000),
+            ("Sturrock & Robson", "Warehouse", "East Rand", "Industrial Components", 5000),
 
-        ("Durban Paints", "Factory", "Mobeni KZN", "Paints & Solvents", 12000),
+            ("Durban Paints", "Factory", "Mobeni KZN", "Paints & Solvents", 12000),
 
-        ("Khwezela Colliery", "Mine", "Emalahleni", "Thermal Coal (RB1)", 60000)
+            ("Khwezela Colliery", "Mine", "Emalahleni", "Thermal Coal (RB1)", 60000)
 
-    ]
+        ]
 
     
 
-    # 2. THE VIRTUAL STOCKPILES (Inventory Sovereignty)
+        # 2. THE VIRTUAL STOCKPILES (Inventory Sovereignty)
 
-    # We simulate stock sitting on their floor that YOU control.
+        # We simulate stock sitting on their floor that YOU control.
 
-    stockpiles = [
+        stockpiles = [
 
-        ("PPC Cement Hercules", "Cement (CEM II)", 1500, 1250.00), # 1,500 tons owned
+            ("PPC Cement Hercules", "Cement (CEM II)", 1500, 1250.00), # 1,500 tons owned
 
-        ("Khwezela Colliery", "Thermal Coal (RB1)", 34000, 950.00), # 34k tons (1 ship)
+            ("Khwezela Colliery", "Thermal Coal (RB1)", 34000, 950.00), # 34k tons (1 ship)
 
-        ("Sturrock & Robson", "Industrial Components", 200, 45000.00) # High value
+            ("Sturrock & Robson", "Industrial Components", 200, 45000.00) # High value
 
-    ]
+        ]
 
     
 
-    # 3. THE SUB-CONTRACTOR FLEET (Elastic Capacity)
+        # 3. THE SUB-CONTRACTOR FLEET (Elastic Capacity)
 
-    subbies = [
+        subbies = [
 
-        ("Makhado Logistics", 15, 650.00),   # Coal Link
+            ("Makhado Logistics", 15, 650.00),   # Coal Link
 
-        ("Super Group Sub-Div", 40, 1800.00), # Flat decks
+            ("Super Group Sub-Div", 40, 1800.00), # Flat decks
 
-        ("Unitrans (Spot)", 12, 850.00),      # Tautliners
+            ("Unitrans (Spot)", 12, 850.00),      # Tautliners
 
-        ("Local PDI Transporters", 8, 600.00) # Community trucks
+            ("Local PDI Transporters", 8, 600.00) # Community trucks
 
-    ]
+        ]
 
 
 
-    # EXECUTE INJECTION
+        # EXECUTE INJECTION
 
-    print("--- INJECTING INDUSTRIAL MUSCLE ---")
+        print("--- INJECTING INDUSTRIAL MUSCLE ---")
 
     
 
-    for p in principals:
+        for p in principals:
 
-        c.execute("INSERT OR IGNORE INTO industrial_sources (name, type, location, product, contract_status, capacity_per_month) VALUES (?, ?, ?, ?, 'Target', ?)", p)
+            c.execute("INSERT INTO industrial_sources (name, type, location, product, contract_status, capacity_per_month) SELECT ?, ?, ?, ?, 'Target', ? WHERE NOT EXISTS (SELECT 1 FROM industrial_sources WHERE name=?)", p + (p[0],))
 
     
 
-    for s in stockpiles:
+        for s in stockpiles:
 
-        # Check if stockpile exists first
+            # Check if stockpile exists first
 
-        c.execute("SELECT count(*) FROM virtual_stockpiles WHERE source_ref=?", (s[0],))
+            c.execute("SELECT count(*) FROM virtual_stockpiles WHERE source_ref=?", (s[0],))
 
-        if c.fetchone()[0] == 0:
+            if c.fetchone()[0] == 0:
 
-            c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, ?, ?, '2025-01-01')", 
+                c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, ?, ?, '2025-01-01')", 
 
-                      (s[0], s[1], s[2], s[3]))
+                          (s[0], s[1], s[2], s[3]))
 
             
 
-    for sub in subbies:
-
-        c.execute("INSERT OR IGNORE INTO subcontractor_registry (company_name, fleet_size, rate_per_ton, status, payment_terms) VALUES (?, ?, ?, 'Vetted', '30 Days')", sub)
-
-        
-
-    conn.commit(); conn.close()
+        for sub in subbies:
 
-
-
-# UNCOMMENT TO RUN ONCE, THEN RE-COMMENT
-
-inject_industrial_muscle()
+            c.execute("INSERT INTO subcontractor_registry (company_name, fleet_size, rate_per_ton, status, payment_terms) SELECT ?, ?, ?, 'Vetted', '30 Days' WHERE NOT EXISTS (SELECT 1 FROM subcontractor_registry WHERE company_name=?)", sub + (sub[0],))
 
 
 
@@ -1556,31 +1497,25 @@ def log_site_event(trip_id, event_type):
 
     """
 
-    conn = sqlite3.connect(DB_NAME)
+    with cortex_connection() as conn:
 
-    c = conn.cursor()
+        c = conn.cursor()
 
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    col = "arrival_time" if event_type == "ARRIVAL" else "departure_time"
+        col = "arrival_time" if event_type == "ARRIVAL" else "departure_time"
 
     
 
-    # Safety check to ensure column exists
+        # Safety check to ensure column exists
 
-    try:
-
-        c.execute(f"UPDATE trip_manifests SET {col} = ? WHERE trip_id = ?", (timestamp, trip_id))
+        try:
 
-        conn.commit()
+            c.execute(f"UPDATE trip_manifests SET {col} = ? WHERE trip_id = ?", (timestamp, trip_id))
 
-    except Exception as e:
+        except Exception as e:
 
-        print(f"Schema Warning: {e}")
-
-        
-
-    conn.close()
+            print(f"Schema Warning: {e}")
 
     return timestamp
 
@@ -1596,91 +1531,54 @@ def complete_pod(trip_id, signatory_name):
 
     """
 
-    conn = sqlite3.connect(DB_NAME)
-
-    c = conn.cursor()
-
-    c.execute("UPDATE trip_manifests SET status='DELIVERED', pod_signatory=? WHERE trip_id=?", 
+    with cortex_connection() as conn:
 
-              (signatory_name, trip_id))
+        c = conn.cursor()
 
-    conn.commit()
+        c.execute("UPDATE trip_manifests SET status='DELIVERED', pod_signatory=? WHERE trip_id=?", 
 
-    conn.close()
+                  (signatory_name, trip_id))
 
 
 
-# Ensure the Schema supports these functions
-
-def _patch_logistics_schema():
-
-    conn = sqlite3.connect(DB_NAME); c = conn.cursor()
-
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN arrival_time TEXT")
-
-    except: pass
-
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN departure_time TEXT")
-
-    except: pass
-
-    try: c.execute("ALTER TABLE trip_manifests ADD COLUMN pod_signatory TEXT")
-
-    except: pass
-
-    conn.commit(); conn.close()
-
-
-
-_patch_logistics_schema()
-
 # ==========================================
 # SURGICAL PATCH: VIRTUAL STOCKPILES ACTIVATION
 # ==========================================
 
 def _patch_stockpile_schema():
     """Ensures the Stockpile Ledger exists without breaking existing tables."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
-    # 1. Create Table if missing
-    c.execute('''CREATE TABLE IF NOT EXISTS virtual_stockpiles (
-        stock_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        source_ref TEXT, product TEXT, tonnage_on_floor REAL, 
-        value_per_ton REAL, last_audit TEXT)''')
-    
-    # 2. Check if we need to seed data (Only if empty)
-    try:
-        c.execute("SELECT count(*) FROM virtual_stockpiles")
-        if c.fetchone()[0] == 0:
-            print(">>> SEEDING VIRTUAL STOCKPILES...")
-            # Inject Strategic Stockpiles (The Muscle)
-            stocks = [
-                ("PPC Cement Hercules", "Cement (CEM II)", 1500, 1250.00),
-                ("Khwezela Colliery", "Thermal Coal (RB1)", 34000, 950.00),
-                ("Sturrock & Robson", "Industrial Components", 200, 45000.00)
-            ]
-            for s in stocks:
-                c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, ?, ?, ?)",
-                          (s[0], s[1], s[2], s[3], datetime.datetime.now().strftime("%Y-%m-%d")))
-            conn.commit()
-    except: pass
-    
-    conn.commit()
-    conn.close()
-
-# Run Patch Immediately
-_patch_stockpile_schema()
+    with cortex_connection() as conn:
+        c = conn.cursor()
+        
+        # 1. Create Table if missing
+        c.execute('''CREATE TABLE IF NOT EXISTS virtual_stockpiles (
+            stock_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_ref TEXT, product TEXT, tonnage_on_floor REAL, 
+            value_per_ton REAL, last_audit TEXT)''')
+        
+        # 2. Check if we need to seed data (Only if empty)
+        try:
+            c.execute("SELECT count(*) FROM virtual_stockpiles")
+            if c.fetchone()[0] == 0:
+                print(">>> SEEDING VIRTUAL STOCKPILES...")
+                # Inject Strategic Stockpiles (The Muscle)
+                stocks = [
+                    ("PPC Cement Hercules", "Cement (CEM II)", 1500, 1250.00),
+                    ("Khwezela Colliery", "Thermal Coal (RB1)", 34000, 950.00),
+                    ("Sturrock & Robson", "Industrial Components", 200, 45000.00)
+                ]
+                for s in stocks:
+                    c.execute("INSERT INTO virtual_stockpiles (source_ref, product, tonnage_on_floor, value_per_ton, last_audit) VALUES (?, ?, ?, ?, ?)",
+                              (s[0], s[1], s[2], s[3], datetime.datetime.now().strftime("%Y-%m-%d")))
+        except: pass
 
 def update_stockpile(source, tons, value):
     """Allows the Industrial Dashboard to update inventory levels."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    # Update logic
-    c.execute("UPDATE virtual_stockpiles SET tonnage_on_floor=?, value_per_ton=? WHERE source_ref=?", 
-              (tons, value, source))
-    conn.commit()
-    conn.close()
+    with cortex_connection() as conn:
+        c = conn.cursor()
+        # Update logic
+        c.execute("UPDATE virtual_stockpiles SET tonnage_on_floor=?, value_per_ton=? WHERE source_ref=?", 
+                  (tons, value, source))
 
 def load_industrial_data():
     """
@@ -1688,12 +1586,451 @@ def load_industrial_data():
     """
     print(f"🔎 APP CONNECTING TO: {DB_PATH}") # Check your terminal for this line!
     
-    conn = sqlite3.connect(DB_NAME)
-    
     # We run these naked to force any error to appear on screen
-    src = pd.read_sql_query("SELECT * FROM industrial_sources", conn)
-    stk = pd.read_sql_query("SELECT * FROM virtual_stockpiles", conn)
-    sub = pd.read_sql_query("SELECT * FROM subcontractor_registry", conn)
+    src = read_cached("SELECT * FROM industrial_sources")
+    stk = read_cached("SELECT * FROM virtual_stockpiles")
+    sub = read_cached("SELECT * FROM subcontractor_registry")
     
-    conn.close()
     return src, stk, sub
+
+# ==========================================
+# 12. MATERIALISED TRIAL BALANCE (ACCOUNT BALANCES)
+# ==========================================
+# One row per (month, account) with running debit / credit totals. Triggers
+# on ledger_lines keep it current inside whichever transaction writes the
+# line, so every writer (journals, trip settlement, fusion deals) is covered
+# without touching their INSERTs. Reports read O(accounts) rows from here.
+
+_LINE_PERIOD = "substr(COALESCE({r}.date, ''), 1, 7)"
+_LINE_ACCOUNT = "COALESCE({r}.account_code, '')"
+
+_BALANCE_REBUILD_SQL = f"""
+    SELECT {_LINE_PERIOD.format(r='l')} AS period, {_LINE_ACCOUNT.format(r='l')} AS account_code,
+           SUM(COALESCE(l.debit, 0)) AS debit, SUM(COALESCE(l.credit, 0)) AS credit, COUNT(*) AS line_count
+    FROM ledger_lines l
+    GROUP BY 1, 2"""
+
+def _balance_upsert(r, sign):
+    return f"""INSERT INTO account_balances (period, account_code, debit, credit, line_count)
+            VALUES ({_LINE_PERIOD.format(r=r)}, {_LINE_ACCOUNT.format(r=r)},
+                    {sign}COALESCE({r}.debit, 0), {sign}COALESCE({r}.credit, 0), {sign}1)
+            ON CONFLICT (period, account_code) DO UPDATE SET
+                debit = debit + excluded.debit,
+                credit = credit + excluded.credit,
+                line_count = line_count + excluded.line_count;"""
+
+def _create_account_balances():
+    """Creates account_balances + its ledger_lines triggers and backfills it."""
+    with cortex_connection() as conn:
+        c = conn.cursor()
+        c.execute('''CREATE TABLE IF NOT EXISTS account_balances (
+            period TEXT NOT NULL, account_code TEXT NOT NULL,
+            debit REAL NOT NULL DEFAULT 0, credit REAL NOT NULL DEFAULT 0,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, account_code))''')
+        c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_ledger_lines_ai AFTER INSERT ON ledger_lines
+            BEGIN {_balance_upsert('NEW', '')} END""")
+        c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_ledger_lines_ad AFTER DELETE ON ledger_lines
+            BEGIN {_balance_upsert('OLD', '-')} END""")
+        c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_ledger_lines_au AFTER UPDATE ON ledger_lines
+            BEGIN {_balance_upsert('OLD', '-')} {_balance_upsert('NEW', '')} END""")
+        c.execute("DELETE FROM account_balances")
+        c.execute(f"INSERT INTO account_balances (period, account_code, debit, credit, line_count) {_BALANCE_REBUILD_SQL}")
+
+def _period_where(period=None, since=None):
+    """WHERE clause + params for a run of account_balances months (both ends inclusive)."""
+    conds, params = [], []
+    if since:
+        conds.append("period >= ?")
+        params.append(since)
+    if period:
+        conds.append("period <= ?")
+        params.append(period)
+    return (" WHERE " + " AND ".join(conds) if conds else ""), tuple(params)
+
+def get_account_balances(period=None, since=None):
+    """
+    Per-account totals from the materialised table.
+    period='YYYY-MM' gives the balance as at the end of that month;
+    since='YYYY-MM' drops the months before it (since=period: that month's movement).
+    Returns: DataFrame [account_code, d, c] (same shape as get_trial_balance_sql).
+    """
+    where, params = _period_where(period, since)
+    query = "SELECT account_code, SUM(debit) as d, SUM(credit) as c FROM account_balances" + where
+    try:
+        return read_cached(query + " GROUP BY account_code HAVING SUM(line_count) > 0", params)
+    except: return pd.DataFrame()
+
+def verify_account_balances(repair=False, tolerance=0.005):
+    """
+    Consistency checker: rebuilds the balances from ledger_lines and diffs
+    them against the stored table. repair=True rewrites the table from the
+    rebuild (one transaction). Returns the mismatching (period, account) rows.
+    """
+    with cortex_connection() as conn:
+        stored = pd.read_sql_query("SELECT * FROM account_balances", conn)
+        actual = pd.read_sql_query(_BALANCE_REBUILD_SQL, conn)
+        diff = stored.merge(actual, on=['period', 'account_code'], how='outer', suffixes=('_stored', '_actual'))
+        diff = diff.fillna({col: 0 for col in diff.columns if col.endswith(('_stored', '_actual'))})
+        bad = (
+            ((diff['debit_stored'] - diff['debit_actual']).abs() > tolerance)
+            | ((diff['credit_stored'] - diff['credit_actual']).abs() > tolerance)
+            | (diff['line_count_stored'] != diff['line_count_actual'])
+        )
+        mismatches = diff[bad].reset_index(drop=True)
+        if repair and not mismatches.empty:
+            conn.execute("DELETE FROM account_balances")
+            conn.execute(f"INSERT INTO account_balances (period, account_code, debit, credit, line_count) {_BALANCE_REBUILD_SQL}")
+    return mismatches
+
+# ==========================================
+# 13. STANDARD INDEX SET
+# ==========================================
+# Hot lookup columns of the operational tables. Created by migration 8;
+# columns missing on an older / drifted database are skipped. Primary keys
+# (trade_deals.deal_id, trip_manifests.trip_id, ...) are indexed already.
+# New entries need a new migration step that re-runs _create_standard_indexes.
+
+CORTEX_INDEXES = [
+    ("idx_ledger_lines_account_date", "ledger_lines", ("account_code", "date")),
+    ("idx_ledger_lines_date", "ledger_lines", ("date",)),
+    ("idx_ledger_lines_txn", "ledger_lines", ("transaction_id",)),
+    ("idx_trade_deals_rfq", "trade_deals", ("rfq_id",)),
+    ("idx_trade_deals_status", "trade_deals", ("status", "stage")),
+    ("idx_interaction_log_company", "interaction_log", ("company_name",)),
+    ("idx_prospects_company", "prospects", ("company_name",)),
+    ("idx_trip_manifests_vehicle", "trip_manifests", ("vehicle_id",)),
+]
+
+def _create_standard_indexes():
+    """CREATE INDEX IF NOT EXISTS for every CORTEX_INDEXES entry whose columns exist."""
+    with cortex_connection() as conn:
+        for name, table, cols in CORTEX_INDEXES:
+            have = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if have and set(cols) <= have:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(cols)})")
+        conn.execute("ANALYZE")
+
+def _add_trip_geofence_columns():
+    """Which fence a trip's arrival_time came from, so the matching exit sets departure_time."""
+    with cortex_connection() as conn:
+        try: conn.execute("ALTER TABLE trip_manifests ADD COLUMN arrival_fence TEXT")
+        except: pass
+
+def _add_trip_dispatch_time():
+    """Full dispatch timestamp: date_dispatched is a date, too coarse to order GPS events against."""
+    with cortex_connection() as conn:
+        try: conn.execute("ALTER TABLE trip_manifests ADD COLUMN dispatched_at TEXT")
+        except: pass
+
+# ==========================================
+# 14. VERSIONED SCHEMA MIGRATIONS
+# ==========================================
+# Nothing in this module touches the database at import time. init_db()
+# creates the base tables and then applies every step below whose version
+# is newer than system_config['schema_version']. Each step runs once per
+# database. Append new steps with the next number; never renumber or edit
+# a step that has shipped.
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+MIGRATIONS = [
+    (1, "Trade deal + fleet registry telemetry columns", _run_migrations),
+    (2, "Site compliance columns on trip_manifests", _patch_gap_closure_schema),
+    (3, "Industrial sourcing + subcontractor tables", _run_industrial_migrations),
+    (4, "Virtual stockpile seed", _patch_stockpile_schema),
+    (5, "Industrial principals + subcontractor seed", inject_industrial_muscle),
+    (6, "Materialised account_balances + ledger_lines triggers", _create_account_balances),
+    (7, "Drop location on trade_deals (milk-run routing)", _add_trade_deal_destination),
+    (8, "Standard index set on hot lookup columns", _create_standard_indexes),
+    (9, "Geofence arrival fence on trip_manifests", _add_trip_geofence_columns),
+    (10, "Dispatch timestamp on trip_manifests", _add_trip_dispatch_time),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """Highest migration version recorded in system_config (0 = never migrated)."""
+    with cortex_connection() as conn:
+        row = conn.execute("SELECT value FROM system_config WHERE key = ?", (SCHEMA_VERSION_KEY,)).fetchone()
+    return int(row[0]) if row else 0
+
+def run_pending_migrations():
+    """
+    Applies outstanding migrations in order, inside one transaction.
+    Returns the list of (version, name) applied — empty when already current.
+    """
+    applied = []
+    with cortex_connection() as conn:
+        current = get_schema_version()
+        for version, name, step in MIGRATIONS:
+            if version <= current:
+                continue
+            step()
+            stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            conn.execute("INSERT OR REPLACE INTO system_config (key, value) VALUES (?, ?)",
+                         (f"migration_{version:03d}", f"{name} @ {stamp}"))
+            conn.execute("INSERT OR REPLACE INTO system_config (key, value) VALUES (?, ?)",
+                         (SCHEMA_VERSION_KEY, str(version)))
+            applied.append((version, name))
+    return applied
+
+# ==========================================
+# 15. LEDGER KPI ENGINE (SQL PUSH-DOWN)
+# ==========================================
+# KPIs are declared as name -> (condition on account_code, amount) and
+# evaluated as one conditional-SUM statement over account_balances, so a
+# dashboard gets scalars back instead of a ledger to mask in pandas. Codes
+# are classified by prefix ('4' revenue, '5' direct cost, '12' debtors).
+
+HEALTH_KPIS = {
+    "revenue": ("account_code LIKE '4%'", "credit"),
+    "expense": ("account_code LIKE '5%'", "debit"),
+    "ar": ("account_code LIKE '12%'", "debit - credit"),
+}
+
+# Revenue streams for the finance split; amounts are credit - debit (income positive, costs negative)
+REVENUE_STREAM_KPIS = {
+    "logistics_revenue": ("account_code LIKE '4%' AND account_code != '4500'", "credit - debit"),
+    "trade_revenue": ("account_code = '4500'", "credit - debit"),
+    "logistics_costs": ("account_code LIKE '5%'", "credit - debit"),
+    "shared_overheads": ("account_code LIKE '6%'", "credit - debit"),
+}
+
+def ledger_kpis(kpis=HEALTH_KPIS, period=None, since=None):
+    """
+    Evaluates kpis in one query against account_balances.
+    period='YYYY-MM' gives the figures as at the end of that month;
+    since='YYYY-MM' drops the months before it (since=period: that month only).
+    Returns: {name: float}, zeros when the ledger is empty or unreadable.
+    """
+    select = ", ".join(f"COALESCE(SUM(CASE WHEN {cond} THEN {amount} END), 0) AS {name}"
+                       for name, (cond, amount) in kpis.items())
+    where, params = _period_where(period, since)
+    query = f"SELECT {select} FROM account_balances" + where
+    try:
+        row = read_cached(query, params).iloc[0]
+        return {name: float(row[name]) for name in kpis}
+    except: return {name: 0.0 for name in kpis}
+
+# ==========================================
+# 16. LEDGER PAGING + STREAMING EXPORT
+# ==========================================
+# Keyset pagination over ledger_lines on (date, rowid): every page is one
+# seek on idx_ledger_lines_date plus LIMIT rows, however deep it is, so a
+# viewer only ever holds one page. Exports walk the same keys in chunks
+# through a generator and append each chunk to the CSV / Parquet file, so
+# memory stays flat whatever the ledger size. Lines without a date fall
+# outside the key and are skipped.
+
+LEDGER_PAGE_SIZE = 50
+LEDGER_EXPORT_CHUNK = 50_000
+LEDGER_COLUMNS = ["transaction_id", "date", "description", "account_code", "debit", "credit", "reference_id"]
+
+def _ledger_keyset_sql(cursor, newest_first, account_code):
+    op, order = ("<", "DESC") if newest_first else (">", "ASC")
+    where, params = ["date IS NOT NULL"], []
+    if cursor is not None:
+        where.append(f"(date, rowid) {op} (?, ?)")
+        params.extend(cursor)
+    if account_code:
+        where.append("account_code = ?")
+        params.append(str(account_code))
+    sql = (f"SELECT rowid AS line_id, {', '.join(LEDGER_COLUMNS)} FROM ledger_lines "
+           f"WHERE {' AND '.join(where)} ORDER BY date {order}, rowid {order} LIMIT ?")
+    return sql, params
+
+def _next_cursor(df):
+    last = df.iloc[-1]
+    return (last["date"], int(last["line_id"]))
+
+def get_ledger_page(cursor=None, limit=LEDGER_PAGE_SIZE, newest_first=True, account_code=None):
+    """
+    One page of ledger lines following cursor (None = first page).
+    Returns: (DataFrame [line_id + LEDGER_COLUMNS], next_cursor). Pass
+    next_cursor back for the following page; it is None on the last page.
+    """
+    sql, params = _ledger_keyset_sql(cursor, newest_first, account_code)
+    try:
+        df = read_cached(sql, tuple(params) + (int(limit) + 1,))  # one extra row: is there another page?
+    except: return pd.DataFrame(columns=["line_id"] + LEDGER_COLUMNS), None
+    if len(df) <= limit:
+        return df, None
+    df = df.iloc[:limit]
+    return df, _next_cursor(df)
+
+def ledger_line_count():
+    """Number of ledger lines, from account_balances (O(accounts), not a COUNT(*) scan)."""
+    try:
+        return int(read_cached("SELECT COALESCE(SUM(line_count), 0) AS n FROM account_balances").iloc[0]["n"])
+    except: return 0
+
+def iter_ledger_chunks(chunk_size=LEDGER_EXPORT_CHUNK, newest_first=False, account_code=None):
+    """Yields the ledger as DataFrames of at most chunk_size lines, in (date, rowid) order."""
+    cursor = None
+    while True:
+        sql, params = _ledger_keyset_sql(cursor, newest_first, account_code)
+        with cortex_connection() as conn:   # not read_cached: an export must not flood the query cache
+            df = pd.read_sql_query(sql, conn, params=tuple(params) + (int(chunk_size),))
+        if df.empty:
+            return
+        yield df
+        if len(df) < chunk_size:
+            return
+        cursor = _next_cursor(df)
+
+def _parquet_chunk(df, pa, schema):
+    text_cols = [c for c in LEDGER_COLUMNS if c not in ("debit", "credit")]
+    df = df.astype({c: "string" for c in text_cols})
+    df["debit"] = pd.to_numeric(df["debit"], errors="coerce")
+    df["credit"] = pd.to_numeric(df["credit"], errors="coerce")
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+def export_ledger(dest, fmt=None, chunk_size=LEDGER_EXPORT_CHUNK, account_code=None):
+    """
+    Streams the ledger to dest (path or binary file object) as 'csv' or
+    'parquet' (inferred from a path's extension when fmt is None), one chunk
+    at a time. Parquet needs pyarrow. Returns the number of lines written.
+    """
+    fmt = (fmt or os.path.splitext(str(dest))[1].lstrip(".") or "csv").lower()
+    chunks = iter_ledger_chunks(chunk_size, account_code=account_code)
+    written = 0
+
+    if fmt == "csv":
+        fh = open(dest, "wb") if isinstance(dest, (str, os.PathLike)) else dest
+        try:
+            for df in chunks:
+                df.to_csv(fh, header=written == 0, index=False, encoding="utf-8")
+                written += len(df)
+            if written == 0:
+                pd.DataFrame(columns=["line_id"] + LEDGER_COLUMNS).to_csv(fh, index=False, encoding="utf-8")
+        finally:
+            if fh is not dest:
+                fh.close()
+        return written
+
+    if fmt != "parquet":
+        raise ValueError(f"Unsupported ledger export format: {fmt}")
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([("line_id", pa.int64())] + [
+        (c, pa.float64() if c in ("debit", "credit") else pa.string()) for c in LEDGER_COLUMNS])
+    with pq.ParquetWriter(dest, schema) as writer:
+        for df in chunks:
+            writer.write_table(_parquet_chunk(df, pa, schema))
+            written += len(df)
+    return written
+
+# ==========================================
+# 17. GEOFENCE SITE EVENTS (AUTOMATIC ARRIVAL / DEPARTURE)
+# ==========================================
+# The geofence engine (modules/logistics/geofence.py) turns GPS pings into
+# ENTER / EXIT events per vehicle and fence. A vehicle's open trip (not yet
+# delivered) takes its arrival_time from the first ENTER after dispatch
+# (dispatched_at; date_dispatched for older trips) into a site fence at one
+# of its drops: a stop on the route label after the origin that names the
+# fence, or resolves to a hub / region whose centre is within reach of the
+# fence's. Sites the truck passes on the way do not count, and a trip whose
+# route names no place we can locate gets no automatic arrival. Its
+# departure_time is the first EXIT out of that same fence. Times already on
+# the manifest (log_site_event, or an earlier batch) are never overwritten.
+
+CLOSED_TRIP_STATUSES = ("DELIVERED", "Delivered", "COMPLETED", "Completed", "CANCELLED", "Cancelled")
+HUB_REACH_KM = 25.0       # fence centre to a drop named after a hub
+REGION_REACH_KM = 250.0   # ... to a region centroid (milk-run drops without a hub)
+
+_OPEN_TRIP = f"status NOT IN ({', '.join('?' * len(CLOSED_TRIP_STATUSES))})"
+
+_OPEN_ARRIVALS = f"""
+    SELECT trip_id, vehicle_id, route, COALESCE(dispatched_at, date_dispatched, '') AS dispatched
+    FROM trip_manifests
+    WHERE vehicle_id IN ({{marks}}) AND arrival_time IS NULL AND {_OPEN_TRIP}
+    ORDER BY dispatched DESC, rowid DESC
+"""
+
+_SET_ARRIVAL = "UPDATE trip_manifests SET arrival_time = ?, arrival_fence = ? WHERE trip_id = ? AND arrival_time IS NULL"
+
+_SET_DEPARTURE = f"""
+    UPDATE trip_manifests SET departure_time = ?
+    WHERE vehicle_id = ? AND arrival_fence = ? AND departure_time IS NULL
+      AND arrival_time <= ? AND {_OPEN_TRIP}
+"""
+
+def _norm_place(place):
+    return re.sub(r"\s+", " ", str(place or "")).strip().lower()
+
+def _trip_drops(route):
+    """Drops on a route label, origin excluded: [(normalised name, (lat, lon) or None, reach km)]."""
+    from modules.logistics.constants import HUB_ALIASES, REGION_COORDS
+    from modules.logistics.route_builder import locate
+
+    text = re.sub(r"\s*\([\d,.]+\s*km\)\s*$", "", str(route or ""))
+    if re.match(r"^\w{1,5}:", text):
+        text = text.split(":", 1)[1]
+    stops = [s for s in re.split(r"\s*(?:→|->)\s*", text.strip()) if s]
+    drops = []
+    for stop in stops[1:]:
+        if stop == stops[0]:
+            continue   # back at the origin
+        coords, reach = None, HUB_REACH_KM
+        for name in (stop, re.sub(r"\s*\([^)]*\)$", "", stop)):   # 'JHB → DBN (N3)': road in brackets
+            name = HUB_ALIASES.get(name, name)
+            coords = locate(name)
+            if coords:
+                reach = REGION_REACH_KM if name in REGION_COORDS else HUB_REACH_KM
+                break
+        drops.append((_norm_place(stop), coords, reach))
+    return drops
+
+def _drops_at(drops, fence_id, site):
+    """True when one of a trip's drops is the fence: named after it, or within reach of its centre."""
+    from modules.logistics.dispatch_optimizer import haversine_km
+
+    name, lat, lon = site
+    names = {_norm_place(fence_id), _norm_place(name)}
+    return any(stop in names or (coords and haversine_km(lat, lon, *coords) <= reach)
+               for stop, coords, reach in drops)
+
+def record_site_events(events, sites):
+    """
+    Applies geofence events to trip_manifests in one transaction.
+    events: iterable of (vehicle_id, fence_id, event, timestamp) with event
+    'ENTER' or 'EXIT' and timestamps as 'YYYY-MM-DD HH:MM:SS'.
+    sites: {fence_id: (name, lat, lon)} for every fence in events, to match
+    an ENTER against the trip's drops. Arrivals are applied before
+    departures, so an ENTER and EXIT in the same batch both land.
+    Returns (arrivals, departures) actually written.
+    """
+    enters, departures = [], []
+    for vehicle, fence, event, ts in events:
+        if event == "ENTER":
+            enters.append((ts, vehicle, fence))
+        elif event == "EXIT":
+            departures.append((ts, vehicle, fence, ts, *CLOSED_TRIP_STATUSES))
+    if not enters and not departures:
+        return 0, 0
+
+    with cortex_connection() as conn:
+        arrivals = []
+        if enters:
+            open_trips = {}   # vehicle -> [(trip_id, dispatched, drops)], latest dispatch first
+            vehicles = sorted({v for _, v, _ in enters})
+            for i in range(0, len(vehicles), 500):
+                chunk = vehicles[i:i + 500]
+                sql = _OPEN_ARRIVALS.format(marks=", ".join("?" * len(chunk)))
+                for trip_id, vehicle, route, dispatched in conn.execute(sql, (*chunk, *CLOSED_TRIP_STATUSES)):
+                    open_trips.setdefault(vehicle, []).append((trip_id, dispatched, _trip_drops(route)))
+            arrived_trips = set()
+            for ts, vehicle, fence in sorted(enters):
+                for trip_id, dispatched, drops in open_trips.get(vehicle, ()):
+                    if trip_id not in arrived_trips and dispatched <= ts and _drops_at(drops, fence, sites[fence]):
+                        arrivals.append((ts, fence, trip_id))
+                        arrived_trips.add(trip_id)
+                        break
+        arrived = conn.executemany(_SET_ARRIVAL, arrivals).rowcount if arrivals else 0
+        departed = conn.executemany(_SET_DEPARTURE, departures).rowcount if departures else 0
+    return arrived, departed
@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from modules.core.query_cache import invalidate, note_write
+from modules.core.query_trace import TracedConnection, TracedCursor
+
+# ==========================================
+# CORTEX CONNECTION POOL (PER-THREAD, LONG-LIVED)
+# ==========================================
+# Streamlit runs every browser session in its own script thread, so one
+# long-lived connection per (thread, db file) removes the connect / schema
+# lookup cost from every db_manager call without sharing a handle across
+# threads.
+
+PRAGMAS = {
+    "journal_mode": "WAL",       # Readers never block the writer
+    "synchronous": "NORMAL",     # fsync on checkpoint, not on every commit (safe under WAL)
+    "cache_size": -32000,        # ~32 MB page cache per connection (negative = KiB)
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,        # ms to wait on a locked DB before raising
+}
+
+
+class _TrackingCursor(TracedCursor):
+    def execute(self, sql, parameters=()):
+        super().execute(sql, parameters)
+        note_write(self.connection.touched_tables, sql, self.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        super().executemany(sql, seq_of_parameters)
+        note_write(self.connection.touched_tables, sql, self.rowcount)
+        return self
+
+
+class TrackingConnection(TracedConnection):
+    """
+    sqlite3 connection that records which tables each statement wrote and
+    bumps their query-cache versions once the transaction commits or rolls back.
+    """
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.touched_tables = set()
+
+    def cursor(self, factory=_TrackingCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        super().commit()
+        self._flush_versions()
+
+    def rollback(self):
+        super().rollback()
+        self._flush_versions()
+
+    def _flush_versions(self):
+        if self.touched_tables:
+            touched, self.touched_tables = self.touched_tables, set()
+            invalidate(self.db_key, *touched)
+
+
+class ConnectionPool:
+    """
+    Hands out one tuned sqlite3 connection per thread for a single DB file.
+    Use `with pool.connect() as conn:` — the outermost block commits on
+    success and rolls back on error; nested blocks join the same transaction.
+    """
+
+    def __init__(self, db_path, pragmas=None):
+        self.db_path = db_path
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns = {}  # thread ident -> (thread, connection)
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, factory=TrackingConnection)
+        for key, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {key}={value}")
+        return conn
+
+    def _prune(self):
+        """Closes connections owned by threads that have exited."""
+        for ident, (thread, conn) in list(self._conns.items()):
+            if not thread.is_alive():
+                try: conn.close()
+                except Exception: pass
+                del self._conns[ident]
+
+    def get(self):
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._prune()
+                self._conns[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+
+    @contextmanager
+    def connect(self):
+        conn = self.get()
+        self._local.depth += 1
+        try:
+            yield conn
+        except Exception:
+            if self._local.depth == 1:
+                conn.rollback()
+            raise
+        else:
+            if self._local.depth == 1:
+                conn.commit()
+        finally:
+            self._local.depth -= 1
+
+    def close_all(self):
+        """Closes every pooled connection (e.g. before deleting the DB file)."""
+        with self._lock:
+            for _, conn in self._conns.values():
+                try: conn.close()
+                except Exception: pass
+            self._conns.clear()
+        self._local = threading.local()
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path):
+    """Process-wide pool registry, one pool per DB file."""
+    pool = _POOLS.get(db_path)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.setdefault(db_path, ConnectionPool(db_path))
+    return pool
@@ -0,0 +1,161 @@
+import re
+import sqlite3
+
+import pandas as pd
+
+from modules.core.query_trace import SLOW_QUERY_MS, slow_queries
+
+# ==========================================
+# INDEX ADVISOR (EXPLAIN QUERY PLAN ON TRACED SQL)
+# ==========================================
+# Takes the slow statements captured by query_trace, re-plans each one with
+# EXPLAIN QUERY PLAN and, for every full table scan, proposes an index on
+# the columns the statement filters that table by: equality columns first,
+# then at most one range column. Nothing is created unless create_index()
+# is called (the admin console's "Create" button).
+
+_PLAN_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_CLAUSE_END = re.compile(r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|HAVING|UNION|WINDOW)\b", re.IGNORECASE)
+_FILTER_START = re.compile(r"\b(?:WHERE|ON)\b", re.IGNORECASE)
+_PREDICATE = re.compile(
+    r"(?:\b(\w+)\.)?\b([A-Za-z_]\w*)\s*(==|=|<=|>=|<(?!>)|>|\bIN\b|\bBETWEEN\b|\bIS\s+NULL\b|\bLIKE\b)",
+    re.IGNORECASE,
+)
+_RANGE_OPS = {"<", ">", "<=", ">=", "BETWEEN", "LIKE"}
+
+
+def _filter_text(sql):
+    """WHERE / ON clauses of a statement (subqueries included)."""
+    parts = []
+    for m in _FILTER_START.finditer(sql):
+        rest = sql[m.end():]
+        end = _CLAUSE_END.search(rest)
+        parts.append(rest[:end.start()] if end else rest)
+    return " ".join(parts)
+
+
+def _bind(sql, params):
+    """Parameters for re-planning sql: the captured ones, else NULL per placeholder."""
+    if isinstance(params, (list, tuple, dict)):
+        return params
+    return (None,) * sql.count("?")
+
+
+def explain(db, sql, params=None):
+    """EXPLAIN QUERY PLAN rows for sql on db, as 'detail' strings (indented by depth)."""
+    conn = sqlite3.connect(db, timeout=30)
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", _bind(sql, params)).fetchall()
+    finally:
+        conn.close()
+    depth = {0: -1}
+    out = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        out.append("  " * depth[node] + detail)
+    return out
+
+
+def _table_columns(conn, table):
+    return {r[1].lower() for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _index_prefixes(conn, table):
+    """Leading-column tuples of every index on table."""
+    prefixes = []
+    for idx in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        cols = [r[2].lower() for r in conn.execute(f"PRAGMA index_info({idx[1]})") if r[2]]
+        prefixes.append(tuple(cols))
+    return prefixes
+
+
+def _candidate_columns(sql, table, alias, columns):
+    eq, rng = [], []
+    for qualifier, col, op in _PREDICATE.findall(_filter_text(sql)):
+        col = col.lower()
+        if col not in columns or (qualifier and qualifier.lower() not in {table.lower(), (alias or "").lower()}):
+            continue
+        bucket = rng if op.upper() in _RANGE_OPS else eq
+        if col not in eq and col not in rng:
+            bucket.append(col)
+    return tuple(eq + rng[:1])
+
+
+def _recommend(db, stmt):
+    """Index recommendations for one traced statement (one per scanned table)."""
+    sql = stmt["sql"]
+    if not re.match(r"^\s*(?:SELECT|WITH|UPDATE|DELETE)\b", sql, re.IGNORECASE):
+        return []
+    try:
+        plan = explain(db, sql, stmt.get("params"))
+    except sqlite3.Error:
+        return []
+
+    recs = []
+    conn = sqlite3.connect(db, timeout=30)
+    try:
+        for line in plan:
+            m = _PLAN_SCAN.match(line.strip())
+            if not m or "INDEX" in m.group(3).upper():
+                continue
+            table, alias = m.group(1), m.group(2)
+            columns = _table_columns(conn, table)
+            if not columns:
+                continue   # view / CTE / subquery
+            cols = _candidate_columns(sql, table, alias, columns)
+            if not cols or any(p[:len(cols)] == cols for p in _index_prefixes(conn, table)):
+                continue
+            name = f"idx_{table}_{'_'.join(cols)}"
+            recs.append({
+                "db": db, "table": table, "columns": cols,
+                "ddl": f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(cols)})",
+                "plan": "\n".join(plan),
+            })
+    finally:
+        conn.close()
+    return recs
+
+
+def advise(threshold_ms=SLOW_QUERY_MS, db=None):
+    """
+    Recommendations for the traced statements slower than threshold_ms.
+    One row per (db, table, columns): the statements it would serve, their
+    combined calls / time, and the CREATE INDEX to run.
+    """
+    merged = {}
+    for stmt in slow_queries(threshold_ms, db):
+        for rec in _recommend(stmt["db"], stmt):
+            key = (rec["db"], rec["table"], rec["columns"])
+            row = merged.setdefault(key, {**rec, "statements": 0, "calls": 0, "total_ms": 0.0, "example": stmt["sql"]})
+            row["statements"] += 1
+            row["calls"] += stmt["calls"]
+            row["total_ms"] += stmt["total_ms"]
+    return sorted(merged.values(), key=lambda r: -r["total_ms"])
+
+
+def create_index(db, ddl):
+    """Runs one recommended CREATE INDEX and refreshes the planner statistics."""
+    if not re.match(r"^\s*CREATE\s+INDEX\b", ddl, re.IGNORECASE):
+        raise ValueError("Only CREATE INDEX statements can be applied by the advisor")
+    conn = sqlite3.connect(db, timeout=30)
+    try:
+        conn.execute(ddl)
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def index_inventory(db):
+    """Every index on db as [table, index, columns, origin] (origin: c = created, pk / u = constraint)."""
+    conn = sqlite3.connect(db, timeout=30)
+    try:
+        rows = []
+        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        for table in tables:
+            for idx in conn.execute(f"PRAGMA index_list({table})").fetchall():
+                cols = [r[2] for r in conn.execute(f"PRAGMA index_info({idx[1]})")]
+                rows.append({"table": table, "index": idx[1], "columns": ", ".join(c or "<expr>" for c in cols), "origin": idx[3]})
+    finally:
+        conn.close()
+    return pd.DataFrame(rows, columns=["table", "index", "columns", "origin"])
@@ -0,0 +1,224 @@
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from modules.core.reference_data import cow_view
+
+# ==========================================
+# QUERY CACHE (TABLE-VERSIONED READS)
+# ==========================================
+# Streamlit reruns the whole script on every click, so the same SELECTs run
+# over and over against data that has not changed. Reads go through
+# cached_read(): the result is kept per (db, sql, params) together with the
+# version of every table the SQL reads. Writers bump table versions when
+# their transaction ends (see track_engine_writes and the cortex pool), so a
+# cached frame is served until one of its tables is actually written.
+#
+# Writes made outside the tracked connections (the ingest server process, a
+# raw sqlite3.connect) are caught by PRAGMA data_version: every read polls it
+# on one watcher connection per DB file, and when it moves every cached read
+# of that DB goes stale. SQLite cannot say which tables changed, and our own
+# commits move it too, so a commit costs one refill of that DB's entries.
+
+MAX_ENTRIES = 256
+
+# Writes to a table also change what these read (triggers / views)
+DEPENDENTS = {
+    "ledger_lines": ("account_balances",),
+    "gps_pings": ("gps_telemetry",),
+}
+
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+[\"`\[]?([A-Za-z_]\w*)", re.IGNORECASE)
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM"
+    r"|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|ALTER\s+TABLE)\s+[\"`\[]?([A-Za-z_]\w*)",
+    re.IGNORECASE,
+)
+_DDL = re.compile(r"^\s*(?:DROP|ALTER)\b", re.IGNORECASE)
+_PARTITION_SUFFIX = re.compile(r"_\d{8}$")
+
+_lock = threading.RLock()
+_versions = {}            # (db, table) -> int
+_entries = OrderedDict()  # (db, sql, params) -> (versions tuple, DataFrame)
+_watchers = {}            # db -> [sqlite3 connection, last PRAGMA data_version]
+_stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "external_writes": 0}
+
+_ALL = "*"                # (db, _ALL) version: bumped when the whole DB changed under us
+
+
+# ------------------------------------------
+# SQL INTROSPECTION
+# ------------------------------------------
+
+@lru_cache(maxsize=2048)
+def read_tables(sql):
+    """Tables / views a SELECT reads (lower-cased, de-duplicated, sorted)."""
+    return tuple(sorted({t.lower() for t in _READ_TABLES.findall(sql)}))
+
+
+@lru_cache(maxsize=2048)
+def written_table(sql):
+    """Target table of an INSERT / UPDATE / DELETE / DROP / ALTER, else None."""
+    m = _WRITE_TABLE.match(sql)
+    return m.group(1).lower() if m else None
+
+
+def _affected(table):
+    tables = {table}
+    family = _PARTITION_SUFFIX.sub("", table)   # gps_pings_20250131 -> gps_pings
+    tables.add(family)
+    for t in (table, family):
+        tables.update(DEPENDENTS.get(t, ()))
+    return tables
+
+
+def note_write(touched, sql, rowcount):
+    """Adds the table sql wrote to the touched set (DML only when rows changed)."""
+    table = written_table(sql)
+    if table and (rowcount != 0 or _DDL.match(sql)):
+        touched.add(table)
+
+
+# ------------------------------------------
+# VERSIONS + INVALIDATION
+# ------------------------------------------
+
+def invalidate(db, *tables):
+    """Bumps the version of each table (and its dependents); cached reads of them go stale."""
+    if not tables:
+        return
+    with _lock:
+        for table in tables:
+            for t in _affected(str(table).lower()):
+                _versions[(db, t)] = _versions.get((db, t), 0) + 1
+        _stats["invalidations"] += 1
+
+
+def sync_external_writes(db):
+    """
+    Polls db's PRAGMA data_version; when another connection has committed
+    since the last poll, every cached read of db goes stale. Keys that are
+    not a database file on disk are left alone.
+    """
+    with _lock:
+        watch = _watchers.get(db)
+        if watch is None:
+            if not os.path.isfile(db):
+                return
+            watch = _watchers[db] = [sqlite3.connect(db, check_same_thread=False), None]
+        try:
+            version = watch[0].execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:   # file replaced or unreadable: reopen on the next poll
+            watch[0].close()
+            del _watchers[db]
+            version = None
+        if watch[1] is not None and version != watch[1]:
+            _versions[(db, _ALL)] = _versions.get((db, _ALL), 0) + 1
+            _stats["external_writes"] += 1
+        watch[1] = version
+
+
+def table_version(db, table):
+    """Changes whenever table (or, per data_version, anything in db) has been written."""
+    sync_external_writes(db)
+    return _versions.get((db, table.lower()), 0) + _versions.get((db, _ALL), 0)
+
+
+def _snapshot(db, tables):
+    return tuple(_versions.get((db, t), 0) for t in (_ALL, *tables))
+
+
+# ------------------------------------------
+# READ PATH
+# ------------------------------------------
+
+def _freeze(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in params.items()))
+    if isinstance(params, (list, tuple)):
+        return tuple(_freeze(v) for v in params)
+    return params
+
+
+def cached_read(db, sql, params, loader):
+    """
+    Returns loader()'s DataFrame, memoised on (db, sql, params) until a table
+    the SQL reads is written, or another process writes the DB. Callers get a copy-on-write view, so mutating
+    it is safe and only the columns they write are ever duplicated.
+    Loader failures (exceptions) propagate and are never cached.
+    """
+    tables = read_tables(sql)
+    if not tables:
+        return loader()
+    try:
+        key = (db, sql, _freeze(params))
+        hash(key)
+    except TypeError:
+        return loader()
+
+    sync_external_writes(db)
+    with _lock:
+        # Snapshot before reading: a write that commits mid-read makes this entry stale
+        versions = _snapshot(db, tables)
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == versions:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return cow_view(entry[1])
+        _stats["misses"] += 1
+
+    df = loader()
+    with _lock:
+        _entries[key] = (versions, df)
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+    return cow_view(df)
+
+
+def clear_cache():
+    with _lock:
+        _entries.clear()
+
+
+def cache_stats():
+    """Hit / miss counters plus current size, for the admin console."""
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "entries": len(_entries),
+            "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+            "tables_tracked": sum(t != _ALL for _, t in _versions),
+        }
+
+
+# ------------------------------------------
+# WRITE TRACKING (SQLALCHEMY ENGINES)
+# ------------------------------------------
+
+def track_engine_writes(engine, db):
+    """
+    Bumps table versions for every write made through engine. Tables are
+    collected per connection and flushed when the connection goes back to
+    the pool, i.e. after its transaction has committed or rolled back.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        note_write(conn.info.setdefault("touched_tables", set()), statement, cursor.rowcount)
+
+    @event.listens_for(engine.pool, "checkin")
+    def _flush(dbapi_connection, connection_record):
+        touched = connection_record.info.pop("touched_tables", None) if connection_record else None
+        if touched:
+            invalidate(db, *touched)
+
+    return engine
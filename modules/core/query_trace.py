@@ -0,0 +1,352 @@
+import bisect
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+# ==========================================
+# QUERY TRACE (PER-STATEMENT TIMINGS + RERUN PROFILE)
+# ==========================================
+# Every DB wrapper opens its sqlite3 connections with TracedConnection: the
+# cortex pool, db_utils' engine, the admin console, and the ORM engines built
+# by traced_engine(). Each finished execution (execute + the fetches that
+# follow it) is recorded per (db, sql): latency histogram, rows, and the
+# calling module. trace_rerun() / trace_section() wrap a page render and its
+# tabs so DB time can be set against render time. The index advisor reads
+# slow_queries(); the admin Performance tab reads the rest and exports JSON.
+
+SLOW_QUERY_MS = 5.0
+MAX_STATEMENTS = 500
+MAX_RERUNS = 200
+MAX_CALLERS = 8
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+# Frames from these modules are DB plumbing, not the caller worth reporting
+_WRAPPER_MODULES = (
+    "modules.core.query_trace", "modules.core.db_pool", "modules.core.db_manager",
+    "modules.core.query_cache", "modules.logistics.db_utils",
+    "sqlalchemy", "pandas", "contextlib", "functools", "streamlit",
+)
+
+_lock = threading.RLock()
+_local = threading.local()
+_orphans = deque()           # executions of cursors collected before finishing
+_statements = OrderedDict()   # (db, sql) -> stats dict
+_reruns = deque(maxlen=MAX_RERUNS)
+_sections = {}                # (page, section) -> aggregate dict
+
+
+# ------------------------------------------
+# RECORDING
+# ------------------------------------------
+
+def _caller(depth=2):
+    """'module.function' of the first frame outside the DB wrappers."""
+    frame = sys._getframe(depth)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_WRAPPER_MODULES):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _drain():
+    while _orphans:
+        try:
+            _store(*_orphans.popleft())
+        except IndexError:
+            break
+
+
+def record(db, sql, params, ms, rows=0, caller=None):
+    """Adds one finished execution of sql to its stats and to the open rerun / sections."""
+    _drain()
+    _store(db, sql, params, ms, rows, caller)
+
+
+def _store(db, sql, params, ms, rows, caller):
+    key = (db, sql)
+    with _lock:
+        entry = _statements.get(key)
+        if entry is None:
+            entry = _statements[key] = {
+                "db": db, "sql": sql, "params": params,
+                "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                "histogram": [0] * len(BUCKETS_MS), "callers": Counter(),
+            }
+            while len(_statements) > MAX_STATEMENTS:
+                _statements.popitem(last=False)
+        else:
+            _statements.move_to_end(key)
+        entry["calls"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["rows"] += rows
+        entry["histogram"][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        if caller and (caller in entry["callers"] or len(entry["callers"]) < MAX_CALLERS):
+            entry["callers"][caller] += 1
+
+    for span in getattr(_local, "spans", ()):
+        span["queries"] += 1
+        span["db_ms"] += ms
+
+
+def _percentile(histogram, q):
+    """Upper bound of the bucket holding the q-th quantile (None when empty)."""
+    total = sum(histogram)
+    if not total:
+        return None
+    target, seen = q * total, 0
+    for bound, count in zip(BUCKETS_MS, histogram):
+        seen += count
+        if seen >= target:
+            return bound
+    return BUCKETS_MS[-1]
+
+
+def _public(entry):
+    row = {k: v for k, v in entry.items() if k not in ("callers", "histogram")}
+    row["avg_ms"] = entry["total_ms"] / entry["calls"] if entry["calls"] else 0.0
+    row["p50_ms"] = _percentile(entry["histogram"], 0.50)
+    row["p95_ms"] = _percentile(entry["histogram"], 0.95)
+    row["histogram"] = list(entry["histogram"])
+    row["callers"] = dict(entry["callers"].most_common())
+    return row
+
+
+def slow_queries(threshold_ms=SLOW_QUERY_MS, db=None):
+    """Statements whose slowest run took at least threshold_ms, worst total first."""
+    _drain()
+    with _lock:
+        rows = [_public(e) for e in _statements.values()
+                if e["max_ms"] >= threshold_ms and (db is None or e["db"] == db)]
+    return sorted(rows, key=lambda e: -e["total_ms"])
+
+
+def top_queries(n=20, by="total_ms"):
+    """The n statements with the highest `by` (total_ms, max_ms, avg_ms, calls or rows)."""
+    _drain()
+    with _lock:
+        rows = [_public(e) for e in _statements.values()]
+    return sorted(rows, key=lambda e: -(e[by] or 0))[:n]
+
+
+def reset_trace():
+    with _lock:
+        _statements.clear()
+        _reruns.clear()
+        _sections.clear()
+
+
+# ------------------------------------------
+# RERUN + SECTION PROFILE
+# ------------------------------------------
+
+@contextmanager
+def _span(name, is_rerun):
+    spans = _local.__dict__.setdefault("spans", [])
+    page = next((s["name"] for s in spans if s["is_rerun"]), None)
+    span = {
+        "name": name, "queries": 0, "db_ms": 0.0, "sections": [],
+        "is_rerun": is_rerun and page is None,   # a rerun inside a rerun is just a section
+    }
+    started = datetime.datetime.now().isoformat(timespec="seconds")
+    spans.append(span)
+    t0 = time.perf_counter()
+    try:
+        yield span
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        spans.pop()
+        if span["is_rerun"]:
+            with _lock:
+                _reruns.append({
+                    "page": name, "started": started, "render_ms": ms,
+                    "db_ms": span["db_ms"], "queries": span["queries"], "sections": span["sections"],
+                })
+        else:
+            page = page or "-"
+            with _lock:
+                agg = _sections.setdefault((page, name), {
+                    "page": page, "section": name, "renders": 0,
+                    "total_ms": 0.0, "max_ms": 0.0, "db_ms": 0.0, "queries": 0,
+                })
+                agg["renders"] += 1
+                agg["total_ms"] += ms
+                agg["max_ms"] = max(agg["max_ms"], ms)
+                agg["db_ms"] += span["db_ms"]
+                agg["queries"] += span["queries"]
+            if spans:
+                spans[-1]["sections"].append({"section": name, "render_ms": ms, "db_ms": span["db_ms"], "queries": span["queries"]})
+
+
+def trace_rerun(page):
+    """Wraps one script run of page (usable as a decorator); nested reruns count as sections."""
+    return _span(page, is_rerun=True)
+
+
+def trace_section(name):
+    """Wraps one tab / panel of the current page render."""
+    return _span(name, is_rerun=False)
+
+
+def rerun_history(page=None):
+    with _lock:
+        return [dict(r) for r in _reruns if page is None or r["page"] == page]
+
+
+def section_costs():
+    """Per (page, section): renders, total / average / max render ms, DB ms and queries."""
+    with _lock:
+        rows = [dict(a) for a in _sections.values()]
+    for row in rows:
+        row["avg_ms"] = row["total_ms"] / row["renders"] if row["renders"] else 0.0
+    return sorted(rows, key=lambda r: -r["avg_ms"])
+
+
+# ------------------------------------------
+# EXPORT
+# ------------------------------------------
+
+def trace_snapshot():
+    """Everything the trace holds, as plain JSON-safe data."""
+    return {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "buckets_ms": [b if b != float("inf") else None for b in BUCKETS_MS],
+        "statements": top_queries(n=MAX_STATEMENTS),
+        "sections": section_costs(),
+        "reruns": rerun_history(),
+    }
+
+
+def export_json(path=None):
+    """Snapshot as a JSON string; also written to path when given."""
+    payload = json.dumps(trace_snapshot(), indent=2, default=str)
+    if path:
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(payload)
+    return payload
+
+
+# ------------------------------------------
+# SQLITE3 CONNECTION FACTORY
+# ------------------------------------------
+
+class TracedCursor(sqlite3.Cursor):
+    """
+    Times each execute plus the fetches that follow it (SQLite does most
+    SELECT work while stepping rows). The execution is recorded when the
+    cursor runs its next statement, is closed, or is garbage-collected.
+    """
+
+    _pending = None   # [db, sql, params, ms, rows, caller]
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending:
+            record(*pending)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        caller = _caller()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._pending = [self.connection.db_key, sql, parameters,
+                         (time.perf_counter() - start) * 1000, max(self.rowcount, 0), caller]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        caller = _caller()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        record(self.connection.db_key, sql, None, (time.perf_counter() - start) * 1000, max(self.rowcount, 0), caller)
+        return self
+
+    def _fetched(self, start, n):
+        if self._pending:
+            self._pending[3] += (time.perf_counter() - start) * 1000
+            self._pending[4] += n
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # May run inside the GC: queue it rather than take the lock here
+        if self._pending:
+            _orphans.append(self._pending)
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    sqlite3 connection whose cursors report to record(). Use as
+    sqlite3.connect(path, factory=TracedConnection), or via connect_args
+    {"factory": TracedConnection} on a SQLAlchemy sqlite engine.
+    """
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.db_key = database if str(database).startswith((":memory:", "file:")) else os.path.abspath(database)
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(db, **kwargs):
+    """sqlite3.connect with tracing, for raw-connection callers."""
+    return sqlite3.connect(db, factory=TracedConnection, **kwargs)
+
+
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def traced_engine(url, **kwargs):
+    """
+    One shared SQLAlchemy engine per URL (ORM sessions bind to it), with
+    sqlite connections opened through TracedConnection.
+    """
+    engine = _ENGINES.get(url)
+    if engine is None:
+        from sqlalchemy import create_engine
+        connect_args = dict(kwargs.pop("connect_args", {}))
+        if url.startswith("sqlite"):
+            connect_args.setdefault("factory", TracedConnection)
+        with _ENGINES_LOCK:
+            engine = _ENGINES.get(url)
+            if engine is None:
+                engine = _ENGINES[url] = create_engine(url, connect_args=connect_args, **kwargs)
+    return engine
@@ -0,0 +1,214 @@
+import datetime
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# SHARED REFERENCE DATA (ONE COPY PER PROCESS)
+# ==========================================
+# Read-mostly frames every session needs (chart of accounts, corridors, SKU
+# catalog, client registry, demo seeds) are loaded once per process and
+# handed to each session as a copy-on-write view: the view shares the
+# column buffers of the shared frame until that session writes to it, and
+# then pandas copies only the columns that changed. bump_reference() moves
+# a dataset to a new version; the next read reloads it (views already handed
+# out keep the data they were given).
+#
+# Views handed out through session_reference() are tracked weakly per
+# Streamlit session, so reference_memory_report() can show what each
+# session would hold as private copies against what it actually holds.
+
+_lock = threading.RLock()
+_loaders = {}   # name -> zero-argument loader returning a DataFrame
+_wanted = {}    # name -> version requested by bump_reference()
+_loaded = {}    # name -> {"version", "frame", "loaded_at", "load_ms"}
+_views = {}     # session id -> {session_state key: (name, weakref to view)}
+
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or bool(getattr(pd.options.mode, "copy_on_write", False))
+
+
+def cow_view(df):
+    """A copy that shares df's buffers until either side writes (deep copy without Copy-on-Write)."""
+    return df.copy(deep=not COPY_ON_WRITE)
+
+
+# ------------------------------------------
+# REGISTRY
+# ------------------------------------------
+
+def register_reference(name, loader):
+    """Declares a dataset; it is loaded on first use. Re-registering a name forces a reload."""
+    with _lock:
+        _loaders[name] = loader
+        _wanted[name] = _wanted.get(name, 0) + (1 if name in _loaded else 0)
+
+
+def bump_reference(name):
+    """Marks name as changed at the source: the next read reloads it. Returns the new version."""
+    with _lock:
+        _wanted[name] = _wanted.get(name, 0) + 1
+        return _wanted[name]
+
+
+def reference_version(name):
+    with _lock:
+        return _wanted.get(name, 0)
+
+
+def _shared(name):
+    """The process-wide frame for name, (re)loaded when its version moved. Never hand this out."""
+    with _lock:
+        if name not in _loaders:
+            raise KeyError(f"Unknown reference dataset: {name}")
+        entry = _loaded.get(name)
+        if entry is not None and entry["version"] == _wanted.get(name, 0):
+            return entry["frame"]
+        version = _wanted.get(name, 0)
+        t0 = time.perf_counter()
+        frame = _loaders[name]()
+        _loaded[name] = {
+            "version": version,
+            "frame": frame,
+            "loaded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "load_ms": (time.perf_counter() - t0) * 1000,
+        }
+        return frame
+
+
+def reference_view(name):
+    """Copy-on-write view of the shared frame: safe to mutate, costs nothing until it is."""
+    return cow_view(_shared(name))
+
+
+# ------------------------------------------
+# SESSION STATE
+# ------------------------------------------
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        ctx = None
+    return ctx.session_id if ctx is not None else "-"
+
+
+def session_reference(key, name):
+    """
+    st.session_state[key], seeded with a view of reference name on first use.
+    Sessions may mutate or reassign their copy freely; it never touches the shared frame.
+    """
+    import streamlit as st
+
+    if key not in st.session_state:
+        view = reference_view(name)
+        st.session_state[key] = view
+        with _lock:
+            _views.setdefault(_session_id(), {})[key] = (name, weakref.ref(view))
+    return st.session_state[key]
+
+
+# ------------------------------------------
+# MEMORY REPORT
+# ------------------------------------------
+
+def _buffers(series):
+    """Addresses of the memory buffers behind a column (numpy or Arrow backed)."""
+    arr = series.array
+    pa_arr = getattr(arr, "_pa_array", None)
+    if pa_arr is not None:
+        return {b.address for chunk in pa_arr.chunks for b in chunk.buffers() if b is not None}
+    try:
+        return {np.asarray(arr).__array_interface__["data"][0]}
+    except Exception:
+        return set()
+
+
+def _private_bytes(view, shared):
+    """Bytes of view's columns that no longer share buffers with the shared frame."""
+    usage = view.memory_usage(deep=True, index=False)
+    private = 0
+    for col in view.columns:
+        if col not in shared.columns or not (_buffers(view[col]) & _buffers(shared[col])):
+            private += int(usage[col])
+    return private
+
+
+def reference_memory_report():
+    """
+    {"shared": one row per loaded dataset (rows, bytes held once per process),
+     "sessions": one row per session: views alive, bytes as private copies
+     (before) and bytes actually private to the session (after)}.
+    """
+    with _lock:
+        loaded = {name: dict(entry) for name, entry in _loaded.items()}
+        views = {sid: dict(keys) for sid, keys in _views.items()}
+
+    shared = [{
+        "dataset": name, "version": entry["version"], "rows": len(entry["frame"]),
+        "bytes": int(entry["frame"].memory_usage(deep=True).sum()),
+        "loaded_at": entry["loaded_at"], "load_ms": entry["load_ms"],
+    } for name, entry in sorted(loaded.items())]
+
+    sessions, dead = [], []
+    for sid, keys in views.items():
+        alive, full, private = 0, 0, 0
+        for key, (name, ref) in keys.items():
+            view = ref()
+            if view is None:
+                dead.append((sid, key))
+                continue
+            alive += 1
+            full += int(view.memory_usage(deep=True).sum())
+            private += _private_bytes(view, loaded[name]["frame"]) if name in loaded else full
+        if alive:
+            sessions.append({"session": sid, "views": alive, "copy_bytes": full, "private_bytes": private})
+
+    with _lock:   # views collected since the last report (reassigned state, closed sessions)
+        for sid, key in dead:
+            _views.get(sid, {}).pop(key, None)
+            if not _views.get(sid, True):
+                _views.pop(sid, None)
+    return {"shared": shared, "sessions": sessions}
+
+
+# ------------------------------------------
+# BUILT-IN DATASETS
+# ------------------------------------------
+# Loaders import their sources lazily so this module stays importable from
+# anywhere without pulling in the verticals. Demo seeds owned by a vertical
+# (hunter DB, industrial asset tree) are registered by that vertical.
+
+def _load_coa():
+    from modules.finance.models import COA_COLUMNS, SEED_COA
+    return pd.DataFrame(SEED_COA, columns=COA_COLUMNS)
+
+
+def _load_corridors():
+    from modules.logistics.constants import CORRIDORS
+    return pd.DataFrame([{"route": route, **meta} for route, meta in CORRIDORS.items()])
+
+
+def _load_sku_catalog():
+    from modules.core.db_manager import TECHNICAL_SKUS
+    return pd.DataFrame(TECHNICAL_SKUS)
+
+
+def _load_client_registry():
+    from modules.core.db_manager import read_cached
+    try:
+        return read_cached("SELECT * FROM client_registry")
+    except Exception:
+        return pd.DataFrame()
+
+
+for _name, _loader in {
+    "coa": _load_coa,
+    "corridors": _load_corridors,
+    "sku_catalog": _load_sku_catalog,
+    "client_registry": _load_client_registry,
+}.items():
+    register_reference(_name, _loader)
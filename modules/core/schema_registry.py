@@ -0,0 +1,223 @@
+import datetime
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from modules.core.query_cache import invalidate, note_write
+
+# ==========================================
+# SCHEMA REGISTRY (DDL ONCE PER PROCESS)
+# ==========================================
+# Each vertical registers its DDL as a named bundle against a DB file
+# instead of running CREATE TABLE on every Streamlit rerun. ensure_schema()
+# verifies a DB once per process: a bundle only runs when the hash stored in
+# the DB's schema_registry table differs from the registered DDL, or when a
+# table or index it declares is missing. After that, every call is a set lookup.
+#
+# A bundle is a list of SQL statements and/or an apply() callable (for
+# Python-driven steps like migrations). Callables are fingerprinted by their
+# code object plus an explicit version, so bump the version when behaviour
+# changes outside the function body (e.g. a new migration step).
+
+REGISTRY_TABLE = "schema_registry"
+
+_CREATE_OBJECT = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?(?:TABLE|INDEX)\s+(?:IF\s+NOT\s+EXISTS\s+)?[\"`\[]?([A-Za-z_]\w*)", re.IGNORECASE
+)
+
+_lock = threading.RLock()
+_local = threading.local()
+_bundles = {}     # db -> {name: bundle}, in registration order
+_verified = {}    # db -> verification record
+_skipped = {}     # db -> fast-path calls since verification
+
+
+# ------------------------------------------
+# FINGERPRINTS
+# ------------------------------------------
+
+def _code_strings(code):
+    """Bytecode + every constant of a code object and the code objects nested in it."""
+    parts = [code.co_code]
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            parts.extend(_code_strings(const))
+        else:
+            parts.append(repr(const).encode())
+    return parts
+
+
+def _normalise(sql):
+    return " ".join(sql.split())
+
+
+def _fingerprint(statements, apply, version):
+    h = hashlib.sha256()
+    for sql in statements:
+        h.update(_normalise(sql).encode())
+    if apply is not None:
+        h.update(apply.__qualname__.encode())
+        for part in _code_strings(apply.__code__):
+            h.update(part)
+    h.update(repr(version).encode())
+    return h.hexdigest()
+
+
+def _declared_objects(statements, apply):
+    text = " ".join(statements)
+    if apply is not None:
+        text += " ".join(p.decode(errors="ignore") for p in _code_strings(apply.__code__))
+    return {t.lower() for t in _CREATE_OBJECT.findall(text)}
+
+
+# ------------------------------------------
+# REGISTRATION
+# ------------------------------------------
+
+def register_schema(db, name, statements=(), apply=None, version=None):
+    """
+    Registers (or replaces) DDL bundle `name` for DB file `db`.
+    statements run first, in order, in one transaction; apply() runs after.
+    A new or changed bundle makes the next ensure_schema() re-verify the DB.
+    """
+    statements = list(statements or ())
+    bundle = {
+        "statements": statements,
+        "apply": apply,
+        "hash": _fingerprint(statements, apply, version),
+        "objects": _declared_objects(statements, apply),
+    }
+    with _lock:
+        bundles = _bundles.setdefault(db, {})
+        old = bundles.get(name)
+        if old is None or old["hash"] != bundle["hash"]:
+            bundles[name] = bundle
+            _verified.pop(db, None)
+    return bundle["hash"]
+
+
+def is_registered(db, name):
+    return name in _bundles.get(db, {})
+
+
+# ------------------------------------------
+# VERIFICATION
+# ------------------------------------------
+
+def _connect(db):
+    conn = sqlite3.connect(db, timeout=30)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {REGISTRY_TABLE} (
+            bundle TEXT PRIMARY KEY,
+            schema_hash TEXT,
+            applied_at TEXT,
+            apply_ms REAL
+        )
+    """)
+    return conn
+
+
+def _run_statements(db, statements):
+    touched = set()
+    conn = sqlite3.connect(db, timeout=30)
+    try:
+        for sql in statements:
+            cur = conn.execute(sql)
+            note_write(touched, sql, cur.rowcount)
+        conn.commit()
+    finally:
+        conn.close()
+    if touched:
+        invalidate(db, *touched)
+
+
+def ensure_schema(db, force=False):
+    """
+    Makes sure every bundle registered for db has been applied to it.
+    First call per process compares stored hashes (one small read); later
+    calls return immediately. force=True re-runs every bundle.
+    Returns the names of the bundles applied by this call.
+    """
+    if not force and db in _verified:
+        _skipped[db] = _skipped.get(db, 0) + 1
+        return []
+    if getattr(_local, "busy", False):
+        return []   # a bundle's apply() is opening connections that land back here
+
+    with _lock:
+        if not force and db in _verified:
+            return []
+        _local.busy = True
+        try:
+            t0 = time.perf_counter()
+            conn = _connect(db)
+            try:
+                stored = dict(conn.execute(f"SELECT bundle, schema_hash FROM {REGISTRY_TABLE}").fetchall())
+                existing = {r[0].lower() for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view', 'index')")}
+                conn.commit()
+            finally:
+                conn.close()
+
+            applied = []
+            for name, bundle in list(_bundles.get(db, {}).items()):
+                if not force and stored.get(name) == bundle["hash"] and bundle["objects"] <= existing:
+                    continue
+                t_apply = time.perf_counter()
+                if bundle["statements"]:
+                    _run_statements(db, bundle["statements"])
+                if bundle["apply"] is not None:
+                    bundle["apply"]()
+                apply_ms = (time.perf_counter() - t_apply) * 1000
+                conn = _connect(db)
+                try:
+                    conn.execute(f"INSERT OR REPLACE INTO {REGISTRY_TABLE} VALUES (?, ?, ?, ?)",
+                                 (name, bundle["hash"], datetime.datetime.now().isoformat(timespec="seconds"), apply_ms))
+                    conn.commit()
+                finally:
+                    conn.close()
+                applied.append(name)
+
+            _verified[db] = {
+                "verified_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "verify_ms": (time.perf_counter() - t0) * 1000,
+                "applied": applied,
+            }
+            _skipped[db] = 0
+            return applied
+        finally:
+            _local.busy = False
+
+
+# ------------------------------------------
+# REPORTING
+# ------------------------------------------
+
+def schema_report():
+    """
+    Per DB: bundles, last verification, fast-path calls since then and the
+    last measured cost of applying each bundle (first boot includes seeding,
+    so it overstates a plain rerun; benchmarks/bench_schema_init measures that).
+    """
+    report = []
+    for db, bundles in list(_bundles.items()):
+        try:
+            conn = _connect(db)
+            try:
+                costs = dict(conn.execute(f"SELECT bundle, apply_ms FROM {REGISTRY_TABLE}").fetchall())
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            costs = {}
+        info = _verified.get(db, {})
+        report.append({
+            "db": db,
+            "bundles": list(bundles),
+            "verified_at": info.get("verified_at"),
+            "verify_ms": info.get("verify_ms"),
+            "applied_at_startup": info.get("applied", []),
+            "apply_ms": {name: costs.get(name) for name in bundles},
+            "skipped_calls": _skipped.get(db, 0),
+        })
+    return report
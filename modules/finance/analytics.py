@@ -1,33 +1,45 @@
 import pandas as pd
 import streamlit as st
 
-def get_financial_split(df_gl):
+try:
+    from modules.core.db_manager import REVENUE_STREAM_KPIS, ledger_kpis
+except ImportError:
+    ledger_kpis = None
+
+def get_financial_split(df_gl=None, period=None):
     """
     Splits the General Ledger into two streams:
     Stream A: Logistics (Heavy Assets, CPK driven)
     Stream B: Trade (Paper Assets, Margin driven)
+
+    df_gl is an in-memory GL with Code / Amount / Km columns (the kernel
+    feed). Without one, or when it has no Amount column (the cortex ledger
+    stream), the split is aggregated in SQL and no ledger rows are loaded.
     """
+    if df_gl is None or 'Amount' not in df_gl.columns:
+        if ledger_kpis is None:
+            return None, None
+        split = ledger_kpis(REVENUE_STREAM_KPIS, period)
+        split["total_km"] = 0.0  # the cortex ledger carries no distance
+        return split
+
     if df_gl.empty:
         return None, None
 
+    codes = df_gl['Code'].astype(str)
+    amount = df_gl['Amount']
+
     # STREAM A: LOGISTICS (Standard Transport Codes: 4000, 4100)
     # Exclude Trade (4500)
-    logistics_rev_mask = (df_gl['Code'].astype(str).str.startswith('4')) & (df_gl['Code'].astype(str) != '4500')
-    df_logistics_rev = df_gl[logistics_rev_mask]
-    
+    is_trade = codes == '4500'
     # Direct Costs (5000 series) & Overheads (6000 series) are assumed Logistics for now
     # (Unless we tag specific trade costs later)
-    df_ops_costs = df_gl[df_gl['Code'].astype(str).str.startswith('5')]
-    df_overheads = df_gl[df_gl['Code'].astype(str).str.startswith('6')]
-
-    # STREAM B: TRADE (Code 4500)
-    trade_rev_mask = (df_gl['Code'].astype(str) == '4500')
-    df_trade = df_gl[trade_rev_mask]
 
     return {
-        "logistics_revenue": df_logistics_rev['Amount'].sum(),
-        "logistics_costs": df_ops_costs['Amount'].sum(),
-        "shared_overheads": df_overheads['Amount'].sum(),
-        "trade_revenue": df_trade['Amount'].sum(),
+        "logistics_revenue": amount[codes.str.startswith('4') & ~is_trade].sum(),
+        "logistics_costs": amount[codes.str.startswith('5')].sum(),
+        "shared_overheads": amount[codes.str.startswith('6')].sum(),
+        # STREAM B: TRADE (Code 4500)
+        "trade_revenue": amount[is_trade].sum(),
         "total_km": df_gl['Km'].sum()
     }
@@ -2,13 +2,15 @@ import streamlit as st
 import pandas as pd
 import json
 import os
-from sqlalchemy import create_engine, text
-from modules.core.db_manager import get_billing_docs, init_db
+import tempfile
+from sqlalchemy import text
+from modules.core.db_manager import export_ledger, get_billing_docs, get_ledger_page, init_db, ledger_line_count
+from modules.core.query_trace import trace_rerun, trace_section, traced_engine
 
 # --- IMPORTS FROM YOUR MODULES ---
 from modules.finance.finance_view import render_finance_tab 
 from modules.finance.models import init_finance_db
-from modules.finance.services import create_journal_entry
+from modules.finance.services import create_journal_entry, get_ledger_store
 from modules.finance.coa import SA_LOGISTICS_COA
 
 def _load_state_from_kernel():
@@ -26,7 +28,7 @@ def _load_state_from_kernel():
         return
 
     # 3. CONNECT
-    engine = create_engine(f'sqlite:///{db_file_path}')
+    engine = traced_engine(f'sqlite:///{db_file_path}')
     
     try:
         with engine.connect() as conn:
@@ -35,9 +37,9 @@ def _load_state_from_kernel():
         
         # 4. HANDLE EMPTY STATE
         if df_raw.empty:
-            st.session_state.general_ledger = pd.DataFrame(columns=[
+            get_ledger_store().replace(pd.DataFrame(columns=[
                 'Entry_ID', 'Date', 'Description', 'Reference', 'Code', 'Debit', 'Credit', 'Amount', 'Km', 'Type'
-            ])
+            ]))
             return
 
         # 5. FLATTEN JSON & MAP ACCOUNTS TO CODES
@@ -83,12 +85,53 @@ def _load_state_from_kernel():
                     'Type': row['status']
                 })
 
-        st.session_state.general_ledger = pd.DataFrame(flattened_rows)
+        get_ledger_store().replace(pd.DataFrame(flattened_rows))
 
     except Exception as e:
         st.error(f"⚠️ Cortex Link Error: {e}")
-        st.session_state.general_ledger = pd.DataFrame()
+        get_ledger_store().replace(pd.DataFrame())
 
+def _ledger_export_file(fmt):
+    """Streams the ledger into a temp file for the download button (runs on click only)."""
+    fh = tempfile.TemporaryFile()
+    export_ledger(fh, fmt)
+    fh.seek(0)
+    return fh
+
+def _render_ledger_stream():
+    """
+    Keyset-paged view of the persisted ledger (ledger_lines): one page in
+    memory per session, with the page cursors kept in session state.
+    """
+    cursors = st.session_state.setdefault("ledger_page_cursors", [None])
+    page, next_cursor = get_ledger_page(cursors[-1])
+    if page.empty:
+        if len(cursors) > 1:   # the ledger shrank under a deep cursor: restart from the top
+            st.session_state.ledger_page_cursors = [None]
+            st.rerun()
+        st.info("Ledger Empty.")
+        return
+
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    c1, c2, c3, c4, c5 = st.columns([1, 1, 2, 1, 2])
+    if c1.button("⬅️ Newer", disabled=len(cursors) == 1, key="ledger_page_prev"):
+        cursors.pop()
+        st.rerun()
+    if c2.button("Older ➡️", disabled=next_cursor is None, key="ledger_page_next"):
+        cursors.append(next_cursor)
+        st.rerun()
+    c3.caption(f"Page {len(cursors)} • {ledger_line_count():,} lines")
+
+    fmt = c4.selectbox("Format", ["csv", "parquet"], key="ledger_export_fmt", label_visibility="collapsed")
+    c5.download_button(
+        "⬇️ Export Full Ledger", data=lambda: _ledger_export_file(fmt),
+        file_name=f"ledger_lines.{fmt}",
+        mime="text/csv" if fmt == "csv" else "application/vnd.apache.parquet",
+        key="ledger_export",
+    )
+
+@trace_rerun("Finance")
 def render_finance_vertical():
     st.markdown("## 💰 Financial Control | Sovereign Treasury")
     st.caption("v14.0 Modular Engine • Double-Entry Logic • Real-Time Analytics")
@@ -107,11 +150,11 @@ def render_finance_vertical():
     ])
 
     # --- TAB 1: EXECUTIVE DASHBOARD ---
-    with tab_dashboard:
+    with tab_dashboard, trace_section("Executive Dashboard"):
         render_finance_tab()
 
     # --- TAB 2: MANUAL JOURNAL ---
-    with tab_journal:
+    with tab_journal, trace_section("Manual Journal"):
         st.subheader("✍️ Manual General Ledger Entry")
         st.caption("Direct Injection into the Sovereign Kernel")
         
@@ -146,12 +189,9 @@ def render_finance_vertical():
         
         st.divider()
         st.markdown("#### 📜 Live Ledger Stream")
-        if 'general_ledger' in st.session_state and not st.session_state.general_ledger.empty:
-            st.dataframe(st.session_state.general_ledger.head(50), use_container_width=True)
-        else:
-            st.info("Ledger Empty.")
+        _render_ledger_stream()
 
-    with tab_invoices:
+    with tab_invoices, trace_section("Document Repo"):
         st.subheader("📄 Document Repository")
         df_docs = get_billing_docs()
         if not df_docs.empty:
@@ -159,6 +199,6 @@ def render_finance_vertical():
         else:
             st.info("No Invoices or Quotes generated yet.")
 
-    with tab_coa:
+    with tab_coa, trace_section("Chart of Accounts"):
         st.subheader("📚 Master Chart of Accounts")
         st.dataframe(pd.DataFrame(SA_LOGISTICS_COA), use_container_width=True)
@@ -14,17 +14,15 @@ def render_finance_tab():
 
     
 
-    if 'general_ledger' not in st.session_state or st.session_state.general_ledger.empty:
+    # 1. RUN ANALYTICS (aggregated in SQL; no ledger rows are loaded)
 
-        st.warning("Ledger Empty. No financial data to display.")
-
-        return
+    fin_data = get_financial_split()
 
+    if not isinstance(fin_data, dict) or not any(fin_data.values()):
 
+        st.warning("Ledger Empty. No financial data to display.")
 
-    # 1. RUN ANALYTICS
-
-    fin_data = get_financial_split(st.session_state.general_ledger)
+        return
 
     
 
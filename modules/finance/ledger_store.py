@@ -0,0 +1,128 @@
+import pandas as pd
+
+# ==========================================
+# APPEND-OPTIMISED GENERAL LEDGER STORE
+# ==========================================
+# The session GL used to be rebuilt with pd.concat on every posting, which
+# makes bulk postings quadratic. The store keeps new lines in a plain list,
+# seals them into typed DataFrame chunks every CHUNK_SIZE rows and only
+# concatenates (once) when a report asks for the DataFrame view.
+
+GL_COLUMNS = [
+    'Entry_ID', 'Date', 'Description', 'Reference', 'Code', 'Account',
+    'Debit', 'Credit', 'Type', 'Source_Module'
+]
+
+GL_DTYPES = {
+    'Entry_ID': 'object', 'Date': 'object', 'Description': 'object', 'Reference': 'object',
+    'Code': 'object', 'Account': 'object', 'Debit': 'float64', 'Credit': 'float64',
+    'Type': 'object', 'Source_Module': 'object',
+}
+
+CHUNK_SIZE = 4096
+
+
+def _typed_chunk(rows):
+    """Row dicts -> DataFrame with the GL dtypes applied to known columns."""
+    df = pd.DataFrame(rows)
+    for col, dtype in GL_DTYPES.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0) if dtype == 'float64' else df[col].astype(dtype)
+    return df
+
+
+class LedgerStore:
+    """
+    Chunked, append-only GL buffer with a lazily compacted DataFrame view.
+    loader (optional) is called on first read to seed the store from disk,
+    so booting the OS no longer pulls the whole ledger into memory.
+    """
+
+    def __init__(self, loader=None, columns=None):
+        self.columns = list(columns or GL_COLUMNS)
+        self._loader = loader
+        self._seeded = False   # a loader has run, or the contents were set by append / replace
+        self._chunks = []    # sealed, typed DataFrames
+        self._pending = []   # row dicts not yet sealed
+        self._view = None    # cached compacted frame (None = stale)
+        self._rows = 0
+
+    # No __len__: Streamlit's usage metrics call len() on values put in
+    # session_state, which would run the loader as soon as the store exists.
+    def row_count(self):
+        self.load()
+        return self._rows
+
+    @property
+    def empty(self):
+        return self.row_count() == 0
+
+    def attach_loader(self, loader):
+        """Sets the loader if nothing has been read or written yet. Returns True when attached."""
+        if self._seeded:
+            return False
+        self._loader = loader
+        return True
+
+    def load(self):
+        """Runs the pending loader once. Call before persisting new lines so they are not loaded twice."""
+        if self._loader is None:
+            return
+        loader, self._loader = self._loader, None
+        self._seeded = True
+        try:
+            df = loader()
+        except Exception:
+            df = pd.DataFrame()
+        if df is not None and not df.empty:
+            self._chunks.insert(0, df)
+            self._rows += len(df)
+            self._view = None
+
+    def _seal(self):
+        if self._pending:
+            self._chunks.append(_typed_chunk(self._pending))
+            self._pending = []
+
+    def append(self, rows):
+        """Adds GL line dicts. Amortised O(1) per row; no DataFrame is rebuilt."""
+        if not rows:
+            return
+        self.load()
+        self._seeded = True
+        self._pending.extend(rows)
+        self._rows += len(rows)
+        self._view = None
+        if len(self._pending) >= CHUNK_SIZE:
+            self._seal()
+
+    def append_saved(self, rows):
+        """
+        Adds lines that were just written to disk. A store that has not run
+        its loader yet will read them from there, so it is left unloaded.
+        """
+        if self._loader is None:
+            self.append(rows)
+
+    def replace(self, df):
+        """Swaps the whole ledger for df (e.g. after reloading from another source)."""
+        self._loader = None
+        self._seeded = True
+        self._chunks = [] if df is None or df.empty else [df]
+        self._pending = []
+        self._rows = 0 if df is None else len(df)
+        self._view = None
+
+    def frame(self):
+        """Compacted DataFrame view. Concatenates at most once per batch of appends."""
+        self.load()
+        if self._view is None:
+            self._seal()
+            chunks = [c for c in self._chunks if not c.empty]
+            if not chunks:
+                chunks = [pd.DataFrame(columns=self.columns)]
+            elif len(chunks) > 1:
+                chunks = [pd.concat(chunks, ignore_index=True)]
+            self._chunks = chunks
+            self._view = chunks[0]
+        return self._view
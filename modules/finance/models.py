@@ -4,11 +4,46 @@ from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, J
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
+from modules.core.reference_data import session_reference
+
 # ==========================================
 # PART 1: LEGACY FRONTEND (Streamlit State)
 # Preserves existing dashboard functionality
 # ==========================================
 
+# SEED DATA: Standard South African SME Structure
+COA_COLUMNS = ['Code', 'Name', 'Type', 'Parent']
+SEED_COA = [
+    # ASSETS (1000 series)
+    {'Code': 1000, 'Name': 'Bank - FNB Main', 'Type': 'ASSET', 'Parent': None},
+    {'Code': 1100, 'Name': 'Petty Cash', 'Type': 'ASSET', 'Parent': None},
+    {'Code': 1200, 'Name': 'Accounts Receivable (Debtors)', 'Type': 'ASSET', 'Parent': None},
+    {'Code': 1500, 'Name': 'Inventory - Stock', 'Type': 'ASSET', 'Parent': None},
+    {'Code': 1600, 'Name': 'Fixed Assets - Vehicles', 'Type': 'ASSET', 'Parent': None},
+
+    # LIABILITIES (2000 series)
+    {'Code': 2000, 'Name': 'Accounts Payable (Creditors)', 'Type': 'LIABILITY', 'Parent': None},
+    {'Code': 2200, 'Name': 'VAT Control Account', 'Type': 'LIABILITY', 'Parent': None},
+    {'Code': 2500, 'Name': 'Bank Loan - Vehicle Finance', 'Type': 'LIABILITY', 'Parent': None},
+
+    # EQUITY (3000 series)
+    {'Code': 3000, 'Name': 'Share Capital', 'Type': 'EQUITY', 'Parent': None},
+    {'Code': 3100, 'Name': 'Retained Earnings', 'Type': 'EQUITY', 'Parent': None},
+
+    # INCOME (4000 series)
+    {'Code': 4000, 'Name': 'Logistics Revenue (Transport)', 'Type': 'INCOME', 'Parent': None},
+    {'Code': 4500, 'Name': 'Trade Revenue (Sourcing)', 'Type': 'INCOME', 'Parent': None},
+
+    # EXPENSES (5000+ series)
+    {'Code': 5000, 'Name': 'Cost of Sales - Goods', 'Type': 'EXPENSE', 'Parent': None},
+    {'Code': 5100, 'Name': 'Cost of Sales - Freight', 'Type': 'EXPENSE', 'Parent': None},
+    {'Code': 5200, 'Name': 'Fuel & Oil', 'Type': 'EXPENSE', 'Parent': None},
+    {'Code': 5300, 'Name': 'Vehicle Maintenance', 'Type': 'EXPENSE', 'Parent': None},
+    {'Code': 6000, 'Name': 'Salaries & Wages', 'Type': 'EXPENSE', 'Parent': None},
+    {'Code': 6100, 'Name': 'Rent & Utilities', 'Type': 'EXPENSE', 'Parent': None},
+    {'Code': 6200, 'Name': 'Consulting Fees', 'Type': 'EXPENSE', 'Parent': None},
+]
+
 def init_finance_db():
     """
     Initializes the Double-Entry General Ledger.
@@ -18,46 +53,8 @@ def init_finance_db():
     """
     
     # --- 1. THE CHART OF ACCOUNTS (The Skeleton) ---
-    if 'chart_of_accounts' not in st.session_state:
-        st.session_state.chart_of_accounts = pd.DataFrame(columns=[
-            'Code', 'Name', 'Type', 'Parent'
-        ])
-        
-        # SEED DATA: Standard South African SME Structure
-        seed_coa = [
-            # ASSETS (1000 series)
-            {'Code': 1000, 'Name': 'Bank - FNB Main', 'Type': 'ASSET', 'Parent': None},
-            {'Code': 1100, 'Name': 'Petty Cash', 'Type': 'ASSET', 'Parent': None},
-            {'Code': 1200, 'Name': 'Accounts Receivable (Debtors)', 'Type': 'ASSET', 'Parent': None},
-            {'Code': 1500, 'Name': 'Inventory - Stock', 'Type': 'ASSET', 'Parent': None},
-            {'Code': 1600, 'Name': 'Fixed Assets - Vehicles', 'Type': 'ASSET', 'Parent': None},
-
-            # LIABILITIES (2000 series)
-            {'Code': 2000, 'Name': 'Accounts Payable (Creditors)', 'Type': 'LIABILITY', 'Parent': None},
-            {'Code': 2200, 'Name': 'VAT Control Account', 'Type': 'LIABILITY', 'Parent': None},
-            {'Code': 2500, 'Name': 'Bank Loan - Vehicle Finance', 'Type': 'LIABILITY', 'Parent': None},
-
-            # EQUITY (3000 series)
-            {'Code': 3000, 'Name': 'Share Capital', 'Type': 'EQUITY', 'Parent': None},
-            {'Code': 3100, 'Name': 'Retained Earnings', 'Type': 'EQUITY', 'Parent': None},
-
-            # INCOME (4000 series)
-            {'Code': 4000, 'Name': 'Logistics Revenue (Transport)', 'Type': 'INCOME', 'Parent': None},
-            {'Code': 4500, 'Name': 'Trade Revenue (Sourcing)', 'Type': 'INCOME', 'Parent': None},
-
-            # EXPENSES (5000+ series)
-            {'Code': 5000, 'Name': 'Cost of Sales - Goods', 'Type': 'EXPENSE', 'Parent': None},
-            {'Code': 5100, 'Name': 'Cost of Sales - Freight', 'Type': 'EXPENSE', 'Parent': None},
-            {'Code': 5200, 'Name': 'Fuel & Oil', 'Type': 'EXPENSE', 'Parent': None},
-            {'Code': 5300, 'Name': 'Vehicle Maintenance', 'Type': 'EXPENSE', 'Parent': None},
-            {'Code': 6000, 'Name': 'Salaries & Wages', 'Type': 'EXPENSE', 'Parent': None},
-            {'Code': 6100, 'Name': 'Rent & Utilities', 'Type': 'EXPENSE', 'Parent': None},
-            {'Code': 6200, 'Name': 'Consulting Fees', 'Type': 'EXPENSE', 'Parent': None},
-        ]
-        st.session_state.chart_of_accounts = pd.concat(
-            [st.session_state.chart_of_accounts, pd.DataFrame(seed_coa)], 
-            ignore_index=True
-        )
+    # Loaded once per process and shared; each session gets a copy-on-write view
+    session_reference('chart_of_accounts', 'coa')
 
     # --- 2. JOURNAL ENTRIES (The Brain - Headers) ---
     if 'journal_entries' not in st.session_state:
@@ -5,14 +5,75 @@ from modules.finance.models import init_finance_db
 
 # NEW: Persistence Import (Sprint 4.0)
 try:
-    from modules.core.db_manager import save_journal_entry
+    from modules.core.db_manager import save_journal_entry, save_journal_entries, get_account_balances, load_ledger_to_dataframe
 except ImportError:
     # Fallback if core not initialized yet
     def save_journal_entry(*args, **kwargs): pass
+    def save_journal_entries(*args, **kwargs): pass
+    get_account_balances = None
+    load_ledger_to_dataframe = None
+
+from modules.finance.ledger_store import LedgerStore
+
+# ==========================================
+# 0. THE LEDGER STORE (SESSION GL)
+# ==========================================
+def get_ledger_store(loader=None):
+    """
+    Session GL store, seeded lazily from disk on first read (see vas_kernel).
+    Whichever page creates it, the store reads ledger_lines before its first
+    append; a loader passed before that first read replaces the default one.
+    """
+    if 'ledger_store' not in st.session_state:
+        st.session_state.ledger_store = LedgerStore(loader=loader or load_ledger_to_dataframe)
+    elif loader is not None:
+        st.session_state.ledger_store.attach_loader(loader)
+    return st.session_state.ledger_store
+
+def get_general_ledger():
+    """Compacted DataFrame view of the session GL, for reports and dashboards."""
+    return get_ledger_store().frame()
 
 # ==========================================
 # 1. THE WRITER (TRANSACTION ENGINE)
 # ==========================================
+def _check_balance(lines):
+    total_debit = sum([l['debit'] for l in lines])
+    total_credit = sum([l['credit'] for l in lines])
+    
+    if abs(total_debit - total_credit) > 0.01:
+        return f"⛔ Entry Unbalanced! Debits: {total_debit} | Credits: {total_credit}"
+    return None
+
+def _coa_lookup():
+    """Code -> (Name, Type) map, built once per posting instead of a filter per line."""
+    if 'chart_of_accounts' in st.session_state:
+        coa = st.session_state.chart_of_accounts
+    else:
+        coa = pd.DataFrame(columns=['Code', 'Name', 'Type'])
+    return {row.Code: (row.Name, row.Type) for row in coa.drop_duplicates('Code').itertuples()}
+
+def _enrich_lines(lines, coa):
+    # We look up the Account Name to store it permanently
+    for l in lines:
+        l['name'], l['type'] = coa.get(l['code'], ("Unknown", "Unknown"))
+    return lines
+
+def _gl_rows(entry_id, date, description, reference, enriched_lines, source_module):
+    # We flatten the lines for the DataFrame view used by the UI
+    return [{
+        'Entry_ID': entry_id,
+        'Date': str(date),
+        'Description': description,
+        'Reference': reference,
+        'Code': el['code'],
+        'Account': el['name'],
+        'Debit': el['debit'],
+        'Credit': el['credit'],
+        'Type': el['type'],
+        'Source_Module': source_module
+    } for el in enriched_lines]
+
 def create_journal_entry(date, description, reference, lines, source_module="MANUAL"):
     """
     Creates a Double-Entry Journal AND Persists to Disk.
@@ -21,41 +82,16 @@ def create_journal_entry(date, description, reference, lines, source_module="MAN
     init_finance_db()
     
     # 1. Validate Balance
-    total_debit = sum([l['debit'] for l in lines])
-    total_credit = sum([l['credit'] for l in lines])
-    
-    if abs(total_debit - total_credit) > 0.01:
-        return False, f"⛔ Entry Unbalanced! Debits: {total_debit} | Credits: {total_credit}"
+    error = _check_balance(lines)
+    if error:
+        return False, error
 
     # 2. Create Header ID
     # Unique ID based on timestamp to avoid collisions
     entry_id = f"JRN-{int(datetime.datetime.now().timestamp())}"
     
     # 3. Augment Lines with Names (from COA)
-    # We look up the Account Name to store it permanently
-    if 'chart_of_accounts' in st.session_state:
-        coa = st.session_state.chart_of_accounts
-    else:
-        coa = pd.DataFrame(columns=['Code', 'Name', 'Type'])
-
-    enriched_lines = []
-    
-    for l in lines:
-        # Find account name
-        acct_name = "Unknown"
-        acct_type = "Unknown"
-        
-        if not coa.empty:
-            # Safe lookup
-            acct_row = coa[coa['Code'] == l['code']]
-            if not acct_row.empty:
-                acct_name = acct_row.iloc[0]['Name']
-                acct_type = acct_row.iloc[0]['Type']
-        
-        # Add to enriched list
-        l['name'] = acct_name
-        l['type'] = acct_type
-        enriched_lines.append(l)
+    enriched_lines = _enrich_lines(lines, _coa_lookup())
 
     # 4. PERSIST TO DISK (The 'Etching in Stone')
     try:
@@ -63,52 +99,98 @@ def create_journal_entry(date, description, reference, lines, source_module="MAN
     except Exception as e:
         return False, f"Database Error: {e}"
 
-    # 5. UPDATE SESSION STATE (Instant Feedback)
-    # We flatten the lines for the DataFrame view used by the UI
-    new_rows = []
-    for el in enriched_lines:
-        new_rows.append({
-            'Entry_ID': entry_id,
-            'Date': str(date),
-            'Description': description,
-            'Reference': reference,
-            'Code': el['code'],
-            'Account': el['name'],
-            'Debit': el['debit'],
-            'Credit': el['credit'],
-            'Type': el['type'],
-            'Source_Module': source_module
-        })
-    
-    # Check if GL exists, if not create it
-    if 'general_ledger' not in st.session_state:
-        st.session_state.general_ledger = pd.DataFrame(columns=[
-             'Entry_ID', 'Date', 'Description', 'Reference', 'Code', 'Account', 'Debit', 'Credit', 'Type', 'Source_Module'
-        ])
-
-    st.session_state.general_ledger = pd.concat(
-        [st.session_state.general_ledger, pd.DataFrame(new_rows)], 
-        ignore_index=True
-    )
+    # 5. UPDATE SESSION STATE (Instant Feedback; a store not loaded yet reads them from disk)
+    get_ledger_store().append_saved(_gl_rows(entry_id, date, description, reference, enriched_lines, source_module))
     
     return True, entry_id
 
+def create_journal_entries(batch):
+    """
+    Bulk posting. Validates every entry first, then persists all lines in
+    ONE transaction — either the whole batch lands or none of it does.
+    batch = [{'date': ..., 'description': ..., 'reference': ...,
+              'lines': [...], 'source_module': 'MANUAL'}, ...]
+    Returns: (True, [entry_ids]) or (False, error message)
+    """
+    init_finance_db()
+    
+    # 1. Validate Balance (all-or-nothing)
+    for i, entry in enumerate(batch):
+        error = _check_balance(entry['lines'])
+        if error:
+            return False, f"Entry {i + 1} ({entry.get('reference', '')}): {error}"
+
+    # 2. Header IDs share the timestamp, suffixed to stay unique within the batch
+    stamp = int(datetime.datetime.now().timestamp())
+    coa = _coa_lookup()
+    entries = []
+    for i, entry in enumerate(batch):
+        entries.append({
+            'entry_id': f"JRN-{stamp}-{i + 1:04d}",
+            'date': entry['date'],
+            'description': entry['description'],
+            'reference': entry['reference'],
+            'lines': _enrich_lines(entry['lines'], coa),
+            'source_module': entry.get('source_module', "MANUAL"),
+        })
+
+    # 3. PERSIST TO DISK (single transaction)
+    try:
+        save_journal_entries(entries)
+    except Exception as e:
+        return False, f"Database Error: {e}"
+
+    # 4. UPDATE SESSION STATE (one append for the whole batch)
+    rows = []
+    for e in entries:
+        rows.extend(_gl_rows(e['entry_id'], e['date'], e['description'], e['reference'], e['lines'], e['source_module']))
+    get_ledger_store().append_saved(rows)
+    
+    return True, [e['entry_id'] for e in entries]
+
 # ==========================================
 # 2. THE READERS (REPORTING ENGINE)
 # ==========================================
 
-def get_trial_balance():
+def _session_trial_balance():
+    """Fallback when the core DB is offline: aggregates the session GL."""
+    df = get_general_ledger()
+    if df.empty or 'Code' not in df.columns:
+        return pd.DataFrame()
+
+    # Group by Account
+    return df.groupby(['Code', 'Account', 'Type'])[['Debit', 'Credit']].sum().reset_index()
+
+def get_trial_balance(period=None, since=None):
     """
     Aggregates the General Ledger into a Trial Balance.
+    Reads the materialised account_balances table (O(accounts), not O(lines)).
+    period='YYYY-MM' gives the balance as at the end of that month;
+    since='YYYY-MM' keeps only the months from it on (cumulative when None).
     Returns: DataFrame [Code, Name, Type, Debit, Credit, Net_Balance]
     """
-    if 'general_ledger' not in st.session_state or st.session_state.general_ledger.empty:
-        return pd.DataFrame()
+    if get_account_balances is None:
+        tb = _session_trial_balance()
+    else:
+        bal = get_account_balances(period, since)
+        if bal.empty:
+            return pd.DataFrame()
 
-    df = st.session_state.general_ledger.copy()
-    
-    # Group by Account
-    tb = df.groupby(['Code', 'Account', 'Type'])[['Debit', 'Credit']].sum().reset_index()
+        # Codes are stored as text ('4000', '1200-AR'); the COA is keyed on the numeric prefix
+        init_finance_db()
+        coa = _coa_lookup()
+        key = pd.to_numeric(bal['account_code'].astype(str).str.split('-').str[0], errors='coerce')
+        acct = [coa.get(k, ("Unknown", "Unknown")) for k in key]
+        tb = pd.DataFrame({
+            'Code': bal['account_code'],
+            'Account': [a[0] for a in acct],
+            'Type': [a[1] for a in acct],
+            'Debit': bal['d'],
+            'Credit': bal['c'],
+        })
+
+    if tb.empty:
+        return tb
     
     # Calculate Net
     # Asset/Expense: Debit - Credit
@@ -117,12 +199,31 @@ def get_trial_balance():
     
     return tb
 
-def get_income_statement():
+def get_ledger_amounts(period=None, since=None):
+    """
+    One row per account in the legacy dashboard shape, from the trial balance
+    (so from account_balances, not from the session GL).
+    period / since as for get_trial_balance.
+    Returns: DataFrame [Code (int), Account, Amount] with Amount = Credit - Debit
+    """
+    tb = get_trial_balance(period, since)
+    if tb.empty:
+        return pd.DataFrame(columns=['Code', 'Account', 'Amount'])
+
+    code = pd.to_numeric(tb['Code'].astype(str).str.split('-').str[0], errors='coerce')
+    df = pd.DataFrame({'Code': code, 'Account': tb['Account'], 'Amount': tb['Credit'] - tb['Debit']})
+    df = df.dropna(subset=['Code'])
+    df['Code'] = df['Code'].astype(int)
+    return df.reset_index(drop=True)
+
+def get_income_statement(period=None, since=None):
     """
     Generates the P&L from the Trial Balance.
+    period='YYYY-MM' reports that month alone; pass since='YYYY-MM' for a
+    longer run of months (e.g. year to date). No period: all time.
     Returns: (DataFrame, net_profit_value)
     """
-    tb = get_trial_balance()
+    tb = get_trial_balance(period, since or period)
     
     if tb.empty:
         return None, 0.0
@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-from modules.core.db_manager import load_fuel_inventory
+from modules.logistics.fuel_forensics import fuel_inventory
 
 def render_fuel_sovereignty():
     """
@@ -11,8 +10,8 @@ def render_fuel_sovereignty():
     st.caption("Energy Custody & Consumption Analytics (Hardened Kernel)")
     st.divider()
 
-    # 1. Pull Live Data from the Hardened Kernel
-    df_fuel = load_fuel_inventory()
+    # 1. Pull Live Data (latest tank levels from fuel_series)
+    df_fuel = fuel_inventory()
     
     # 2. Render Metrics
     if not df_fuel.empty:
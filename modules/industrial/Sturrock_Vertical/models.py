@@ -2,60 +2,68 @@ import streamlit as st
 import pandas as pd
 import datetime
 
+from modules.core.reference_data import register_reference, session_reference
+
+# THE ASSET TREE: schema + pre-seed (crucial for the demo to look active)
+ASSET_COLUMNS = [
+    'Asset_ID',       # e.g., MR-LOG-001
+    'Division',       # Martin & Robson / Shand / LAS
+    'Product',        # The item name
+    'Client',         # End user (e.g., Glencore)
+    'Location',       # Physical location
+    'Status',         # Operational status
+    'Compliance',     # ISO/OCIMF/SARS status
+    'Created_At'
+]
+
+SEED_ASSETS = [
+    {
+        "Asset_ID": "MR-LOG-402",
+        "Division": "Martin & Robson", 
+        "Product": "Magnetite (Grade A - Bulk)", 
+        "Client": "Glencore",
+        "Location": "Richards Bay Terminal",
+        "Status": "In Transit",
+        "Compliance": "Export Cleared"
+    },
+    {
+        "Asset_ID": "SH-MFG-009", 
+        "Division": "Shand Engineering",
+        "Product": "Marine Breakaway Coupling", 
+        "Client": "Shell",
+        "Location": "Grimsby Plant (UK)",
+        "Status": "Manufacturing",
+        "Compliance": "OCIMF Pending"
+    },
+    {
+        "Asset_ID": "LAS-IOT-88", 
+        "Division": "Liquid Automation",
+        "Product": "Smart Nozzle Reader", 
+        "Client": "Anglo Platinum",
+        "Location": "Mogalakwena Mine",
+        "Status": "Active",
+        "Compliance": "SARS Logged"
+    }
+]
+
+
+def _load_seed_assets():
+    df = pd.DataFrame(SEED_ASSETS)
+    df['Created_At'] = str(datetime.date.today())
+    return df[ASSET_COLUMNS]
+
+
+register_reference('industrial_assets', _load_seed_assets)
+
+
 def init_industrial_db():
     """
     Initializes the 'Iron Vault' - The Asset & Compliance Database.
     PRE-SEEDED with Sturrock & Robson data for the Nazeem demo.
     """
     # 1. THE ASSET TREE (The Physical Reality)
-    if 'asset_registry' not in st.session_state:
-        # Define the schema
-        columns = [
-            'Asset_ID',       # e.g., MR-LOG-001
-            'Division',       # Martin & Robson / Shand / LAS
-            'Product',        # The item name
-            'Client',         # End user (e.g., Glencore)
-            'Location',       # Physical location
-            'Status',         # Operational status
-            'Compliance',     # ISO/OCIMF/SARS status
-            'Created_At'
-        ]
-        
-        # PRE-SEED DATA (Crucial for the demo to look active)
-        seed_data = [
-            {
-                "Asset_ID": "MR-LOG-402",
-                "Division": "Martin & Robson", 
-                "Product": "Magnetite (Grade A - Bulk)", 
-                "Client": "Glencore",
-                "Location": "Richards Bay Terminal",
-                "Status": "In Transit",
-                "Compliance": "Export Cleared",
-                "Created_At": str(datetime.date.today())
-            },
-            {
-                "Asset_ID": "SH-MFG-009", 
-                "Division": "Shand Engineering",
-                "Product": "Marine Breakaway Coupling", 
-                "Client": "Shell",
-                "Location": "Grimsby Plant (UK)",
-                "Status": "Manufacturing",
-                "Compliance": "OCIMF Pending",
-                "Created_At": str(datetime.date.today())
-            },
-            {
-                "Asset_ID": "LAS-IOT-88", 
-                "Division": "Liquid Automation",
-                "Product": "Smart Nozzle Reader", 
-                "Client": "Anglo Platinum",
-                "Location": "Mogalakwena Mine",
-                "Status": "Active",
-                "Compliance": "SARS Logged",
-                "Created_At": str(datetime.date.today())
-            }
-        ]
-        
-        st.session_state.asset_registry = pd.DataFrame(seed_data, columns=columns)
+    # Shared across sessions; each session gets a copy-on-write view it can update
+    session_reference('asset_registry', 'industrial_assets')
 
     # 2. THE COMPLIANCE VAULT (The Paperwork)
     if 'compliance_vault' not in st.session_state:
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import sessionmaker
+from modules.core.query_trace import trace_rerun, trace_section, traced_engine
 
 # --- CROSS-MODULE IMPORTS (The Bridge) ---
 from modules.finance.settlement import SettlementEngine
@@ -14,7 +15,7 @@ def get_engine():
     if not os.path.exists(db_path):
         st.error(f"❌ DATABASE MISSING: {db_path}")
         return None
-    return create_engine(f'sqlite:///{db_path}')
+    return traced_engine(f'sqlite:///{db_path}')
 
 # --- ACTION: SAVE RFQ ---
 def save_new_rfq(client, item, qty, rate, status="DRAFT"):
@@ -88,6 +89,7 @@ def promote_to_finance(rfq_id, client_name, amount, desc):
     return result
 
 # --- MAIN RENDER ---
+@trace_rerun("Industrial")
 def render_industrial_vertical():
     st.markdown("## 🏭 Industrial Portal | Sourcing Nexus")
     st.caption("v14.2 Integrated Deal Engine • Linked to Finance Module")
@@ -124,7 +126,7 @@ def render_industrial_vertical():
     ])
 
     # --- TAB 1: SEARCH ---
-    with tab_search:
+    with tab_search, trace_section("Global Search"):
         st.subheader("Global Sourcing Search")
         c_search, c_btn = st.columns([4, 1])
         search_term = c_search.text_input("Find Industrial Equipment...", placeholder="e.g. Cement, Coal")
@@ -145,7 +147,7 @@ def render_industrial_vertical():
                     st.warning("No matches found.")
 
     # --- TAB 2: DEAL MANAGER (The Integration Point) ---
-    with tab_rfq:
+    with tab_rfq, trace_section("Deal Manager"):
         c1, c2 = st.columns([2, 1])
         c1.subheader("Deal Flow & Quotations")
         
@@ -191,7 +193,7 @@ def render_industrial_vertical():
             st.info("No Deals in Pipeline.")
 
     # --- TAB 3: REGISTRY ---
-    with tab_registry:
+    with tab_registry, trace_section("Origin Registry"):
         st.subheader("Register Primary Origins")
         if not df_origins.empty:
             st.dataframe(df_origins[['name', 'type', 'location', 'product', 'capacity']], use_container_width=True)
@@ -211,6 +213,6 @@ def render_industrial_vertical():
                         st.rerun()
 
     # --- TAB 4: STOCKPILES ---
-    with tab_stockpiles:
+    with tab_stockpiles, trace_section("Virtual Stockpiles"):
         st.subheader("Virtual Inventory Management")
         st.info("Aggregated Stockpile View Offline.")
@@ -1,15 +1,22 @@
 import streamlit as st
 import pandas as pd
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+
+from modules.core.query_trace import traced_engine
+from modules.logistics.road_network import corridor_leg
 
 # --- CONFIGURATION: LOGISTICS CORRIDORS ---
+# Lane -> (origin hub, destination hub, risk); distance and tolls come from the hub road network
+LANES = {
+    "N3: DBN Port -> JHB City Deep": ("DBN Port", "JHB City Deep", "Medium"),
+    "N1: CPT -> JHB": ("CPT", "JHB", "Low"),
+    "N4: Maputo -> Witbank": ("Maputo", "Witbank", "High"),
+    "N1: JHB -> Musina (Border)": ("JHB", "Musina (Border)", "Medium"),
+    "R33: Mpumalanga -> Richards Bay": ("Mpumalanga", "Richards Bay", "High (Potholes)"),
+}
 CORRIDORS = {
-    "N3: DBN Port -> JHB City Deep": {"dist": 570, "tolls": 2850, "risk": "Medium"},
-    "N1: CPT -> JHB": {"dist": 1400, "tolls": 1900, "risk": "Low"},
-    "N4: Maputo -> Witbank": {"dist": 380, "tolls": 1200, "risk": "High"},
-    "N1: JHB -> Musina (Border)": {"dist": 520, "tolls": 1450, "risk": "Medium"},
-    "R33: Mpumalanga -> Richards Bay": {"dist": 610, "tolls": 850, "risk": "High (Potholes)"}
+    name: {**corridor_leg(origin, dest), "risk": risk} for name, (origin, dest, risk) in LANES.items()
 }
 
 DIESEL_PRICE = 24.50 
@@ -18,7 +25,7 @@ def get_engine():
     db_path = r"C:\Users\Balisa\OneDrive\Documents\Business\Veridian Markets\IT\Python Code\project_cortex\cortex_live.db"
     if not os.path.exists(db_path):
         return None
-    return create_engine(f'sqlite:///{db_path}')
+    return traced_engine(f'sqlite:///{db_path}')
 
 def calculate_route_economics(route_name, truck_efficiency):
     data = CORRIDORS[route_name]
@@ -109,7 +116,7 @@ def render_logistics_vertical():
             eco = calculate_route_economics(selected_route, efficiency)
             
             ec1, ec2, ec3 = st.columns(3)
-            ec1.metric("Distance", f"{eco['distance']} km", eco['risk'])
+            ec1.metric("Distance", f"{eco['distance']:,.0f} km", eco['risk'])
             ec2.metric("Fuel Cost", f"R {eco['fuel_cost']:,.0f}", f"{eco['fuel_cost']/eco['distance']:.2f} R/km")
             ec3.metric("Toll Fees", f"R {eco['toll_cost']:,.0f}", "Est.")
             
@@ -21,8 +21,8 @@ st.write("🚦 Logistics Vertical Booted")
 from modules.logistics.db_utils import (
     init_db,
     load_data,
-    run_query,
 )
+from modules.core.query_trace import trace_rerun, trace_section
 
 try:
     from modules.logistics.db_utils import SCHEMA_VERSION
@@ -35,7 +35,7 @@ except ImportError:
 # =========================================================
 try:
     from modules.logistics.constants import DIESEL_PRICE, CORRIDORS
-    from modules.logistics.services import calculate_route_economics
+    from modules.logistics.services import calculate_route_economics, calculate_route_economics_batch
     from modules.logistics.rules import enrich_fleet_data
 except Exception:
     DIESEL_PRICE = 24.50
@@ -44,6 +44,8 @@ except Exception:
     def calculate_route_economics(r, e):
         return {"total_ops_cost": 0, "fuel_cost": 0, "toll_cost": 0}
 
+    calculate_route_economics_batch = None
+
     def enrich_fleet_data(df):
         return df
 
@@ -67,6 +69,7 @@ except Exception:
 # =========================================================
 # 4. LOGISTICS VERTICAL (MAIN ENTRY POINT)
 # =========================================================
+@trace_rerun("Logistics Cloud")
 def render_logistics_vertical():
 
     # -----------------------------------------------------
@@ -102,18 +105,8 @@ def render_logistics_vertical():
 
             if st.button("Verify RFQ Table"):
                 try:
-                    run_query("""
-                        CREATE TABLE IF NOT EXISTS ind_rfqs (
-                            rfq_id TEXT PRIMARY KEY,
-                            client TEXT,
-                            origin TEXT,
-                            destination TEXT,
-                            tons REAL,
-                            commodity TEXT,
-                            status TEXT,
-                            created_at DATETIME
-                        );
-                    """)
+                    # Re-applies every registered logistics bundle, ind_rfqs included
+                    init_db(force=True)
                     st.success("RFQ table verified and aligned with sovereign schema.")
                 except Exception as e:
                     st.error(f"RFQ Verification Error: {e}")
@@ -168,7 +161,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # MARKET
     # -----------------------------------------------------
-    with tabs[0]:
+    with tabs[0], trace_section("Market"):
         try:
             render_dealstream_marketplace()
         except Exception as e:
@@ -177,7 +170,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # ROUTE PLANNER
     # -----------------------------------------------------
-    with tabs[1]:
+    with tabs[1], trace_section("Route Planner"):
         st.subheader("Algorithmic Quoting Engine")
 
         c1, c2 = st.columns([1, 2])
@@ -204,10 +197,21 @@ def render_logistics_vertical():
             except Exception as e:
                 st.error(f"Economics Error: {e}")
 
+            # Every corridor for this asset in one vectorised call
+            if calculate_route_economics_batch is not None and CORRIDORS:
+                with st.expander("Compare All Corridors"):
+                    df_quotes = calculate_route_economics_batch(list(CORRIDORS.keys()), eff)
+                    st.dataframe(
+                        df_quotes[["route", "distance_km", "fuel_cost", "toll_cost", "total_ops_cost", "suggested_rate", "risk"]]
+                        .sort_values("total_ops_cost"),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+
     # -----------------------------------------------------
     # DISPATCH
     # -----------------------------------------------------
-    with tabs[2]:
+    with tabs[2], trace_section("Dispatch"):
         try:
             render_dispatch_console(df_orders, df_fleet)
         except Exception as e:
@@ -216,7 +220,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # FLEET REGISTRY
     # -----------------------------------------------------
-    with tabs[3]:
+    with tabs[3], trace_section("Fleet Registry"):
         try:
             render_fleet_registry(df_fleet)
         except Exception as e:
@@ -225,7 +229,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # DRIVER OPS
     # -----------------------------------------------------
-    with tabs[4]:
+    with tabs[4], trace_section("Driver"):
         try:
             render_driver_portal(df_fleet)
         except Exception as e:
@@ -234,7 +238,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # FINANCE
     # -----------------------------------------------------
-    with tabs[5]:
+    with tabs[5], trace_section("Finance"):
         try:
             render_finance_view()
         except Exception as e:
@@ -243,7 +247,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # RISK & FUEL
     # -----------------------------------------------------
-    with tabs[6]:
+    with tabs[6], trace_section("Risk & Fuel"):
         try:
             render_risk_view()
         except Exception as e:
@@ -252,7 +256,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # CUSTOMER PORTAL
     # -----------------------------------------------------
-    with tabs[7]:
+    with tabs[7], trace_section("Portal"):
         try:
             render_customer_wizard()
         except Exception as e:
@@ -261,7 +265,7 @@ def render_logistics_vertical():
     # -----------------------------------------------------
     # GPS ENGINE
     # -----------------------------------------------------
-    with tabs[8]:
+    with tabs[8], trace_section("GPS Engine"):
         try:
             render_gps_console()
         except Exception as e:
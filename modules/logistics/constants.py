@@ -122,6 +122,143 @@ CORRIDORS = {
     },
 }
 
+# Connector roads between corridor endpoints. With CORRIDORS they form the
+# hub road network (road_network.py); lengths and tolls agree with the
+# corridors they run alongside.
+ROAD_LINKS = {
+    "N3: Durban -> Pietermaritzburg": {
+        "dist": 80, "tolls": 450, "risk": "Low",
+        "corridor_type": "Port", "road": "Good", "crime": "Medium",
+        "preferred_trailer": "Interlink",
+    },
+    "N3: Harrismith -> JHB City Deep": {
+        "dist": 290, "tolls": 1400, "risk": "Medium",
+        "corridor_type": "Transit", "road": "Good", "crime": "Medium",
+        "preferred_trailer": "Interlink",
+    },
+    "N1: JHB City Deep -> Pretoria": {
+        "dist": 60, "tolls": 0, "risk": "Low",
+        "corridor_type": "Metro", "road": "Good", "crime": "Medium",
+        "preferred_trailer": "Tautliner",
+    },
+    "N1: Cape Town -> Bloemfontein": {
+        "dist": 1000, "tolls": 1300, "risk": "Low",
+        "corridor_type": "Long Haul", "road": "Good", "crime": "Low",
+        "preferred_trailer": "Tautliner",
+    },
+    "N1: Polokwane -> Musina (Beitbridge Border)": {
+        "dist": 190, "tolls": 1170, "risk": "Medium",
+        "corridor_type": "Border", "road": "Fair", "crime": "High",
+        "preferred_trailer": "Flat Deck",
+    },
+    "N12: JHB City Deep -> Witbank": {
+        "dist": 140, "tolls": 120, "risk": "Low",
+        "corridor_type": "Industrial", "road": "Good", "crime": "Medium",
+        "preferred_trailer": "Side Tipper",
+    },
+    "N17: JHB City Deep -> Secunda": {
+        "dist": 130, "tolls": 100, "risk": "Medium",
+        "corridor_type": "Industrial", "road": "Fair", "crime": "Medium",
+        "preferred_trailer": "Tautliner",
+    },
+    "R547: Secunda -> Witbank": {
+        "dist": 90, "tolls": 0, "risk": "Medium",
+        "corridor_type": "Mining", "road": "Poor", "crime": "Medium",
+        "preferred_trailer": "Side Tipper",
+    },
+    "R33: Witbank -> Richards Bay": {
+        "dist": 610, "tolls": 850, "risk": "High",
+        "corridor_type": "Mining", "road": "Poor", "crime": "Medium",
+        "preferred_trailer": "Side Tipper",
+    },
+    "N2: Gqeberha -> East London": {
+        "dist": 300, "tolls": 0, "risk": "Medium",
+        "corridor_type": "Coastal", "road": "Fair", "crime": "Medium",
+        "preferred_trailer": "Tautliner",
+    },
+}
+
+# Hub names that are the same network node (yards, port gates, short names)
+HUB_ALIASES = {
+    "JHB": "JHB City Deep",
+    "Johannesburg": "JHB City Deep",
+    "JHB Yard": "JHB City Deep",
+    "Depot": "JHB City Deep",
+    "Durban Port": "Durban",
+    "DBN": "Durban",
+    "DBN Port": "Durban",
+    "CPT": "Cape Town",
+    "PTA": "Pretoria",
+    "Musina": "Musina (Beitbridge Border)",
+    "Beitbridge": "Musina (Beitbridge Border)",
+    "Musina (Border)": "Musina (Beitbridge Border)",
+    "Emalahleni": "Witbank",
+    "Mpumalanga": "Witbank",
+    "Port Elizabeth": "Gqeberha",
+    "PE": "Gqeberha",
+    "PMB": "Pietermaritzburg",
+}
+
+# Average loaded-truck speed by road condition (corridor hours)
+ROAD_SPEED_KMH = {
+    "Good": 80.0,
+    "Fair": 70.0,
+    "Poor": 60.0,
+}
+
+# Priced distance for a lane that cannot be placed on the network
+UNKNOWN_LANE_KM = 500.0
+UNKNOWN_TRIP_KM = 600.0   # create_trip's flat figure, for a route label off the network
+
+# =========================================================
+# HUB COORDINATES (CORRIDOR ENDPOINTS + RFQ / YARD NAMES)
+# =========================================================
+
+HUB_COORDS = {
+    "JHB City Deep": (-26.2166, 28.0806),
+    "JHB": (-26.2041, 28.0473),
+    "JHB Yard": (-26.1929, 28.0305),
+    "Depot": (-26.2041, 28.0473),
+    "Pretoria": (-25.7479, 28.2293),
+    "Witbank": (-25.8713, 29.2332),
+    "Secunda": (-26.5500, 29.1667),
+    "Rustenburg": (-25.6676, 27.2421),
+    "Botswana Border": (-25.2697, 25.7264),
+    "Polokwane": (-23.9045, 29.4689),
+    "Musina": (-22.3481, 30.0405),
+    "Musina (Beitbridge Border)": (-22.2167, 29.9833),
+    "Maputo": (-25.9692, 32.5732),
+    "Durban Port": (-29.8716, 31.0262),
+    "Durban": (-29.8587, 31.0218),
+    "Pietermaritzburg": (-29.6006, 30.3794),
+    "Harrismith": (-28.2726, 29.1295),
+    "Richards Bay": (-28.7830, 32.0377),
+    "Bloemfontein": (-29.0852, 26.1596),
+    "Cape Town": (-33.9249, 18.4241),
+    "Gqeberha": (-33.9608, 25.6022),
+    "East London": (-33.0292, 27.8546),
+}
+
+# SA regional centroids (prospecting map + milk-run drop fallback)
+REGION_COORDS = {
+    "Gauteng": {"lat": -26.2041, "lon": 28.0473},
+    "KZN": {"lat": -29.8587, "lon": 31.0218},
+    "Western Cape": {"lat": -33.9249, "lon": 18.4241},
+    "Mpumalanga": {"lat": -25.4753, "lon": 30.9694},
+    "Limpopo": {"lat": -23.4013, "lon": 29.4179},
+    "North West": {"lat": -26.6639, "lon": 25.8828},
+    "Free State": {"lat": -28.4541, "lon": 26.7968},
+    "Eastern Cape": {"lat": -32.2968, "lon": 26.4194},
+    "Northern Cape": {"lat": -29.0467, "lon": 21.8569},
+    "Cross-Border": {"lat": -17.8216, "lon": 31.0492}
+}
+
+# Straight-line -> road distance inflation for lanes not in CORRIDORS
+ROAD_DETOUR_FACTOR = 1.25
+
+# Commodities that may only move on hazchem-compliant vehicles
+HAZCHEM_COMMODITIES = {"Chemicals", "Fuels", "Diesel", "Diesel 50ppm", "Acids", "LPG"}
+
 # =========================================================
 # BACKWARDS COMPATIBILITY (CRITICAL)
 # =========================================================
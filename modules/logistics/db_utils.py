@@ -1,19 +1,31 @@
+import os
+
 import pandas as pd
 import streamlit as st
 from sqlalchemy import create_engine, text
 
+from modules.core.query_cache import cached_read, track_engine_writes
+from modules.core.query_trace import TracedConnection
+from modules.core.schema_registry import ensure_schema, register_schema
+
 # =========================================================
 # DATABASE CORE MODULE — SOVEREIGN LOGISTICS DB
 # =========================================================
 
+SCHEMA_VERSION = 17
 DB_URL = "sqlite:///fleet_data.db"
 
 engine = create_engine(
     DB_URL,
     future=True,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False, "factory": TracedConnection}
 )
 
+# Cache key for this DB; every write through engine bumps the query-cache
+# versions of the tables it touched (statements are timed by TracedConnection)
+DB_KEY = os.path.abspath(engine.url.database)
+track_engine_writes(engine, DB_KEY)
+
 # =========================================================
 # WRITE WRAPPER
 # =========================================================
@@ -31,10 +43,19 @@ def run_query(query_str: str, params: dict | None = None) -> bool:
 # READ WRAPPER
 # =========================================================
 
+def _read(query_str: str, params: dict | None = None) -> pd.DataFrame:
+    with engine.connect() as conn:
+        return pd.read_sql(text(query_str), conn, params=params or {})
+
+
 def load_data(query_str: str, params: dict | None = None) -> pd.DataFrame:
+    """
+    Cached read: served from memory until one of the queried tables is written.
+    Bulk scans (a day of raw pings, a vehicle's fuel series) go through
+    engine.connect() instead, so they do not flood the query cache.
+    """
     try:
-        with engine.connect() as conn:
-            return pd.read_sql(text(query_str), conn, params=params or {})
+        return cached_read(DB_KEY, query_str, params, lambda: _read(query_str, params))
     except Exception as e:
         st.error(f"Read Error: {e}")
         return pd.DataFrame()
@@ -43,115 +64,157 @@ def load_data(query_str: str, params: dict | None = None) -> pd.DataFrame:
 # SCHEMA INITIALISATION (SOVEREIGN LOGISTICS STACK v17)
 # =========================================================
 
-def init_db() -> None:
-    schema_statements = [
-
-        # Fleet Registry
-        """
-        CREATE TABLE IF NOT EXISTS log_vehicles (
-            reg_number TEXT PRIMARY KEY,
-            type TEXT,
-            make_model TEXT,
-            fuel_rating REAL,
-            status TEXT DEFAULT 'Idle',
-            driver_name TEXT,
-            location TEXT DEFAULT 'Depot',
-            last_lat REAL,
-            last_lon REAL
-        );
-        """,
-
-        # Missions
-        """
-        CREATE TABLE IF NOT EXISTS log_missions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            mission_name TEXT,
-            reg_number TEXT,
-            driver_name TEXT,
-            start_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-            end_time DATETIME,
-            status TEXT DEFAULT 'Staged',
-            location TEXT,
-            notes TEXT
-        );
-        """,
-
-        # Dispatch Journal
-        """
-        CREATE TABLE IF NOT EXISTS log_dispatch_journal (
-            trip_id TEXT PRIMARY KEY,
-            rfq_ref TEXT,
-            truck_reg TEXT,
-            driver TEXT,
-            status TEXT,
-            tare_weight REAL,
-            gross_weight REAL,
-            net_weight REAL,
-            ticket_no TEXT,
-            start_time DATETIME,
-            end_time DATETIME
-        );
-        """,
-
-        # RFQs
-        """
-        CREATE TABLE IF NOT EXISTS ind_rfqs (
-            rfq_id TEXT PRIMARY KEY,
-            client TEXT,
-            origin TEXT,
-            destination TEXT,
-            tons REAL,
-            commodity TEXT,
-            status TEXT,
-            created_at DATETIME
-        );
-        """,
-
-        # Risk Incidents
-        """
-        CREATE TABLE IF NOT EXISTS log_risk_incidents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date DATE,
-            type TEXT,
-            severity TEXT,
-            description TEXT,
-            cost_impact REAL,
-            status TEXT
-        );
-        """,
-
-        # Compliance Docs
-        """
-        CREATE TABLE IF NOT EXISTS log_compliance_docs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            doc_type TEXT,
-            ref_number TEXT,
-            expiry_date DATE,
-            status TEXT
-        );
-        """,
-
-        # GPS Pings
-        """
-        CREATE TABLE IF NOT EXISTS gps_pings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            reg_number TEXT,
-            timestamp TEXT,
-            latitude REAL,
-            longitude REAL,
-            speed REAL,
-            heading REAL,
-            ignition INTEGER,
-            signal_quality REAL,
-            source TEXT
-        );
-        """
-    ]
-
-    for stmt in schema_statements:
-        run_query(stmt)
-
-    print("[DB INIT] Sovereign Logistics Schema Loaded (v17)")
+# Registered with the schema registry: runs once per DB (and again only when
+# this list changes), not on every Streamlit rerun
+SCHEMA_STATEMENTS = [
+
+    # Fleet Registry
+    """
+    CREATE TABLE IF NOT EXISTS log_vehicles (
+        reg_number TEXT PRIMARY KEY,
+        type TEXT,
+        make_model TEXT,
+        fuel_rating REAL,
+        status TEXT DEFAULT 'Idle',
+        driver_name TEXT,
+        location TEXT DEFAULT 'Depot',
+        last_lat REAL,
+        last_lon REAL
+    );
+    """,
+
+    # Missions
+    """
+    CREATE TABLE IF NOT EXISTS log_missions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        mission_name TEXT,
+        reg_number TEXT,
+        driver_name TEXT,
+        start_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+        end_time DATETIME,
+        status TEXT DEFAULT 'Staged',
+        location TEXT,
+        notes TEXT
+    );
+    """,
+
+    # Dispatch Journal
+    """
+    CREATE TABLE IF NOT EXISTS log_dispatch_journal (
+        trip_id TEXT PRIMARY KEY,
+        rfq_ref TEXT,
+        truck_reg TEXT,
+        driver TEXT,
+        status TEXT,
+        tare_weight REAL,
+        gross_weight REAL,
+        net_weight REAL,
+        ticket_no TEXT,
+        start_time DATETIME,
+        end_time DATETIME
+    );
+    """,
+
+    # RFQs
+    """
+    CREATE TABLE IF NOT EXISTS ind_rfqs (
+        rfq_id TEXT PRIMARY KEY,
+        client TEXT,
+        origin TEXT,
+        destination TEXT,
+        tons REAL,
+        commodity TEXT,
+        status TEXT,
+        created_at DATETIME
+    );
+    """,
+
+    # Risk Incidents
+    """
+    CREATE TABLE IF NOT EXISTS log_risk_incidents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date DATE,
+        type TEXT,
+        severity TEXT,
+        description TEXT,
+        cost_impact REAL,
+        status TEXT
+    );
+    """,
+
+    # Compliance Docs
+    """
+    CREATE TABLE IF NOT EXISTS log_compliance_docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        doc_type TEXT,
+        ref_number TEXT,
+        expiry_date DATE,
+        status TEXT
+    );
+    """,
+
+    # GPS Pings
+    """
+    CREATE TABLE IF NOT EXISTS gps_pings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        reg_number TEXT,
+        timestamp TEXT,
+        latitude REAL,
+        longitude REAL,
+        speed REAL,
+        heading REAL,
+        ignition INTEGER,
+        signal_quality REAL,
+        source TEXT
+    );
+    """,
+
+    # GPS Latest Position (one row per vehicle, upserted on ingest)
+    """
+    CREATE TABLE IF NOT EXISTS gps_latest (
+        reg_number TEXT PRIMARY KEY,
+        timestamp TEXT,
+        latitude REAL,
+        longitude REAL,
+        speed REAL,
+        heading REAL,
+        ignition INTEGER,
+        signal_quality REAL,
+        source TEXT
+    );
+    """,
+
+    # Backfill gps_latest from history (first run only)
+    """
+    INSERT OR IGNORE INTO gps_latest
+    SELECT reg_number, timestamp, latitude, longitude, speed, heading, ignition, signal_quality, source
+    FROM gps_pings
+    WHERE id IN (SELECT MAX(id) FROM gps_pings GROUP BY reg_number)
+      AND NOT EXISTS (SELECT 1 FROM gps_latest);
+    """
+]
+
+# Standard index set on the hot lookup columns (gps_pings (reg_number,
+# timestamp) ships with the telemetry tables)
+INDEX_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS idx_log_missions_reg_status ON log_missions (reg_number, status)",
+    "CREATE INDEX IF NOT EXISTS idx_log_vehicles_status ON log_vehicles (status)",
+    "CREATE INDEX IF NOT EXISTS idx_ind_rfqs_status ON ind_rfqs (status)",
+    "CREATE INDEX IF NOT EXISTS idx_log_dispatch_journal_status ON log_dispatch_journal (status)",
+    "CREATE INDEX IF NOT EXISTS idx_log_risk_incidents_date ON log_risk_incidents (date)",
+]
+
+# The telemetry modules (telemetry_store, geofence, trajectory, ...) register
+# their own bundles under DB_KEY at import; init_db applies them with these,
+# once per DB
+register_schema(DB_KEY, "logistics.core", SCHEMA_STATEMENTS)
+register_schema(DB_KEY, "logistics.indexes", INDEX_STATEMENTS)
+
+
+def init_db(force: bool = False) -> None:
+    """Verifies the logistics schema once per process; later calls are a set lookup."""
+    if ensure_schema(DB_KEY, force=force):
+        print(f"[DB INIT] Sovereign Logistics Schema Loaded (v{SCHEMA_VERSION})")
 
 # =========================================================
 # DB HEALTH CHECK (EXPOSED TO LOGISTICS CLOUD)
@@ -0,0 +1,391 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# ROBUST IMPORTS
+# ---------------------------------------------------------
+try:
+    from modules.logistics.constants import (
+        CORRIDORS, DIESEL_PRICE, HUB_COORDS, ROAD_DETOUR_FACTOR, HAZCHEM_COMMODITIES,
+    )
+    from modules.logistics.services import calculate_route_economics_batch
+    from modules.logistics.road_network import road_km
+except ImportError:
+    from .constants import (
+        CORRIDORS, DIESEL_PRICE, HUB_COORDS, ROAD_DETOUR_FACTOR, HAZCHEM_COMMODITIES,
+    )
+    from .services import calculate_route_economics_batch
+    from .road_network import road_km
+
+# =========================================================
+# DISPATCH OPTIMISER — GLOBAL TRUCK-TO-ORDER ASSIGNMENT
+# =========================================================
+# Cost of truck j serving order i =
+#     lane cost   (route economics for that truck's efficiency / trailer)
+#   + deadhead    (empty run from the truck's last fix to the order origin)
+# Infeasible pairs (not idle, over capacity, hazchem mismatch) get BIG.
+# The matrix is solved exactly (Hungarian, shortest augmenting path) up to
+# MAX_EXACT_CELLS, and by a greedy cheapest-pair pass above that or when
+# the exact solver runs past its time budget.
+
+BIG = 1e12
+MAX_EXACT_CELLS = 600_000
+DEADHEAD_OPS_PER_KM = 12.0   # Same base ops rate as the route engine
+DEFAULT_EFFICIENCY = 38.0    # L/100km when the fleet row has no fuel_rating
+
+
+# ---------------------------------------------------------
+# 1. GEOGRAPHY
+# ---------------------------------------------------------
+
+def _norm(place):
+    return re.sub(r"\s+", " ", str(place or "")).strip().lower()
+
+
+_HUBS = {_norm(k): v for k, v in HUB_COORDS.items()}
+
+
+def hub_coords(place):
+    """(lat, lon) for a hub / yard name; loose match on prefixes ('JHB' ~ 'JHB City Deep')."""
+    key = _norm(place)
+    if key in _HUBS:
+        return _HUBS[key]
+    for name, coords in _HUBS.items():
+        if key and (name.startswith(key) or key.startswith(name)):
+            return coords
+    return None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+def _corridor_endpoints():
+    ends = {}
+    for name in CORRIDORS:
+        lane = name.split(":", 1)[-1]
+        if "->" in lane:
+            a, b = (_norm(x) for x in lane.split("->", 1))
+            ends[name] = (a, b)
+    return ends
+
+
+def _same_place(a, b):
+    return bool(a and b) and (a == b or a.startswith(b) or b.startswith(a))
+
+
+def resolve_lane(origin, destination):
+    """
+    Maps an RFQ lane to a CORRIDORS key (either direction).
+    Returns (corridor_name or None, road km for unmatched lanes: over the hub
+    road network, else estimated from the straight line).
+    """
+    o, d = _norm(origin), _norm(destination)
+    for name, (a, b) in _corridor_endpoints().items():
+        if (_same_place(o, a) and _same_place(d, b)) or (_same_place(o, b) and _same_place(d, a)):
+            return name, float(CORRIDORS[name]["dist"])
+
+    km = road_km(origin, destination)
+    if not np.isnan(km):
+        return None, km
+
+    po, pd_ = hub_coords(origin), hub_coords(destination)
+    if po and pd_:
+        return None, float(haversine_km(po[0], po[1], pd_[0], pd_[1]) * ROAD_DETOUR_FACTOR)
+    return None, np.nan
+
+
+# ---------------------------------------------------------
+# 2. INPUT NORMALISATION
+# ---------------------------------------------------------
+
+def _split_route(route):
+    parts = re.split(r"\s*(?:→|->)\s*", str(route or ""), maxsplit=1)
+    return (parts[0], parts[1]) if len(parts) == 2 else (None, None)
+
+
+def _col(df, *names, default=None):
+    """First of names present in df, else a column filled with default."""
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series(default, index=df.index, dtype=object if not isinstance(default, (int, float)) else float)
+
+
+def _prepare_orders(df_orders):
+    o = pd.DataFrame(index=df_orders.index)
+    o["rfq_id"] = _col(df_orders, "rfq_id", "id")
+    o["rfq_id"] = o["rfq_id"].where(o["rfq_id"].notna(), pd.Series([f"UNK-{i}" for i in df_orders.index], index=df_orders.index))
+    o["client"] = _col(df_orders, "client", default="Unknown Client")
+    o["commodity"] = _col(df_orders, "commodity", "product", default="General Cargo")
+    o["tons"] = pd.to_numeric(_col(df_orders, "tons", "volume", default=0.0), errors="coerce").fillna(0.0)
+
+    origin = _col(df_orders, "origin")
+    dest = _col(df_orders, "destination")
+    if "route" in df_orders.columns:
+        split = df_orders["route"].map(_split_route)
+        origin = origin.where(origin.notna(), split.str[0])
+        dest = dest.where(dest.notna(), split.str[1])
+    o["origin"], o["destination"] = origin, dest
+
+    # One resolution per distinct lane
+    pairs = list(zip(o["origin"], o["destination"]))
+    lanes = {lane: resolve_lane(*lane) for lane in set(pairs)}
+    o["corridor"] = [lanes[l][0] for l in pairs]
+    o["lane_km"] = [lanes[l][1] for l in pairs]
+
+    coords = [hub_coords(p) for p in o["origin"]]
+    o["origin_lat"] = [c[0] if c else np.nan for c in coords]
+    o["origin_lon"] = [c[1] if c else np.nan for c in coords]
+    o["hazchem"] = o["commodity"].isin(HAZCHEM_COMMODITIES)
+    return o.reset_index(drop=True)
+
+
+def _prepare_fleet(df_fleet):
+    f = pd.DataFrame(index=df_fleet.index)
+    f["reg_number"] = df_fleet["reg_number"]
+    f["driver_name"] = _col(df_fleet, "driver_name")
+    f["max_tons"] = pd.to_numeric(_col(df_fleet, "max_tons", default=34.0), errors="coerce").fillna(34.0)
+    f["efficiency"] = pd.to_numeric(_col(df_fleet, "fuel_rating", default=DEFAULT_EFFICIENCY), errors="coerce").fillna(DEFAULT_EFFICIENCY)
+    f["trailer_type"] = _col(df_fleet, "type")
+    f["hazchem_ok"] = _col(df_fleet, "hazchem_compliant", default=False).fillna(False).astype(bool)
+    if "is_idle" in df_fleet.columns:
+        f["idle"] = df_fleet["is_idle"].fillna(False).astype(bool)
+    else:
+        f["idle"] = _col(df_fleet, "status", default="Idle") == "Idle"
+
+    # Position: last GPS fix, else the named yard, else the main depot
+    yard = [hub_coords(p) or HUB_COORDS["Depot"] for p in _col(df_fleet, "location", "location_clean", default="Depot")]
+    f["lat"] = pd.to_numeric(_col(df_fleet, "last_lat", default=np.nan), errors="coerce").fillna(pd.Series([y[0] for y in yard], index=df_fleet.index))
+    f["lon"] = pd.to_numeric(_col(df_fleet, "last_lon", default=np.nan), errors="coerce").fillna(pd.Series([y[1] for y in yard], index=df_fleet.index))
+    return f.reset_index(drop=True)
+
+
+# ---------------------------------------------------------
+# 3. COST MATRIX
+# ---------------------------------------------------------
+
+def build_cost_matrix(orders, fleet):
+    """
+    orders / fleet are the prepared frames. Returns dict of (n_orders x n_trucks)
+    arrays: cost (BIG where infeasible), lane_cost, deadhead_km, feasible.
+
+    Lane cost is linear in fuel efficiency, so it is priced once per
+    (order, trailer type) at 0 and 100 L/100km and interpolated per truck
+    instead of quoting every pair.
+    """
+    n = len(orders)
+    t_codes, t_uniques = pd.factorize(fleet["trailer_type"])
+    k = len(t_uniques) + 1  # last slot = no trailer type known
+    t_codes = np.where(t_codes < 0, k - 1, t_codes)
+    trailer_slots = list(t_uniques) + [None]
+
+    routes = np.repeat(orders["corridor"].to_numpy(dtype=object), k)
+    tons = np.repeat(orders["tons"].to_numpy(), k)
+    km = np.repeat(orders["lane_km"].fillna(0.0).to_numpy(), k)
+    trailers = np.tile(np.array(trailer_slots, dtype=object), n)
+
+    q0 = calculate_route_economics_batch(routes, 0.0, tons, trailers, fallback_distance=km)["total_ops_cost"].to_numpy()
+    q1 = calculate_route_economics_batch(routes, 100.0, tons, trailers, fallback_distance=km)["total_ops_cost"].to_numpy()
+    base = q0.reshape(n, k)[:, t_codes]
+    slope = ((q1 - q0) / 100.0).reshape(n, k)[:, t_codes]
+    eff = fleet["efficiency"].to_numpy()
+    lane_cost = base + slope * eff[None, :]
+
+    deadhead_km = haversine_km(
+        orders["origin_lat"].to_numpy()[:, None], orders["origin_lon"].to_numpy()[:, None],
+        fleet["lat"].to_numpy()[None, :], fleet["lon"].to_numpy()[None, :],
+    ) * ROAD_DETOUR_FACTOR
+    deadhead_km = np.nan_to_num(deadhead_km, nan=0.0)
+    deadhead_cost = deadhead_km * ((eff[None, :] / 100) * DIESEL_PRICE + DEADHEAD_OPS_PER_KM)
+
+    feasible = (
+        fleet["idle"].to_numpy()[None, :]
+        & (fleet["max_tons"].to_numpy()[None, :] >= orders["tons"].to_numpy()[:, None])
+        & (~orders["hazchem"].to_numpy()[:, None] | fleet["hazchem_ok"].to_numpy()[None, :])
+    )
+    cost = np.where(feasible, lane_cost + deadhead_cost, BIG)
+    return {"cost": cost, "lane_cost": lane_cost, "deadhead_km": deadhead_km,
+            "deadhead_cost": deadhead_cost, "feasible": feasible}
+
+
+# ---------------------------------------------------------
+# 4. SOLVERS
+# ---------------------------------------------------------
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def _hungarian(cost, deadline=None):
+    """
+    Minimum-cost assignment for an n x m matrix with n <= m
+    (Jonker-Volgenant style shortest augmenting paths, vectorised over columns).
+    - rows are warm-started on their cheapest column where it is still free
+    - every column reached at the current distance is settled in one pass, so
+      the ties of a real order book (same lane, same tonnage) cost one 2-D
+      scan instead of one Python step each
+    Returns col_of_row (length n).
+    """
+    n, m = cost.shape
+    u = np.zeros(n)
+    v = np.zeros(m)                            # free columns keep v = 0 (rectangular optimality)
+    row_of = np.full(m, -1, dtype=np.int64)
+    col_of = np.full(n, -1, dtype=np.int64)
+
+    # Warm start: u = row minima keeps every reduced cost >= 0
+    best = cost.argmin(axis=1)
+    u[:] = cost[np.arange(n), best]
+    pending = []
+    for i in range(n):
+        if row_of[best[i]] < 0:
+            row_of[best[i]] = i
+            col_of[i] = best[i]
+        else:
+            pending.append(i)
+
+    cols = np.arange(m)
+    for i in pending:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _BudgetExceeded()
+
+        # Dijkstra over reduced costs from row i
+        dist = cost[i] - u[i] - v
+        pred = np.full(m, i, dtype=np.int64)
+        settled = np.zeros(m, dtype=bool)
+        while True:
+            masked = np.where(settled, np.inf, dist)
+            mu = masked.min()
+            frontier = np.flatnonzero(masked == mu)
+            free = frontier[row_of[frontier] < 0]
+            if free.size:
+                end = int(free[0])
+                break
+            settled[frontier] = True
+            rows = row_of[frontier]
+            red = cost[rows] - u[rows][:, None] - v + mu
+            k = red.argmin(axis=0)
+            cand = red[k, cols]
+            upd = ~settled & (cand < dist)
+            dist[upd] = cand[upd]
+            pred[upd] = rows[k[upd]]
+
+        # Dual update keeps tree edges tight, then flip the path
+        sc = np.flatnonzero(settled)
+        u[row_of[sc]] += mu - dist[sc]
+        v[sc] += dist[sc] - mu
+        u[i] += mu
+        j = end
+        while True:
+            r = pred[j]
+            prev = col_of[r]
+            row_of[j] = r
+            col_of[r] = j
+            if r == i:
+                break
+            j = prev
+
+    return col_of
+
+
+def solve_assignment(cost, time_budget_s=None):
+    """Exact assignment on any rectangular matrix. Returns (rows, cols) of matched pairs."""
+    deadline = None if time_budget_s is None else time.perf_counter() + time_budget_s
+    if cost.shape[0] <= cost.shape[1]:
+        cols = _hungarian(cost, deadline)
+        return np.arange(cost.shape[0]), cols
+    rows = _hungarian(cost.T, deadline)
+    return rows, np.arange(cost.shape[1])
+
+
+def greedy_assignment(cost):
+    """Cheapest-pair-first heuristic: O(nm log nm), no optimality guarantee."""
+    n, m = cost.shape
+    flat = np.flatnonzero(cost < BIG)
+    flat = flat[np.argsort(cost.ravel()[flat], kind="stable")]
+    row_free = [True] * n
+    col_free = [True] * m
+    rows, cols = [], []
+    limit = min(n, m)
+    for i, j in zip((flat // m).tolist(), (flat % m).tolist()):
+        if row_free[i] and col_free[j]:
+            row_free[i] = col_free[j] = False
+            rows.append(i)
+            cols.append(j)
+            if len(rows) == limit:
+                break
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+# ---------------------------------------------------------
+# 5. PUBLIC ENTRYPOINT
+# ---------------------------------------------------------
+
+PLAN_COLUMNS = [
+    "rfq_id", "client", "commodity", "origin", "destination", "tons",
+    "reg_number", "driver_name", "lane_cost", "deadhead_km", "deadhead_cost",
+    "total_cost", "status",
+]
+
+
+def optimize_dispatch(df_orders, df_fleet, max_exact_cells=MAX_EXACT_CELLS, time_budget_s=2.0):
+    """
+    Recommends a truck for every pending order at once.
+    Returns (plan DataFrame [PLAN_COLUMNS], info dict with method / timings).
+    Orders that no idle, capable truck can take come back with status 'Unassigned'.
+    """
+    t0 = time.perf_counter()
+    if df_orders is None or df_orders.empty or df_fleet is None or df_fleet.empty or "reg_number" not in df_fleet.columns:
+        return pd.DataFrame(columns=PLAN_COLUMNS), {"method": "none", "ms": 0.0}
+
+    orders = _prepare_orders(df_orders)
+    fleet = _prepare_fleet(df_fleet)
+    mats = build_cost_matrix(orders, fleet)
+    cost = mats["cost"]
+    t_matrix = time.perf_counter()
+
+    method = "optimal"
+    if cost.size > max_exact_cells:
+        method = "greedy"
+        rows, cols = greedy_assignment(cost)
+    else:
+        try:
+            rows, cols = solve_assignment(cost, time_budget_s)
+        except _BudgetExceeded:
+            method = "greedy (time budget)"
+            rows, cols = greedy_assignment(cost)
+
+    keep = (cols >= 0) & (cost[rows, np.maximum(cols, 0)] < BIG)
+    rows, cols = rows[keep], cols[keep]
+
+    plan = orders[["rfq_id", "client", "commodity", "origin", "destination", "tons"]].copy()
+    plan["reg_number"] = None
+    plan["driver_name"] = None
+    plan["lane_cost"] = np.nan
+    plan["deadhead_km"] = np.nan
+    plan["deadhead_cost"] = np.nan
+    plan.loc[rows, "reg_number"] = fleet["reg_number"].to_numpy()[cols]
+    plan.loc[rows, "driver_name"] = fleet["driver_name"].to_numpy()[cols]
+    plan.loc[rows, "lane_cost"] = mats["lane_cost"][rows, cols].round(2)
+    plan.loc[rows, "deadhead_km"] = mats["deadhead_km"][rows, cols].round(1)
+    plan.loc[rows, "deadhead_cost"] = mats["deadhead_cost"][rows, cols].round(2)
+    plan["total_cost"] = (plan["lane_cost"] + plan["deadhead_cost"]).round(2)
+    plan["status"] = np.where(plan["reg_number"].notna(), "Recommended", "Unassigned")
+
+    t_end = time.perf_counter()
+    info = {
+        "method": method,
+        "orders": len(orders),
+        "trucks": len(fleet),
+        "assigned": int(len(rows)),
+        "total_cost": float(plan["total_cost"].sum()),
+        "matrix_ms": (t_matrix - t0) * 1000,
+        "solve_ms": (t_end - t_matrix) * 1000,
+        "ms": (t_end - t0) * 1000,
+    }
+    return plan[PLAN_COLUMNS], info
@@ -1,17 +1,18 @@
 import streamlit as st
 import plotly.express as px
 import datetime
-import pandas as pd
 
 # ==========================================================
 # 1. INTEGRATION IMPORTS (FINANCE ENGINE BRIDGE)
 # ==========================================================
 try:
-    from modules.finance.services import create_journal_entry
+    from modules.finance.services import create_journal_entry, get_ledger_amounts
 except ImportError:
     def create_journal_entry(*args, **kwargs):
         return False, "Finance Core Offline"
 
+    get_ledger_amounts = None
+
 
 def render_finance_portal():
     st.markdown("## 🏦 Finance Portal | Treasury")
@@ -31,7 +32,7 @@ def render_finance_portal():
 
         # Defensive: ensure ledger exists
         if (
-            "general_ledger" not in st.session_state
+            get_ledger_amounts is None
             and "journal_entries" not in st.session_state
         ):
             st.warning("Ledger Empty")
@@ -46,11 +47,12 @@ def render_finance_portal():
             # Placeholder: full mapping will occur once Reporting Engine is online
             pass
 
-        # Legacy ledger fallback (ensures no functionality loss)
-        if "general_ledger" in st.session_state:
-            df_gl = st.session_state.general_ledger
+        # Legacy ledger view: this month's per-account totals (account_balances)
+        if get_ledger_amounts is not None:
+            month = datetime.date.today().strftime("%Y-%m")
+            df_gl = get_ledger_amounts(month, since=month)
 
-            if "Code" in df_gl.columns and "Amount" in df_gl.columns:
+            if not df_gl.empty:
                 revenue = df_gl[df_gl["Code"].astype(str).str.startswith("4")]["Amount"].sum()
                 direct_costs = df_gl[df_gl["Code"].astype(str).str.startswith("5")]["Amount"].sum()
                 overheads = df_gl[df_gl["Code"].astype(str).str.startswith("6")]["Amount"].sum()
@@ -98,7 +100,7 @@ def render_finance_portal():
                         fig = px.pie(
                             df_costs,
                             values="Amount",
-                            names="Desc",
+                            names="Account",
                             title="Direct Cost Drivers",
                         )
                         fig.update_layout(height=250, margin=dict(t=0, b=0, l=0, r=0))
@@ -171,26 +173,6 @@ def render_finance_portal():
 
                     if success:
                         st.success(f"✅ Posted: {t_desc}")
-
-                        # Legacy ledger update (no functionality loss)
-                        new_legacy_row = pd.DataFrame(
-                            [
-                                {
-                                    "Date": t_date,
-                                    "Code": debit_code,
-                                    "Desc": t_desc,
-                                    "Amount": -t_amount,
-                                    "Km": 0,
-                                }
-                            ]
-                        )
-
-                        if "general_ledger" in st.session_state:
-                            st.session_state.general_ledger = pd.concat(
-                                [st.session_state.general_ledger, new_legacy_row],
-                                ignore_index=True,
-                            )
-
                         st.rerun()
                     else:
                         st.error(f"⛔ Error: {msg}")
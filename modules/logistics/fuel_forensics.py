@@ -0,0 +1,514 @@
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from modules.core.schema_registry import register_schema
+from modules.logistics.constants import DIESEL_PRICE
+from modules.logistics.db_utils import DB_KEY, engine, init_db, load_data
+from modules.logistics.dispatch_optimizer import DEFAULT_EFFICIENCY
+from modules.logistics import telemetry_store  # noqa: F401  registers gps_rollup_15m, read for the expected use
+
+# =========================================================
+# FUEL FORENSICS — TANK-LEVEL SERIES + THEFT DETECTION
+# =========================================================
+# A tank is either a truck's own tank (tank_id = reg_number) or a depot tank
+# (tank_id = asset id, e.g. TNK-DSL-01). Level readings are stored one row
+# per tank per day in fuel_series. Timestamps (s) and levels (0.1 L) are
+# delta-encoded (int16 when the day's deltas fit, else int32) and zlib-packed
+# into one BLOB, so a year of minute readings for a tank is 365 small rows,
+# not half a million.
+#
+# Detection runs per tank over the decoded arrays, with no per-reading Python:
+#   1. Build the expected use as a cumulative curve:
+#      - trucks: GPS distance x L/100km + idling x IDLE_L_PER_H, from
+#        gps_rollup_15m (kept for good, unlike raw pings)
+#      - depot tanks: logged dispensing (fuel_dispensing)
+#   2. Unexplained level = level + expected use. It stays flat; refuels and
+#      deliveries step it up, losses step it down.
+#   3. Rolling median of MEDIAN_N readings. This removes slosh / sensor spikes,
+#      and the short mismatch between when a logged pump issue is modelled
+#      and when the level actually falls. Steps stay sharp.
+#   4. For each trailing window in WINDOWS (short for a quick drain, long
+#      for a slow siphon), flag an unexplained loss that persists for
+#      PERSIST_N readings and exceeds
+#      max(min litres, Z x noise x sqrt(readings)). Noise is the rolling std
+#      of the clipped per-reading change over the BASELINE_N readings before
+#      the window.
+# Consecutive flagged readings form one event. Each new event is stored in
+# fuel_events and raised in log_risk_incidents as a 'Fuel Theft' incident.
+#
+# A truck's readings are only judged up to the start of its latest
+# gps_rollup_15m bucket. Past that, the expected use is not known yet (the
+# maintenance pass has not rolled up those pings), so they wait for a later
+# scan instead of reading as an unexplained loss.
+
+MEDIAN_N = 9
+PERSIST_N = 10             # a loss must still hold this many readings later (not a transient dip)
+WINDOWS = ((15 * 60, 25.0), (2 * 3600, 60.0))   # (trailing window s, minimum unexplained loss L)
+Z = 6.0
+BASELINE_N = 240
+NOISE_CLIP_L = 5.0
+IDLE_L_PER_H = 3.0
+PUMP_L_PER_MIN = 80.0      # a logged pump issue drains at this rate from its logged time
+MOVING_KMH = 5.0
+LOOKBACK_S = 6 * 3600      # re-read before scanned_until so windows + baseline are complete
+_ROLLUP_S = 15 * 60
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS fuel_tanks (
+        tank_id TEXT PRIMARY KEY,
+        kind TEXT,
+        name TEXT,
+        capacity_l REAL,
+        l_per_100km REAL,
+        scanned_until INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fuel_series (
+        tank_id TEXT,
+        day TEXT,
+        start_ts INTEGER,
+        end_ts INTEGER,
+        n INTEGER,
+        last_l REAL,
+        readings BLOB,
+        PRIMARY KEY (tank_id, day)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fuel_dispensing (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tank_id TEXT,
+        ts TEXT,
+        liters REAL,
+        reference TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_fuel_dispensing_tank_ts ON fuel_dispensing (tank_id, ts)",
+    """
+    CREATE TABLE IF NOT EXISTS fuel_events (
+        tank_id TEXT,
+        start_ts TEXT,
+        end_ts TEXT,
+        liters_lost REAL,
+        observed_drop_l REAL,
+        expected_l REAL,
+        window_s INTEGER,
+        incident_id INTEGER,
+        detected_at TEXT,
+        PRIMARY KEY (tank_id, start_ts)
+    )
+    """,
+]
+
+register_schema(DB_KEY, "logistics.fuel_forensics", _SCHEMA)
+
+
+# ---------------------------------------------------------
+# 1. STORAGE (ONE PACKED ROW PER TANK PER DAY)
+# ---------------------------------------------------------
+
+def _epoch(ts):
+    """Timestamps (ISO strings, datetimes or epoch numbers) -> float epoch seconds."""
+    ts = pd.Series(ts)
+    if pd.api.types.is_numeric_dtype(ts):
+        return ts.to_numpy(float)
+    return pd.to_datetime(ts, errors="coerce", format="ISO8601").to_numpy("datetime64[s]").astype(np.int64).astype(float)
+
+
+def _encode(t, liters):
+    q = np.column_stack([t - t[0], np.rint(liters * 10)]).astype(np.int64)
+    q[1:] -= q[:-1].copy()
+    small = np.abs(q).max() < 2 ** 15                # int16 when it fits: half the bytes to inflate
+    return zlib.compress(q.astype(np.int16 if small else np.int32).tobytes(), 6)
+
+
+def _decode_days(rows):
+    """(start_ts, n, readings) rows in day order -> (t, liters) arrays: one cumsum over all the
+    deltas, restarted at each day's first reading."""
+    start = np.array([r[0] for r in rows], dtype=np.int64)
+    n = np.array([r[1] for r in rows], dtype=np.int64)
+    raw = [zlib.decompress(blob) for _, _, blob in rows]
+    q = np.concatenate([np.frombuffer(b, dtype=np.int16 if len(b) == 4 * k else np.int32) for b, k in zip(raw, n)])
+    q = q.reshape(-1, 2).astype(np.int64).cumsum(axis=0)
+    first = np.cumsum(n) - n
+    base = np.zeros((len(rows), 2), dtype=np.int64)
+    base[1:] = q[first[1:] - 1]
+    q -= np.repeat(base, n, axis=0)
+    return (q[:, 0] + np.repeat(start, n)).astype(float), q[:, 1] / 10
+
+
+def register_tank(tank_id, kind="vehicle", name=None, capacity_l=None, l_per_100km=None):
+    init_db()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO fuel_tanks (tank_id, kind, name, capacity_l, l_per_100km) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(tank_id) DO UPDATE SET kind = excluded.kind, name = COALESCE(excluded.name, name), "
+            "capacity_l = COALESCE(excluded.capacity_l, capacity_l), l_per_100km = COALESCE(excluded.l_per_100km, l_per_100km)",
+            [(tank_id, kind, name or tank_id, capacity_l, l_per_100km)])
+
+
+def _register_unknown(conn, tank_ids):
+    """New tank ids: trucks in log_vehicles become vehicle tanks (their fuel_rating), the rest depot tanks."""
+    known = {r[0] for r in conn.exec_driver_sql("SELECT tank_id FROM fuel_tanks").fetchall()}
+    new = [t for t in tank_ids if t not in known]
+    if not new:
+        return
+    fleet = dict(conn.exec_driver_sql("SELECT reg_number, fuel_rating FROM log_vehicles").fetchall())
+    conn.exec_driver_sql(
+        "INSERT INTO fuel_tanks (tank_id, kind, name, l_per_100km) VALUES (?, ?, ?, ?)",
+        [(t, "vehicle" if t in fleet else "depot", t, fleet.get(t)) for t in new])
+
+
+def ingest_fuel_levels(readings):
+    """
+    Stores level readings: a DataFrame (or dict of columns) with tank_id,
+    timestamp and liters. Readings merge into any day already stored.
+    Unknown tanks are registered on the way in. Returns the readings written.
+    """
+    df = pd.DataFrame(readings)
+    t = _epoch(df["timestamp"])
+    liters = pd.to_numeric(df["liters"], errors="coerce").to_numpy(float)
+    ok = ~(np.isnan(t) | np.isnan(liters))
+    if not ok.any():
+        return 0
+    init_db()
+    codes, tanks = pd.factorize(df["tank_id"].to_numpy(object)[ok])
+    t, liters = t[ok], liters[ok]
+    dn = (t // 86400).astype(np.int64)          # day number; formatted once per group, not per reading
+    order = np.lexsort((t, dn, codes))
+    codes, dn, t, liters = codes[order], dn[order], t[order], liters[order]
+    cut = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (dn[1:] != dn[:-1]), True])
+    days = [d.replace("-", "") for d in dn[cut[:-1]].astype("datetime64[D]").astype(str)]
+
+    with engine.begin() as conn:
+        _register_unknown(conn, list(tanks))
+        keys = {(a, b) for a, b in conn.exec_driver_sql(
+            f"SELECT tank_id, day FROM fuel_series WHERE day BETWEEN ? AND ? AND tank_id IN ({', '.join('?' * len(tanks))})",
+            (min(days), max(days), *tanks)).fetchall()}
+        rows = []
+        for s, e, day in zip(cut[:-1], cut[1:], days):
+            tank = tanks[codes[s]]
+            gt, gl = t[s:e], liters[s:e]
+            if (tank, day) in keys:   # merge with what is stored; a re-sent reading replaces the old one
+                ot, ol = _decode_days(conn.exec_driver_sql(
+                    "SELECT start_ts, n, readings FROM fuel_series WHERE tank_id = ? AND day = ?", (tank, day)).fetchall())
+                gt, gl = np.r_[gt, ot], np.r_[gl, ol]
+                order = np.lexsort((np.r_[np.zeros(e - s), np.ones(len(ot))], gt))
+                gt, gl = gt[order], gl[order]
+            first = np.r_[True, gt[1:] != gt[:-1]]
+            gt, gl = gt[first], gl[first]
+            rows.append((tank, day, int(gt[0]), int(gt[-1]), len(gt), float(gl[-1]), _encode(gt, gl)))
+        conn.exec_driver_sql(f"INSERT OR REPLACE INTO fuel_series VALUES ({', '.join('?' * 7)})", rows)
+    return int(ok.sum())
+
+
+def log_dispensing(tank_id, liters, ts=None, reference=None):
+    """Records fuel drawn from a tank (pump issue to a truck, transfer), so detection does not flag it."""
+    init_db()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO fuel_dispensing (tank_id, ts, liters, reference) VALUES (?, ?, ?, ?)",
+                             [(tank_id, ts or datetime.now().isoformat(timespec="seconds"), float(liters), reference)])
+
+
+def load_series(tank_id, since=None, until=None):
+    """(epoch seconds, liters) arrays for one tank, optionally bounded (epoch seconds)."""
+    sql = "SELECT start_ts, n, readings FROM fuel_series WHERE tank_id = ?"
+    params = [tank_id]
+    if since is not None:
+        sql += " AND end_ts >= ?"
+        params.append(int(since))
+    if until is not None:
+        sql += " AND start_ts <= ?"
+        params.append(int(until))
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(sql + " ORDER BY day", tuple(params)).fetchall()
+    if not rows:
+        return np.zeros(0), np.zeros(0)
+    t, liters = _decode_days(rows)
+    keep = np.ones(len(t), dtype=bool)
+    if since is not None:
+        keep &= t >= since
+    if until is not None:
+        keep &= t <= until
+    return t[keep], liters[keep]
+
+
+# ---------------------------------------------------------
+# 2. EXPECTED USE (CUMULATIVE LITRES AT EACH READING)
+# ---------------------------------------------------------
+
+def _rolled_up_until(conn, reg):
+    """Epoch s of the start of a truck's latest gps_rollup_15m bucket (it may still fill up), else None."""
+    latest = conn.exec_driver_sql("SELECT MAX(bucket) FROM gps_rollup_15m WHERE reg_number = ?", (reg,)).fetchone()[0]
+    if latest is None:
+        return None
+    # Buckets keep the pings' own 'T' / ' ' separator: compare within the latest day on one of them
+    latest = conn.exec_driver_sql(
+        "SELECT MAX(REPLACE(bucket, ' ', 'T')) FROM gps_rollup_15m WHERE reg_number = ? AND bucket >= ?",
+        (reg, latest[:10])).fetchone()[0]
+    return float(np.datetime64(latest, "s").astype(np.int64))
+
+
+def _expected_vehicle(conn, reg, t, l_per_100km):
+    """GPS distance x L/100km + idling, from gps_rollup_15m, interpolated to the reading times."""
+    lo = pd.Timestamp(t[0] - _ROLLUP_S, unit="s").strftime("%Y-%m-%dT%H:%M")
+    hi = pd.Timestamp(t[-1], unit="s").strftime("%Y-%m-%dT%H:%M")
+    hours = _ROLLUP_S / 3600
+    # Litres per bucket are worked out in SQL; parked buckets (no movement, ignition off) use nothing.
+    # Bounds are given in both bucket separators ('T' and ' ', whichever the pings used).
+    rows = conn.exec_driver_sql(
+        "SELECT bucket, COALESCE(avg_speed, 0) * ? + CASE WHEN COALESCE(avg_speed, 0) <= ? "
+        "THEN ignition_on * ? / MAX(pings, 1) ELSE 0 END "
+        "FROM gps_rollup_15m WHERE reg_number = ? AND (bucket BETWEEN ? AND ? OR bucket BETWEEN ? AND ?) "
+        "AND (avg_speed > ? OR ignition_on > 0)",
+        (hours * l_per_100km / 100, MOVING_KMH, hours * IDLE_L_PER_H, reg, lo, hi,
+         lo.replace("T", " "), hi.replace("T", " "), MOVING_KMH)).fetchall()
+    if not rows:
+        return np.zeros(len(t))
+    bucket, used = zip(*rows)
+    start = np.array(bucket, dtype="datetime64[s]").astype(np.int64).astype(float)
+    order = np.argsort(start, kind="stable")
+    start, used = start[order], np.asarray(used, dtype=float)[order]
+    # Use is spread evenly over each bucket: points at bucket start / end of the cumulative curve
+    cum = np.concatenate([[0.0], np.cumsum(used)])
+    x = np.column_stack([start, start + _ROLLUP_S]).ravel()
+    y = np.column_stack([cum[:-1], cum[1:]]).ravel()
+    return np.interp(t, x, y)
+
+
+def _expected_depot(conn, tank_id, t):
+    """Logged dispensing, each issue drawn at PUMP_L_PER_MIN: litres drawn up to each reading."""
+    rate = PUMP_L_PER_MIN / 60
+    lo = pd.Timestamp(t[0] - 3600, unit="s").isoformat()
+    hi = pd.Timestamp(t[-1], unit="s").isoformat()
+    rows = conn.exec_driver_sql("SELECT ts, liters FROM fuel_dispensing WHERE tank_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                                (tank_id, lo, hi)).fetchall()
+    if not rows:
+        return np.zeros(len(t))
+    ts, liters = zip(*rows)
+    start = _epoch(list(ts))
+    end = np.sort(start + np.asarray(liters, dtype=float) / rate)
+    # rate x (sum of (t - start)+ - sum of (t - end)+), via prefix sums
+    drawn = np.zeros(len(t))
+    for edge, sign in ((start, 1.0), (end, -1.0)):
+        # edges at or before each reading (searchsorted(edge, t, "right"), counted the cheap way round)
+        k = np.cumsum(np.bincount(np.searchsorted(t, edge), minlength=len(t) + 1))[:len(t)]
+        drawn += sign * rate * (t * k - np.concatenate([[0.0], np.cumsum(edge)])[k])
+    return drawn - drawn[0]
+
+
+# ---------------------------------------------------------
+# 3. DETECTION (ROLLING WINDOWS, VECTORISED)
+# ---------------------------------------------------------
+
+def _window(x, n, op):
+    """op (np.minimum / np.maximum) over each x[i:i + n], by doubling: log2(n) passes, not n."""
+    out, span = x, 1
+    while span * 2 <= n:
+        out = op(out[:-span], out[span:])
+        span *= 2
+    return op(out[:len(x) - n + 1], out[n - span:]) if span < n else out
+
+
+def detect_drops(t, liters, expected, windows=WINDOWS, z=Z, baseline_n=BASELINE_N):
+    """
+    Unexplained losses in one tank's series (t sorted, epoch s). Returns a
+    DataFrame of events: start / end (epoch s), liters_lost (beyond
+    expected), observed_drop_l, expected_l, window_s.
+    """
+    cols = ["start", "end", "liters_lost", "observed_drop_l", "expected_l", "window_s"]
+    n = len(t)
+    if n < MEDIAN_N + PERSIST_N:
+        return pd.DataFrame(columns=cols)
+    half = MEDIAN_N // 2
+    u = np.pad(np.rint((liters + expected) * 10).astype(np.int32), half, mode="edge")   # 0.1 L, as stored
+    u = np.partition(sliding_window_view(u, MEDIAN_N), half, axis=1)[:, half] / 10
+    floor = _window(np.concatenate([np.full(PERSIST_N - 1, u[0]), u]), PERSIST_N, np.minimum)   # lowest of the last PERSIST_N
+    ceil = _window(np.concatenate([u, np.full(PERSIST_N - 1, u[-1])]), PERSIST_N, np.maximum)   # highest of the next PERSIST_N
+    rc = np.clip(np.diff(u), -NOISE_CLIP_L, NOISE_CLIP_L)   # per-reading change; refuels / thefts must not inflate the noise
+    c1 = np.concatenate([[0.0], np.cumsum(rc)])
+    c2 = np.concatenate([[0.0], np.cumsum(rc * rc)])
+
+    # Candidates by time block (the shortest window's length): a window ending in block b reaches
+    # back at most ceil(window_s / block) blocks, so the highest floor over those blocks minus the
+    # lowest ceil in b bounds every loss in b. The threshold is never below min_l, so only blocks
+    # over it on that bound need their readings' exact window starts.
+    base = min(w for w, _ in windows)
+    blk = np.floor(t / base)
+    first = np.flatnonzero(np.concatenate([[True], blk[1:] != blk[:-1]]))
+    size = np.diff(np.append(first, n))
+    bid = blk[first]
+    top = np.append(np.maximum.reduceat(floor, first), -np.inf)
+    bot = np.minimum.reduceat(ceil, first)
+
+    score = np.full(n, -np.inf)
+    lost = np.zeros(n)
+    start_at = np.zeros(n, dtype=np.int64)
+    win_of = np.zeros(n, dtype=np.int64)
+    for window_s, min_l in windows:
+        back = np.searchsorted(bid, bid - np.ceil(window_s / base))
+        reach = np.maximum.reduceat(top, np.column_stack([back, np.arange(1, len(bid) + 1)]).ravel())[::2]
+        i = np.flatnonzero(np.repeat(reach - bot > min_l, size))
+        j = np.searchsorted(t, t[i] - window_s)    # first reading inside the trailing window
+        loss = floor[j] - ceil[i]                  # unexplained loss over [j, i] that persists
+        i, j, loss = i[loss > min_l], j[loss > min_l], loss[loss > min_l]
+        b0 = np.maximum(j - baseline_n, 0)
+        cnt = np.maximum(j - b0, 1)
+        mean = (c1[j] - c1[b0]) / cnt
+        sigma = np.sqrt(np.maximum((c2[j] - c2[b0]) / cnt - mean * mean, 0.0))
+        s = loss - np.maximum(min_l, z * sigma * np.sqrt(np.maximum(i - j, 1)))
+        better = s > score[i]
+        i = i[better]
+        score[i], lost[i], start_at[i], win_of[i] = s[better], loss[better], j[better], window_s
+
+    score[n - PERSIST_N + 1:] = -np.inf           # persistence not observed yet: the next scan re-reads these
+    flagged = np.flatnonzero(score > 0)
+    if not len(flagged):
+        return pd.DataFrame(columns=cols)
+    # One event per run of flagged readings, reported at its worst point; the
+    # start moves up to the highest settled level inside the window...
+    run_start = np.flatnonzero(np.r_[True, np.diff(flagged) > 1])
+    peaks = np.array([seg[np.argmax(lost[seg])] for seg in np.split(flagged, run_start[1:])])
+    top = np.array([a + np.argmax(floor[a:b + 1]) for a, b in zip(start_at[peaks], peaks)])
+    lost = floor[top] - ceil[peaks]
+    # ...and on to the last reading within 10% of the loss of that level; the end
+    # is the first reading with 90% of the loss gone
+    j = np.array([a + np.flatnonzero(u[a:b + 1] >= u[a] - 0.1 * d)[-1]
+                  for a, b, d in zip(top, peaks, lost)])
+    end = np.array([a + np.flatnonzero(u[a:b + 1] <= u[a] - 0.9 * d)[0] if (u[a:b + 1] <= u[a] - 0.9 * d).any() else b
+                    for a, b, d in zip(j, peaks, lost)])
+    used = expected[peaks] - expected[j]
+    return pd.DataFrame({
+        "start": t[j], "end": t[end], "liters_lost": lost,
+        "observed_drop_l": lost + used, "expected_l": used, "window_s": win_of[peaks],
+    })
+
+
+# ---------------------------------------------------------
+# 4. SCAN + INCIDENTS
+# ---------------------------------------------------------
+
+def _severity(cost):
+    """Same bands as the manual incident logger in the risk view."""
+    return "High" if cost >= 50000 else "Medium" if cost >= 5000 else "Low"
+
+
+def _iso(epoch):
+    return pd.Timestamp(epoch, unit="s").strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _scan(tank_id, kind, l_per_100km, since=None, until=None):
+    with engine.connect() as conn:
+        if kind == "vehicle":
+            rolled = _rolled_up_until(conn, tank_id)
+            if rolled is None:   # no GPS use rolled up yet: nothing can be judged
+                return np.zeros(0), detect_drops(np.zeros(0), np.zeros(0), np.zeros(0))
+            until = rolled if until is None else min(until, rolled)
+        t, liters = load_series(tank_id, since, until)
+        if not len(t):
+            return t, detect_drops(t, liters, t)
+        if kind == "vehicle":
+            expected = _expected_vehicle(conn, tank_id, t, l_per_100km or DEFAULT_EFFICIENCY)
+        else:
+            expected = _expected_depot(conn, tank_id, t)
+    return t, detect_drops(t, liters, expected)
+
+
+def scan_tank(tank_id, kind="vehicle", l_per_100km=None, since=None, until=None):
+    """Detected events for one tank (nothing is written)."""
+    return _scan(tank_id, kind, l_per_100km, since, until)[1]
+
+
+def scan_fuel(tank_ids=None, full=False, raise_incidents=True):
+    """
+    Scans every tank (or tank_ids) from where the last scan stopped (full=True:
+    all history). New events go to fuel_events and, with raise_incidents, to
+    log_risk_incidents. Returns {"tanks", "readings", "events", "incidents"}.
+    """
+    init_db()
+    tanks = load_data("SELECT tank_id, kind, l_per_100km, scanned_until FROM fuel_tanks")
+    if tank_ids is not None:
+        tanks = tanks[tanks["tank_id"].isin(list(tank_ids))]
+    stamp = datetime.now().isoformat(timespec="seconds")
+    summary = {"tanks": 0, "readings": 0, "events": 0, "incidents": 0}
+
+    for tank_id, kind, rate, scanned in zip(tanks["tank_id"], tanks["kind"], tanks["l_per_100km"], tanks["scanned_until"]):
+        since = None if full or pd.isna(scanned) else float(scanned) - LOOKBACK_S
+        t, events = _scan(tank_id, kind, None if pd.isna(rate) else float(rate), since)
+        if not len(t):
+            continue
+        if not full and not pd.isna(scanned):
+            events = events[events["end"] > float(scanned)]   # earlier ones were raised by the previous scan
+        summary["tanks"] += 1
+        summary["readings"] += len(t)
+
+        with engine.begin() as conn:
+            for ev in events.itertuples(index=False):
+                start, end = _iso(ev.start), _iso(ev.end)
+                if conn.exec_driver_sql("SELECT 1 FROM fuel_events WHERE tank_id = ? AND start_ts <= ? AND end_ts >= ?",
+                                        (tank_id, end, start)).fetchone():
+                    continue   # same loss seen by an overlapping scan
+                incident_id = None
+                if raise_incidents:
+                    cost = round(ev.liters_lost * DIESEL_PRICE, 2)
+                    minutes = (ev.end - ev.start) / 60
+                    desc = (f"{tank_id}: {ev.liters_lost:,.0f} L unexplained loss in {minutes:,.0f} min "
+                            f"(level fell {ev.observed_drop_l:,.0f} L, expected use {ev.expected_l:,.0f} L) at {start}")
+                    incident_id = conn.exec_driver_sql(
+                        "INSERT INTO log_risk_incidents (date, type, severity, description, cost_impact, status) "
+                        "VALUES (?, 'Fuel Theft', ?, ?, ?, 'Open')", (start[:10], _severity(cost), desc, cost)).lastrowid
+                    summary["incidents"] += 1
+                conn.exec_driver_sql("INSERT INTO fuel_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     (tank_id, start, end, float(ev.liters_lost), float(ev.observed_drop_l),
+                                      float(ev.expected_l), int(ev.window_s), incident_id, stamp))
+                summary["events"] += 1
+            # the last PERSIST_N readings cannot be judged yet: the next scan starts before them
+            settled = t[max(len(t) - PERSIST_N, 0)]
+            conn.exec_driver_sql("UPDATE fuel_tanks SET scanned_until = ? WHERE tank_id = ?", (int(settled), tank_id))
+    return summary
+
+
+# ---------------------------------------------------------
+# 5. READ API (VIEWS)
+# ---------------------------------------------------------
+
+def fuel_inventory():
+    """One row per tank: latest level, capacity and open theft events."""
+    init_db()
+    return load_data("""
+        SELECT k.tank_id, k.kind, k.name, k.capacity_l, s.last_l AS current_liters,
+               datetime(s.end_ts, 'unixepoch') AS last_reading,
+               (SELECT COUNT(*) FROM fuel_events e WHERE e.tank_id = k.tank_id) AS theft_events
+        FROM fuel_tanks k
+        LEFT JOIN fuel_series s
+          ON s.tank_id = k.tank_id AND s.day = (SELECT MAX(day) FROM fuel_series WHERE tank_id = k.tank_id)
+        ORDER BY k.kind, k.tank_id
+    """)
+
+
+def fuel_events(tank_id=None, limit=200):
+    """Detected events, newest first."""
+    init_db()
+    sql = "SELECT * FROM fuel_events"
+    params = {}
+    if tank_id:
+        sql += " WHERE tank_id = :tank"
+        params["tank"] = tank_id
+    return load_data(f"{sql} ORDER BY start_ts DESC LIMIT {int(limit)}", params)
+
+
+def level_history(tank_id, days=7, max_points=2000):
+    """Recent readings for charting, thinned to at most max_points."""
+    with engine.connect() as conn:
+        last = conn.exec_driver_sql("SELECT MAX(end_ts) FROM fuel_series WHERE tank_id = ?", (tank_id,)).fetchone()[0]
+    if last is None:
+        return pd.DataFrame(columns=["timestamp", "liters"])
+    t, liters = load_series(tank_id, since=last - days * 86400)
+    step = max(1, len(t) // max_points)
+    return pd.DataFrame({"timestamp": pd.to_datetime(t[::step], unit="s"), "liters": liters[::step]})
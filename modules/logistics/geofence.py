@@ -0,0 +1,401 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.core.db_manager import record_site_events
+from modules.core.query_cache import table_version
+from modules.core.schema_registry import register_schema
+from modules.logistics.constants import HUB_COORDS
+from modules.logistics.db_utils import DB_KEY, engine, init_db, load_data
+from modules.logistics.dispatch_optimizer import haversine_km
+
+# =========================================================
+# GEOFENCE ENGINE — SITE ARRIVAL / DEPARTURE FROM GPS PINGS
+# =========================================================
+# Fences are circles (centre + radius) or polygons (lat/lon rings) around
+# depots, mines, ports and client sites. A uniform lat/lon grid maps every
+# cell to the fences whose buffered bounding box touches it, so a batch of
+# pings is matched to candidate fences with one searchsorted instead of a
+# pings x fences test; only those candidates get the exact circle / polygon
+# test, all of it in numpy.
+#
+# Each fence has a hysteresis band: a vehicle enters when a ping falls
+# inside the fence and only leaves once a ping is more than EXIT_MARGIN_M
+# beyond it, so GPS jitter on the boundary does not flap. Presence per
+# (vehicle, fence) is kept in geofence_presence between batches. Every
+# transition is logged to geofence_events; transitions at site fences (any
+# kind but 'depot') set arrival_time / departure_time on the vehicle's open
+# trip in trip_manifests when the fence is one of the trip's drops
+# (db_manager.record_site_events).
+#
+# Pings are evaluated in timestamp order within a batch; batches are
+# assumed to arrive roughly in time order per vehicle, as trackers send them.
+
+GRID_DEG = 0.05          # ~5.5 km cells
+EXIT_MARGIN_M = 150.0
+M_PER_DEG = 111_320.0
+DEPOT_KINDS = {"depot"}
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS geofences (
+        fence_id TEXT PRIMARY KEY,
+        name TEXT,
+        kind TEXT,
+        center_lat REAL,
+        center_lon REAL,
+        radius_m REAL,
+        polygon TEXT,
+        active INTEGER DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS geofence_presence (
+        reg_number TEXT,
+        fence_id TEXT,
+        entered_at TEXT,
+        PRIMARY KEY (reg_number, fence_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS geofence_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        reg_number TEXT,
+        fence_id TEXT,
+        event TEXT,
+        timestamp TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_geofence_events_reg_ts ON geofence_events (reg_number, timestamp)",
+]
+
+# Demo sites; polygons are [[lat, lon], ...] rings
+SEED_FENCES = [
+    {"fence_id": "DEPOT-JHB", "name": "Veridian Depot (JHB)", "kind": "depot",
+     "center": HUB_COORDS["Depot"], "radius_m": 400},
+    {"fence_id": "YARD-JHB", "name": "JHB Yard", "kind": "depot",
+     "center": HUB_COORDS["JHB Yard"], "radius_m": 400},
+    {"fence_id": "TERM-CITY-DEEP", "name": "JHB City Deep Terminal", "kind": "terminal",
+     "center": HUB_COORDS["JHB City Deep"], "radius_m": 1200},
+    {"fence_id": "PORT-DURBAN", "name": "Durban Port", "kind": "port",
+     "center": HUB_COORDS["Durban Port"], "radius_m": 2500},
+    {"fence_id": "PORT-RBCT", "name": "Richards Bay Coal Terminal", "kind": "port",
+     "polygon": [[-28.770, 32.000], [-28.770, 32.055], [-28.805, 32.055], [-28.815, 32.010]]},
+    {"fence_id": "MINE-KHWEZELA", "name": "Khwezela Colliery", "kind": "mine",
+     "polygon": [[-25.925, 29.170], [-25.925, 29.250], [-25.990, 29.250], [-25.990, 29.185]]},
+    {"fence_id": "CLIENT-PPC-HERCULES", "name": "PPC Hercules", "kind": "client",
+     "center": (-25.7310, 28.1570), "radius_m": 700},
+]
+
+
+def _fence_row(fence_id, name, kind, center=None, radius_m=None, polygon=None):
+    if polygon is not None:
+        ring = np.asarray(polygon, dtype=float)
+        center = ring.mean(axis=0)
+        return (fence_id, name, kind, float(center[0]), float(center[1]), None, json.dumps(ring.tolist()), 1)
+    return (fence_id, name, kind, float(center[0]), float(center[1]), float(radius_m), None, 1)
+
+
+_INSERT_FENCE = "INSERT OR {verb} INTO geofences VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def ensure_geofence_tables():
+    with engine.begin() as conn:
+        for stmt in _SCHEMA:
+            conn.exec_driver_sql(stmt)
+        conn.exec_driver_sql(_INSERT_FENCE.format(verb="IGNORE"), [_fence_row(**f) for f in SEED_FENCES])
+    return True
+
+
+register_schema(DB_KEY, "logistics.geofence", _SCHEMA, apply=ensure_geofence_tables)
+
+
+# ---------------------------------------------------------
+# 1. FENCE STORE
+# ---------------------------------------------------------
+
+def add_fence(fence_id, name, kind, center=None, radius_m=None, polygon=None):
+    """Creates or replaces a fence: a circle (center=(lat, lon) + radius_m) or a polygon ring."""
+    if polygon is None and (center is None or not radius_m):
+        raise ValueError("A fence needs center + radius_m, or a polygon")
+    init_db()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_INSERT_FENCE.format(verb="REPLACE"),
+                             [_fence_row(fence_id, name, kind, center, radius_m, polygon)])
+
+
+def load_fences():
+    init_db()
+    return load_data("SELECT * FROM geofences WHERE active = 1 ORDER BY fence_id")
+
+
+# ---------------------------------------------------------
+# 2. GRID INDEX
+# ---------------------------------------------------------
+
+_index = {"version": None}
+_index_lock = threading.Lock()
+
+
+def _cell_keys(lat, lon):
+    return np.floor(np.asarray(lat) / GRID_DEG).astype(np.int64) * (1 << 20) + np.floor(np.asarray(lon) / GRID_DEG).astype(np.int64)
+
+
+def _build_index(fences):
+    n = len(fences)
+    lat = fences["center_lat"].to_numpy(float)
+    lon = fences["center_lon"].to_numpy(float)
+    radius = pd.to_numeric(fences["radius_m"], errors="coerce").to_numpy(float)
+    rings = {}
+    lo_lat, hi_lat, lo_lon, hi_lon = (np.empty(n) for _ in range(4))
+    for i, poly in enumerate(fences["polygon"]):
+        lon_scale = 1 / max(np.cos(np.radians(lat[i])), 1e-6)   # degrees of longitude shrink towards the poles
+        if isinstance(poly, str) and poly:
+            ring = np.asarray(json.loads(poly), dtype=float)
+            rings[i] = (ring[:, 0], ring[:, 1])
+            d_lat = EXIT_MARGIN_M / M_PER_DEG
+            lo_lat[i], hi_lat[i] = ring[:, 0].min() - d_lat, ring[:, 0].max() + d_lat
+            lo_lon[i], hi_lon[i] = ring[:, 1].min() - d_lat * lon_scale, ring[:, 1].max() + d_lat * lon_scale
+        else:
+            d_lat = (radius[i] + EXIT_MARGIN_M) / M_PER_DEG
+            lo_lat[i], hi_lat[i] = lat[i] - d_lat, lat[i] + d_lat
+            lo_lon[i], hi_lon[i] = lon[i] - d_lat * lon_scale, lon[i] + d_lat * lon_scale
+
+    # Every grid cell a fence's buffered bounding box touches -> that fence
+    keys, owners = [], []
+    for i in range(n):
+        rows = np.arange(np.floor(lo_lat[i] / GRID_DEG), np.floor(hi_lat[i] / GRID_DEG) + 1, dtype=np.int64)
+        cols = np.arange(np.floor(lo_lon[i] / GRID_DEG), np.floor(hi_lon[i] / GRID_DEG) + 1, dtype=np.int64)
+        cell = (rows[:, None] * (1 << 20) + cols[None, :]).ravel()
+        keys.append(cell)
+        owners.append(np.full(len(cell), i, dtype=np.int64))
+    keys = np.concatenate(keys) if keys else np.empty(0, np.int64)
+    owners = np.concatenate(owners) if owners else np.empty(0, np.int64)
+    order = np.argsort(keys, kind="stable")
+
+    return {
+        "ids": fences["fence_id"].to_numpy(object),
+        "names": fences["name"].to_numpy(object),
+        "site": ~fences["kind"].isin(DEPOT_KINDS).to_numpy(bool),
+        "lat": lat, "lon": lon, "radius": radius, "rings": rings,
+        "bbox": (lo_lat, hi_lat, lo_lon, hi_lon),
+        "cell_keys": keys[order], "cell_fence": owners[order],
+    }
+
+
+def fence_index():
+    """
+    Grid index over the active fences. The fences are re-read after geofences
+    is written, here or by another process (e.g. fences added in the console
+    while the ingest server runs), and the index is rebuilt only when they differ.
+    """
+    version = table_version(DB_KEY, "geofences")
+    with _index_lock:
+        if _index["version"] != version or "ids" not in _index:
+            fences = load_fences()
+            if "ids" not in _index or not fences.equals(_index["fences"]):
+                _index.clear()
+                _index.update(_build_index(fences), fences=fences)
+            _index["version"] = version
+        return _index
+
+
+def _in_polygon(lat, lon, ring_lat, ring_lon):
+    """Even-odd ray casting of many points against one ring."""
+    inside = np.zeros(len(lat), dtype=bool)
+    j = len(ring_lat) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i in range(len(ring_lat)):
+            crosses = (ring_lat[i] > lat) != (ring_lat[j] > lat)
+            x_at = (ring_lon[j] - ring_lon[i]) * (lat - ring_lat[i]) / (ring_lat[j] - ring_lat[i]) + ring_lon[i]
+            inside ^= crosses & (lon < x_at)
+            j = i
+    return inside
+
+
+def match_fences(lat, lon, index=None):
+    """
+    Every (ping, fence) pair where the ping is inside the fence or its exit band.
+    Returns (ping positions, fence positions, inside flags) as numpy arrays.
+    """
+    index = index or fence_index()
+    lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    keys = _cell_keys(lat, lon)
+    lo = np.searchsorted(index["cell_keys"], keys, "left")
+    counts = np.searchsorted(index["cell_keys"], keys, "right") - lo
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, bool)
+
+    ping = np.repeat(np.arange(len(keys)), counts)
+    offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    fence = index["cell_fence"][np.repeat(lo, counts) + offset]
+    plat, plon = lat[ping], lon[ping]
+
+    inside = np.zeros(total, dtype=bool)
+    band = np.zeros(total, dtype=bool)
+    radius = index["radius"][fence]
+    circle = ~np.isnan(radius)
+    if circle.any():
+        d = haversine_km(plat[circle], plon[circle], index["lat"][fence[circle]], index["lon"][fence[circle]]) * 1000
+        inside[circle] = d <= radius[circle]
+        band[circle] = d <= radius[circle] + EXIT_MARGIN_M
+    if (~circle).any():
+        lo_lat, hi_lat, lo_lon, hi_lon = index["bbox"]
+        poly = np.flatnonzero(~circle)
+        f = fence[poly]
+        band[poly] = (plat[poly] >= lo_lat[f]) & (plat[poly] <= hi_lat[f]) & (plon[poly] >= lo_lon[f]) & (plon[poly] <= hi_lon[f])
+        order = np.argsort(f, kind="stable")
+        poly, f = poly[order], f[order]
+        starts = np.flatnonzero(np.r_[True, f[1:] != f[:-1]])
+        for s, e in zip(starts, np.r_[starts[1:], len(f)]):
+            ring_lat, ring_lon = index["rings"][f[s]]
+            rows = poly[s:e]
+            inside[rows] = _in_polygon(plat[rows], plon[rows], ring_lat, ring_lon)
+
+    keep = band | inside
+    return ping[keep], fence[keep], inside[keep]
+
+
+# ---------------------------------------------------------
+# 3. TRANSITIONS (ENTER / EXIT)
+# ---------------------------------------------------------
+
+def _transitions(regs, ts, ping, fence, inside, presence, n_fences):
+    """
+    Runs the hysteresis state machine for every (vehicle, fence) pair that has
+    a ping in its band this batch or was inside before it. regs / ts are the
+    batch sorted by vehicle then time. Returns (events, entered, left) where
+    events is [(reg, fence, 'ENTER'|'EXIT', ts)] in time order per pair.
+    """
+    reg_codes, reg_names = pd.factorize(regs)
+    n_regs = len(reg_names)
+    start = np.searchsorted(reg_codes, np.arange(n_regs), "left")
+    size = np.searchsorted(reg_codes, np.arange(n_regs), "right") - start
+
+    hit_keys = reg_codes[ping] * n_fences + fence
+    known = presence[presence["reg"].isin(reg_names)]
+    prior_keys = pd.Index(reg_names).get_indexer(known["reg"]) * n_fences + known["fence"].to_numpy(np.int64)
+    pairs = np.unique(np.concatenate([hit_keys, prior_keys]))
+    if len(pairs) == 0:
+        return [], [], []
+
+    pair_reg, pair_fence = pairs // n_fences, pairs % n_fences
+    prior = np.isin(pairs, prior_keys).astype(float)
+
+    # One row per (pair, ping of that vehicle), already in pair / time order
+    counts = size[pair_reg]
+    row_start = np.cumsum(counts) - counts
+    group = np.repeat(np.arange(len(pairs)), counts)
+    pos = np.repeat(start[pair_reg], counts) + (np.arange(counts.sum()) - np.repeat(row_start, counts))
+
+    # 1 inside, 0 beyond the band, NaN in the band (keeps the previous state)
+    state = np.zeros(len(pos))
+    hit_pair = np.searchsorted(pairs, hit_keys)
+    hit_row = row_start[hit_pair] + (ping - start[reg_codes[ping]])
+    state[hit_row] = np.where(inside, 1.0, np.nan)
+    state = pd.Series(state).groupby(group).ffill().to_numpy()
+    state = np.where(np.isnan(state), prior[group], state)
+
+    prev = np.empty_like(state)
+    prev[1:] = state[:-1]
+    prev[row_start] = prior
+    change = np.flatnonzero(state != prev)
+
+    ts_rows = ts[pos[change]]
+    events = [
+        (reg_names[r], f, "ENTER" if s == 1 else "EXIT", t)
+        for r, f, s, t in zip(pair_reg[group[change]], pair_fence[group[change]], state[change], ts_rows)
+    ]
+    final = state[row_start + counts - 1]
+    entered = [(reg_names[r], f) for r, f, p, s in zip(pair_reg, pair_fence, prior, final) if s == 1 and p == 0]
+    left = [(reg_names[r], f) for r, f, p, s in zip(pair_reg, pair_fence, prior, final) if s == 0 and p == 1]
+    return events, entered, left
+
+
+_process_lock = threading.Lock()
+
+
+def process_pings(rows):
+    """
+    Evaluates a batch of pings (tuples in GPS_FIELDS order: reg_number,
+    timestamp, latitude, longitude, ...) against every active fence, logs the
+    ENTER / EXIT events, updates presence and writes arrival / departure
+    times onto open trips. Returns a summary dict.
+    """
+    summary = {"pings": len(rows), "candidates": 0, "events": 0, "arrivals": 0, "departures": 0}
+    if not rows:
+        return summary
+    init_db()
+
+    cols = list(zip(*rows))
+    batch = pd.DataFrame({
+        "reg": pd.Series(cols[0], dtype=object),
+        "ts": pd.to_datetime(pd.Series(cols[1], dtype=object), errors="coerce", format="ISO8601"),
+        "lat": pd.to_numeric(pd.Series(cols[2], dtype=object), errors="coerce"),
+        "lon": pd.to_numeric(pd.Series(cols[3], dtype=object), errors="coerce"),
+    }).dropna()
+    batch = batch.sort_values(["reg", "ts"], kind="stable")
+    if batch.empty:
+        return summary
+
+    index = fence_index()
+    if len(index["ids"]) == 0:
+        return summary
+    ping, fence, inside = match_fences(batch["lat"].to_numpy(), batch["lon"].to_numpy(), index)
+    summary["candidates"] = len(ping)
+    regs = batch["reg"].to_numpy(object)
+    ts = batch["ts"].dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(object)
+
+    with _process_lock:
+        presence = load_data("SELECT reg_number, fence_id FROM geofence_presence")
+        fence_pos = pd.Index(index["ids"]).get_indexer(presence.get("fence_id", pd.Series(dtype=object)))
+        presence = pd.DataFrame({"reg": presence.get("reg_number", pd.Series(dtype=object)).to_numpy(object),
+                                 "fence": fence_pos})
+        presence = presence[presence["fence"] >= 0]
+
+        events, entered, left = _transitions(regs, ts, ping, fence, inside, presence, len(index["ids"]))
+        if not events:
+            return summary
+
+        ids = index["ids"]
+        entered_at = {(r, f): t for r, f, e, t in events if e == "ENTER"}
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO geofence_events (reg_number, fence_id, event, timestamp) VALUES (?, ?, ?, ?)",
+                                 [(r, ids[f], e, t) for r, f, e, t in events])
+            if left:
+                conn.exec_driver_sql("DELETE FROM geofence_presence WHERE reg_number = ? AND fence_id = ?",
+                                     [(r, ids[f]) for r, f in left])
+            if entered:
+                conn.exec_driver_sql("INSERT OR REPLACE INTO geofence_presence VALUES (?, ?, ?)",
+                                     [(r, ids[f], entered_at[(r, f)]) for r, f in entered])
+
+    summary["events"] = len(events)
+    site_events = [(r, ids[f], e, t) for r, f, e, t in events if index["site"][f]]
+    sites = {ids[f]: (index["names"][f], index["lat"][f], index["lon"][f]) for _, f, _, _ in events if index["site"][f]}
+    summary["arrivals"], summary["departures"] = record_site_events(site_events, sites)
+    return summary
+
+
+# ---------------------------------------------------------
+# 4. READ SIDE
+# ---------------------------------------------------------
+
+def recent_geofence_events(limit=200):
+    init_db()
+    return load_data(f"""
+        SELECT e.timestamp, e.reg_number, e.event, e.fence_id, f.name, f.kind
+        FROM geofence_events e LEFT JOIN geofences f ON f.fence_id = e.fence_id
+        ORDER BY e.id DESC LIMIT {int(limit)}
+    """)
+
+
+def vehicles_on_site():
+    init_db()
+    return load_data("""
+        SELECT p.reg_number, p.fence_id, f.name, f.kind, p.entered_at
+        FROM geofence_presence p LEFT JOIN geofences f ON f.fence_id = p.fence_id
+        ORDER BY p.entered_at
+    """)
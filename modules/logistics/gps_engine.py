@@ -1,6 +1,12 @@
 import random
 from datetime import datetime
-from modules.logistics.db_utils import run_query, load_data
+
+import pandas as pd
+import streamlit as st
+
+from modules.logistics.db_utils import init_db, load_data, engine
+from modules.logistics.geofence import process_pings
+from modules.logistics.telemetry_store import GPS_FIELDS, write_pings
 
 
 # ---------------------------------------------------------
@@ -8,20 +14,8 @@ from modules.logistics.db_utils import run_query, load_data
 # ---------------------------------------------------------
 
 def ensure_gps_table():
-    run_query("""
-        CREATE TABLE IF NOT EXISTS gps_pings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            reg_number TEXT,
-            timestamp TEXT,
-            latitude REAL,
-            longitude REAL,
-            speed REAL,
-            heading REAL,
-            ignition INTEGER,
-            signal_quality REAL,
-            source TEXT
-        )
-    """)
+    """gps_pings / gps_latest live in the logistics schema bundle; verified once per process."""
+    init_db()
     return True
 
 
@@ -50,7 +44,107 @@ def generate_synthetic_gps(reg_number, lat, lon):
 
 
 # ---------------------------------------------------------
-# 3. GPS INGESTION LOOP
+# 3. BULK INGESTION (ONE TRANSACTION PER BATCH)
+# ---------------------------------------------------------
+
+# Only move forward: an older ping arriving late never overwrites a newer fix
+_UPSERT_LATEST = f"""
+    INSERT INTO gps_latest ({", ".join(GPS_FIELDS)})
+    VALUES ({", ".join("?" * len(GPS_FIELDS))})
+    ON CONFLICT(reg_number) DO UPDATE SET
+        {", ".join(f"{f} = excluded.{f}" for f in GPS_FIELDS[1:])}
+    WHERE COALESCE(excluded.timestamp, '') >= COALESCE(gps_latest.timestamp, '')
+"""
+
+# Copied from gps_latest after the upsert, so a late batch cannot move a truck back either
+_UPDATE_FLEET = """
+    UPDATE log_vehicles
+    SET (last_lat, last_lon) = (
+        SELECT latitude, longitude FROM gps_latest WHERE gps_latest.reg_number = log_vehicles.reg_number)
+    WHERE reg_number = ?
+"""
+
+
+def _ping_rows(pings, source):
+    """
+    Normalises a batch to tuples in GPS_FIELDS order.
+    Accepts a list of ping dicts, a DataFrame, or a dict of equal-length
+    columns (lists / numpy arrays). Missing timestamp -> now, missing source -> source.
+    """
+    if isinstance(pings, pd.DataFrame):
+        pings = {c: pings[c] for c in pings.columns}
+
+    if isinstance(pings, dict):
+        n = len(pings["reg_number"])
+        now = datetime.now().isoformat()
+        defaults = {"timestamp": now, "source": source}
+        cols = []
+        for f in GPS_FIELDS:
+            col = pings.get(f)
+            if col is None:
+                cols.append([defaults.get(f)] * n)
+            else:
+                # .tolist() turns numpy scalars into plain Python values sqlite3 can bind
+                cols.append(col.tolist() if hasattr(col, "tolist") else list(col))
+        return list(zip(*cols))
+
+    now = datetime.now().isoformat()
+    return [
+        tuple(p.get(f, now if f == "timestamp" else source if f == "source" else None) for f in GPS_FIELDS)
+        for p in pings
+    ]
+
+
+def ingest_gps_batch(pings, source="bulk", update_fleet=True, geofence=True):
+    """
+    Writes a batch of pings in ONE transaction:
+    - executemany into the daily gps_pings_YYYYMMDD partitions (telemetry_store)
+    - upsert of gps_latest (newest ping per vehicle)
+    - log_vehicles.last_lat / last_lon from gps_latest (update_fleet=True)
+    Once committed, the batch is run through the geofence engine
+    (geofence=True): site arrivals / departures land on trip_manifests.
+    Returns the number of pings written (0 on failure).
+    """
+    rows = _ping_rows(pings, source)
+    if not rows:
+        return 0
+    ensure_gps_table()   # write_pings reads gps_dropped_days: the telemetry bundle must be applied
+
+    # Newest ping per vehicle in this batch (later rows win ties)
+    latest = {}
+    for row in rows:
+        prev = latest.get(row[0])
+        if prev is None or (row[1] or "") >= (prev[1] or ""):
+            latest[row[0]] = row
+    latest_rows = list(latest.values())
+
+    try:
+        with engine.begin() as conn:
+            write_pings(conn, rows)
+            conn.exec_driver_sql(_UPSERT_LATEST, latest_rows)
+            if update_fleet:
+                # Mirror onto log_vehicles in a savepoint: older fleet tables lack
+                # last_lat / last_lon and must not cost us the pings themselves
+                try:
+                    with conn.begin_nested():
+                        conn.exec_driver_sql(_UPDATE_FLEET, [(r[0],) for r in latest_rows])
+                except Exception:
+                    pass
+    except Exception as e:
+        st.error(f"GPS Ingest Error: {e}")
+        return 0
+
+    if geofence:
+        # The pings are stored either way; a fence failure only costs the events
+        try:
+            process_pings(rows)
+        except Exception as e:
+            print(f"[GEOFENCE] Evaluation error: {e}")
+    return len(rows)
+
+
+# ---------------------------------------------------------
+# 4. GPS INGESTION LOOP
 # ---------------------------------------------------------
 
 def ingest_synthetic_gps():
@@ -64,33 +158,16 @@ def ingest_synthetic_gps():
     if fleet.empty:
         return False
 
-    for _, row in fleet.iterrows():
-        ping = generate_synthetic_gps(
-            row["reg_number"],
-            row["last_lat"],
-            row["last_lon"]
-        )
-
-        # Insert GPS ping
-        run_query("""
-            INSERT INTO gps_pings 
-            (reg_number, timestamp, latitude, longitude, speed, heading, ignition, signal_quality, source)
-            VALUES (:reg_number, :timestamp, :latitude, :longitude, :speed, :heading, :ignition, :signal_quality, :source)
-        """, ping)
-
-        # Update live fleet position
-        run_query("""
-            UPDATE log_vehicles
-            SET last_lat = :latitude,
-                last_lon = :longitude
-            WHERE reg_number = :reg_number
-        """, ping)
+    pings = [
+        generate_synthetic_gps(reg, lat, lon)
+        for reg, lat, lon in zip(fleet["reg_number"], fleet["last_lat"], fleet["last_lon"])
+    ]
 
-    return True
+    return ingest_gps_batch(pings, source="synthetic") > 0
 
 
 # ---------------------------------------------------------
-# 4. PUBLIC ENTRYPOINT
+# 5. PUBLIC ENTRYPOINT
 # ---------------------------------------------------------
 
 def run_gps_simulation():
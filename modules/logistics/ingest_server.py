@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import socket
+import time
+from collections import deque
+
+import numpy as np
+
+from modules.logistics.db_utils import init_db
+from modules.logistics.gps_engine import ingest_gps_batch
+
+# =========================================================
+# TELEMETRY INGESTION SERVER (ASYNCIO, JSON LINES OVER TCP / UDP)
+# =========================================================
+# Trackers send one JSON object per line:
+#   {"reg_number": "TRK-001", "latitude": -26.2, "longitude": 28.0,
+#    "timestamp": "...", "speed": 62.5, "heading": 90, "ignition": 1, ...}
+# reg_number, latitude and longitude are required; any other GPS_FIELDS
+# column is optional (missing timestamp -> time received). An optional
+# numeric "sent_at" (epoch seconds) is used only to measure end-to-end latency.
+#
+# Parsed pings go onto one bounded queue. A single writer task drains it in
+# micro-batches (up to BATCH_MAX pings, or whatever arrived within
+# BATCH_WINDOW_S of the first) and hands each batch to
+# gps_engine.ingest_gps_batch on a worker thread. That is the same bulk write
+# path as the console, with gps_latest, fleet positions and geofences.
+#
+# Backpressure: when the queue is full, TCP readers stop reading, so the
+# kernel's receive window fills and the trackers' writes block. UDP
+# cannot push back, so datagrams arriving at a full queue are dropped and
+# counted.
+#
+# Run:  python -m modules.logistics.ingest_server [--tcp 5055] [--udp 5055]
+
+log = logging.getLogger("veridian.ingest")
+
+QUEUE_MAX = 50_000
+BATCH_MAX = 5_000
+BATCH_WINDOW_S = 0.05
+STATS_INTERVAL_S = 5.0
+STOP_GRACE_S = 10.0
+UDP_RCVBUF = 8 * 2**20   # kernel drops datagrams silently once this overflows
+_LATENCY_SAMPLES = 20_000
+
+
+class IngestServer:
+    """One queue, one writer; any number of TCP connections plus an optional UDP socket."""
+
+    def __init__(self, queue_max=QUEUE_MAX, batch_max=BATCH_MAX, batch_window_s=BATCH_WINDOW_S,
+                 writer=None, source="tracker"):
+        self.queue = asyncio.Queue(maxsize=queue_max)
+        self.batch_max = batch_max
+        self.batch_window_s = batch_window_s
+        self.writer = writer or (lambda pings: ingest_gps_batch(pings, source=source))
+        self.stats = {"received": 0, "written": 0, "batches": 0, "rejected": 0, "dropped": 0,
+                      "failed": 0, "connections": 0, "max_queue": 0}
+        self._commit_latency = deque(maxlen=_LATENCY_SAMPLES)   # received -> committed (s)
+        self._e2e_latency = deque(maxlen=_LATENCY_SAMPLES)      # tracker sent_at -> committed (s)
+        self._servers = []
+        self._connections = set()
+        self._writer_task = None
+
+    # ---------------------------------------------------------
+    # 1. PARSING
+    # ---------------------------------------------------------
+
+    def _parse(self, line):
+        """One JSON line -> (ping dict, received_at, sent_at), or None when malformed."""
+        try:
+            msg = json.loads(line)
+            ping = {
+                "reg_number": str(msg["reg_number"]),
+                "latitude": float(msg["latitude"]),
+                "longitude": float(msg["longitude"]),
+            }
+        except (ValueError, KeyError, TypeError):
+            self.stats["rejected"] += 1
+            return None
+        for field in ("timestamp", "speed", "heading", "ignition", "signal_quality", "source"):
+            if msg.get(field) is not None:
+                ping[field] = msg[field]
+        sent_at = msg.get("sent_at")
+        return ping, time.time(), sent_at if isinstance(sent_at, (int, float)) else None
+
+    def _accepted(self):
+        self.stats["received"] += 1
+        depth = self.queue.qsize()
+        if depth > self.stats["max_queue"]:
+            self.stats["max_queue"] = depth
+
+    # ---------------------------------------------------------
+    # 2. TRANSPORTS
+    # ---------------------------------------------------------
+
+    async def _handle_tcp(self, reader, writer):
+        self.stats["connections"] += 1
+        self._connections.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                item = self._parse(line)
+                if item is not None:
+                    await self.queue.put(item)   # blocks while full -> reader stops -> TCP window closes
+                    self._accepted()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    class _Datagrams(asyncio.DatagramProtocol):
+        def __init__(self, server):
+            self.server = server
+
+        def datagram_received(self, data, addr):
+            for line in data.splitlines():
+                if not line.strip():
+                    continue
+                item = self.server._parse(line)
+                if item is None:
+                    continue
+                try:
+                    self.server.queue.put_nowait(item)
+                    self.server._accepted()
+                except asyncio.QueueFull:
+                    self.server.stats["dropped"] += 1
+
+    async def start(self, host="0.0.0.0", tcp_port=5055, udp_port=None):
+        init_db()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        if tcp_port is not None:
+            server = await asyncio.start_server(self._handle_tcp, host, tcp_port, limit=2**16)
+            self._servers.append(server)
+            tcp_port = server.sockets[0].getsockname()[1]
+        if udp_port is not None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
+            sock.bind((host, udp_port))
+            transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: self._Datagrams(self), sock=sock)
+            self._servers.append(transport)
+            udp_port = transport.get_extra_info("sockname")[1]
+        log.info("Ingest server listening: tcp=%s udp=%s", tcp_port, udp_port)
+        return tcp_port, udp_port
+
+    # ---------------------------------------------------------
+    # 3. MICRO-BATCH WRITER
+    # ---------------------------------------------------------
+
+    async def _next_batch(self):
+        """Waits for one ping, then collects more until batch_max or the batch window closes."""
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_window_s
+        while len(batch) < self.batch_max:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write_loop(self):
+        while True:
+            batch = await self._next_batch()
+            pings = [p for p, _, _ in batch]
+            try:
+                written = await asyncio.to_thread(self.writer, pings)   # SQLite work off the event loop
+            except Exception as e:
+                log.error("Batch write failed: %s", e)
+                written = 0
+            done = time.time()
+            if written:
+                self.stats["written"] += written
+                self.stats["batches"] += 1
+                self._commit_latency.extend(done - received for _, received, _ in batch)
+                self._e2e_latency.extend(done - sent for _, _, sent in batch if sent is not None)
+            else:
+                self.stats["failed"] += len(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    async def drain(self):
+        """Waits until every queued ping has been written (or failed)."""
+        await self.queue.join()
+
+    async def stop(self, grace_s=STOP_GRACE_S):
+        """
+        Stops accepting, lets open TCP connections finish what they already sent
+        (up to grace_s, then cuts them), writes everything queued, stops the writer.
+        """
+        for server in self._servers:
+            server.close()
+        if self._connections:
+            _, pending = await asyncio.wait(list(self._connections), timeout=grace_s)
+            for task in pending:
+                task.cancel()
+        await self.drain()
+        if self._writer_task:
+            self._writer_task.cancel()
+
+    # ---------------------------------------------------------
+    # 4. STATS
+    # ---------------------------------------------------------
+
+    def snapshot(self):
+        """Counters plus latency percentiles (ms) over the most recent pings."""
+        out = dict(self.stats, queue=self.queue.qsize())
+        for name, samples in (("commit", self._commit_latency), ("e2e", self._e2e_latency)):
+            if samples:
+                pct = np.percentile(np.fromiter(samples, float), [50, 95, 99]) * 1000
+                out[f"{name}_ms"] = dict(zip(("p50", "p95", "p99"), pct.round(1).tolist()))
+        return out
+
+    async def report(self, interval=STATS_INTERVAL_S):
+        last, t_last = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            snap = self.snapshot()
+            rate = (snap["written"] - last) / (now - t_last)
+            last, t_last = snap["written"], now
+            log.info(f"{rate:,.0f} pings/s | written {snap['written']:,} | queue {snap['queue']:,} "
+                     f"(max {snap['max_queue']:,}) | rejected {snap['rejected']} dropped {snap['dropped']} "
+                     f"failed {snap['failed']} | commit ms {snap.get('commit_ms', '-')}")
+
+
+async def serve(host, tcp_port, udp_port, **kwargs):
+    server = IngestServer(**kwargs)
+    await server.start(host, tcp_port, udp_port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:   # Windows
+            pass
+    reporter = asyncio.create_task(server.report())
+    await stop.wait()
+    reporter.cancel()
+    await server.stop()
+    log.info("Stopped: %s", server.snapshot())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Veridian telemetry ingestion server (JSON lines over TCP / UDP)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--tcp", type=int, default=5055, help="TCP port (-1 to disable)")
+    parser.add_argument("--udp", type=int, default=5055, help="UDP port (-1 to disable)")
+    parser.add_argument("--queue-max", type=int, default=QUEUE_MAX)
+    parser.add_argument("--batch-max", type=int, default=BATCH_MAX)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_S * 1000)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    asyncio.run(serve(args.host, None if args.tcp < 0 else args.tcp, None if args.udp < 0 else args.udp,
+                      queue_max=args.queue_max, batch_max=args.batch_max, batch_window_s=args.batch_window_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
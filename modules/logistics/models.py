@@ -14,6 +14,8 @@ except ImportError:
     except ImportError:
         from modules.logistics.db_utils import run_query, load_data
 
+from modules.logistics.gps_engine import ensure_gps_table, ingest_gps_batch
+
 
 # ---------------------------------------------------------
 # SEASONAL + CLIENT PROFILE + ROUTE MODELS
@@ -129,17 +131,16 @@ def inject_sovereign_data():
     # ---------------------------------------------------------
     # 2. GPS PINGS
     # ---------------------------------------------------------
-    for truck in fleet:
-        result = run_query("""
-            INSERT INTO gps_pings (
-                reg_number, timestamp, latitude, longitude,
-                speed, heading, ignition, signal_quality, source
-            ) VALUES (:r, :ts, :lat, :lon, 0, 0, 1, 1.0, 'SIM')
-        """, {
-            "r": truck[0], "ts": datetime.now().isoformat(),
-            "lat": truck[7], "lon": truck[8]
-        })
-        print(f"[GPS] Pinged {truck[0]}: {result}")
+    ensure_gps_table()
+    result = ingest_gps_batch([
+        {
+            "reg_number": truck[0], "timestamp": datetime.now().isoformat(),
+            "latitude": truck[7], "longitude": truck[8],
+            "speed": 0, "heading": 0, "ignition": 1, "signal_quality": 1.0,
+        }
+        for truck in fleet
+    ], source="SIM", update_fleet=False)
+    print(f"[GPS] Pinged {result} trucks")
 
     # ---------------------------------------------------------
     # 3. RFQ INJECTION
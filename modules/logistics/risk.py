@@ -1,23 +1,54 @@
 import streamlit as st
-import pandas as pd
+
+from modules.logistics.fuel_forensics import fuel_events, fuel_inventory, level_history, scan_fuel
 
 def render_risk_tabs():
     # Note: We group these two into sub-tabs here for cleaner organization
     tab_fuel, tab_comp = st.tabs(["⛽ Fuel Risk", "🪪 Compliance"])
     
-    # --- FUEL FORENSICS ---
+    # --- FUEL FORENSICS (fuel_series / fuel_events) ---
     with tab_fuel:
         st.subheader("⛽ Fuel Forensics | TTE-07")
-        c_fuel, c_alert = st.columns([3, 1])
-        with c_fuel:
-            fuel_hours = [f"{i}:00" for i in range(24)]
-            # The specific logic for the 'Drop' at 08:00
-            fuel_levels = [900 - (i*10) if i != 8 else 900-(i*10)-50 for i in range(24)] 
-            st.line_chart(pd.DataFrame({'Time': fuel_hours, 'Level': fuel_levels}).set_index('Time'), color="#C0392B")
-        with c_alert:
-            st.error("🚨 **THEFT EVENT**")
-            st.markdown("08:00 AM • **-50L Drop**")
-            st.button("👮 Log Incident")
+        df_tanks = fuel_inventory()
+        if df_tanks.empty:
+            st.info("No tank-level readings yet. Feed them in with fuel_forensics.ingest_fuel_levels().")
+        else:
+            f1, f2, f3 = st.columns(3)
+            f1.metric("Tanks Monitored", len(df_tanks))
+            f2.metric("Fuel On Hand", f"{df_tanks['current_liters'].sum():,.0f} L")
+            f3.metric("Theft Events", int(df_tanks["theft_events"].sum()))
+
+            c_fuel, c_alert = st.columns([3, 1])
+            with c_fuel:
+                tank = st.selectbox("Tank", df_tanks["tank_id"].tolist())
+                df_level = level_history(tank)
+                if not df_level.empty:
+                    st.line_chart(df_level.set_index("timestamp"), color="#C0392B")
+            with c_alert:
+                df_events = fuel_events(tank, limit=50)
+                if df_events.empty:
+                    st.success("✅ No unexplained drops")
+                else:
+                    ev = df_events.iloc[0]
+                    st.error("🚨 **THEFT EVENT**")
+                    st.markdown(f"{ev['start_ts'].replace('T', ' ')} • **-{ev['liters_lost']:,.0f}L** "
+                                f"(expected use {ev['expected_l']:,.0f}L)")
+                if st.button("🔍 Scan for Theft"):
+                    res = scan_fuel()
+                    st.success(f"{res['events']} new events, {res['incidents']} logged to the Risk Ledger.")
+                    st.rerun()
+
+            if not df_events.empty:
+                st.dataframe(
+                    df_events[["start_ts", "end_ts", "liters_lost", "observed_drop_l", "expected_l", "incident_id"]],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "liters_lost": st.column_config.NumberColumn("Unexplained (L)", format="%.0f"),
+                        "observed_drop_l": st.column_config.NumberColumn("Level Drop (L)", format="%.0f"),
+                        "expected_l": st.column_config.NumberColumn("Expected Use (L)", format="%.0f"),
+                    },
+                )
 
     # --- COMPLIANCE VAULT ---
     with tab_comp:
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# ROBUST IMPORTS
+# ---------------------------------------------------------
+try:
+    from modules.logistics.constants import CORRIDORS, HUB_ALIASES, ROAD_LINKS, ROAD_SPEED_KMH
+except ImportError:
+    from .constants import CORRIDORS, HUB_ALIASES, ROAD_LINKS, ROAD_SPEED_KMH
+
+# =========================================================
+# HUB ROAD NETWORK — ALL-PAIRS CORRIDOR MATRIX
+# =========================================================
+# Nodes are hubs: corridor endpoints, with HUB_ALIASES folding yards, port
+# gates and short names ('DBN', 'JHB Yard') onto them. Edges are CORRIDORS
+# + ROAD_LINKS, either direction, and keep their corridor metadata.
+# Shortest routes by distance are found for every pair at once
+# (Floyd-Warshall over numpy arrays). The hours and tolls of each chosen
+# route are summed along with it, so all three matrices describe the same
+# road. The matrices are cached to CACHE_PATH, keyed by a hash of the edge
+# data, and held in memory after the first read. A lookup is a dict hit
+# per hub plus a table read.
+
+CACHE_PATH = "road_network.npz"   # relative to the working directory, like fleet_data.db
+DEFAULT_ORIGIN = "JHB City Deep"  # main depot: lanes priced "from JHB" start here
+
+_lock = threading.Lock()
+_net = None   # {"key", "nodes", "dist", "hours", "tolls", "next", "legs", "index", "edges", "resolved"}
+
+
+# ---------------------------------------------------------
+# 1. GRAPH
+# ---------------------------------------------------------
+
+def _norm(place):
+    return re.sub(r"\s+", " ", str(place or "")).strip().lower()
+
+
+def _edges():
+    """[(a, b, corridor name, meta)] for every corridor / link, endpoints folded onto network nodes."""
+    out = []
+    for name, meta in {**CORRIDORS, **ROAD_LINKS}.items():
+        lane = name.split(":", 1)[-1]
+        if "->" not in lane:
+            continue
+        a, b = (x.strip() for x in lane.split("->", 1))
+        out.append((HUB_ALIASES.get(a, a), HUB_ALIASES.get(b, b), name, meta))
+    return out
+
+
+def _hours(meta):
+    return meta["dist"] / ROAD_SPEED_KMH.get(meta.get("road"), ROAD_SPEED_KMH["Good"])
+
+
+def _key(edges):
+    raw = json.dumps([(a, b, meta["dist"], meta["tolls"], _hours(meta)) for a, b, _, meta in edges])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def build_network(edges=None):
+    """
+    All-pairs matrices over the hub graph: {"nodes", "dist" (km), "hours",
+    "tolls" (ZAR), "next"}. next[i, j] is the hop after i on the route to j
+    (-1: no road). Unreachable pairs are inf.
+    """
+    edges = _edges() if edges is None else edges
+    nodes = sorted({a for a, *_ in edges} | {b for _, b, *_ in edges})
+    idx = {n: i for i, n in enumerate(nodes)}
+    n = len(nodes)
+    dist, hours, tolls = (np.full((n, n), np.inf) for _ in range(3))
+    nxt = np.full((n, n), -1, dtype=np.int64)
+    for m in (dist, hours, tolls):
+        np.fill_diagonal(m, 0.0)
+    np.fill_diagonal(nxt, np.arange(n))
+
+    for a, b, _, meta in edges:
+        i, j = idx[a], idx[b]
+        if meta["dist"] < dist[i, j]:   # parallel corridors: the shorter one is the road
+            for p, q in ((i, j), (j, i)):
+                dist[p, q], hours[p, q], tolls[p, q], nxt[p, q] = meta["dist"], _hours(meta), meta["tolls"], q
+
+    # Floyd-Warshall, one vectorised relaxation per intermediate hub. Only a
+    # strictly shorter route replaces one, so ties keep the direct corridor.
+    for k in range(n):
+        via = dist[:, k, None] + dist[None, k, :]
+        better = via < dist - 1e-9
+        dist = np.where(better, via, dist)
+        hours = np.where(better, hours[:, k, None] + hours[None, k, :], hours)
+        tolls = np.where(better, tolls[:, k, None] + tolls[None, k, :], tolls)
+        nxt = np.where(better, nxt[:, k, None], nxt)
+    return {"nodes": np.array(nodes), "dist": dist, "hours": hours, "tolls": tolls, "next": nxt}
+
+
+# ---------------------------------------------------------
+# 2. DISK CACHE + PROCESS COPY
+# ---------------------------------------------------------
+
+def _read_cache(path):
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            return {k: z[k] for k in z.files}
+    except (OSError, ValueError, KeyError):   # missing or unreadable: rebuild
+        return None
+
+
+def _write_cache(path, data):
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            np.savez(f, **data)
+        os.replace(tmp, path)   # readers never see a half-written file
+    except OSError:
+        pass   # read-only working directory: the in-memory copy still serves
+
+
+def network():
+    """
+    The process-wide matrices. Read from CACHE_PATH on first use; rebuilt and
+    re-cached when the corridor data no longer matches the cached key.
+    """
+    global _net
+    if _net is not None:
+        return _net
+    with _lock:
+        if _net is None:
+            edges = _edges()
+            key = _key(edges)
+            data = _read_cache(CACHE_PATH)
+            if data is None or str(data.get("key")) != key:
+                data = build_network(edges)
+                data["key"] = np.array(key)
+                _write_cache(CACHE_PATH, data)
+            nodes = [str(x) for x in data["nodes"]]
+            index = {_norm(name): i for i, name in enumerate(nodes)}
+            index.update({_norm(alias): index[_norm(node)] for alias, node in HUB_ALIASES.items() if _norm(node) in index})
+            roads = {}   # (i, j) -> (corridor name, meta) of the road build_network used
+            for a, b, name, meta in edges:
+                i, j = index[_norm(a)], index[_norm(b)]
+                for pair in ((i, j), (j, i)):
+                    if pair not in roads or meta["dist"] < roads[pair][1]["dist"]:
+                        roads[pair] = (name, meta)
+            # Per-pair answers as plain Python: a lookup skips numpy scalar indexing
+            table = [[{"dist": d, "hours": h, "tolls": x} if np.isfinite(d) else None for d, h, x in zip(*rows)]
+                     for rows in zip(data["dist"].tolist(), data["hours"].tolist(), data["tolls"].tolist())]
+            data.update(key=key, nodes=nodes, index=index, edges=roads, legs=table, resolved={})
+            _net = data
+    return _net
+
+
+def reset_network():
+    """Drops the in-memory copy; the next lookup reads the disk cache again."""
+    global _net
+    with _lock:
+        _net = None
+
+
+# ---------------------------------------------------------
+# 3. LOOKUPS
+# ---------------------------------------------------------
+
+def hub_node(place):
+    """
+    Network node index for a hub name, else None. Accepts aliases, labels
+    such as 'Durban (DBN)', and whole-word prefixes ('Pretoria North' ~
+    'Pretoria'); 'Durbanville' is not Durban.
+    """
+    net = _net or network()
+    resolved = net["resolved"]
+    if place in resolved:
+        return resolved[place]
+    index = net["index"]
+    key = _norm(place)
+    found = index.get(key)
+    if found is None:
+        label = re.match(r"(.*?)\s*\((.*)\)$", key)
+        for part in label.groups() if label else ():
+            if part in index:
+                found = index[part]
+                break
+    if found is None and len(key) >= 3:
+        for name, i in index.items():
+            if len(name) >= 3 and (name.startswith(key + " ") or key.startswith(name + " ")):
+                found = i
+                break
+    resolved[place] = found
+    return found
+
+
+def corridor_leg(origin, destination):
+    """{"dist" (km), "hours", "tolls" (ZAR)} of the shortest road between two hubs, else None."""
+    i, j = hub_node(origin), hub_node(destination)
+    if i is None or j is None:
+        return None
+    leg = network()["legs"][i][j]
+    return dict(leg) if leg else None
+
+
+def road_km(origin, destination, default=np.nan):
+    """Shortest road km between two hubs (default when either is not on the network)."""
+    leg = corridor_leg(origin, destination)
+    return leg["dist"] if leg else default
+
+
+def lane_km(route, default=np.nan):
+    """
+    Road km along a route label: a corridor name ('N3: Durban Port -> JHB City Deep')
+    or a stop list ('Depot → Durban → Depot', optionally ending in '(570 km)').
+    default when any stop is not on the network.
+    """
+    text = re.sub(r"\s*\([\d,.]+\s*km\)\s*$", "", str(route or ""))
+    if re.match(r"^\w{1,5}:", text):
+        text = text.split(":", 1)[1]
+    stops = [s for s in re.split(r"\s*(?:→|->)\s*", text.strip()) if s]
+    if len(stops) < 2:
+        return default
+    total = 0.0
+    for a, b in zip(stops, stops[1:]):
+        km = road_km(a, b)
+        if np.isnan(km):
+            return default
+        total += km
+    return total
+
+
+def km_matrix(places):
+    """Road km between every pair of places (NaN rows / columns for places off the network)."""
+    net = network()
+    ids = [hub_node(p) for p in places]
+    known = np.array([i is not None for i in ids], dtype=bool)
+    pos = np.array([i if i is not None else 0 for i in ids], dtype=np.int64)
+    out = net["dist"][np.ix_(pos, pos)]
+    out[~known, :] = np.nan
+    out[:, ~known] = np.nan
+    return out
+
+
+def route_path(origin, destination):
+    """
+    Corridor legs of the shortest road: [(from hub, to hub, corridor name, meta)].
+    [] when both names are the same hub, None when there is no road.
+    """
+    net = network()
+    i, j = hub_node(origin), hub_node(destination)
+    if i is None or j is None or net["next"][i, j] < 0:
+        return None
+    legs = []
+    while i != j:
+        k = int(net["next"][i, j])
+        name, meta = net["edges"][(i, k)]
+        legs.append((net["nodes"][i], net["nodes"][k], name, meta))
+        i = k
+    return legs
+
+
+def corridor_matrix(metric="dist"):
+    """One all-pairs matrix (hubs x hubs) as a DataFrame: metric is 'dist', 'hours' or 'tolls'."""
+    net = network()
+    return pd.DataFrame(net[metric], index=net["nodes"], columns=net["nodes"])
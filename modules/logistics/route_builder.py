@@ -0,0 +1,220 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# ROBUST IMPORTS
+# ---------------------------------------------------------
+try:
+    from modules.logistics.constants import REGION_COORDS, ROAD_DETOUR_FACTOR
+    from modules.logistics.dispatch_optimizer import hub_coords, haversine_km
+    from modules.logistics.road_network import km_matrix
+except ImportError:
+    from .constants import REGION_COORDS, ROAD_DETOUR_FACTOR
+    from .dispatch_optimizer import hub_coords, haversine_km
+    from .road_network import km_matrix
+
+# =========================================================
+# MILK-RUN BUILDER — CAPACITATED MULTI-DROP ROUTING
+# =========================================================
+# Orders are drops around a single depot. Routes are built with the
+# Clarke-Wright savings heuristic (merge the two routes whose join saves the
+# most km, within vehicle capacity), each route is then tightened with 2-opt
+# and matched to the smallest free vehicle that can carry it.
+# Savings is re-run at each distinct fleet capacity (largest first) and the
+# plan that places the most orders at the lowest cost wins. Everything stops
+# at the time budget and returns the best plan found so far.
+
+DEPOT = "Depot"
+DEFAULT_CPK = 15.00        # R/km when fleet_registry has no cpk
+TIME_BUDGET_S = 0.5
+
+
+# ---------------------------------------------------------
+# 1. GEOGRAPHY
+# ---------------------------------------------------------
+
+def locate(place):
+    """(lat, lon) for a hub name or a REGION_COORDS region, else None."""
+    coords = hub_coords(place)
+    if coords:
+        return coords
+    region = REGION_COORDS.get(str(place or "").strip())
+    return (region["lat"], region["lon"]) if region else None
+
+
+def distance_matrix(points):
+    """Road-distance estimate (km) between every pair of (lat, lon) points."""
+    p = np.asarray(points, dtype=float).reshape(-1, 2)
+    return haversine_km(p[:, None, 0], p[:, None, 1], p[None, :, 0], p[None, :, 1]) * ROAD_DETOUR_FACTOR
+
+
+def site_matrix(places, points):
+    """Road km between sites: hub road network where both ends are hubs, else the straight-line estimate."""
+    road = km_matrix(places)
+    return np.where(np.isnan(road), distance_matrix(points), road)
+
+
+def route_km(route, D):
+    """Depot -> drops in order -> depot. Node 0 is the depot."""
+    if not route:
+        return 0.0
+    legs = D[0, route[0]] + D[route[-1], 0]
+    return float(legs + sum(D[a, b] for a, b in zip(route, route[1:])))
+
+
+# ---------------------------------------------------------
+# 2. HEURISTICS
+# ---------------------------------------------------------
+
+def _savings(D, loads, capacity, deadline):
+    """Clarke-Wright parallel savings. loads[k] is node k's load (loads[0] = depot = 0)."""
+    n = len(loads) - 1
+    routes = {k: [k] for k in range(1, n + 1)}
+    route_of = list(range(n + 1))
+    route_load = list(loads)
+
+    i_idx, j_idx = np.triu_indices(n, k=1)
+    i_idx, j_idx = i_idx + 1, j_idx + 1
+    s = D[0, i_idx] + D[0, j_idx] - D[i_idx, j_idx]
+    keep = s > 1e-9
+    order = np.argsort(-s[keep], kind="stable")
+    pairs = zip(i_idx[keep][order].tolist(), j_idx[keep][order].tolist())
+
+    for step, (i, j) in enumerate(pairs):
+        if step % 1024 == 0 and time.perf_counter() > deadline:
+            break
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj or route_load[ri] + route_load[rj] > capacity:
+            continue
+        a, b = routes[ri], routes[rj]
+        # Only route ends can be joined
+        if a[-1] == i and b[0] == j:
+            merged = a + b
+        elif a[0] == i and b[-1] == j:
+            merged = b + a
+        elif a[-1] == i and b[-1] == j:
+            merged = a + b[::-1]
+        elif a[0] == i and b[0] == j:
+            merged = a[::-1] + b
+        else:
+            continue
+        routes[ri] = merged
+        route_load[ri] += route_load[rj]
+        for k in routes.pop(rj):
+            route_of[k] = ri
+
+    return [(r, route_load[route_of[r[0]]]) for r in routes.values()]
+
+
+def _two_opt(route, D, deadline):
+    """Reverses segments while that shortens the closed tour."""
+    if len(route) < 3:
+        return route
+    path = [0] + route + [0]
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for a in range(1, len(path) - 2):
+            for b in range(a + 1, len(path) - 1):
+                delta = (D[path[a - 1], path[b]] + D[path[a], path[b + 1]]
+                         - D[path[a - 1], path[a]] - D[path[b], path[b + 1]])
+                if delta < -1e-9:
+                    path[a:b + 1] = path[a:b + 1][::-1]
+                    improved = True
+    return path[1:-1]
+
+
+def _group_same_site(route, sites):
+    """Pulls drops at an already-visited site up next to its first visit (never adds km)."""
+    first = {}
+    for pos, k in enumerate(route):
+        first.setdefault(sites[k], pos)
+    return sorted(route, key=lambda k: first[sites[k]])
+
+
+def _assign_vehicles(routes, vehicles):
+    """Largest route first onto the smallest free vehicle that carries it (cheapest cpk on ties)."""
+    free = sorted(vehicles.itertuples(index=False), key=lambda v: (v.capacity_kg, v.cpk))
+    placed, unplaced = [], []
+    for route, load in sorted(routes, key=lambda r: -r[1]):
+        pick = next((k for k, v in enumerate(free) if v.capacity_kg >= load), None)
+        if pick is None:
+            unplaced.append((route, load))
+        else:
+            placed.append((route, load, free.pop(pick)))
+    return placed, unplaced
+
+
+# ---------------------------------------------------------
+# 3. PUBLIC ENTRYPOINT
+# ---------------------------------------------------------
+
+def build_milk_runs(orders, vehicles, depot=DEPOT, time_budget_s=TIME_BUDGET_S):
+    """
+    orders:   DataFrame [order_id, load_kg, location] (location = hub or region name)
+    vehicles: DataFrame [vehicle_id, capacity_kg, cpk]
+    Returns {"trips": [...], "unrouted": {order_id: reason}, "ms": float}.
+    Each trip: vehicle_id, stops (order_ids in drop order), route, distance_km, load_kg, cost.
+    """
+    t0 = time.perf_counter()
+    deadline = t0 + time_budget_s
+    unrouted = {}
+
+    depot_xy = locate(depot) or locate("Gauteng")
+    drops = []
+    for row in orders.itertuples(index=False):
+        xy = locate(row.location)
+        if xy is None:
+            unrouted[row.order_id] = "No drop location"
+        else:
+            drops.append((row.order_id, float(row.load_kg or 0.0), str(row.location), xy))
+
+    vehicles = vehicles.copy()
+    vehicles["cpk"] = pd.to_numeric(vehicles["cpk"], errors="coerce").fillna(DEFAULT_CPK)
+    vehicles["capacity_kg"] = pd.to_numeric(vehicles["capacity_kg"], errors="coerce").fillna(0.0)
+    if not drops or vehicles.empty:
+        for order_id, *_ in drops:
+            unrouted[order_id] = "No vehicle available"
+        return {"trips": [], "unrouted": unrouted, "ms": (time.perf_counter() - t0) * 1000}
+
+    sites = [depot_xy] + [d[3] for d in drops]
+    D = site_matrix([depot] + [d[2] for d in drops], sites)
+    loads = [0.0] + [d[1] for d in drops]
+
+    # Savings at each distinct capacity, best plan wins (most drops placed, then lowest cost)
+    best = None
+    for capacity in sorted(vehicles["capacity_kg"].unique(), reverse=True):
+        routes = _savings(D, loads, capacity, deadline)
+        placed, unplaced = _assign_vehicles(routes, vehicles)
+        n_placed = sum(len(r) for r, _, _ in placed)
+        cost = sum(route_km(r, D) * v.cpk for r, _, v in placed)
+        if best is None or (n_placed, -cost) > (best[0], -best[1]):
+            best = (n_placed, cost, placed, unplaced)
+        if not unplaced or time.perf_counter() > deadline:
+            break
+
+    _, _, placed, unplaced = best
+    max_capacity = vehicles["capacity_kg"].max()
+    for route, _ in unplaced:
+        for k in route:
+            order_id, load = drops[k - 1][0], drops[k - 1][1]
+            unrouted[order_id] = "Exceeds fleet capacity" if load > max_capacity else "No vehicle available"
+
+    trips = []
+    for route, load, vehicle in placed:
+        route = _group_same_site(_two_opt(route, D, deadline), sites)
+        km = route_km(route, D)
+        places = [depot] + [drops[k - 1][2] for k in route] + [depot]
+        places = [p for i, p in enumerate(places) if i == 0 or p != places[i - 1]]
+        trips.append({
+            "vehicle_id": vehicle.vehicle_id,
+            "stops": [drops[k - 1][0] for k in route],
+            "route": " → ".join(places),
+            "distance_km": round(km, 1),
+            "load_kg": round(load, 1),
+            "cost": round(km * vehicle.cpk, 2),
+        })
+
+    return {"trips": trips, "unrouted": unrouted, "ms": (time.perf_counter() - t0) * 1000}
@@ -73,10 +73,8 @@ def _fetch_latest_gps(reg_number: str) -> dict:
     df = load_data(
         """
         SELECT latitude, longitude, speed, heading, ignition, signal_quality
-        FROM gps_pings
+        FROM gps_latest
         WHERE reg_number = :r
-        ORDER BY id DESC
-        LIMIT 1
         """,
         {"r": reg_number},
     )
@@ -115,7 +113,171 @@ def _fetch_latest_gps(reg_number: str) -> dict:
     }
 
 
-def enrich_fleet_data(df_fleet: pd.DataFrame) -> pd.DataFrame:
+# ---------------------------------------------------------
+# SET-BASED FETCHERS (WHOLE FLEET, CONSTANT QUERY COUNT)
+# ---------------------------------------------------------
+_HISTORY_COLS = ["mission_name", "status", "start_time", "end_time"]
+_GPS_COLS = ["reg_number", "latitude", "longitude", "speed", "heading", "ignition", "signal_quality"]
+
+
+def _fetch_missions_batch() -> pd.DataFrame:
+    """
+    Last 3 missions for every vehicle in one windowed query.
+    rn = 1 is the latest mission; rn <= 3 is the history window.
+    """
+    return load_data(
+        """
+        SELECT reg_number, mission_name, driver_name, status, start_time, end_time, rn
+        FROM (
+            SELECT reg_number, mission_name, driver_name, status, start_time, end_time,
+                   ROW_NUMBER() OVER (PARTITION BY reg_number ORDER BY id DESC) AS rn
+            FROM log_missions
+        )
+        WHERE rn <= 3
+        ORDER BY reg_number, rn
+        """
+    )
+
+
+def _fetch_latest_gps_batch() -> pd.DataFrame:
+    """Latest ping for every vehicle (gps_latest is maintained by gps_engine.ingest_gps_batch)."""
+    return load_data(
+        """
+        SELECT reg_number, latitude, longitude, speed, heading, ignition, signal_quality
+        FROM gps_latest
+        """
+    )
+
+
+def _movement_status(has_gps: pd.Series, speed: pd.Series, ignition: pd.Series) -> np.ndarray:
+    """Vectorised equivalent of the if/else ladder in _fetch_latest_gps."""
+    return np.select(
+        [
+            has_gps & (ignition == 0),
+            has_gps & (speed > 5),
+            has_gps & (speed >= 0) & (speed <= 5),
+        ],
+        ["Parked", "In Transit", "Stationary"],
+        default="Unknown",
+    )
+
+
+def _present(s: pd.Series) -> pd.Series:
+    """Mirrors the `value or fallback` truthiness used by the per-row path."""
+    return s.notna() & (s != "")
+
+
+def _enrich_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Set-based enrichment path.
+    One windowed query plus a gps_latest read for the whole fleet, merged with vectorised ops.
+    Produces the same columns as _enrich_rows.
+    """
+    regs = df["reg_number"]
+
+    # Mission context (latest + last-3 history)
+    missions = _fetch_missions_batch()
+    if missions.empty:
+        missions = pd.DataFrame(columns=["reg_number", "driver_name", "rn", *_HISTORY_COLS])
+
+    latest = missions[missions["rn"] == 1].set_index("reg_number")
+    history = {
+        reg: grp[_HISTORY_COLS].reset_index(drop=True)
+        for reg, grp in missions.groupby("reg_number", sort=False)
+    }
+
+    has_mission = regs.isin(latest.index)
+    m_name = regs.map(latest["mission_name"]).astype(object)
+    m_driver = regs.map(latest["driver_name"]).astype(object)
+    m_status = regs.map(latest["status"]).astype(object).where(has_mission, "Unassigned")
+    m_client = (
+        m_name.where(m_name.str.contains(" - ", regex=False, na=False))
+        .str.split(" - ", n=1)
+        .str[0]
+    )
+
+    df["mission_client"] = m_client.where(_present(m_client), df["mission_client"])
+    df["mission_driver"] = m_driver.where(_present(m_driver), df["driver_name"])
+    df["mission_status"] = m_status.where(_present(m_status), df["mission_status"])
+    df["mission_start"] = regs.map(latest["start_time"]).astype(object).where(has_mission, None)
+    df["mission_history"] = pd.Series([history.get(r) for r in regs], index=df.index, dtype=object)
+
+    # GPS context (latest ping)
+    gps = _fetch_latest_gps_batch()
+    if gps.empty:
+        gps = pd.DataFrame(columns=_GPS_COLS)
+    gps = gps.set_index("reg_number")
+
+    has_gps = regs.isin(gps.index)
+    lat = regs.map(gps["latitude"])
+    lon = regs.map(gps["longitude"])
+    speed = pd.to_numeric(regs.map(gps["speed"]), errors="coerce").fillna(0).where(has_gps)
+    ignition = regs.map(gps["ignition"])
+
+    # Prefer GPS last_lat/last_lon, fall back to existing columns if present
+    df["last_lat"] = lat.where(lat.notna(), df.get("last_lat"))
+    df["last_lon"] = lon.where(lon.notna(), df.get("last_lon"))
+    df["speed"] = speed
+    df["heading"] = regs.map(gps["heading"])
+    df["ignition"] = ignition
+    df["signal_quality"] = regs.map(gps["signal_quality"])
+    df["movement_status"] = _movement_status(has_gps, speed, ignition)
+
+    return df
+
+
+# ---------------------------------------------------------
+# PER-VEHICLE PATH (LEGACY, N x 3 QUERIES)
+# ---------------------------------------------------------
+def _enrich_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-vehicle enrichment path (three queries per row)."""
+    enriched_rows = []
+
+    for _, row in df.iterrows():
+        reg = row.get("reg_number")
+
+        # Mission context
+        mission_ctx = _fetch_latest_mission(reg)
+        history_df = _fetch_mission_history(reg)
+
+        # GPS context
+        gps_ctx = _fetch_latest_gps(reg)
+
+        enriched_row = row.copy()
+
+        # Mission fields
+        enriched_row["mission_client"] = mission_ctx["mission_client"] or row.get(
+            "mission_client", "Unassigned"
+        )
+        enriched_row["mission_driver"] = mission_ctx["mission_driver"] or row.get(
+            "driver_name"
+        )
+        enriched_row["mission_status"] = mission_ctx["mission_status"] or row.get(
+            "mission_status", "Unknown"
+        )
+        enriched_row["mission_start"] = mission_ctx["mission_start"]
+        enriched_row["mission_history"] = history_df
+
+        # GPS fields
+        # Prefer GPS last_lat/last_lon, fall back to existing columns if present
+        enriched_row["last_lat"] = gps_ctx["last_lat"] if gps_ctx["last_lat"] is not None else row.get(
+            "last_lat"
+        )
+        enriched_row["last_lon"] = gps_ctx["last_lon"] if gps_ctx["last_lon"] is not None else row.get(
+            "last_lon"
+        )
+        enriched_row["speed"] = gps_ctx["speed"]
+        enriched_row["heading"] = gps_ctx["heading"]
+        enriched_row["ignition"] = gps_ctx["ignition"]
+        enriched_row["signal_quality"] = gps_ctx["signal_quality"]
+        enriched_row["movement_status"] = gps_ctx["movement_status"]
+
+        enriched_rows.append(enriched_row)
+
+    return pd.DataFrame(enriched_rows)
+
+
+def enrich_fleet_data(df_fleet: pd.DataFrame, batch: bool = True) -> pd.DataFrame:
     """
     Sovereign enrichment engine for fleet data.
     Ensures all downstream modules receive a complete, enriched dataset:
@@ -123,6 +285,10 @@ def enrich_fleet_data(df_fleet: pd.DataFrame) -> pd.DataFrame:
     - GPS context (movement + coordinates)
     - availability forecast
     - physics placeholders
+
+    batch=True (default) resolves mission + GPS context for the whole
+    fleet in two set-based queries; batch=False keeps the original
+    three-queries-per-vehicle path.
     """
     if df_fleet.empty:
         return df_fleet
@@ -191,56 +357,13 @@ def enrich_fleet_data(df_fleet: pd.DataFrame) -> pd.DataFrame:
         df["load_rating"] = df["max_tons"]
 
     # -----------------------------------------------------
-    # 6. GPS + MISSION ENRICHMENT (PER VEHICLE)
+    # 6. GPS + MISSION ENRICHMENT
     # -----------------------------------------------------
     # Ensure reg_number exists
     if "reg_number" not in df.columns:
         return df  # Cannot enrich without a key
 
-    enriched_rows = []
-
-    for _, row in df.iterrows():
-        reg = row.get("reg_number")
-
-        # Mission context
-        mission_ctx = _fetch_latest_mission(reg)
-        history_df = _fetch_mission_history(reg)
-
-        # GPS context
-        gps_ctx = _fetch_latest_gps(reg)
-
-        enriched_row = row.copy()
-
-        # Mission fields
-        enriched_row["mission_client"] = mission_ctx["mission_client"] or row.get(
-            "mission_client", "Unassigned"
-        )
-        enriched_row["mission_driver"] = mission_ctx["mission_driver"] or row.get(
-            "driver_name"
-        )
-        enriched_row["mission_status"] = mission_ctx["mission_status"] or row.get(
-            "mission_status", "Unknown"
-        )
-        enriched_row["mission_start"] = mission_ctx["mission_start"]
-        enriched_row["mission_history"] = history_df
-
-        # GPS fields
-        # Prefer GPS last_lat/last_lon, fall back to existing columns if present
-        enriched_row["last_lat"] = gps_ctx["last_lat"] if gps_ctx["last_lat"] is not None else row.get(
-            "last_lat"
-        )
-        enriched_row["last_lon"] = gps_ctx["last_lon"] if gps_ctx["last_lon"] is not None else row.get(
-            "last_lon"
-        )
-        enriched_row["speed"] = gps_ctx["speed"]
-        enriched_row["heading"] = gps_ctx["heading"]
-        enriched_row["ignition"] = gps_ctx["ignition"]
-        enriched_row["signal_quality"] = gps_ctx["signal_quality"]
-        enriched_row["movement_status"] = gps_ctx["movement_status"]
-
-        enriched_rows.append(enriched_row)
-
-    df_enriched = pd.DataFrame(enriched_rows)
-
-    return df_enriched
+    if batch:
+        return _enrich_batch(df)
 
+    return _enrich_rows(df)
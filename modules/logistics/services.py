@@ -2,6 +2,9 @@ import datetime
 from io import BytesIO
 from fpdf import FPDF
 
+import numpy as np
+import pandas as pd
+
 # ==========================================================
 # ROBUST IMPORTS (MATCHES constants.py EXACTLY)
 # ==========================================================
@@ -156,6 +159,151 @@ def calculate_route_economics(route_name, truck_efficiency, tons=28, asset_profi
     }
 
 
+# ==========================================================
+# 2b. BATCH ROUTE ECONOMICS (VECTORISED)
+# ==========================================================
+# Same maths as calculate_route_economics, evaluated over NumPy arrays.
+# Every intermediate uses the scalar engine's operation order so the
+# float64 results are bit-identical; rounding goes through _round_like_py
+# so round(x, n) ties resolve exactly as Python's round() does.
+
+_UNKNOWN_CORRIDOR = {
+    "dist": 0,
+    "tolls": 0,
+    "risk": "Unknown",
+    "road": "Good",
+    "crime": "Low",
+    "corridor_type": "General",
+    "preferred_trailer": None,
+}
+
+
+def _corridor_arrays():
+    """Column arrays over CORRIDORS; the last row is the unknown-route fallback."""
+    names = list(CORRIDORS.keys())
+    rows = [CORRIDORS[n] for n in names] + [_UNKNOWN_CORRIDOR]
+
+    def risk_key(c):
+        risk_val = c.get("risk", "Medium")
+        return risk_val.split()[0] if isinstance(risk_val, str) else "Medium"
+
+    return names, {
+        "dist": np.array([c["dist"] for c in rows]),
+        "tolls": np.array([c["tolls"] for c in rows]),
+        "road_factor": np.array([ROAD_QUALITY_FACTORS.get(c.get("road", "Good"), 1.00) for c in rows], dtype=float),
+        "congestion": np.array([1.10 if c.get("corridor_type") in ["Port", "Border"] else 1.00 for c in rows]),
+        "risk_factor": np.array([RISK_MAP.get(risk_key(c), 0.06) for c in rows], dtype=float),
+        "crime_factor": np.array([CRIME_MAP.get(c.get("crime", "Low"), 0.00) for c in rows], dtype=float),
+        "preferred_trailer": np.array([c.get("preferred_trailer") for c in rows], dtype=object),
+        "risk": np.array([c.get("risk", "Unknown") for c in rows], dtype=object),
+        "road": np.array([c.get("road", "Good") for c in rows], dtype=object),
+        "crime": np.array([c.get("crime", "Low") for c in rows], dtype=object),
+        "corridor_type": np.array([c.get("corridor_type", "General") for c in rows], dtype=object),
+    }
+
+
+def _round_like_py(values, ndigits):
+    """np.round, with values sitting on a rounding tie re-rounded by Python's round()."""
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    frac = np.abs(scaled - np.trunc(scaled))
+    tie = np.abs(frac - 0.5) <= 1e-12 * np.maximum(np.abs(scaled), 1.0) + 1e-9
+    if tie.any():
+        out[tie] = [round(v, ndigits) for v in values[tie].tolist()]
+    return out
+
+
+def calculate_route_economics_batch(route_names, truck_efficiency, tons=28, trailer_types=None,
+                                    fallback_distance=None):
+    """
+    Prices many (corridor, efficiency, tons, trailer_type) quotes at once.
+    Scalars broadcast against arrays. trailer_types=None (or None / NaN
+    entries) means no asset profile, i.e. no trailer penalty.
+    fallback_distance (optional) prices routes missing from CORRIDORS over
+    that many km instead of the scalar engine's 0 km fallback.
+    Returns a DataFrame with the scalar engine's keys as columns, one row per
+    quote (plus 'route'), numerically identical to calculate_route_economics
+    called with plain Python numbers.
+    """
+    route_codes, route_uniques = pd.factorize(np.atleast_1d(np.asarray(route_names, dtype=object)))
+    n = len(route_codes)
+    names, c = _corridor_arrays()
+
+    # Resolve each distinct route once; unknown routes map to the fallback row at the end
+    corridor_of = pd.Index(names).get_indexer(route_uniques)
+    corridor_of[corridor_of < 0] = len(names)
+    corridor_of = np.append(corridor_of, len(names))  # code -1 (None / NaN route)
+    idx = corridor_of[route_codes]
+
+    eff = np.broadcast_to(np.asarray(truck_efficiency, dtype=float), (n,))
+    tons = np.broadcast_to(np.asarray(tons), (n,))
+
+    dist = c["dist"][idx]
+    tolls = c["tolls"][idx]
+    if fallback_distance is not None:
+        unknown = idx == len(names)
+        dist = np.where(unknown, np.broadcast_to(np.asarray(fallback_distance, dtype=float), (n,)), dist)
+
+    # 1. Road Condition + Congestion
+    effective_distance = dist * c["road_factor"][idx] * c["congestion"][idx]
+
+    # 2. Fuel Consumption
+    liters_used = (effective_distance / 100) * eff
+    fuel_cost = liters_used * DIESEL_PRICE
+
+    # 3. Base Ops Cost
+    ops_cost = 12.0 * dist
+
+    # 4. Risk Loading
+    risk_loading = (fuel_cost + ops_cost) * (c["risk_factor"][idx] + c["crime_factor"][idx])
+
+    # 5. Payload Sensitivity
+    payload_factor = 1.0 + (0.005 * np.maximum(0, tons - 28))
+
+    # 6. Trailer Suitability Penalty
+    trailer_penalty = np.zeros(n)
+    if trailer_types is not None:
+        actual = np.broadcast_to(np.asarray(trailer_types, dtype=object), (n,))
+        t_codes, t_uniques = pd.factorize(actual)
+        # (corridor row x distinct trailer) penalty table, then one gather
+        table = np.array([
+            [0.03 if (p and t and p != t) else 0.0 for t in t_uniques] + [0.0]
+            for p in c["preferred_trailer"]
+        ])
+        trailer_penalty = table[idx, t_codes]
+
+    # 7. Total Operational Cost
+    total_ops_cost = (fuel_cost + ops_cost + risk_loading)
+    total_ops_cost = total_ops_cost * payload_factor
+    total_ops_cost = total_ops_cost * (1 + trailer_penalty)
+
+    # 8. Suggested Rate (Margin)
+    suggested_rate = total_ops_cost * 1.15
+
+    def labels(values):
+        # Categorical over the corridor rows: no per-quote string objects
+        codes, cats = pd.factorize(values)
+        return pd.Categorical.from_codes(codes[idx], cats)
+
+    return pd.DataFrame({
+        "route": pd.Categorical.from_codes(route_codes, route_uniques),
+        "distance_km": dist,
+        "effective_distance_km": _round_like_py(effective_distance, 2),
+        "fuel_cost": _round_like_py(fuel_cost, 2),
+        "toll_cost": tolls,
+        "risk_loading": _round_like_py(risk_loading, 2),
+        "payload_factor": _round_like_py(payload_factor, 3),
+        "trailer_penalty": trailer_penalty,
+        "total_ops_cost": _round_like_py(total_ops_cost, 2),
+        "suggested_rate": _round_like_py(suggested_rate, 2),
+        "risk": labels(c["risk"]),
+        "road": labels(c["road"]),
+        "crime": labels(c["crime"]),
+        "corridor_type": labels(c["corridor_type"]),
+    })
+
+
 # ==========================================================
 # 3. DOCUMENTATION FACTORY (PDF)
 # ==========================================================
@@ -0,0 +1,347 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from modules.core.schema_registry import register_schema
+from modules.logistics.db_utils import DB_KEY, engine, init_db, load_data
+from modules.logistics.dispatch_optimizer import haversine_km
+from modules.logistics.telemetry_store import partition_name
+
+# =========================================================
+# TELEMETRY ANALYTICS — MOVEMENT, IDLE, OVERSPEED, HARSH EVENTS
+# =========================================================
+# Each ping gets a movement state, using the same thresholds as
+# rules._movement_status:
+#   Parked      ignition off
+#   Stationary  ignition on, speed <= MOVING_KMH  (idling)
+#   In Transit  speed > MOVING_KMH
+# Missing ignition counts as on. A missing speed is taken from the distance
+# to the next fix. The interval to the next ping is credited to the state of
+# the ping it starts from. Intervals longer than GAP_S are reporting gaps:
+# their distance is kept, but they add no time to any state.
+#
+# Everything is computed over whole-day NumPy arrays sorted by
+# (vehicle, day, time), with no per-ping Python:
+#   - state segments and stops
+#   - time per state
+#   - haversine distance
+#   - overspeed episodes (runs above OVERSPEED_KMH lasting OVERSPEED_MIN_S)
+#   - harsh acceleration / braking (speed change >= HARSH_KMH_S per second
+#     between fixes at most HARSH_MAX_DT_S apart, one event per run)
+# summarise_day() stores one row per vehicle per day in telemetry_daily, and
+# the overspeed episodes in telemetry_overspeed. The fleet and risk views
+# read those tables instead of raw pings. telemetry_store.run_maintenance
+# runs it for every day it rolls up.
+
+MOVING_KMH = 5.0
+GAP_S = 15 * 60
+STOP_MIN_S = 120
+OVERSPEED_KMH = 80.0          # heavy-vehicle limit (GVM > 9 t)
+OVERSPEED_MIN_S = 30
+HARSH_KMH_S = 9.0             # ~0.25 g
+HARSH_MAX_DT_S = 5
+
+STATES = np.array(["Parked", "Stationary", "In Transit"], dtype=object)
+PARKED, STATIONARY, IN_TRANSIT = range(3)
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS telemetry_daily (
+        day TEXT,
+        reg_number TEXT,
+        pings INTEGER,
+        first_ts TEXT,
+        last_ts TEXT,
+        distance_km REAL,
+        moving_min REAL,
+        idle_min REAL,
+        parked_min REAL,
+        stops INTEGER,
+        max_speed REAL,
+        avg_moving_kmh REAL,
+        overspeed_episodes INTEGER,
+        overspeed_min REAL,
+        harsh_accel INTEGER,
+        harsh_brake INTEGER,
+        computed_at TEXT,
+        PRIMARY KEY (day, reg_number)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_daily_reg ON telemetry_daily (reg_number, day)",
+    """
+    CREATE TABLE IF NOT EXISTS telemetry_overspeed (
+        reg_number TEXT,
+        day TEXT,
+        start_ts TEXT,
+        end_ts TEXT,
+        duration_s REAL,
+        max_speed REAL,
+        distance_km REAL,
+        latitude REAL,
+        longitude REAL,
+        PRIMARY KEY (reg_number, start_ts)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_overspeed_day ON telemetry_overspeed (day)",
+]
+
+register_schema(DB_KEY, "logistics.telemetry_analytics", _SCHEMA)
+
+_DAILY_COLS = ["day", "reg_number", "pings", "first_ts", "last_ts", "distance_km", "moving_min", "idle_min",
+               "parked_min", "stops", "max_speed", "avg_moving_kmh", "overspeed_episodes", "overspeed_min",
+               "harsh_accel", "harsh_brake"]
+_OVERSPEED_COLS = ["reg_number", "day", "start_ts", "end_ts", "duration_s", "max_speed", "distance_km",
+                   "latitude", "longitude"]
+_SEGMENT_COLS = ["reg_number", "state", "start_ts", "end_ts", "duration_s", "distance_km", "max_speed"]
+
+
+# ---------------------------------------------------------
+# 1. PER-PING STATE
+# ---------------------------------------------------------
+
+def movement_state(speed, ignition):
+    """State codes (index into STATES) for arrays of speed (km/h) and ignition."""
+    ignition = np.nan_to_num(np.asarray(ignition, dtype=float), nan=1.0)
+    return np.where(ignition == 0, PARKED, np.where(np.asarray(speed, dtype=float) > MOVING_KMH, IN_TRANSIT, STATIONARY))
+
+
+def _runs(flag, linked):
+    """Start index of each run of True in flag; a run breaks where linked[i] (ping i joined to i-1) is False."""
+    prev = np.r_[False, flag[:-1] & linked[1:]]
+    return np.flatnonzero(flag & ~prev)
+
+
+def _day(d):
+    """Day numbers (epoch days) -> 'YYYY-MM-DD'."""
+    return np.asarray(d).astype(np.int64).astype("datetime64[D]").astype(str).astype(object)
+
+
+def _iso(t):
+    """Epoch seconds -> 'YYYY-MM-DDTHH:MM:SS' (numpy formatting; pandas strftime is per element)."""
+    return np.asarray(t).astype(np.int64).astype("datetime64[s]").astype(str).astype(object)
+
+
+# ---------------------------------------------------------
+# 2. ANALYSIS (ONE PASS OVER SORTED ARRAYS)
+# ---------------------------------------------------------
+
+def analyse_pings(pings):
+    """
+    pings: DataFrame with reg_number, timestamp, latitude, longitude, speed, ignition.
+    Returns {"daily", "segments", "overspeed"} DataFrames (one daily row per vehicle per day).
+    """
+    ts = pd.to_datetime(pings["timestamp"], errors="coerce", format="ISO8601")
+    pings = pings.assign(ts=ts).dropna(subset=["ts", "latitude", "longitude"])
+    if pings.empty:
+        return {"daily": pd.DataFrame(columns=_DAILY_COLS), "segments": pd.DataFrame(columns=_SEGMENT_COLS),
+                "overspeed": pd.DataFrame(columns=_OVERSPEED_COLS)}
+    pings = pings.sort_values(["reg_number", "ts"], kind="stable")
+
+    regs = pings["reg_number"].to_numpy(object)
+    t = pings["ts"].to_numpy("datetime64[s]").astype(np.int64).astype(float)
+    day = t // 86400
+    lat = pings["latitude"].to_numpy(float)
+    lon = pings["longitude"].to_numpy(float)
+    speed = pd.to_numeric(pings["speed"], errors="coerce").to_numpy(float)
+    ignition = pd.to_numeric(pings.get("ignition"), errors="coerce") if "ignition" in pings else np.ones(len(t))
+    n = len(t)
+
+    # Vehicle-days; interval i runs from ping i to ping i + 1
+    new_vd = np.r_[True, (regs[1:] != regs[:-1]) | (day[1:] != day[:-1])]
+    vd = np.cumsum(new_vd) - 1
+    vd_start = np.flatnonzero(new_vd)
+    n_vd = len(vd_start)
+    same = ~new_vd[1:]
+    dt = np.where(same, np.diff(t), 0.0)
+    step_km = np.where(same, haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:]), 0.0)
+    live = same & (dt <= GAP_S)
+    dt_live = np.where(live, dt, 0.0)
+
+    fix_kmh = np.divide(step_km * 3600, dt, out=np.zeros_like(dt), where=live & (dt > 0))
+    speed = np.where(np.isnan(speed), np.r_[fix_kmh, 0.0], speed)
+    state = movement_state(speed, ignition)
+
+    # Time and distance per vehicle-day and state
+    key = vd[:-1] * 3 + state[:-1]
+    per_state = np.bincount(key, weights=dt_live, minlength=n_vd * 3).reshape(n_vd, 3) / 60
+    distance = np.bincount(vd[:-1], weights=step_km, minlength=n_vd)
+    moving_km = np.bincount(key, weights=np.where(live, step_km, 0.0), minlength=n_vd * 3).reshape(n_vd, 3)[:, IN_TRANSIT]
+
+    # State segments: break on a new vehicle-day, a gap or a state change
+    linked = np.r_[False, live]   # ping i continues from ping i - 1
+    seg_break = ~linked | np.r_[True, state[1:] != state[:-1]]
+    seg = np.cumsum(seg_break) - 1
+    seg_start = np.flatnonzero(seg_break)
+    seg_dur = np.bincount(seg[:-1], weights=dt_live, minlength=len(seg_start))
+    seg_km = np.bincount(seg[:-1], weights=step_km, minlength=len(seg_start))
+    seg_state = state[seg_start]
+    stops = np.bincount(vd[seg_start], weights=(seg_state != IN_TRANSIT) & (seg_dur >= STOP_MIN_S), minlength=n_vd)
+    segments = pd.DataFrame({
+        "reg_number": regs[seg_start], "state": STATES[seg_state], "start_ts": _iso(t[seg_start]),
+        "end_ts": _iso(t[seg_start] + seg_dur), "duration_s": seg_dur, "distance_km": seg_km,
+        "max_speed": np.fmax.reduceat(speed, seg_start),
+    })
+
+    # Overspeed: runs of connected pings above the limit, each ping credited with the interval after it
+    fast = speed > OVERSPEED_KMH
+    member = np.flatnonzero(fast)
+    ep_pos = np.flatnonzero(np.isin(member, _runs(fast, linked)))
+    first = member[ep_pos]
+    if len(member):
+        ep_dur = np.add.reduceat(np.r_[dt_live, 0.0][member], ep_pos)
+        ep_km = np.add.reduceat(np.r_[step_km, 0.0][member], ep_pos)
+        ep_max = np.maximum.reduceat(speed[member], ep_pos)
+    else:
+        ep_dur = ep_km = ep_max = np.zeros(0)
+    keep = ep_dur >= OVERSPEED_MIN_S
+    overspeed = pd.DataFrame({
+        "reg_number": regs[first], "day": _day(day[first]), "start_ts": _iso(t[first]), "end_ts": _iso(t[first] + ep_dur),
+        "duration_s": ep_dur, "max_speed": ep_max, "distance_km": ep_km,
+        "latitude": lat[first], "longitude": lon[first],
+    })[keep]
+    ep_count = np.bincount(vd[first[keep]], minlength=n_vd)
+    ep_min = np.bincount(vd[first[keep]], weights=ep_dur[keep], minlength=n_vd) / 60
+
+    # Harsh events: one per run of consecutive intervals past the threshold
+    close = same & (dt > 0) & (dt <= HARSH_MAX_DT_S)
+    accel = np.divide(np.diff(speed), dt, out=np.zeros_like(dt), where=close)
+    harsh = {}
+    for name, flag in (("harsh_accel", accel >= HARSH_KMH_S), ("harsh_brake", accel <= -HARSH_KMH_S)):
+        edge = flag & ~np.r_[False, flag[:-1] & close[:-1]]
+        harsh[name] = np.bincount(vd[:-1][edge], minlength=n_vd)
+
+    vd_end = np.r_[vd_start[1:], n] - 1
+    moving_h = per_state[:, IN_TRANSIT] / 60
+    daily = pd.DataFrame({
+        "day": _day(day[vd_start]), "reg_number": regs[vd_start], "pings": np.diff(np.r_[vd_start, n]),
+        "first_ts": _iso(t[vd_start]), "last_ts": _iso(t[vd_end]), "distance_km": distance,
+        "moving_min": per_state[:, IN_TRANSIT], "idle_min": per_state[:, STATIONARY], "parked_min": per_state[:, PARKED],
+        "stops": stops.astype(int), "max_speed": np.fmax.reduceat(speed, vd_start),
+        "avg_moving_kmh": np.divide(moving_km, moving_h, out=np.zeros(n_vd), where=moving_h > 0),
+        "overspeed_episodes": ep_count, "overspeed_min": ep_min, **harsh,
+    })
+    return {"daily": daily, "segments": segments, "overspeed": overspeed.reset_index(drop=True)}
+
+
+# ---------------------------------------------------------
+# 3. PERSISTENCE (PER DAY)
+# ---------------------------------------------------------
+
+def _read_day(day, reg_number=None):
+    table = partition_name(day)
+    with engine.connect() as conn:
+        exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if not exists:
+            return None
+        sql = f"SELECT reg_number, timestamp, latitude, longitude, speed, ignition FROM {table}"
+        if reg_number:
+            return pd.read_sql(sql + " WHERE reg_number = ? ORDER BY timestamp", conn, params=(reg_number,))
+        return pd.read_sql(sql + " ORDER BY reg_number, timestamp", conn)
+
+
+def summarise_day(day):
+    """
+    Analyses one daily partition (day = 'YYYYMMDD') into telemetry_daily and
+    telemetry_overspeed. Idempotent: re-running replaces the rows of the
+    vehicles in the partition; other vehicles' rows for the day are kept.
+    Days whose raw partition retention has dropped are left as summarised.
+    Returns {"vehicles", "pings", "overspeed_episodes"}.
+    """
+    init_db()
+    with engine.connect() as conn:
+        dropped = conn.exec_driver_sql("SELECT 1 FROM gps_dropped_days WHERE day = ?", (day,)).fetchone()
+    pings = None if dropped else _read_day(day)
+    if pings is None:
+        return {"vehicles": 0, "pings": 0, "overspeed_episodes": 0}
+    out = analyse_pings(pings)
+    daily, overspeed = out["daily"], out["overspeed"]
+    iso_day = f"{day[:4]}-{day[4:6]}-{day[6:]}"
+    stamp = datetime.now().isoformat(timespec="seconds")
+    regs = list(pings["reg_number"].unique())
+
+    with engine.begin() as conn:
+        for table in ("telemetry_daily", "telemetry_overspeed"):
+            for k in range(0, len(regs), 500):   # SQLite host-parameter limit
+                chunk = regs[k:k + 500]
+                conn.exec_driver_sql(
+                    f"DELETE FROM {table} WHERE day = ? AND reg_number IN ({', '.join('?' * len(chunk))})",
+                    (iso_day, *chunk))
+        if not daily.empty:
+            conn.exec_driver_sql(
+                f"INSERT OR REPLACE INTO telemetry_daily ({', '.join(_DAILY_COLS)}, computed_at) "
+                f"VALUES ({', '.join('?' * (len(_DAILY_COLS) + 1))})",
+                [(*row, stamp) for row in daily[_DAILY_COLS].itertuples(index=False, name=None)])
+        if not overspeed.empty:
+            conn.exec_driver_sql(
+                f"INSERT OR REPLACE INTO telemetry_overspeed ({', '.join(_OVERSPEED_COLS)}) "
+                f"VALUES ({', '.join('?' * len(_OVERSPEED_COLS))})",
+                list(overspeed[_OVERSPEED_COLS].itertuples(index=False, name=None)))
+    return {"vehicles": len(daily), "pings": int(daily["pings"].sum()) if len(daily) else 0,
+            "overspeed_episodes": len(overspeed)}
+
+
+# ---------------------------------------------------------
+# 4. READ API (VIEWS)
+# ---------------------------------------------------------
+
+def daily_summary(since=None, reg_number=None):
+    """telemetry_daily rows, newest day first. since = 'YYYY-MM-DD'."""
+    init_db()
+    where, params = [], {}
+    if since:
+        where.append("day >= :since")
+        params["since"] = since
+    if reg_number:
+        where.append("reg_number = :reg")
+        params["reg"] = reg_number
+    sql = "SELECT * FROM telemetry_daily"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return load_data(sql + " ORDER BY day DESC, reg_number", params)
+
+
+def latest_activity():
+    """Each vehicle's most recent summarised day (the fleet board's activity columns)."""
+    init_db()
+    return load_data("""
+        SELECT d.* FROM telemetry_daily d
+        JOIN (SELECT reg_number, MAX(day) AS day FROM telemetry_daily GROUP BY reg_number) m
+          ON m.reg_number = d.reg_number AND m.day = d.day
+    """)
+
+
+def driver_behaviour(since=None):
+    """Per-vehicle totals since a day, with overspeed and harsh events per 100 km."""
+    df = daily_summary(since)
+    if df.empty:
+        return df
+    agg = df.groupby("reg_number", as_index=False).agg(
+        days=("day", "nunique"), distance_km=("distance_km", "sum"), moving_h=("moving_min", "sum"),
+        idle_h=("idle_min", "sum"), max_speed=("max_speed", "max"), overspeed_episodes=("overspeed_episodes", "sum"),
+        overspeed_min=("overspeed_min", "sum"), harsh_accel=("harsh_accel", "sum"), harsh_brake=("harsh_brake", "sum"))
+    agg[["moving_h", "idle_h"]] /= 60
+    per_100 = 100 / agg["distance_km"].where(agg["distance_km"] > 0)
+    agg["overspeed_per_100km"] = agg["overspeed_episodes"] * per_100
+    agg["harsh_per_100km"] = (agg["harsh_accel"] + agg["harsh_brake"]) * per_100
+    return agg.sort_values(["overspeed_per_100km", "harsh_per_100km"], ascending=False, na_position="last")
+
+
+def overspeed_episodes(since=None, limit=200):
+    """Stored overspeed episodes, worst (fastest) first."""
+    init_db()
+    sql = "SELECT * FROM telemetry_overspeed"
+    params = {}
+    if since:
+        sql += " WHERE day >= :since"
+        params["since"] = since
+    return load_data(f"{sql} ORDER BY max_speed DESC LIMIT {int(limit)}", params)
+
+
+def movement_segments(reg_number, day):
+    """One vehicle's state segments for a day (day = 'YYYYMMDD'), computed from its raw pings."""
+    init_db()
+    pings = _read_day(day, reg_number)
+    if pings is None:
+        return pd.DataFrame(columns=_SEGMENT_COLS)
+    return analyse_pings(pings)["segments"]
@@ -0,0 +1,405 @@
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy.exc import OperationalError
+
+from modules.core.schema_registry import register_schema
+from modules.logistics.db_utils import DB_KEY, engine, load_data
+
+# =========================================================
+# TELEMETRY STORE — DAILY GPS PARTITIONS + ROLLUPS
+# =========================================================
+# Raw pings land in one table per day (gps_pings_YYYYMMDD) with a
+# (reg_number, timestamp) index, so a query for one truck on one day touches
+# one small indexed table instead of scanning all history. Closed days are
+# rolled up into 1-minute and 15-minute aggregates; raw partitions older
+# than RETENTION_DAYS are dropped once rolled up, the rollups are kept.
+# Dropped days are recorded in gps_dropped_days: a late ping for one of them
+# is added into the kept rollups instead of recreating the partition (whose
+# rollup would otherwise replace the full day's buckets with the late rows).
+#
+# gps_telemetry is a UNION ALL view over the legacy gps_pings table and every
+# live partition; it is rebuilt whenever a partition is created or dropped.
+
+GPS_FIELDS = [
+    "reg_number", "timestamp", "latitude", "longitude",
+    "speed", "heading", "ignition", "signal_quality", "source"
+]
+
+PARTITION_PREFIX = "gps_pings_"
+TELEMETRY_VIEW = "gps_telemetry"
+RETENTION_DAYS = 30
+MAINTENANCE_INTERVAL_S = 300
+
+_DAY_KEY = re.compile(r"^\d{8}$")
+
+_known_partitions = set()
+_partitions_lock = threading.Lock()
+
+
+# ---------------------------------------------------------
+# 1. SCHEMA
+# ---------------------------------------------------------
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS gps_partitions (
+        day TEXT PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        created_at TEXT,
+        rolled_up_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gps_dropped_days (
+        day TEXT PRIMARY KEY,
+        dropped_at TEXT,
+        late_pings INTEGER DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gps_rollup_1m (
+        reg_number TEXT,
+        bucket TEXT,
+        pings INTEGER,
+        avg_speed REAL,
+        max_speed REAL,
+        avg_lat REAL,
+        avg_lon REAL,
+        ignition_on INTEGER,
+        first_ts TEXT,
+        last_ts TEXT,
+        PRIMARY KEY (reg_number, bucket)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gps_rollup_15m (
+        reg_number TEXT,
+        bucket TEXT,
+        pings INTEGER,
+        avg_speed REAL,
+        max_speed REAL,
+        avg_lat REAL,
+        avg_lon REAL,
+        ignition_on INTEGER,
+        first_ts TEXT,
+        last_ts TEXT,
+        PRIMARY KEY (reg_number, bucket)
+    )
+    """,
+]
+
+
+def ensure_telemetry_tables():
+    """Registry + rollup tables, the legacy-table index and the union view."""
+    with engine.begin() as conn:
+        for stmt in _SCHEMA:
+            conn.exec_driver_sql(stmt)
+        if _table_exists(conn, "gps_pings"):
+            conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS idx_gps_pings_reg_ts ON gps_pings (reg_number, timestamp)")
+        _rebuild_view(conn)
+    return True
+
+
+register_schema(DB_KEY, "logistics.telemetry", _SCHEMA, apply=ensure_telemetry_tables)
+
+
+def _table_exists(conn, name):
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def _partition_tables(conn):
+    rows = conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+        (PARTITION_PREFIX + "[0-9]*",)
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def _rebuild_view(conn):
+    cols = ", ".join(GPS_FIELDS)
+    sources = _partition_tables(conn)
+    if _table_exists(conn, "gps_pings"):
+        sources = ["gps_pings"] + sources
+    conn.exec_driver_sql(f"DROP VIEW IF EXISTS {TELEMETRY_VIEW}")
+    if sources:
+        body = " UNION ALL ".join(f"SELECT {cols} FROM {t}" for t in sources)
+    else:
+        body = "SELECT " + ", ".join(f"NULL AS {c}" for c in GPS_FIELDS) + " WHERE 0"
+    conn.exec_driver_sql(f"CREATE VIEW {TELEMETRY_VIEW} AS {body}")
+
+
+# ---------------------------------------------------------
+# 2. PARTITIONED WRITES
+# ---------------------------------------------------------
+
+def day_key(ts):
+    """'2025-01-31T08:00:00' -> '20250131'. Unparseable timestamps file under today."""
+    key = str(ts or "")[:10].replace("-", "")
+    return key if _DAY_KEY.match(key) else datetime.now().strftime("%Y%m%d")
+
+
+def partition_name(day):
+    return f"{PARTITION_PREFIX}{day}"
+
+
+def _ensure_partition(conn, day):
+    table = partition_name(day)
+    if table in _known_partitions:
+        return table
+    if not _table_exists(conn, table):
+        for stmt in _SCHEMA:
+            conn.exec_driver_sql(stmt)
+        conn.exec_driver_sql(f"""
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                reg_number TEXT,
+                timestamp TEXT,
+                latitude REAL,
+                longitude REAL,
+                speed REAL,
+                heading REAL,
+                ignition INTEGER,
+                signal_quality REAL,
+                source TEXT
+            )
+        """)
+        conn.exec_driver_sql(f"CREATE INDEX idx_{table}_reg_ts ON {table} (reg_number, timestamp)")
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO gps_partitions (day, table_name, created_at) VALUES (?, ?, ?)",
+            (day, table, datetime.now().isoformat())
+        )
+        _rebuild_view(conn)
+    with _partitions_lock:
+        _known_partitions.add(table)
+    return table
+
+
+def _dropped_days(conn, days):
+    days = list(days)
+    if not days:
+        return set()
+    rows = conn.exec_driver_sql(
+        f"SELECT day FROM gps_dropped_days WHERE day IN ({', '.join('?' * len(days))})", tuple(days)
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
+def write_pings(conn, rows):
+    """
+    Inserts ping tuples (GPS_FIELDS order) into their daily partitions.
+    Pings for a day whose partition retention already dropped are added into
+    that day's rollups instead (_merge_late_pings).
+    Runs on the caller's connection so it joins the caller's transaction.
+    """
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(day_key(row[1]), []).append(row)
+
+    # Days this process holds a live partition for skip the registry lookup
+    dropped = _dropped_days(conn, [d for d in by_day if partition_name(d) not in _known_partitions])
+    insert_cols = ", ".join(GPS_FIELDS)
+    marks = ", ".join("?" * len(GPS_FIELDS))
+    for day, day_rows in by_day.items():
+        if day in dropped:
+            _merge_late_pings(conn, day, day_rows)
+            continue
+        table = _ensure_partition(conn, day)
+        try:
+            conn.exec_driver_sql(f"INSERT INTO {table} ({insert_cols}) VALUES ({marks})", day_rows)
+        except OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            # Dropped by another process's maintenance since this one last saw it
+            with _partitions_lock:
+                _known_partitions.discard(table)
+            if _dropped_days(conn, [day]):
+                _merge_late_pings(conn, day, day_rows)
+            else:
+                table = _ensure_partition(conn, day)
+                conn.exec_driver_sql(f"INSERT INTO {table} ({insert_cols}) VALUES ({marks})", day_rows)
+    return len(rows)
+
+
+def migrate_legacy_pings(batch_size=50000):
+    """Moves rows from the unpartitioned gps_pings table into daily partitions."""
+    moved = 0
+    while True:
+        with engine.begin() as conn:
+            if not _table_exists(conn, "gps_pings"):
+                return moved
+            rows = conn.exec_driver_sql(
+                f"SELECT id, {', '.join(GPS_FIELDS)} FROM gps_pings ORDER BY id LIMIT ?", (batch_size,)
+            ).fetchall()
+            if not rows:
+                return moved
+            write_pings(conn, [tuple(r[1:]) for r in rows])
+            conn.exec_driver_sql("DELETE FROM gps_pings WHERE id <= ?", (rows[-1][0],))
+            moved += len(rows)
+
+
+# ---------------------------------------------------------
+# 3. ROLLUPS (1 MIN FROM RAW, 15 MIN FROM 1 MIN)
+# ---------------------------------------------------------
+
+# Bucket labels keep the source timestamp's own date/time separator:
+# 1m  -> 'YYYY-MM-DDTHH:MM'
+# 15m -> 'YYYY-MM-DDTHH:' + minute floored to 00/15/30/45
+_BUCKET_15M = "substr(bucket, 1, 14) || printf('%02d', (CAST(substr(bucket, 15, 2) AS INTEGER) / 15) * 15)"
+
+
+def rollup_day(day):
+    """(Re)builds the 1m and 15m rollups for one day's partition. Idempotent."""
+    with engine.begin() as conn:
+        return _rollup(conn, day)
+
+
+def _rollup(conn, day):
+    table = partition_name(day)
+    if not _table_exists(conn, table):
+        return 0
+    conn.exec_driver_sql(f"""
+        INSERT OR REPLACE INTO gps_rollup_1m
+        SELECT reg_number, substr(timestamp, 1, 16) AS bucket,
+               COUNT(*), AVG(speed), MAX(speed), AVG(latitude), AVG(longitude),
+               SUM(CASE WHEN ignition = 1 THEN 1 ELSE 0 END),
+               MIN(timestamp), MAX(timestamp)
+        FROM {table}
+        GROUP BY reg_number, bucket
+    """)
+    day_prefix = f"{day[:4]}-{day[4:6]}-{day[6:]}"
+    conn.exec_driver_sql(f"""
+        INSERT OR REPLACE INTO gps_rollup_15m
+        SELECT reg_number, {_BUCKET_15M} AS bucket15,
+               SUM(pings), SUM(avg_speed * pings) / SUM(pings), MAX(max_speed),
+               SUM(avg_lat * pings) / SUM(pings), SUM(avg_lon * pings) / SUM(pings),
+               SUM(ignition_on), MIN(first_ts), MAX(last_ts)
+        FROM gps_rollup_1m
+        WHERE bucket >= ? AND bucket < ?
+        GROUP BY reg_number, bucket15
+    """, (day_prefix, day_prefix + "~"))
+    n = conn.exec_driver_sql(
+        "SELECT COUNT(*) FROM gps_rollup_1m WHERE bucket >= ? AND bucket < ?", (day_prefix, day_prefix + "~")
+    ).fetchone()[0]
+    conn.exec_driver_sql("UPDATE gps_partitions SET rolled_up_at = ? WHERE day = ?", (datetime.now().isoformat(), day))
+    return n
+
+
+# Adds the late rows' aggregates onto a kept bucket: counts and sums add up,
+# averages are re-weighted by ping count, extremes and first / last widen.
+_MERGE_BUCKET = """
+    ON CONFLICT (reg_number, bucket) DO UPDATE SET
+        pings = pings + excluded.pings,
+        avg_speed = (COALESCE(avg_speed, 0) * pings + COALESCE(excluded.avg_speed, 0) * excluded.pings) / (pings + excluded.pings),
+        max_speed = MAX(COALESCE(max_speed, excluded.max_speed), COALESCE(excluded.max_speed, max_speed)),
+        avg_lat = (avg_lat * pings + excluded.avg_lat * excluded.pings) / (pings + excluded.pings),
+        avg_lon = (avg_lon * pings + excluded.avg_lon * excluded.pings) / (pings + excluded.pings),
+        ignition_on = ignition_on + excluded.ignition_on,
+        first_ts = MIN(first_ts, excluded.first_ts),
+        last_ts = MAX(last_ts, excluded.last_ts)
+"""
+
+
+def _merge_late_pings(conn, day, rows):
+    """Adds pings for an already dropped day into its kept 1m / 15m rollups."""
+    conn.exec_driver_sql(f"CREATE TEMP TABLE IF NOT EXISTS gps_late ({', '.join(GPS_FIELDS)})")
+    conn.exec_driver_sql("DELETE FROM temp.gps_late")
+    conn.exec_driver_sql(f"INSERT INTO temp.gps_late VALUES ({', '.join('?' * len(GPS_FIELDS))})", rows)
+    bucket_15m = _BUCKET_15M.replace("bucket", "timestamp")
+    for table, bucket in (("gps_rollup_1m", "substr(timestamp, 1, 16)"), ("gps_rollup_15m", bucket_15m)):
+        conn.exec_driver_sql(f"""
+            INSERT INTO {table}
+            SELECT reg_number, {bucket} AS b,
+                   COUNT(*), AVG(speed), MAX(speed), AVG(latitude), AVG(longitude),
+                   SUM(CASE WHEN ignition = 1 THEN 1 ELSE 0 END),
+                   MIN(timestamp), MAX(timestamp)
+            FROM temp.gps_late
+            WHERE 1
+            GROUP BY reg_number, b
+            {_MERGE_BUCKET}
+        """)
+    conn.exec_driver_sql("DELETE FROM temp.gps_late")
+    conn.exec_driver_sql("UPDATE gps_dropped_days SET late_pings = late_pings + ? WHERE day = ?", (len(rows), day))
+
+
+def drop_partition(day):
+    """Drops a day's raw partition. The rollup is rebuilt in the same transaction,
+    so pings written since the last rollup are kept too."""
+    table = partition_name(day)
+    with engine.begin() as conn:
+        _rollup(conn, day)
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {table}")
+        conn.exec_driver_sql("DELETE FROM gps_partitions WHERE day = ?", (day,))
+        conn.exec_driver_sql(
+            "INSERT OR IGNORE INTO gps_dropped_days (day, dropped_at) VALUES (?, ?)", (day, datetime.now().isoformat())
+        )
+        _rebuild_view(conn)
+    with _partitions_lock:
+        _known_partitions.discard(table)
+
+
+# ---------------------------------------------------------
+# 4. MAINTENANCE (ROLLUP + RETENTION)
+# ---------------------------------------------------------
+
+def run_maintenance(retention_days=RETENTION_DAYS, today=None):
+    """
+    One maintenance pass:
+    - rolls up every closed day not yet rolled up, and today's partial day,
+      compresses its trip tracks (trajectory.compress_day) and refreshes its
+      per-vehicle summaries (telemetry_analytics.summarise_day)
+    - drops raw partitions older than retention_days (only once rolled up)
+    Returns a summary dict.
+    """
+    from modules.logistics.trajectory import compress_day   # both build on this module
+    from modules.logistics.telemetry_analytics import summarise_day
+
+    ensure_telemetry_tables()
+    today = today or datetime.now().strftime("%Y%m%d")
+    cutoff = (datetime.strptime(today, "%Y%m%d") - timedelta(days=retention_days)).strftime("%Y%m%d")
+
+    parts = load_data("SELECT day, rolled_up_at FROM gps_partitions ORDER BY day")
+    rolled, dropped = [], []
+    for day, rolled_up_at in zip(parts.get("day", []), parts.get("rolled_up_at", [])):
+        # Re-roll today, and any day whose last rollup ran before the day closed
+        if pd.isna(rolled_up_at) or str(rolled_up_at)[:10].replace("-", "") <= day:
+            rollup_day(day)
+            compress_day(day)   # compressed trip tracks and daily summaries outlive the raw partition
+            summarise_day(day)
+            rolled.append(day)
+        if day < cutoff:
+            drop_partition(day)
+            dropped.append(day)
+
+    return {"rolled_up": rolled, "dropped": dropped, "cutoff": cutoff}
+
+
+_maintenance_thread = None
+_maintenance_lock = threading.Lock()
+
+
+def _maintenance_loop(interval_s, retention_days):
+    while True:
+        try:
+            run_maintenance(retention_days)
+        except Exception as e:
+            print(f"[TELEMETRY] Maintenance error: {e}")
+        time.sleep(interval_s)
+
+
+def start_background_maintenance(interval_s=MAINTENANCE_INTERVAL_S, retention_days=RETENTION_DAYS):
+    """Starts the rollup/retention daemon once per process (safe to call on every rerun)."""
+    global _maintenance_thread
+    with _maintenance_lock:
+        if _maintenance_thread is None or not _maintenance_thread.is_alive():
+            _maintenance_thread = threading.Thread(
+                target=_maintenance_loop, args=(interval_s, retention_days),
+                name="gps-telemetry-maintenance", daemon=True
+            )
+            _maintenance_thread.start()
+    return _maintenance_thread
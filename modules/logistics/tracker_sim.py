@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from modules.logistics.constants import HUB_COORDS
+from modules.logistics.gps_engine import generate_synthetic_gps
+
+# =========================================================
+# TRACKER SIMULATOR (LOAD GENERATOR FOR ingest_server)
+# =========================================================
+# N trucks start at random hubs and drift via generate_synthetic_gps.
+# Their pings go to the ingestion server as JSON lines at a fixed total rate.
+# TCP: the trucks are spread over `connections` sockets. Any socket the kernel
+# can't take in full is awaited with drain(), so server backpressure shows up
+# here as stall time and a lower achieved rate, never as lost pings. UDP: lines are packed into datagrams of at most DATAGRAM_BYTES
+# and fired without any flow control.
+# Every ping carries "sent_at" so the server can report end-to-end latency.
+#
+# Run:  python -m modules.logistics.tracker_sim --trucks 500 --rate 5000 --seconds 30 [--udp]
+
+TICK_S = 0.05
+DATAGRAM_BYTES = 1200
+
+
+class _Fleet:
+    def __init__(self, trucks):
+        hubs = list(HUB_COORDS.values())
+        self.regs = [f"SIM-{i:05d}" for i in range(trucks)]
+        self.pos = [random.choice(hubs) for _ in range(trucks)]
+        self._next = 0
+
+    def pings(self, n):
+        """Next n pings, round-robin over the fleet; each truck drifts from its last fix."""
+        out = []
+        for _ in range(n):
+            i = self._next
+            self._next = (i + 1) % len(self.regs)
+            ping = generate_synthetic_gps(self.regs[i], *self.pos[i])
+            self.pos[i] = (ping["latitude"], ping["longitude"])
+            ping["sent_at"] = time.time()
+            out.append(ping)
+        return out
+
+
+def _datagrams(lines):
+    buf, size = [], 0
+    for line in lines:
+        if buf and size + len(line) > DATAGRAM_BYTES:
+            yield b"".join(buf)
+            buf, size = [], 0
+        buf.append(line)
+        size += len(line)
+    if buf:
+        yield b"".join(buf)
+
+
+async def run_simulator(host="127.0.0.1", port=5055, trucks=100, rate=1000, seconds=10.0,
+                        proto="tcp", connections=None):
+    """
+    Sends `rate` pings/s for `seconds`. Returns what was sent, the achieved rate, and
+    (TCP) how long the client spent blocked on server backpressure.
+    """
+    fleet = _Fleet(trucks)
+    connections = max(1, min(connections or trucks, trucks, 200))
+    if proto == "udp":
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=(host, port))
+        writers = None
+    else:
+        writers = [(await asyncio.open_connection(host, port))[1] for _ in range(connections)]
+
+    per_tick = rate * TICK_S
+    sent, owed, stalled = 0, 0.0, 0.0
+    start = time.monotonic()
+    tick = 0
+    while time.monotonic() - start < seconds:
+        owed += per_tick
+        n, owed = int(owed), owed - int(owed)
+        lines = [json.dumps(p).encode() + b"\n" for p in fleet.pings(n)]
+        if writers is None:
+            for datagram in _datagrams(lines):
+                transport.sendto(datagram)
+        else:
+            for c, w in enumerate(writers):
+                w.write(b"".join(lines[c::connections]))
+            # Only sockets the kernel could not take in full have anything to wait for
+            backlog = [w for w in writers if w.transport.get_write_buffer_size()]
+            if backlog:
+                t = time.monotonic()
+                await asyncio.gather(*(w.drain() for w in backlog))
+                stalled += time.monotonic() - t
+        sent += n
+        tick += 1
+        # Pace against the schedule, not the previous tick, so slow ticks are caught up
+        await asyncio.sleep(max(0.0, start + tick * TICK_S - time.monotonic()))
+
+    if writers is None:
+        transport.close()
+    else:
+        for w in writers:
+            w.close()
+        await asyncio.gather(*(w.wait_closed() for w in writers), return_exceptions=True)
+    elapsed = time.monotonic() - start
+    return {"proto": proto, "trucks": trucks, "connections": 1 if writers is None else connections,
+            "sent": sent, "seconds": round(elapsed, 2), "rate": round(sent / elapsed),
+            "stalled_s": round(stalled, 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay synthetic tracker traffic into the ingestion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--trucks", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=1000, help="total pings per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=None, help="TCP sockets (default: one per truck, max 200)")
+    parser.add_argument("--udp", action="store_true")
+    args = parser.parse_args(argv)
+    result = asyncio.run(run_simulator(args.host, args.port, args.trucks, args.rate, args.seconds,
+                                       "udp" if args.udp else "tcp", args.connections))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from modules.core.schema_registry import register_schema
+from modules.logistics.db_utils import DB_KEY, engine, init_db, load_data
+from modules.logistics.dispatch_optimizer import haversine_km
+from modules.logistics.telemetry_store import partition_name
+
+# =========================================================
+# TRAJECTORIES — COMPRESSED TRIP TRACKS + REPLAY
+# =========================================================
+# Each vehicle's pings for a day are cut into tracks wherever it reports
+# nothing for TRIP_GAP_S (a track running past midnight is stored as two
+# legs). A track is simplified with Douglas-Peucker on the synchronized
+# Euclidean distance: a point is dropped only if the position replay would
+# interpolate for its timestamp (linear in time between the kept points)
+# is within TOLERANCE_M of where the truck actually was. So the bound holds
+# for the replay itself, not just for the shape of the line. The search runs
+# QUANT_ERROR_M inside the tolerance, because the stored points are rounded.
+#
+# Kept points are quantised (1e-5 deg, 1 s, 1 km/h), delta-encoded and
+# zlib-packed into one BLOB per track in trip_tracks, next to the
+# per-track summary (distance, max speed, idle minutes) computed from the
+# raw pings and the measured worst-case replay error. A track whose start
+# falls inside a log_dispatch_journal trip for the same truck carries that
+# trip_id, so a trip can be replayed across all its legs.
+
+TOLERANCE_M = 25.0
+TRIP_GAP_S = 30 * 60
+IDLE_SPEED_KMH = 5.0
+M_PER_DEG = 111_320.0
+_SCALE = np.array([1, 1e5, 1e5, 1])   # t (s), lat, lon, speed -> integers
+QUANT_ERROR_M = 0.5e-5 * M_PER_DEG * np.sqrt(2)   # worst offset of a rounded point (~0.8 m), so of the replay too
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS trip_tracks (
+        track_id TEXT PRIMARY KEY,
+        trip_id TEXT,
+        reg_number TEXT,
+        start_ts TEXT,
+        end_ts TEXT,
+        raw_points INTEGER,
+        kept_points INTEGER,
+        tolerance_m REAL,
+        max_error_m REAL,
+        distance_km REAL,
+        max_speed REAL,
+        idle_minutes REAL,
+        polyline BLOB,
+        created_at TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_trip_tracks_reg_start ON trip_tracks (reg_number, start_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_trip_tracks_trip ON trip_tracks (trip_id)",
+]
+
+register_schema(DB_KEY, "logistics.trajectory", _SCHEMA)
+
+
+# ---------------------------------------------------------
+# 1. SIMPLIFICATION (DOUGLAS-PEUCKER ON SYNCHRONIZED DISTANCE)
+# ---------------------------------------------------------
+
+def _local_xy(lat, lon):
+    """Metres on a plane tangent at the track's mean latitude (fine at trip scale)."""
+    x = (lon - lon.mean()) * M_PER_DEG * np.cos(np.radians(lat.mean()))
+    y = (lat - lat.mean()) * M_PER_DEG
+    return x, y
+
+
+def _sed(t, x, y, a, b):
+    """Distance of points a+1..b-1 from where linear-in-time replay between a and b puts them."""
+    inner = slice(a + 1, b)
+    span = t[b] - t[a]
+    f = (t[inner] - t[a]) / span if span > 0 else np.zeros(b - a - 1)
+    return np.hypot(x[inner] - (x[a] + f * (x[b] - x[a])), y[inner] - (y[a] + f * (y[b] - y[a])))
+
+
+def simplify(t, lat, lon, tolerance_m=TOLERANCE_M):
+    """
+    Indices of the points to keep (first and last always), so that replay
+    from the quantised points stays within tolerance_m.
+    """
+    n = len(t)
+    if n <= 2:
+        return np.arange(n)
+    limit = max(tolerance_m - QUANT_ERROR_M, 0.0)
+    x, y = _local_xy(lat, lon)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        err = _sed(t, x, y, a, b)
+        i = int(err.argmax())
+        if err[i] > limit:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return np.flatnonzero(keep)
+
+
+def replay_error_m(t, lat, lon, kept_t, kept_lat, kept_lon):
+    """Worst distance between the raw points and the replayed (interpolated) polyline."""
+    rlat = np.interp(t, kept_t, kept_lat)
+    rlon = np.interp(t, kept_t, kept_lon)
+    return float(haversine_km(lat, lon, rlat, rlon).max() * 1000) if len(t) else 0.0
+
+
+# ---------------------------------------------------------
+# 2. ENCODING
+# ---------------------------------------------------------
+
+def encode_track(t, lat, lon, speed):
+    """(epoch seconds, lat, lon, speed) arrays -> delta-encoded, zlib-packed bytes."""
+    q = np.rint(np.column_stack([t - t[0], lat, lon, np.nan_to_num(speed)]) * _SCALE).astype(np.int64)
+    q[1:] -= q[:-1].copy()
+    return zlib.compress(q.astype(np.int32).tobytes(), 6)
+
+
+def decode_track(blob, start_epoch):
+    """Inverse of encode_track: DataFrame of epoch, latitude, longitude, speed."""
+    q = np.frombuffer(zlib.decompress(blob), dtype=np.int32).reshape(-1, 4).astype(np.int64).cumsum(axis=0)
+    v = q / _SCALE
+    return pd.DataFrame({"epoch": v[:, 0] + start_epoch, "latitude": v[:, 1], "longitude": v[:, 2], "speed": v[:, 3]})
+
+
+# ---------------------------------------------------------
+# 3. COMPRESSION (PER DAY, PER TRACK)
+# ---------------------------------------------------------
+
+def _summaries(track, t, lat, lon, speed):
+    """distance_km, max_speed and idle_minutes per track, from the raw pings."""
+    same = track[1:] == track[:-1]
+    step_km = np.where(same, haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:]), 0.0)
+    dt = np.where(same, np.minimum(t[1:] - t[:-1], TRIP_GAP_S), 0.0)
+    idle = np.where(np.nan_to_num(speed[:-1], nan=0.0) < IDLE_SPEED_KMH, dt, 0.0)
+    n_tracks = int(track[-1]) + 1
+    return (np.bincount(track[:-1], weights=step_km, minlength=n_tracks),
+            pd.Series(speed).groupby(track).max().reindex(range(n_tracks)).to_numpy(),
+            np.bincount(track[:-1], weights=idle, minlength=n_tracks) / 60)
+
+
+def _journal_trips(conn, regs):
+    try:
+        journal = pd.read_sql("SELECT trip_id, truck_reg, start_time, end_time FROM log_dispatch_journal "
+                              "WHERE start_time IS NOT NULL", conn)
+    except Exception:
+        return pd.DataFrame()
+    journal = journal[journal["truck_reg"].isin(regs)]
+    journal["start"] = pd.to_datetime(journal["start_time"], errors="coerce", format="mixed")
+    journal["end"] = pd.to_datetime(journal["end_time"], errors="coerce", format="mixed")
+    return journal.dropna(subset=["start"])
+
+
+def compress_day(day, tolerance_m=TOLERANCE_M):
+    """
+    Compresses every vehicle's pings in one daily partition (day = 'YYYYMMDD')
+    into trip_tracks (idempotent: re-running replaces that day's tracks).
+    Returns {"tracks", "raw_points", "kept_points"}.
+    """
+    init_db()
+    table = partition_name(day)
+    with engine.connect() as conn:
+        exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if not exists:
+            return {"tracks": 0, "raw_points": 0, "kept_points": 0}
+        pings = pd.read_sql(f"SELECT reg_number, timestamp, latitude, longitude, speed FROM {table} "
+                            "ORDER BY reg_number, timestamp", conn)
+        journal = _journal_trips(conn, pings["reg_number"].unique())
+    return _store_tracks(pings, journal, tolerance_m)
+
+
+def _store_tracks(pings, journal, tolerance_m):
+    ts = pd.to_datetime(pings["timestamp"], errors="coerce", format="ISO8601")
+    pings = pings.assign(ts=ts).dropna(subset=["ts", "latitude", "longitude"])
+    if pings.empty:
+        return {"tracks": 0, "raw_points": 0, "kept_points": 0}
+
+    regs = pings["reg_number"].to_numpy(object)
+    t = pings["ts"].to_numpy("datetime64[s]").astype(np.int64).astype(float)
+    lat = pings["latitude"].to_numpy(float)
+    lon = pings["longitude"].to_numpy(float)
+    speed = pd.to_numeric(pings["speed"], errors="coerce").to_numpy(float)
+
+    # New track on a new vehicle or after a reporting gap
+    new = np.r_[True, (regs[1:] != regs[:-1]) | (np.diff(t) > TRIP_GAP_S)]
+    track = np.cumsum(new) - 1
+    starts = np.flatnonzero(new)
+    ends = np.r_[starts[1:], len(t)]
+    dist_km, max_speed, idle_min = _summaries(track, t, lat, lon, speed)
+
+    seg = pd.DataFrame({"reg": regs[starts], "start": pings["ts"].to_numpy()[starts], "track": np.arange(len(starts))})
+    trip_ids = np.full(len(starts), None, dtype=object)
+    if not journal.empty:
+        linked = pd.merge_asof(seg.sort_values("start"), journal.sort_values("start")[["truck_reg", "start", "end", "trip_id"]],
+                               on="start", left_by="reg", right_by="truck_reg", direction="backward")
+        ok = linked["trip_id"].notna() & (linked["end"].isna() | (linked["end"] >= linked["start"]))
+        trip_ids[linked.loc[ok, "track"].to_numpy()] = linked.loc[ok, "trip_id"].to_numpy()
+
+    stamp = datetime.now().isoformat(timespec="seconds")
+    rows, kept_total = [], 0
+    for k, (s, e) in enumerate(zip(starts, ends)):
+        keep = s + simplify(t[s:e], lat[s:e], lon[s:e], tolerance_m)
+        kept_total += len(keep)
+        error = replay_error_m(t[s:e], lat[s:e], lon[s:e], t[keep], np.round(lat[keep], 5), np.round(lon[keep], 5))
+        start_ts = pd.Timestamp(t[s], unit="s").strftime("%Y-%m-%dT%H:%M:%S")
+        rows.append((
+            f"{regs[s]}@{start_ts}", trip_ids[k], regs[s], start_ts,
+            pd.Timestamp(t[e - 1], unit="s").strftime("%Y-%m-%dT%H:%M:%S"),
+            int(e - s), int(len(keep)), float(tolerance_m), error,
+            float(dist_km[k]), None if np.isnan(max_speed[k]) else float(max_speed[k]), float(idle_min[k]),
+            encode_track(t[keep], lat[keep], lon[keep], speed[keep]), stamp,
+        ))
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"INSERT OR REPLACE INTO trip_tracks VALUES ({', '.join('?' * 14)})", rows)
+    return {"tracks": len(rows), "raw_points": int(len(t)), "kept_points": kept_total}
+
+
+# ---------------------------------------------------------
+# 4. REPLAY API
+# ---------------------------------------------------------
+
+_SUMMARY_COLS = ("track_id, trip_id, reg_number, start_ts, end_ts, raw_points, kept_points, "
+                 "max_error_m, distance_km, max_speed, idle_minutes")
+
+
+def list_tracks(reg_number=None, since=None, limit=200):
+    """Track summaries (no polylines), newest first."""
+    init_db()
+    where, params = [], {}
+    if reg_number:
+        where.append("reg_number = :reg")
+        params["reg"] = reg_number
+    if since:
+        where.append("start_ts >= :since")
+        params["since"] = since
+    sql = f"SELECT {_SUMMARY_COLS} FROM trip_tracks"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return load_data(f"{sql} ORDER BY start_ts DESC LIMIT {int(limit)}", params)
+
+
+def trip_replay(trip_or_track_id, step_s=None):
+    """
+    Points to animate one track, or every leg of a dispatch-journal trip:
+    timestamp, latitude, longitude, speed. step_s resamples to a fixed
+    interval (linear interpolation, same error bound as the stored track).
+    """
+    init_db()
+    legs = load_data("SELECT start_ts, polyline FROM trip_tracks WHERE track_id = :id OR trip_id = :id ORDER BY start_ts",
+                     {"id": trip_or_track_id})
+    if legs.empty:
+        return pd.DataFrame(columns=["timestamp", "latitude", "longitude", "speed"])
+
+    df = pd.concat([
+        decode_track(blob, pd.Timestamp(start).value // 10**9) for start, blob in zip(legs["start_ts"], legs["polyline"])
+    ], ignore_index=True)
+    if step_s:
+        grid = np.arange(df["epoch"].iloc[0], df["epoch"].iloc[-1] + 1, step_s)
+        df = pd.DataFrame({"epoch": grid, **{c: np.interp(grid, df["epoch"], df[c]) for c in ("latitude", "longitude", "speed")}})
+    df.insert(0, "timestamp", pd.to_datetime(df.pop("epoch"), unit="s"))
+    return df
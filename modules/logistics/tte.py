@@ -1,5 +1,8 @@
+import datetime
+
 import streamlit as st
 import vas_kernel as vk
+from modules.finance.services import get_ledger_amounts
 
 # 1. CORRECT DATA IMPORT (THE FIX)
 # We import the local initializer instead of calling the missing kernel function.
@@ -31,13 +34,11 @@ def render_tte_dashboard():
     st.caption("Operational & Financial Command (Architecture: V7.9 Live)")
     
     # KPI ROW (Live Financials)
-    rev_mtd = 0
-    if 'general_ledger' in st.session_state:
-        gl = st.session_state.general_ledger
-        # Defensive check for legacy schema compatibility
-        if not gl.empty and 'Code' in gl.columns:
-            # Sum Revenue (Codes starting with 4)
-            rev_mtd = gl[gl['Code'].astype(str).str.startswith('4')]['Amount'].sum()
+    # This month's per-account totals (account_balances), not the whole ledger
+    month = datetime.date.today().strftime("%Y-%m")
+    gl = get_ledger_amounts(month, since=month)
+    # Sum Revenue (Codes starting with 4)
+    rev_mtd = gl[gl['Code'].astype(str).str.startswith('4')]['Amount'].sum()
     
     k1, k2, k3, k4 = st.columns(4)
     k1.metric("Utilization", "82%")
@@ -8,13 +8,14 @@ import streamlit as st
 # ROBUST IMPORTS (NO FALLBACKS)
 # ---------------------------------------------------------
 try:
-    from modules.logistics.db_utils import load_data, run_query
+    from modules.logistics.db_utils import init_db, load_data, run_query
 except ImportError:
-    from ..db_utils import load_data, run_query
+    from ..db_utils import init_db, load_data, run_query
 
 from modules.logistics.models import inject_sovereign_data
 from modules.logistics.services import validate_physics_handshake, generate_dispatch_docs
 from modules.logistics.rules import enrich_fleet_data
+from modules.logistics.dispatch_optimizer import optimize_dispatch
 
 
 # ---------------------------------------------------------
@@ -42,22 +43,30 @@ def render_dispatch_console(df_orders: pd.DataFrame, df_fleet: pd.DataFrame):
             valid_cols = [c for c in snapshot_cols if c in df_rich.columns]
             st.dataframe(df_rich[valid_cols], use_container_width=True, hide_index=True)
 
-    # Ensure dispatch journal exists
-    run_query("""
-        CREATE TABLE IF NOT EXISTS log_dispatch_journal (
-            trip_id TEXT PRIMARY KEY,
-            rfq_ref TEXT,
-            truck_reg TEXT,
-            driver TEXT,
-            status TEXT,
-            tare_weight REAL,
-            gross_weight REAL,
-            net_weight REAL,
-            ticket_no TEXT,
-            start_time DATETIME,
-            end_time DATETIME
-        );
-    """)
+    # Ensure required columns exist
+    if not df_rich.empty:
+        if "is_idle" not in df_rich.columns:
+            df_rich["is_idle"] = df_rich["status"] == "Idle"
+        if "max_tons" not in df_rich.columns:
+            df_rich["max_tons"] = 34.0
+
+    # ---------------------------------------------------------
+    # GLOBAL ASSIGNMENT (ALL PENDING RFQS AT ONCE)
+    # ---------------------------------------------------------
+    recommended = {}
+    if not df_orders.empty and not df_rich.empty:
+        plan, info = optimize_dispatch(df_orders, df_rich)
+        recommended = dict(zip(plan["rfq_id"], plan["reg_number"]))
+
+        with st.expander(f"🧠 Recommended Plan ({info['assigned']}/{info['orders']} assigned)"):
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Plan Cost", f"R {info['total_cost']:,.0f}")
+            c2.metric("Deadhead", f"{plan['deadhead_km'].sum():,.0f} km")
+            c3.metric("Solver", info["method"].title(), f"{info['ms']:.0f} ms", delta_color="off")
+            st.dataframe(plan, use_container_width=True, hide_index=True)
+
+    # Dispatch journal ships in the logistics schema bundle (no-op after the first verify)
+    init_db()
 
     df_active_trips = load_data(
         "SELECT * FROM log_dispatch_journal WHERE status != 'DISPATCHED'"
@@ -101,12 +110,6 @@ def render_dispatch_console(df_orders: pd.DataFrame, df_fleet: pd.DataFrame):
                         st.warning("No fleet data available.")
                         continue
 
-                    # Ensure required columns exist
-                    if "is_idle" not in df_rich.columns:
-                        df_rich["is_idle"] = df_rich["status"] == "Idle"
-                    if "max_tons" not in df_rich.columns:
-                        df_rich["max_tons"] = 34.0
-
                     suitable = df_rich[
                         (df_rich["is_idle"]) & (df_rich["max_tons"] >= volume)
                     ]
@@ -115,9 +118,15 @@ def render_dispatch_console(df_orders: pd.DataFrame, df_fleet: pd.DataFrame):
                         st.warning("No suitable idle vehicles.")
                         continue
 
+                    options = list(suitable["reg_number"].unique())
+                    rec = recommended.get(rfq_id)
+                    if rec in options:
+                        st.caption(f"🧠 Recommended: **{rec}**")
+
                     truck_assign = st.selectbox(
                         "Assign Truck",
-                        suitable["reg_number"].unique(),
+                        options,
+                        index=options.index(rec) if rec in options else 0,
                         key=f"t_{rfq_id}_{idx}",
                     )
 
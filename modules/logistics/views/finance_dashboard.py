@@ -5,69 +5,72 @@ import pandas as pd
 import datetime
 
 from modules.logistics.db_utils import load_data
-from modules.logistics.constants import CORRIDORS, DIESEL_PRICE
+from modules.logistics.constants import DIESEL_PRICE
+from modules.core.reference_data import reference_view
 
 # --- FINANCE CORE INTEGRATION ---
 try:
-    from modules.finance.services import create_journal_entry
+    from modules.finance.services import create_journal_entry, get_ledger_amounts
 except ImportError:
     # Fallback if Finance Core is offline
     def create_journal_entry(*args, **kwargs):
         return False, "Finance Core Offline"
 
+    get_ledger_amounts = None
+
 
 # =========================================================
 # FINANCE INTELLIGENCE ENGINES (LOCAL HELPERS)
 # =========================================================
+# One pipeline: the dispatch journal is read once (trip_id + route only),
+# inner-joined to a corridor frame built from CORRIDORS, and CPK, fuel
+# variance and corridor profit are derived from that per-trip cost frame
+# with vectorised arithmetic and a groupby. No per-row Python loops.
+
+FUEL_EFFICIENCY = 38.0  # L/100km, fleet planning figure
+
+_CPK_COLUMNS = ["trip_id", "route", "distance_km", "fuel_cost", "toll_cost", "total_cost", "cpk"]
+
 
-def _compute_cpk():
+def _corridor_frame():
+    """CORRIDORS as one row per route: route, distance_km, toll_cost (from the shared reference copy)."""
+    return reference_view("corridors")[["route", "dist", "tolls"]].rename(
+        columns={"dist": "distance_km", "tolls": "toll_cost"}
+    )
+
+
+def _compute_cpk(df_dispatch: pd.DataFrame | None = None):
     """
-    Computes CPK (Cost Per Kilometer) using:
-    - Dispatch journal (actual trips)
+    Computes CPK (Cost Per Kilometer) per trip using:
+    - Dispatch journal (actual trips; loaded when not passed in)
     - Corridor metadata (distance, tolls)
     - Diesel price (global constant)
+    Trips on routes outside CORRIDORS are dropped; journal order is kept.
     """
-    df = load_data("SELECT * FROM log_dispatch_journal")
+    if df_dispatch is None:
+        df_dispatch = load_data("SELECT trip_id, rfq_ref FROM log_dispatch_journal")
+
+    if df_dispatch.empty:
+        return pd.DataFrame()
 
+    trips = df_dispatch[["trip_id", "rfq_ref"]].rename(columns={"rfq_ref": "route"})
+    df = trips.merge(_corridor_frame(), on="route", how="inner")
     if df.empty:
         return pd.DataFrame()
 
-    rows = []
-
-    for _, row in df.iterrows():
-        route = row.get("rfq_ref", "")
-        if route not in CORRIDORS:
-            continue
-
-        meta = CORRIDORS[route]
-        dist = meta["dist"]
-        tolls = meta["tolls"]
-
-        # Fuel consumption estimate (L/100km)
-        eff = 38.0
-        liters = (dist / 100) * eff
-        fuel_cost = liters * DIESEL_PRICE
-
-        total_cost = fuel_cost + tolls
-        cpk = total_cost / dist if dist > 0 else 0
-
-        rows.append({
-            "trip_id": row.get("trip_id"),
-            "route": route,
-            "distance_km": dist,
-            "fuel_cost": fuel_cost,
-            "toll_cost": tolls,
-            "total_cost": total_cost,
-            "cpk": cpk,
-        })
+    dist = df["distance_km"]
+    df["fuel_cost"] = (dist / 100) * FUEL_EFFICIENCY * DIESEL_PRICE
+    df["total_cost"] = df["fuel_cost"] + df["toll_cost"]
+    df["cpk"] = (df["total_cost"] / dist).where(dist > 0, 0.0)
 
-    return pd.DataFrame(rows)
+    return df[_CPK_COLUMNS]
 
 
-def _compute_fuel_variance(gl_df: pd.DataFrame):
+def _compute_fuel_variance(gl_df: pd.DataFrame, df_cpk: pd.DataFrame | None = None):
     """
     Compares expected vs actual fuel spend.
-    gl_df = general ledger entries (in-memory)
+    gl_df = general ledger amounts by Code (e.g. get_ledger_amounts)
+    df_cpk = output of _compute_cpk (computed when not passed in)
     """
     if gl_df.empty or "Code" not in gl_df.columns:
         return pd.DataFrame()
@@ -76,75 +79,45 @@ def _compute_fuel_variance(gl_df: pd.DataFrame):
     if fuel_entries.empty:
         return pd.DataFrame()
 
-    df_dispatch = load_data("SELECT * FROM log_dispatch_journal")
-    if df_dispatch.empty:
+    if df_cpk is None:
+        df_cpk = _compute_cpk()
+    if df_cpk.empty:
         return pd.DataFrame()
 
-    rows = []
-
-    # Current simple model: compare total expected vs total actual
-    for _, trip in df_dispatch.iterrows():
-        route = trip.get("rfq_ref", "")
-        if route not in CORRIDORS:
-            continue
+    # Current simple model: each trip's expected burn against total actual spend
+    actual_cost = fuel_entries["Amount"].abs().sum()
 
-        meta = CORRIDORS[route]
-        dist = meta["dist"]
+    return pd.DataFrame({
+        "route": df_cpk["route"],
+        "distance_km": df_cpk["distance_km"],
+        "expected_fuel_cost": df_cpk["fuel_cost"],
+        "actual_fuel_cost": actual_cost,
+        "variance": actual_cost - df_cpk["fuel_cost"],
+    })
 
-        # Expected fuel burn
-        eff = 38.0
-        expected_liters = (dist / 100) * eff
-        expected_cost = expected_liters * DIESEL_PRICE
 
-        # Actual fuel spend (aggregate)
-        actual_cost = fuel_entries["Amount"].abs().sum()
-
-        variance = actual_cost - expected_cost
-
-        rows.append({
-            "route": route,
-            "distance_km": dist,
-            "expected_fuel_cost": expected_cost,
-            "actual_fuel_cost": actual_cost,
-            "variance": variance,
-        })
-
-    return pd.DataFrame(rows)
-
-
-def _compute_corridor_profit(gl_df: pd.DataFrame):
+def _compute_corridor_profit(gl_df: pd.DataFrame, df_cpk: pd.DataFrame | None = None):
     """
     Computes profitability per corridor using:
     - Revenue (GL code 4000+)
-    - Costs (from CPK engine)
+    - Costs (from CPK engine; computed when df_cpk is not passed in)
     """
     if gl_df.empty or "Code" not in gl_df.columns:
         return pd.DataFrame()
 
-    df_cpk = _compute_cpk()
+    if df_cpk is None:
+        df_cpk = _compute_cpk()
     if df_cpk.empty:
         return pd.DataFrame()
 
-    revenue_df = gl_df[gl_df["Code"].astype(str).str.startswith("4")]
+    revenue = gl_df.loc[gl_df["Code"].astype(str).str.startswith("4"), "Amount"].sum()
 
-    rows = []
+    df = df_cpk.groupby("route", sort=False)["total_cost"].sum().rename("cost").reset_index()
+    df.insert(1, "revenue", revenue)
+    df["profit"] = revenue - df["cost"]
+    df["margin_pct"] = (df["profit"] / revenue) * 100 if revenue > 0 else 0
 
-    for route in df_cpk["route"].unique():
-        cost = df_cpk[df_cpk["route"] == route]["total_cost"].sum()
-        revenue = revenue_df["Amount"].sum()
-
-        profit = revenue - cost
-        margin = (profit / revenue) * 100 if revenue > 0 else 0
-
-        rows.append({
-            "route": route,
-            "revenue": revenue,
-            "cost": cost,
-            "profit": profit,
-            "margin_pct": margin,
-        })
-
-    return pd.DataFrame(rows)
+    return df
 
 
 def _compute_depreciation(asset_df: pd.DataFrame):
@@ -158,24 +131,30 @@ def _compute_depreciation(asset_df: pd.DataFrame):
     if asset_df.empty:
         return pd.DataFrame()
 
-    rows = []
+    def column(name, default):
+        if name not in asset_df.columns:
+            return pd.Series(default, index=asset_df.index)
+        values = pd.to_numeric(asset_df[name], errors="coerce").fillna(default)
+        return values.mask(values == 0, default)
 
-    for _, row in asset_df.iterrows():
-        cost = row.get("Purchase_Value", 0) or 0
-        life = row.get("Useful_Life_Years", 5) or 5
+    cost = column("Purchase_Value", 0)
+    life = column("Useful_Life_Years", 5)
+    annual_dep = (cost / life).where(life > 0, 0.0)
 
-        annual_dep = cost / life if life > 0 else 0
-        monthly_dep = annual_dep / 12
+    if "Asset_ID" in asset_df.columns:
+        asset = asset_df["Asset_ID"]
+    elif "Reg" in asset_df.columns:
+        asset = asset_df["Reg"]
+    else:
+        asset = pd.Series("Unknown", index=asset_df.index)
 
-        rows.append({
-            "Asset": row.get("Asset_ID", row.get("Reg", "Unknown")),
-            "Purchase_Value": cost,
-            "Useful_Life_Years": life,
-            "Annual_Depreciation": annual_dep,
-            "Monthly_Depreciation": monthly_dep,
-        })
-
-    return pd.DataFrame(rows)
+    return pd.DataFrame({
+        "Asset": asset,
+        "Purchase_Value": cost,
+        "Useful_Life_Years": life,
+        "Annual_Depreciation": annual_dep,
+        "Monthly_Depreciation": annual_dep / 12,
+    }).reset_index(drop=True)
 
 
 # =========================================================
@@ -201,9 +180,11 @@ def render_finance_view():
         direct_costs = 0
         gl_df = pd.DataFrame()
 
-        if "general_ledger" in st.session_state:
-            gl_df = st.session_state.general_ledger
-            if not gl_df.empty and "Code" in gl_df.columns:
+        if get_ledger_amounts is not None:
+            # Per-account totals for this month from account_balances, not the whole ledger
+            month = datetime.date.today().strftime("%Y-%m")
+            gl_df = get_ledger_amounts(month, since=month)
+            if not gl_df.empty:
                 revenue = gl_df[gl_df["Code"].astype(str).str.startswith("4")]["Amount"].sum()
                 direct_costs = gl_df[gl_df["Code"].astype(str).str.startswith("5")]["Amount"].sum()
 
@@ -229,14 +210,14 @@ def render_finance_view():
             st.dataframe(df_cpk, use_container_width=True)
 
         st.markdown("### Corridor Profitability (GL + Dispatch)")
-        df_profit = _compute_corridor_profit(gl_df) if not gl_df.empty else pd.DataFrame()
+        df_profit = _compute_corridor_profit(gl_df, df_cpk) if not gl_df.empty else pd.DataFrame()
         if df_profit.empty:
             st.info("Insufficient data to compute corridor profitability.")
         else:
             st.dataframe(df_profit, use_container_width=True)
 
         st.markdown("### Fuel Variance (Expected vs Actual)")
-        df_var = _compute_fuel_variance(gl_df) if not gl_df.empty else pd.DataFrame()
+        df_var = _compute_fuel_variance(gl_df, df_cpk) if not gl_df.empty else pd.DataFrame()
         if df_var.empty:
             st.info("No fuel entries found in the ledger.")
         else:
@@ -303,23 +284,6 @@ def render_finance_view():
 
                     if success:
                         st.success(f"✅ Posted: {t_desc}")
-
-                        new_row = pd.DataFrame(
-                            [
-                                {
-                                    "Date": t_date,
-                                    "Code": debit_code,
-                                    "Desc": t_desc,
-                                    "Amount": -t_amount,
-                                    "Km": 0,
-                                }
-                            ]
-                        )
-                        if "general_ledger" in st.session_state:
-                            st.session_state.general_ledger = pd.concat(
-                                [st.session_state.general_ledger, new_row],
-                                ignore_index=True,
-                            )
                         st.rerun()
                     else:
                         st.error(f"⛔ Error: {msg}")
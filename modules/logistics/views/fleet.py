@@ -25,6 +25,18 @@ except ImportError:
         df["mission_history"] = None
         return df
 
+from modules.logistics.telemetry_analytics import latest_activity
+
+# Telemetry summary columns shown on the board (telemetry_daily, latest day per truck)
+_ACTIVITY_COLS = {
+    "day": "last_active",
+    "distance_km": "km",
+    "moving_min": "driving_h",
+    "idle_min": "idle_min",
+    "overspeed_episodes": "overspeed",
+    "harsh_brake": "harsh_brakes",
+}
+
 
 def render_fleet_registry(df_fleet):
     st.markdown("## 🚛 Logistics Cloud | Fleet Control Tower")
@@ -52,6 +64,13 @@ def render_fleet_registry(df_fleet):
             # Sort for readability
             df_rich_sorted = df_rich.sort_values("reg_number") if "reg_number" in df_rich.columns else df_rich
 
+            # Driving activity from the daily telemetry summaries (never raw pings)
+            activity = latest_activity()
+            if not activity.empty and "reg_number" in df_rich_sorted.columns:
+                activity = activity[["reg_number", *_ACTIVITY_COLS]].rename(columns=_ACTIVITY_COLS)
+                activity["driving_h"] = activity["driving_h"] / 60
+                df_rich_sorted = df_rich_sorted.merge(activity, on="reg_number", how="left")
+
             desired_cols = [
                 "reg_number",
                 "make_model",
@@ -61,6 +80,7 @@ def render_fleet_registry(df_fleet):
                 "mission_driver",
                 "location_clean",
                 "availability_forecast",
+                *_ACTIVITY_COLS.values(),
                 "max_tons",
                 "hazchem_compliant",
             ]
@@ -70,6 +90,11 @@ def render_fleet_registry(df_fleet):
                 df_rich_sorted[display_cols],
                 use_container_width=True,
                 hide_index=True,
+                column_config={
+                    "km": st.column_config.NumberColumn("km", format="%.0f"),
+                    "driving_h": st.column_config.NumberColumn("Driving (h)", format="%.1f"),
+                    "idle_min": st.column_config.NumberColumn("Idle (min)", format="%.0f"),
+                },
             )
 
             st.markdown("### 📜 Mission History (Last 3 per Vehicle)")
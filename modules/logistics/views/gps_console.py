@@ -6,16 +6,25 @@ try:
     from modules.logistics.gps_engine import run_gps_simulation
     from modules.logistics.db_utils import load_data
     from modules.logistics.rules import enrich_fleet_data
+    from modules.logistics.telemetry_store import start_background_maintenance
+    from modules.logistics.geofence import load_fences, recent_geofence_events, vehicles_on_site
+    from modules.logistics.trajectory import compress_day, list_tracks, trip_replay
 except ImportError:
     from ..gps_engine import run_gps_simulation
     from ..db_utils import load_data
     from ..rules import enrich_fleet_data
+    from ..telemetry_store import start_background_maintenance
+    from ..geofence import load_fences, recent_geofence_events, vehicles_on_site
+    from ..trajectory import compress_day, list_tracks, trip_replay
 
 
 def render_gps_console():
     st.subheader("📡 GPS Engine Console")
     st.markdown("Simulates GPS movement and updates live fleet telemetry.")
 
+    # Rollups + raw-partition retention (one daemon per process)
+    start_background_maintenance()
+
     # ---------------------------------------------------------
     # Trigger GPS Simulation
     # ---------------------------------------------------------
@@ -23,6 +32,8 @@ def render_gps_console():
         run_gps_simulation()
         st.success("GPS updated.")
         st.rerun()
+    st.caption("Live trackers: `python -m modules.logistics.ingest_server` (JSON lines over TCP / UDP, port 5055). "
+               "Load-test it with `python -m modules.logistics.tracker_sim --trucks 500 --rate 5000`.")
 
     # ---------------------------------------------------------
     # Load fleet + enrich with GPS context
@@ -59,6 +70,53 @@ def render_gps_console():
         hide_index=True,
     )
 
+    # ---------------------------------------------------------
+    # Geofences (automatic site arrival / departure)
+    # ---------------------------------------------------------
+    st.markdown("### 📍 Geofences")
+    g1, g2 = st.columns(2)
+    with g1:
+        st.caption("Vehicles on site")
+        on_site = vehicles_on_site()
+        if on_site.empty:
+            st.info("No vehicles inside a fence.")
+        else:
+            st.dataframe(on_site, use_container_width=True, hide_index=True)
+    with g2:
+        st.caption("Latest ENTER / EXIT events")
+        events = recent_geofence_events(50)
+        if events.empty:
+            st.info("No geofence events yet.")
+        else:
+            st.dataframe(events, use_container_width=True, hide_index=True)
+    with st.expander("Fence Register"):
+        st.dataframe(load_fences().drop(columns=["polygon", "active"], errors="ignore"),
+                     use_container_width=True, hide_index=True)
+
+    # ---------------------------------------------------------
+    # Trip Replay (compressed tracks)
+    # ---------------------------------------------------------
+    st.markdown("### 🎞️ Trip Replay")
+    if st.button("Compress Today's Tracks"):
+        out = compress_day(pd.Timestamp.now().strftime("%Y%m%d"))
+        st.toast(f"{out['tracks']} tracks: {out['raw_points']:,} pings -> {out['kept_points']:,} points")
+
+    tracks = list_tracks(limit=100)
+    if tracks.empty:
+        st.info("No compressed tracks yet.")
+    else:
+        track_id = st.selectbox("Track", tracks["track_id"], format_func=lambda t: t.replace("@", " — "))
+        info = tracks[tracks["track_id"] == track_id].iloc[0]
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Distance", f"{info['distance_km']:,.1f} km")
+        r2.metric("Max Speed", f"{info['max_speed'] or 0:,.0f} km/h")
+        r3.metric("Idle", f"{info['idle_minutes']:,.0f} min")
+        r4.metric("Points Kept", f"{info['kept_points']:,}", f"of {info['raw_points']:,} (≤ {info['max_error_m']:.0f} m)",
+                  delta_color="off")
+        replay = trip_replay(track_id)
+        st.map(replay, latitude="latitude", longitude="longitude", size=20)
+        st.line_chart(replay.set_index("timestamp")["speed"], height=160)
+
     # ---------------------------------------------------------
     # Per‑Vehicle Detail
     # ---------------------------------------------------------
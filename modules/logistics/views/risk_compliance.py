@@ -4,40 +4,22 @@ import datetime
 
 # --- 1. ROBUST IMPORTS ---
 try:
-    from .db_utils import load_data, run_query
+    from .db_utils import init_db, load_data, run_query
 except ImportError:
     try:
-        from ..db_utils import load_data, run_query
+        from ..db_utils import init_db, load_data, run_query
     except ImportError:
-        from modules.logistics.db_utils import load_data, run_query
+        from modules.logistics.db_utils import init_db, load_data, run_query
+
+from modules.logistics.telemetry_analytics import OVERSPEED_KMH, driver_behaviour, overspeed_episodes
 
 
 # =========================================================
 # 2. SELF-HEALING SCHEMA (RESILIENT)
 # =========================================================
 def ensure_risk_tables():
-    """Creates risk and compliance tables if they don't exist."""
-    run_query("""
-        CREATE TABLE IF NOT EXISTS log_risk_incidents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date DATE,
-            type TEXT,
-            severity TEXT,
-            description TEXT,
-            cost_impact REAL,
-            status TEXT
-        );
-    """)
-
-    run_query("""
-        CREATE TABLE IF NOT EXISTS log_compliance_docs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            doc_type TEXT,
-            ref_number TEXT,
-            expiry_date DATE,
-            status TEXT
-        );
-    """)
+    """Risk and compliance tables ship in the logistics schema bundle (verified once per process)."""
+    init_db()
 
 
 # =========================================================
@@ -48,8 +30,9 @@ def render_risk_view():
 
     ensure_risk_tables()
 
-    tab_incidents, tab_vault = st.tabs([
+    tab_incidents, tab_driving, tab_vault = st.tabs([
         "🚨 Risk Ledger (Live)",
+        "🚦 Driving Behaviour",
         "🪪 Compliance Vault (DB)"
     ])
 
@@ -125,7 +108,41 @@ def render_risk_view():
                     st.rerun()
 
     # =========================================================
-    # TAB 2: COMPLIANCE VAULT
+    # TAB 2: DRIVING BEHAVIOUR (telemetry_daily / telemetry_overspeed)
+    # =========================================================
+    with tab_driving:
+        window = st.selectbox("Window", [7, 30, 90], index=1, format_func=lambda d: f"Last {d} days")
+        since = (datetime.date.today() - datetime.timedelta(days=window)).isoformat()
+        df_drive = driver_behaviour(since)
+
+        if df_drive.empty:
+            st.info("No telemetry summaries yet. They are built by the GPS maintenance pass.")
+        else:
+            d1, d2, d3, d4 = st.columns(4)
+            d1.metric("Distance", f"{df_drive['distance_km'].sum():,.0f} km")
+            d2.metric("Idle (ignition on)", f"{df_drive['idle_h'].sum():,.1f} h")
+            d3.metric(f"Overspeed (> {OVERSPEED_KMH:.0f} km/h)", int(df_drive["overspeed_episodes"].sum()))
+            d4.metric("Harsh Events", int((df_drive["harsh_accel"] + df_drive["harsh_brake"]).sum()))
+
+            st.dataframe(
+                df_drive,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "distance_km": st.column_config.NumberColumn("km", format="%.0f"),
+                    "moving_h": st.column_config.NumberColumn("Driving (h)", format="%.1f"),
+                    "idle_h": st.column_config.NumberColumn("Idle (h)", format="%.1f"),
+                    "overspeed_min": st.column_config.NumberColumn("Overspeed (min)", format="%.1f"),
+                    "overspeed_per_100km": st.column_config.NumberColumn("Overspeed / 100 km", format="%.2f"),
+                    "harsh_per_100km": st.column_config.NumberColumn("Harsh / 100 km", format="%.2f"),
+                },
+            )
+
+            st.markdown("#### 🏁 Worst Overspeed Episodes")
+            st.dataframe(overspeed_episodes(since, limit=50), use_container_width=True, hide_index=True)
+
+    # =========================================================
+    # TAB 3: COMPLIANCE VAULT
     # =========================================================
     with tab_vault:
         df_docs = load_data("SELECT * FROM log_compliance_docs")
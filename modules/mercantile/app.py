@@ -2,8 +2,9 @@ import streamlit as st
 import pandas as pd
 import os
 import datetime
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import sessionmaker
+from modules.core.query_trace import trace_rerun, trace_section, traced_engine
 
 # --- IMPORT MODELS ---
 from modules.mercantile.models import Base, SovereignAsset, TradePosition, TreasuryInstrument
@@ -15,7 +16,7 @@ PUMP_PRICE = 24.50   # Retail Diesel Price
 def get_engine():
     db_path = r"C:\Users\Balisa\OneDrive\Documents\Business\Veridian Markets\IT\Python Code\project_cortex\cortex_live.db"
     if not os.path.exists(db_path): return None
-    return create_engine(f'sqlite:///{db_path}')
+    return traced_engine(f'sqlite:///{db_path}')
 
 def init_mercantile_db(engine):
     """
@@ -64,6 +65,7 @@ def save_treasury_instrument(ref, type_, bank, amount, curr, date, deal_link):
             })
             conn.commit()
 
+@trace_rerun("Mercantile")
 def render_mercantile_vertical():
     st.markdown("## 🏛️ Magisterial Mercantile | Sovereign Assets")
     st.caption("v15.4 Principal Holdings • Energy Import • Commodity Export • Treasury")
@@ -115,7 +117,7 @@ def render_mercantile_vertical():
     ])
 
     # === TAB 1: ENERGY DESK ===
-    with tab_energy:
+    with tab_energy, trace_section("Energy Desk"):
         st.subheader("Liquid Asset Management")
         c_left, c_right = st.columns([1, 2])
         with c_left:
@@ -138,7 +140,7 @@ def render_mercantile_vertical():
                 st.warning("No Liquid Assets found.")
 
     # === TAB 2: COMMODITY DESK ===
-    with tab_comm:
+    with tab_comm, trace_section("Commodity Desk"):
         st.subheader("Solid Asset Arbitrage")
         c1, c2 = st.columns(2)
         with c1:
@@ -159,7 +161,7 @@ def render_mercantile_vertical():
                 st.success("Position Locked. Logistics Orders Sent to TTE.")
 
     # === TAB 3: TREASURY (ACTIVATED) ===
-    with tab_treasury:
+    with tab_treasury, trace_section("Treasury"):
         st.subheader("Central Bank Console")
         
         t_blotter, t_issue = st.tabs(["📜 Instrument Blotter", "✍️ Issue Instrument"])
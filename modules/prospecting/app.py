@@ -12,25 +12,12 @@ from modules.core.db_manager import (
     set_annual_target,
     get_annual_target
 )
+from modules.logistics.constants import REGION_COORDS  # SA regional centroids (shared with the route builder)
 
 # --- CONFIGURATION & GEO-INTELLIGENCE ---
 STAGE_WEIGHTS = {"New": 0.10, "Contacted": 0.25, "Meeting": 0.50, "Negotiation": 0.75, "WON": 1.00}
 INTERACTION_TYPES = ["WhatsApp", "LinkedIn DM", "Video Call", "Call", "Email", "Site Visit", "Strategy Session"]
 
-# SA REGIONAL COORDINATES (Central Points)
-REGION_COORDS = {
-    "Gauteng": {"lat": -26.2041, "lon": 28.0473},
-    "KZN": {"lat": -29.8587, "lon": 31.0218},
-    "Western Cape": {"lat": -33.9249, "lon": 18.4241},
-    "Mpumalanga": {"lat": -25.4753, "lon": 30.9694},
-    "Limpopo": {"lat": -23.4013, "lon": 29.4179},
-    "North West": {"lat": -26.6639, "lon": 25.8828},
-    "Free State": {"lat": -28.4541, "lon": 26.7968},
-    "Eastern Cape": {"lat": -32.2968, "lon": 26.4194},
-    "Northern Cape": {"lat": -29.0467, "lon": 21.8569},
-    "Cross-Border": {"lat": -17.8216, "lon": 31.0492}
-}
-
 def render_prospecting_vertical():
     # --- HEADER AESTHETICS ---
     st.markdown("## ⚔️ War Room | Strategic Command")
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import sqlite3
-from modules.core.db_manager import DB_NAME
+from modules.core.db_manager import DB_NAME, cortex_connection
 
 def render_retail_portal():
     """
@@ -36,15 +36,12 @@ def render_retail_portal():
         submitted = st.form_submit_button("🚀 Submit Order")
         
         if submitted and client:
-            # Simple write-back logic
-            conn = sqlite3.connect(DB_NAME)
-            c = conn.cursor()
+            # Simple write-back logic (pooled connection, so cached reads see the new order)
             import datetime
             order_id = f"ORD-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}"
             
             # Inject into retail_orders table
-            c.execute("INSERT INTO retail_orders (order_id, retailer_name, sku_id, qty, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                      (order_id, client, product, qty, "Pending", datetime.datetime.now().isoformat()))
-            conn.commit()
-            conn.close()
+            with cortex_connection() as conn:
+                conn.execute("INSERT INTO retail_orders (order_id, retailer_name, sku_id, qty, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                             (order_id, client, product, qty, "Pending", datetime.datetime.now().isoformat()))
             st.success(f"Order {order_id} Received. Dispatch notified.")
@@ -3,6 +3,7 @@ import pandas as pd
 import json
 from modules.finance.services import create_journal_entry
 from modules.core.db_manager import load_technical_skus, load_prospects_to_dataframe
+from modules.logistics.road_network import road_km
 
 def get_logistics_handshake(sku_id, qty_tons):
     """
@@ -24,8 +25,8 @@ def get_logistics_handshake(sku_id, qty_tons):
         v_type = "34-Ton Tri-Axle Flatbed" if qty_tons > 15 else "8-Ton Flatbed"
         base_rate = 24.50 # Standard Commercial Rate
 
-    # Transport Estimate (Standard JHB to DBN route)
-    distance = 550 
+    # Transport Estimate (Standard JHB to DBN route, from the hub road network)
+    distance = road_km("JHB", "DBN")
     est_cost = distance * base_rate
     
     return {
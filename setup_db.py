@@ -1,11 +1,11 @@
-from sqlalchemy import create_engine
 from core_registry.models import Base
+from modules.core.query_trace import traced_engine
 
 # This creates the database file in the same folder
 DATABASE_URL = "sqlite:///veridian_cortex.db"
 
 def init_db():
-    engine = create_engine(DATABASE_URL)
+    engine = traced_engine(DATABASE_URL)
     Base.metadata.create_all(engine)
     print(f"STATUS: Database initialized successfully at {DATABASE_URL}")
     print("STATUS: Schema 'SuspectEntity' created.")
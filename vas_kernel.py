@@ -2,6 +2,15 @@ import streamlit as st
 import pandas as pd
 # NEW: Import Database Manager
 from modules.core.db_manager import init_db, load_ledger_to_dataframe, load_trades_to_dataframe
+from modules.finance.services import get_ledger_store
+from modules.core.reference_data import register_reference, session_reference
+
+# (Prospecting persistence can be added in Sprint 4.1, keeping seed for now)
+HUNTER_SEED = [
+    {'Company': 'Anglo American', 'Status': 'Active', 'Sector': 'Mining', 'ES_Risk_Score': 2.0},
+    {'Company': 'Sasol', 'Status': 'Lead', 'Sector': 'Energy', 'ES_Risk_Score': 4.5}
+]
+register_reference('hunter_seed', lambda: pd.DataFrame(HUNTER_SEED))
 
 def boot_system():
     """
@@ -16,22 +25,10 @@ def boot_system():
     if 'system_status' not in st.session_state:
         st.session_state.system_status = "ONLINE"
 
-    # 2. FINANCE KERNEL (Load from Disk)
-    if 'general_ledger' not in st.session_state:
-        # Try load from DB
-        df_ledger = load_ledger_to_dataframe()
-        
-        if df_ledger.empty:
-            # Fallback to empty schema if DB is new
-            st.session_state.general_ledger = pd.DataFrame(columns=[
-                'Entry_ID', 'Date', 'Description', 'Reference', 'Code', 'Account', 'Debit', 'Credit', 'Type'
-            ])
-        else:
-            st.session_state.general_ledger = df_ledger
-            
-    # Legacy Support (journal_entries) - Link to GL
-    if 'journal_entries' not in st.session_state:
-         st.session_state.journal_entries = st.session_state.general_ledger
+    # 2. FINANCE KERNEL (Lazy load from Disk)
+    # The ledger store only reads ledger_lines when a report first asks for
+    # the GL, so booting no longer pulls the whole table into memory.
+    get_ledger_store(loader=load_ledger_to_dataframe)
 
     # 3. TRADE KERNEL (Load from Disk)
     if 'trade_rfqs' not in st.session_state:
@@ -51,9 +48,5 @@ def boot_system():
             st.session_state.trade_rfqs = df_trades
 
     # 4. HUNTER KERNEL
-    if 'hunter_db' not in st.session_state:
-        # (Prospecting persistence can be added in Sprint 4.1, keeping seed for now)
-        st.session_state.hunter_db = pd.DataFrame([
-            {'Company': 'Anglo American', 'Status': 'Active', 'Sector': 'Mining', 'ES_Risk_Score': 2.0},
-            {'Company': 'Sasol', 'Status': 'Lead', 'Sector': 'Energy', 'ES_Risk_Score': 4.5}
-        ])
+    # Shared seed; the session's copy-on-write view diverges only when a prospect is added
+    session_reference('hunter_db', 'hunter_seed')